@@ -57,13 +57,13 @@ class AdminController:
         # Rezept eines Cocktails anzeigen
         return self.cocktail_model.get_recipe(cocktail_id)
 
-    def add_recipe_item(self, cocktail_id: int, ingredient_id: int, amount_ml: float, order_index: int):
+    def add_recipe_item(self, cocktail_id: int, ingredient_id: int, amount_ml: float, order_index: int, order_group: int | None = None):
         # Zutat ins Rezept einfügen
-        self.cocktail_model.add_recipe_item(cocktail_id, ingredient_id, amount_ml, order_index)
+        self.cocktail_model.add_recipe_item(cocktail_id, ingredient_id, amount_ml, order_index, order_group)
 
-    def update_recipe_item(self, cocktail_id: int, ingredient_id: int, amount_ml: float, order_index: int):
-        # Rezeptzeile ändern (Menge/Reihenfolge)
-        self.cocktail_model.update_recipe_item(cocktail_id, ingredient_id, amount_ml, order_index)
+    def update_recipe_item(self, cocktail_id: int, ingredient_id: int, amount_ml: float, order_index: int, order_group: int | None = None):
+        # Rezeptzeile ändern (Menge/Reihenfolge/Gruppe)
+        self.cocktail_model.update_recipe_item(cocktail_id, ingredient_id, amount_ml, order_index, order_group)
 
     def delete_recipe_item(self, cocktail_id: int, ingredient_id: int):
         # Zutat aus Rezept entfernen
@@ -188,6 +188,21 @@ class AdminController:
     def get_homing_safe_height(self):
         return self.settings_model.get_homing_safe_height()
 
+    def set_rehome_every_n_mixes(self, count: int):
+        # 0 = nur bei Bedarf referenzieren.
+        if int(count) < 0:
+            raise ValueError("rehome_every_n_mixes muss >= 0 sein")
+        self.settings_model.set_rehome_every_n_mixes(int(count))
+
+    def get_rehome_every_n_mixes(self) -> int:
+        return self.settings_model.get_rehome_every_n_mixes()
+
+    def set_rehome_after_fault(self, enabled: bool):
+        self.settings_model.set_rehome_after_fault(bool(enabled))
+
+    def get_rehome_after_fault(self) -> bool:
+        return self.settings_model.get_rehome_after_fault()
+
     def set_simulation_mode(self, enabled: bool):
         # Simulation schaltet Hardwareaktionen im Laptop-Modus um.
         self.settings_model.set_simulation_mode(bool(enabled))
@@ -1,41 +1,104 @@
 from Services.mix_engine import MixEngine
-from Model.mix_model import MixModel
+from Services.mix_estimator_service import get_mix_estimator_service
+from Services.mix_plan_service import get_mix_plan_service
+from Services.order_queue_service import OrderQueueService
 
 
 class MixController:
-    def __init__(self, db_path=None):
-        # Engine steuert Hardware, Model liefert Rezeptdaten.
-        self.engine = MixEngine()
-        self.model = MixModel(db_path=db_path)
+    def __init__(self, db_path=None, clock=None):
+        # Engine steuert Hardware, Mixplaene liefern vorberechnete Rezeptdaten.
+        # clock: Standard ist die Systemzeit, Benchmarks geben eine VirtualClock mit.
+        self.engine = MixEngine(clock=clock, db_path=db_path)
+        self.plans = get_mix_plan_service(db_path)
+        # Dauerschaetzung fuer Kacheln und Queue, lernt aus den Messungen der Engine.
+        self.estimator = get_mix_estimator_service(db_path)
+        # Persistente Warteschlange arbeitet Auftraege ueber genau einen Worker ab.
+        # Unterbrochene Mixe setzt die Queue vor neuen Auftraegen fort.
+        self.order_queue = OrderQueueService(
+            self.run_mix,
+            db_path=db_path,
+            resume_fn=self.engine.resume_mix,
+            checkpoints=self.engine.checkpoints,
+        )
+        self.order_queue.start()
 
     def mix_cocktail(self, cocktail_id: int, factor: float = 1.0):
-        # Rezept vor dem Start vollstaendig aus der DB laden.
-        mix_data = self.model.get_full_mix_data(cocktail_id)
-        if not mix_data:
-            # Ohne Rezeptdaten kann kein sinnvoller Ablauf gebaut werden.
-            raise ValueError(f"Kein Rezept fuer Cocktail-ID {cocktail_id} gefunden.")
-        for item in mix_data:
-            # Cocktail-ID bleibt pro Schritt fuer Regal- und Level-Logik verfuegbar.
-            item["cocktail_id"] = int(cocktail_id)
+        # Mixplan fuer Rezept und Faktor aus dem Cache (oder einmalig kompiliert).
+        mix_data = self.plans.get_plan(cocktail_id, factor).to_mix_data()
         return self.engine.mix_cocktail(mix_data, factor)
 
+    def estimate_mix(self, cocktail_id: int, factor: float = 1.0) -> dict:
+        # Voraussichtliche Mixdauer mit Aufteilung nach Phasen.
+        return self.estimator.estimate(cocktail_id, factor)
+
     def get_status(self):
         # Kombinierter Mixer- und Regalstatus fuer die UI.
         return self.engine.get_status()
 
+    def subscribe_status(self, callback):
+        # Statusaenderungen pushen statt pollen; callback laeuft im Poller-Thread.
+        return self.engine.subscribe_status(callback)
+
     # Fuer GUI: vorbereiten des DB Teils im UI Thread, verhindert GUI freeze.
-    def prepare_mix(self, cocktail_id: int):
-        # DB-Zugriff vor dem Worker-Thread erledigen.
-        mix_data = self.model.get_full_mix_data(cocktail_id)
-        if not mix_data:
-            raise ValueError(f"Kein Rezept fuer Cocktail-ID {cocktail_id} gefunden.")
-        for item in mix_data:
-            item["cocktail_id"] = int(cocktail_id)
-        return mix_data
-
-    def run_mix(self, mix_data, factor: float = 1.0):
+    def prepare_mix(self, cocktail_id: int, factor: float = 1.0):
+        # DB-Zugriff vor dem Worker-Thread erledigen; wiederholte Starts treffen den Cache.
+        return self.plans.get_plan(cocktail_id, factor).to_mix_data()
+
+    def run_mix(self, mix_data, factor: float = 1.0, order_id: int = None):
         # Vorbereitete Rezeptdaten an die Hardware-Engine geben.
-        return self.engine.mix_cocktail(mix_data, factor)
+        return self.engine.mix_cocktail(mix_data, factor, order_id=order_id)
+
+    def resume_mix(self):
+        # Unterbrochenen Mix direkt fortsetzen (ohne Queue).
+        return self.engine.resume_mix()
+
+    def get_mix_checkpoint(self):
+        # Stand des unterbrochenen Mixes oder None.
+        return self.engine.checkpoints.describe(self.engine.checkpoints.get_resumable())
+
+    def discard_mix_checkpoint(self):
+        # Unterbrochenen Mix verwerfen, z.B. wenn das Glas entnommen wurde.
+        return self.order_queue.discard_interrupted()
+
+    def mix_batch(self, cocktail_id: int, count: int, factor: float = 1.0, order_id: int = None):
+        # N Glaeser desselben Cocktails: Plan und Regal-Parameter nur einmal laden.
+        # Engine-Uhr, damit Laeufe mit VirtualClock simulierte Zeit melden.
+        clock = self.engine.clock
+        start = clock.monotonic()
+        plan = self.plans.get_plan(cocktail_id, factor)
+        plan_s = clock.monotonic() - start
+        report = self.engine.mix_batch(
+            plan.to_mix_data(), count, factor, plan.get_regal_params(), order_id=order_id
+        )
+        report["plan_s"] = plan_s
+        return report
+
+    def enqueue_order(self, cocktail_id: int, factor: float = 1.0, priority: int = 0):
+        # Auftrag in die Warteschlange stellen statt direkt zu mixen.
+        return self.order_queue.enqueue(cocktail_id, factor=factor, priority=priority)
+
+    def get_order_queue(self):
+        # Offene Auftraege mit ETA fuer die UI.
+        return self.order_queue.get_snapshot()
+
+    def cancel_order(self, order_id: int):
+        self.order_queue.cancel(order_id)
+
+    def resume_order_queue(self):
+        # Queue nach Fehler, Stop oder Neustart wieder freigeben.
+        self.order_queue.resume()
+
+    def get_mix_timeline_runs(self, limit: int = 20):
+        # Zuletzt aufgezeichnete Mixe fuer die Zeitleiste im Adminbereich.
+        return self.engine.timeline.get_runs(limit)
+
+    def get_mix_timeline(self, run_id: int):
+        # Phasen eines aufgezeichneten Mixes.
+        return self.engine.timeline.get_spans(run_id)
+
+    def get_bus_stats(self):
+        # I2C-Latenzen fuer die Diagnose.
+        return self.engine.get_bus_stats()
 
     def request_stop(self):
         # Stop wird direkt an die Engine weitergereicht.
@@ -50,8 +113,8 @@ class MixController:
         self.engine.admin_move_regal_lift_to_position(int(position_mm))
 
     def shutdown(self):
-        # Hardware-Polling zuerst stoppen, danach DB-Verbindung schliessen.
+        # Queue und Hardware-Polling stoppen.
         try:
-            self.engine.close()
+            self.order_queue.close()
         finally:
-            self.model.close()
+            self.engine.close()
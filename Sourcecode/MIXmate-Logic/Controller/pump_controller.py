@@ -15,6 +15,7 @@ class PumpController:
         self.calibration_service = PumpCalibrationService(
             monitor=self.engine.monitor,
             status_service=self.engine.status_service,
+            cancel_token=self.engine.stop_token,
         )
         # sim_trace zeigt Kalibrierbefehle im Simulationsmonitor.
         self.sim_trace = get_simulation_trace_service()
@@ -45,11 +46,13 @@ class PumpController:
 
     def ensure_homed(self):
         # Kalibrierfahrten starten nur nach Referenzfahrt sicher.
-        self.engine.ensure_homed()
+        with self.engine.exclusive_run("Kalibrierung"):
+            self.engine.ensure_homed()
 
     def move_to_position(self, position_mm: int):
         # Direkte Fahrt fuer Pumpenpositionierung in der Kalibrierung.
-        self.engine.move_to_position(position_mm)
+        with self.engine.exclusive_run("Kalibrierung"):
+            self.engine.move_to_position(position_mm)
 
     def run_pump_for_calibration(self, pump_number: int, seconds: int):
         if self.engine.is_simulation_mode():
@@ -64,11 +67,13 @@ class PumpController:
             return sec
 
         # Echtbetrieb laeuft ueber den Kalibrier-Service mit Status-Waits.
-        return self.calibration_service.run_pump_for_seconds(
-            i2c=self.engine.i2c,
-            pump_number=pump_number,
-            seconds=seconds,
-        )
+        # exclusive_run setzt das Stop-Signal nur zurueck, wenn kein Mix laeuft.
+        with self.engine.exclusive_run("Kalibrierung"):
+            return self.calibration_service.run_pump_for_seconds(
+                i2c=self.engine.i2c,
+                pump_number=pump_number,
+                seconds=seconds,
+            )
 
     def save_flow_rate_from_measurement(self, pump_number: int, measured_ml: float, seconds: int):
         # Gemessene Menge wird in ml/s umgerechnet.
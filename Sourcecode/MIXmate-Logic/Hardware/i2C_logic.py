@@ -1,15 +1,11 @@
 # I2C-Kommunikation mit dem Mixer-Arduino.
 # Statusformat (5 Byte):
 # [busy, band, pos_low, pos_high, homing_ok]
+# Erweiterte Firmware (7 Byte):
+# [busy, band, pos_low, pos_high, homing_ok, glass_present, glass_moved]
 
-try:
-    from smbus2 import SMBus, i2c_msg
-except ImportError as e:
-    SMBus = None
-    i2c_msg = None
-    _IMPORT_ERROR = e
-else:
-    _IMPORT_ERROR = None
+# smbus2 oder der virtuelle Bus (MIXMATE_I2C_BACKEND=virtual).
+from Hardware.i2c_backend import IMPORT_ERROR as _IMPORT_ERROR, SMBus, i2c_msg
 
 I2C_BUS = 1
 I2C_ADDR = 0x13
@@ -22,17 +18,49 @@ CMD_PUMPE = 3
 CMD_BELADEN = 4
 CMD_ENTLADEN = 5
 CMD_STOP = 6
+# Pumpenlauf in Millisekunden: [cmd, pumpe, ms uint32 little-endian]
+CMD_PUMPE_MS = 7
+# Faehigkeiten abfragen: Antwort [CAPS_MAGIC, Version, Flags]
+CMD_CAPS = 8
+# Mehrere Pumpen gleichzeitig: [cmd, n, (pumpe, ms uint32 little-endian) * n]
+CMD_PUMPE_MULTI = 9
+
+CAPS_MAGIC = 0xCA
+CAPS_LEN = 3
+CAP_PUMPE_MS = 0x01
+CAP_PUMPE_MULTI = 0x02
+
+# Laengster Pumpenlauf pro Befehl; laengere Laeufe werden aufgeteilt.
+PUMP_MS_MAX = 600000
+PUMP_S_MAX = 255
+# 2 + 5 * 6 Byte passen in den 32-Byte-Wire-Puffer des Arduino.
+PUMP_MULTI_MAX = 6
+
+# Laenge des Statuspakets (Basis und erweitert mit Glas-Flags).
+STATUS_LEN = 5
+STATUS_LEN_EXT = 7
+# Nach so vielen unplausiblen Antworten bleibt es beim zweistufigen Statusread.
+COMBINED_STATUS_MAX_FAILS = 3
 
 
 class i2C_logic:
-    def __init__(self):
+    def __init__(self, bus=None):
         if _IMPORT_ERROR is not None:
             # Zielsystem braucht smbus2 fuer den echten I2C-Bus.
             raise RuntimeError(
                 "smbus2 ist nicht installiert. Bitte im Zielsystem installieren: pip install smbus2"
             ) from _IMPORT_ERROR
-        # Bus 1 ist der Standard-I2C-Bus am Raspberry Pi.
-        self.bus = SMBus(I2C_BUS)
+        # Bus 1 ist der Standard-I2C-Bus am Raspberry Pi; Benchmarks reichen einen eigenen Bus rein.
+        self.bus = bus if bus is not None else SMBus(I2C_BUS)
+        # Geteilter Bus (I2CBusService) wird von seinem Besitzer geschlossen.
+        self._owns_bus = bus is None
+        # Statusread per Repeated Start, bis die Firmware ihn nicht unterstuetzt.
+        self.combined_status = True
+        self._combined_status_fails = 0
+        # Statuslaenge wird beim ersten gueltigen Paket ausgehandelt; None = noch unbekannt.
+        self.status_len = None
+        # Firmware-Faehigkeiten (CAP_*-Flags); None = noch nicht abgefragt.
+        self.capabilities = None
         print("[I2C] Hardware aktiv.")
 
     def i2c_write(self, payload: bytes, read_len: int = 0) -> bytes:
@@ -74,7 +102,7 @@ class i2C_logic:
     def get_current_position(self):
         # Position aus dem normalen Statuspaket lesen.
         raw = self.getstatus_raw()
-        if len(raw) != 5:
+        if len(raw) not in (STATUS_LEN, STATUS_LEN_EXT):
             print("[I2C] Keine gueltige Statusantwort.")
             return None
         return int.from_bytes(raw[2:4], "little", signed=True)
@@ -91,6 +119,73 @@ class i2C_logic:
         payload = bytes([CMD_PUMPE, pump_id, seconds])
         self.i2c_write(payload, read_len=1)
 
+    def detect_capabilities(self):
+        # Faehigkeiten der Firmware einmalig abfragen.
+        # Alte Firmware antwortet nur mit ACK (0x06) und bekommt Flags 0.
+        raw = self.i2c_write(bytes([CMD_CAPS]), read_len=CAPS_LEN)
+        if len(raw) != CAPS_LEN:
+            # Keine Antwort: spaeter erneut versuchen.
+            return None
+        if raw[0] == CAPS_MAGIC:
+            self.capabilities = int(raw[2])
+            print(f"[I2C] Firmware-Faehigkeiten v{raw[1]}: 0x{self.capabilities:02X}")
+        else:
+            self.capabilities = 0
+            print("[I2C] Firmware ohne CMD_CAPS, nutze Pumpenlauf in Sekunden.")
+        return self.capabilities
+
+    def supports_pump_ms(self) -> bool:
+        return bool((self.capabilities or 0) & CAP_PUMPE_MS)
+
+    def supports_pump_multi(self) -> bool:
+        return bool((self.capabilities or 0) & CAP_PUMPE_MULTI)
+
+    def pump_multi_rounds(self, runs: list) -> list:
+        # Parallele Laeufe [(pumpe, ms), ...] in Befehle mit max. PUMP_MS_MAX pro Pumpe teilen.
+        remaining = [(int(pump_id), max(0, int(duration_ms))) for pump_id, duration_ms in runs]
+        rounds = []
+        while any(duration_ms > 0 for _, duration_ms in remaining):
+            rounds.append([(pump_id, min(duration_ms, PUMP_MS_MAX)) for pump_id, duration_ms in remaining if duration_ms > 0])
+            remaining = [(pump_id, duration_ms - PUMP_MS_MAX) for pump_id, duration_ms in remaining]
+        return rounds
+
+    def pump_segments(self, duration_ms: int) -> list:
+        # Laufzeit in Einzelbefehle aufteilen, die die Firmware annimmt (Werte in ms).
+        duration_ms = max(0, int(duration_ms))
+        if self.supports_pump_ms():
+            max_ms = PUMP_MS_MAX
+        else:
+            # Sekundenbefehl: auf ganze Sekunden runden, mindestens 1 s.
+            duration_ms = max(1, int(round(duration_ms / 1000.0))) * 1000
+            max_ms = PUMP_S_MAX * 1000
+        segments = []
+        while duration_ms > 0:
+            chunk = min(duration_ms, max_ms)
+            segments.append(chunk)
+            duration_ms -= chunk
+        return segments
+
+    def activate_pump_ms(self, pump_id: int, duration_ms: int):
+        # Pumpe fuer eine Laufzeit in ms starten; alte Firmware bekommt Sekunden.
+        duration_ms = max(0, min(PUMP_MS_MAX, int(duration_ms)))
+        if not self.supports_pump_ms():
+            seconds = max(1, int(round(duration_ms / 1000.0))) if duration_ms > 0 else 0
+            self.activate_pump(pump_id, seconds)
+            return
+
+        payload = bytes([CMD_PUMPE_MS, pump_id]) + duration_ms.to_bytes(4, "little")
+        self.i2c_write(payload, read_len=1)
+
+    def activate_pumps_ms(self, runs: list):
+        # Mehrere Pumpen gleichzeitig starten, jede mit eigener Laufzeit in ms.
+        if len(runs) > PUMP_MULTI_MAX:
+            raise ValueError(f"Maximal {PUMP_MULTI_MAX} Pumpen pro Befehl")
+        payload = bytes([CMD_PUMPE_MULTI, len(runs)])
+        for pump_id, duration_ms in runs:
+            duration_ms = max(0, min(PUMP_MS_MAX, int(duration_ms)))
+            payload += bytes([int(pump_id)]) + duration_ms.to_bytes(4, "little")
+        self.i2c_write(payload, read_len=1)
+
     def beladen(self):
         # Mixerband in Beladen-Richtung starten.
         self.i2c_write(bytes([CMD_BELADEN]), read_len=1)
@@ -103,20 +198,66 @@ class i2C_logic:
         # Alle laufenden Mixeraktionen stoppen.
         self.i2c_write(bytes([CMD_STOP]), read_len=1)
 
+    def _status_packet_valid(self, raw: bytes) -> bool:
+        # busy, band und homing sind 0/1; ein ACK (0x06) mit 0xFF-Fuellbytes faellt durch.
+        return len(raw) >= STATUS_LEN and raw[0] in (0, 1) and raw[1] in (0, 1) and raw[4] in (0, 1)
+
+    def _read_len(self) -> int:
+        # Solange die Version unbekannt ist, das lange Paket anfragen.
+        return self.status_len or STATUS_LEN_EXT
+
+    def _negotiate_status(self, raw: bytes) -> bytes:
+        # Alte Firmware sendet nur 5 Byte, der Rest kommt als 0xFF vom Bus.
+        if len(raw) == STATUS_LEN_EXT:
+            if raw[5] in (0, 1) and raw[6] in (0, 1):
+                if self.status_len is None:
+                    self.status_len = STATUS_LEN_EXT
+                    print("[I2C] Firmware liefert erweiterten Status (7 Byte, Glas-Flags).")
+                return raw
+            if self.status_len is None:
+                self.status_len = STATUS_LEN
+                print("[I2C] Firmware liefert Basisstatus (5 Byte).")
+        return raw[:STATUS_LEN]
+
+    def _getstatus_raw_combined(self) -> bytes:
+        # Eine Transaktion: CMD_STATUS schreiben, Repeated Start, Statuspaket lesen.
+        write_msg = i2c_msg.write(I2C_ADDR, bytes([CMD_STATUS]))
+        read_msg = i2c_msg.read(I2C_ADDR, self._read_len())
+        self.bus.i2c_rdwr(write_msg, read_msg)
+        return bytes(read_msg)
+
+    def _getstatus_raw_legacy(self) -> bytes:
+        # Alter Ablauf: CMD_STATUS mit ACK-Read, danach separater Read.
+        _ = self.i2c_write(bytes([CMD_STATUS]), read_len=1)
+        read_msg = i2c_msg.read(I2C_ADDR, self._read_len())
+        self.bus.i2c_rdwr(read_msg)
+        return bytes(read_msg)
+
     def getstatus_raw(self) -> bytes:
-        # Statusformat: [busy, band, pos_low, pos_high, homing_ok]
+        # Statusformat: [busy, band, pos_low, pos_high, homing_ok(, glass_present, glass_moved)]
         try:
-            # Firmware erwartet erst CMD_STATUS, dann den Read.
-            _ = self.i2c_write(bytes([CMD_STATUS]), read_len=1)
-            read_msg = i2c_msg.read(I2C_ADDR, 5)
-            self.bus.i2c_rdwr(read_msg)
-            return bytes(read_msg)
+            if self.combined_status:
+                raw = self._getstatus_raw_combined()
+                if self._status_packet_valid(raw):
+                    self._combined_status_fails = 0
+                    return self._negotiate_status(raw)
+                # Antwort kam, passt aber nicht: Firmware kennt den kombinierten Read evtl. nicht.
+                self._combined_status_fails += 1
+                if self._combined_status_fails >= COMBINED_STATUS_MAX_FAILS:
+                    self.combined_status = False
+                    print("[I2C] Kombinierter Statusread nicht unterstuetzt, nutze zweistufigen Read.")
+            raw = self._getstatus_raw_legacy()
+            if not self._status_packet_valid(raw):
+                return raw
+            return self._negotiate_status(raw)
         except Exception as e:
             print(f"[I2C] Status lesen fehlgeschlagen: {e}")
             return b""
 
     def close(self):
         # I2C-Bus beim Programmende freigeben.
+        if not self._owns_bus:
+            return
         try:
             self.bus.close()
         except Exception:
@@ -0,0 +1,27 @@
+# Auswahl des I2C-Backends fuer Mixer, Regal und I2CBusService.
+# Standard ist smbus2 (echter Bus am Raspberry Pi); mit MIXMATE_I2C_BACKEND=virtual
+# laeuft alles gegen den emulierten Bus aus Hardware/virtual_i2c_bus.py.
+
+import os
+
+BACKEND_ENV = "MIXMATE_I2C_BACKEND"
+
+
+def use_virtual_bus() -> bool:
+    return os.environ.get(BACKEND_ENV, "").strip().lower() == "virtual"
+
+
+if use_virtual_bus():
+    from Hardware.virtual_i2c_bus import SMBus, i2c_msg
+
+    IMPORT_ERROR = None
+    print("[I2C] Virtueller I2C-Bus aktiv (keine Hardware).")
+else:
+    try:
+        from smbus2 import SMBus, i2c_msg
+    except ImportError as e:
+        SMBus = None
+        i2c_msg = None
+        IMPORT_ERROR = e
+    else:
+        IMPORT_ERROR = None
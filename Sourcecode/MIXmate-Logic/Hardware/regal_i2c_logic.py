@@ -1,14 +1,8 @@
 # I2C-Protokoll fuer den Regal-Controller an Adresse 0x12.
 # Status: [busy, sensor_flags, pos_low, pos_high, homing_ok].
 
-try:
-    from smbus2 import SMBus, i2c_msg
-except ImportError as e:
-    SMBus = None
-    i2c_msg = None
-    _IMPORT_ERROR = e
-else:
-    _IMPORT_ERROR = None
+# smbus2 oder der virtuelle Bus (MIXMATE_I2C_BACKEND=virtual).
+from Hardware.i2c_backend import IMPORT_ERROR as _IMPORT_ERROR, SMBus, i2c_msg
 
 
 I2C_BUS = 1
@@ -22,14 +16,24 @@ CMD_BELADEN = 4
 CMD_ENTLADEN = 5
 CMD_STOP = 8
 
+# Laenge des Statuspakets.
+STATUS_LEN = 5
+# Nach so vielen unplausiblen Antworten bleibt es beim zweistufigen Statusread.
+COMBINED_STATUS_MAX_FAILS = 3
+
 
 class RegalI2CLogic:
-    def __init__(self, bus_number: int = I2C_BUS):
+    def __init__(self, bus_number: int = I2C_BUS, bus=None):
         if _IMPORT_ERROR is not None:
             raise RuntimeError(
                 "smbus2 ist nicht installiert. Bitte im Zielsystem installieren: pip install smbus2"
             ) from _IMPORT_ERROR
-        self.bus = SMBus(bus_number)
+        self.bus = bus if bus is not None else SMBus(bus_number)
+        # Geteilter Bus (I2CBusService) wird von seinem Besitzer geschlossen.
+        self._owns_bus = bus is None
+        # Statusread per Repeated Start, bis die Firmware ihn nicht unterstuetzt.
+        self.combined_status = True
+        self._combined_status_fails = 0
 
     def _i2c_write(self, payload: bytes, read_len: int = 0) -> bytes:
         # I2C-Paket an den Regal-Controller senden.
@@ -88,20 +92,55 @@ class RegalI2CLogic:
         # Laufende Regalbewegungen stoppen.
         self._i2c_write(bytes([CMD_STOP]), read_len=1)
 
+    def _status_packet_valid(self, raw: bytes) -> bool:
+        # Byte 1 sind Sensorflags; busy und homing muessen 0/1 sein, ein ACK (0x06) faellt durch.
+        return len(raw) == STATUS_LEN and raw[0] in (0, 1) and raw[4] in (0, 1)
+
+    def _get_status_raw_combined(self) -> bytes:
+        # Eine Transaktion: CMD_STATUS schreiben, Repeated Start, Statuspaket lesen.
+        write_msg = i2c_msg.write(I2C_ADDR_REGAL, bytes([CMD_STATUS]))
+        read_msg = i2c_msg.read(I2C_ADDR_REGAL, STATUS_LEN)
+        self.bus.i2c_rdwr(write_msg, read_msg)
+        return bytes(read_msg)
+
+    def _get_status_raw_legacy(self) -> bytes:
+        # Alter Ablauf: CMD_STATUS mit ACK-Read, danach separater Read.
+        _ = self._i2c_write(bytes([CMD_STATUS]), read_len=1)
+        read_msg = i2c_msg.read(I2C_ADDR_REGAL, STATUS_LEN)
+        self.bus.i2c_rdwr(read_msg)
+        return bytes(read_msg)
+
     def get_status_raw(self) -> bytes:
         # Rohes 5-Byte-Statuspaket lesen.
         try:
-            _ = self._i2c_write(bytes([CMD_STATUS]), read_len=1)
-            read_msg = i2c_msg.read(I2C_ADDR_REGAL, 5)
-            self.bus.i2c_rdwr(read_msg)
-            return bytes(read_msg)
+            if self.combined_status:
+                raw = self._get_status_raw_combined()
+                if self._status_packet_valid(raw):
+                    self._combined_status_fails = 0
+                    return raw
+                # Antwort kam, passt aber nicht: Firmware kennt den kombinierten Read evtl. nicht.
+                self._combined_status_fails += 1
+                if self._combined_status_fails >= COMBINED_STATUS_MAX_FAILS:
+                    self.combined_status = False
+                    print("[Regal-I2C] Kombinierter Statusread nicht unterstuetzt, nutze zweistufigen Read.")
+            return self._get_status_raw_legacy()
         except Exception as e:
             print(f"[Regal-I2C] Status lesen fehlgeschlagen: {e}")
             return b""
 
     def get_status(self) -> dict:
+        # Regalstatus direkt vom Bus lesen (ohne Monitor-Cache).
+        return self.parse_status(self.get_status_raw())
+
+    def parse_status(self, raw: bytes) -> dict:
         # Regal-Statuspaket in sprechende Felder umwandeln.
-        raw = self.get_status_raw()
+        if not raw:
+            # Leere Antwort: Controller antwortet nicht.
+            return {
+                "ok": False,
+                "error_code": "I2C_NO_RESPONSE",
+                "error_msg": "Keine Antwort vom Regal-Controller.",
+            }
         if len(raw) != 5:
             # Ungueltige Paketlaenge bedeutet Protokoll- oder Busproblem.
             return {
@@ -132,6 +171,8 @@ class RegalI2CLogic:
 
     def close(self):
         # I2C-Bus schliessen.
+        if not self._owns_bus:
+            return
         try:
             self.bus.close()
         except Exception:
@@ -0,0 +1,1036 @@
+# Virtueller I2C-Bus mit Mixer- (0x13) und Regal-Controller (0x12), kompatibel zu smbus2.
+# Bildet die Zustandsautomaten aus Mixer.ino und Regal.ino nach: Schlitten und Lift mit
+# Beschleunigungsrampen, blockierendes Homing, Pumpentimer, Foerderbaender, Glassensoren
+# und die 5/7-Byte-Statuspakete. Damit laufen die echten MixEngine-Pfade (Polling, Warten,
+# Timeouts) ohne Hardware, z.B. fuer Benchmarks und Regressionstests auf einem Linux-PC.
+#
+# Aktivierung: MIXMATE_I2C_BACKEND=virtual (siehe Hardware/i2c_backend.py).
+# Zeitskala: MIXMATE_I2C_TIME_SCALE, z.B. 20 = Maschine laeuft zwanzigmal schneller als Echtzeit.
+# Zu grosse Skalen lassen kurze Sensorimpulse zwischen zwei Statusreads verschwinden,
+# genau wie ein zu langsamer Poll an echter Hardware (Monitor-Takt 30 ms -> Skala <= ~20).
+#
+# Vereinfachungen: Foerderrichtungen werden nicht ausgewertet, Glaeser bewegen sich mit der
+# Bandgeschwindigkeit zwischen festen Sensorabstaenden.
+
+import os
+import threading
+import time
+
+TIME_SCALE_ENV = "MIXMATE_I2C_TIME_SCALE"
+# 0 schaltet den Regal-Controller ab (Mixer-only-Aufbau).
+REGAL_ENV = "MIXMATE_VIRTUAL_REGAL"
+# 7 = erweiterte Mixer-Firmware mit Glas-Flags.
+STATUS_LEN_ENV = "MIXMATE_VIRTUAL_STATUS_LEN"
+# I2C-Takt fuer die Uebertragungsdauer; 0 = ohne Buszeit.
+BUS_HZ_ENV = "MIXMATE_VIRTUAL_BUS_HZ"
+
+I2C_M_RD = 0x0001
+
+MIXER_ADDR = 0x13
+REGAL_ADDR = 0x12
+
+ACK = 0x06
+
+# Glas- und Bandgeometrie in mm (Sensorabstaende der Uebergaben).
+CONVEYOR_MM_S = 100.0
+GLASS_MM = 80.0
+# Ebene -> Lift: Ebenensensor frei nach 60 mm, Liftsensor erkennt das Glas nach 150 mm.
+LEVEL_FRONT_CLEAR_MM = 60.0
+LEVEL_TO_LIFT_MM = 150.0
+# Naechstes Glas der Ebene steht dicht dahinter und erreicht den Sensor, bevor der Lift meldet.
+LEVEL_REFILL_MM = 40.0
+# Lift <-> Mixer: Quellsensor frei nach 80 mm, Zielsensor erkennt das Glas nach 200 mm.
+HANDOVER_CLEAR_MM = 80.0
+HANDOVER_MM = 200.0
+# Warteschiene: Glas startet auf dem Lift (negative Position), Sensoren am Anfang und Ende.
+LIFT_TO_WAIT_MM = 120.0
+LIFT_SENSOR_CLEAR_MM = 40.0
+WAIT_START_SENSOR_MM = 40.0
+WAIT_BAND_MM = 400.0
+WAIT_END_SENSOR_MM = 370.0
+
+
+class i2c_msg:
+    # Nachbau von smbus2.i2c_msg: addr, flags, buf; bytes(msg) liefert die Nutzdaten.
+
+    def __init__(self, addr: int, flags: int, buf: bytearray):
+        self.addr = int(addr)
+        self.flags = int(flags)
+        self.buf = buf
+
+    @property
+    def len(self) -> int:
+        return len(self.buf)
+
+    @classmethod
+    def write(cls, address: int, buf):
+        return cls(address, 0, bytearray(buf))
+
+    @classmethod
+    def read(cls, address: int, length: int):
+        return cls(address, I2C_M_RD, bytearray(int(length)))
+
+    def __len__(self):
+        return len(self.buf)
+
+    def __iter__(self):
+        return iter(bytes(self.buf))
+
+    def __bytes__(self):
+        return bytes(self.buf)
+
+    def __repr__(self):
+        return f"i2c_msg(addr=0x{self.addr:02X}, flags={self.flags}, buf={list(self.buf)})"
+
+
+class _Axis:
+    # Schrittmotor wie AccelStepper.run(): Trapezprofil mit Beschleunigung, Position in Steps.
+
+    def __init__(self, max_speed: float, accel: float):
+        self.max_speed = float(max_speed)
+        self.accel = float(accel)
+        self.pos = 0.0
+        self.speed = 0.0
+        self.target = 0.0
+
+    def move_to(self, target: float):
+        self.target = float(target)
+
+    def stop(self):
+        # Wie AccelStepper.stop(): Ziel auf den Bremsweg legen, Bewegung laeuft aus.
+        if self.speed == 0.0:
+            self.target = self.pos
+            return
+        brake = self.speed * self.speed / (2.0 * self.accel)
+        self.target = self.pos + (brake if self.speed > 0 else -brake)
+
+    def halt(self):
+        # setSpeed(0) + moveTo(currentPosition()): sofortiger Stillstand.
+        self.speed = 0.0
+        self.target = self.pos
+
+    def set_position(self, pos: float):
+        self.pos = float(pos)
+        self.target = float(pos)
+        self.speed = 0.0
+
+    def moving(self) -> bool:
+        return self.speed != 0.0 or abs(self.target - self.pos) >= 0.5
+
+    def step(self, dt: float):
+        dist = self.target - self.pos
+        if abs(dist) < 0.5 and abs(self.speed) * dt < 0.5:
+            self.pos = self.target
+            self.speed = 0.0
+            return
+        direction = 1.0 if dist > 0 else -1.0
+        brake = self.speed * self.speed / (2.0 * self.accel)
+        if self.speed * direction < 0 or brake >= abs(dist):
+            # Bremsen (oder Richtungswechsel): Geschwindigkeit Richtung 0.
+            delta = self.accel * dt
+            if abs(self.speed) <= delta:
+                self.speed = 0.0
+            else:
+                self.speed -= delta if self.speed > 0 else -delta
+        else:
+            self.speed += direction * self.accel * dt
+            self.speed = max(-self.max_speed, min(self.max_speed, self.speed))
+        self.pos += self.speed * dt
+        if (self.target - self.pos) * direction <= 0 and self.speed * direction >= 0:
+            # Ziel erreicht oder ueberfahren: wie die Firmware genau auf dem Ziel stehen.
+            self.pos = self.target
+            self.speed = 0.0
+
+
+class _Homing:
+    # Blockierende Referenzfahrt: optionale Vorfahrt mit Rampe, dann konstante Fahrt zum Sensor.
+
+    def __init__(self, premove_steps: float, speed: float):
+        self.premove_steps = float(premove_steps)
+        self.speed = float(speed)
+        self.phase = "premove" if premove_steps > 0 else "seek"
+
+
+class VirtualMixer:
+    # Mixer.ino: Schlitten (PLF), Band mit Sensor-/Timer-Modus, 10 Pumpen.
+    CMD_FAHR = 0
+    CMD_HOME = 1
+    CMD_STATUS = 2
+    CMD_PUMPE = 3
+    CMD_BELADEN = 4
+    CMD_ENTLADEN = 5
+    CMD_STOP = 6
+    CMD_PUMPE_MS = 7
+    CMD_CAPS = 8
+    CMD_PUMPE_MULTI = 9
+
+    STEPS_PER_MM = 17
+    PLF_MAX_SPEED = 3000.0
+    PLF_ACCEL = 1000.0
+    HOME_SPEED = 800.0
+    BAND_MAX_SPEED = 1500.0
+    BAND_ACCEL = 1000.0
+    BAND_STEPS_PER_MM = BAND_MAX_SPEED / CONVEYOR_MM_S
+    BAND_TIMEOUT_S = 10.0
+    BAND_CONTINUOUS_STEPS = 100000000.0
+    PUMP_COUNT = 10
+    PUMP_MS_MAX = 600000
+    PUMP_MULTI_MAX = 6
+    CAPS = bytes([0xCA, 1, 0x03])
+
+    def __init__(self, machine, status_len: int = 5, start_mm: float = 100.0):
+        self.machine = machine
+        self.status_len = 7 if int(status_len) == 7 else 5
+        self.plf = _Axis(self.PLF_MAX_SPEED, self.PLF_ACCEL)
+        # Physische Position = Schrittzaehler + Versatz; Home-Sensor bei physisch 0.
+        self._offset = float(start_mm) * self.STEPS_PER_MM
+        self.band = _Axis(self.BAND_MAX_SPEED, self.BAND_ACCEL)
+        self.band_mode = None
+        self.band_stop_at = None
+        self.band_stopping = False
+        self.busy = False
+        self.is_homed = False
+        self.homing = None
+        self.pumps = {}
+        self.last_cmd = 0
+        # Kommando, das waehrend des blockierenden Homings ankommt (nur das letzte zaehlt).
+        self.pending = None
+        self.glass_moved = False
+
+    def physical_mm(self) -> float:
+        return (self.plf.pos + self._offset) / self.STEPS_PER_MM
+
+    def position_mm(self) -> int:
+        # Firmware teilt ganzzahlig (Richtung 0).
+        return int(self.plf.pos / self.STEPS_PER_MM)
+
+    def band_speed_mm_s(self) -> float:
+        # Positiv = Beladen (zum Mixer hin), negativ = Entladen.
+        return self.band.speed / self.BAND_STEPS_PER_MM
+
+    def is_active(self) -> bool:
+        return (
+            self.homing is not None
+            or self.plf.moving()
+            or self.band_mode is not None
+            or bool(self.pumps)
+        )
+
+    # --- I2C ---
+
+    def receive(self, data: bytes):
+        if not data:
+            return
+        cmd = data[0]
+        self.last_cmd = cmd
+        if self.homing is not None:
+            # home() blockiert den loop(): das zuletzt empfangene Kommando wartet (Status ueberschreibt es).
+            self.pending = bytes(data)
+            return
+        self._execute(bytes(data))
+
+    def request(self, length: int) -> bytes:
+        if self.last_cmd == self.CMD_STATUS:
+            return self._status_packet()
+        if self.last_cmd == self.CMD_CAPS:
+            return self.CAPS
+        return bytes([ACK])
+
+    def _status_packet(self) -> bytes:
+        busy = self.busy or self.is_active()
+        pos = max(-32768, min(32767, self.position_mm())) & 0xFFFF
+        out = [
+            1 if busy else 0,
+            1 if self.machine.mixer_glass else 0,
+            pos & 0xFF,
+            (pos >> 8) & 0xFF,
+            1 if self.is_homed else 0,
+        ]
+        if self.status_len == 7:
+            out += [1 if self.machine.mixer_glass else 0, 1 if self.glass_moved else 0]
+        return bytes(out)
+
+    def _execute(self, data: bytes):
+        cmd = data[0]
+        if cmd == self.CMD_FAHR:
+            if len(data) >= 3:
+                mm = int.from_bytes(data[1:3], "little", signed=True)
+                self.busy = True
+                self.plf.move_to(mm * self.STEPS_PER_MM)
+        elif cmd == self.CMD_HOME:
+            self.busy = True
+            self.is_homed = False
+            self.plf.halt()
+            self.homing = _Homing(0, self.HOME_SPEED)
+        elif cmd == self.CMD_PUMPE:
+            if len(data) >= 3:
+                self._pumpe([(data[1], int(data[2]) * 1000)])
+        elif cmd == self.CMD_PUMPE_MS:
+            if len(data) >= 6:
+                self._pumpe([(data[1], int.from_bytes(data[2:6], "little"))])
+        elif cmd == self.CMD_PUMPE_MULTI:
+            n = data[1] if len(data) >= 2 else 0
+            if n > self.PUMP_MULTI_MAX or len(data) < 2 + 5 * n:
+                n = 0
+            runs = []
+            for k in range(n):
+                base = 2 + 5 * k
+                runs.append((data[base], int.from_bytes(data[base + 1:base + 5], "little")))
+            self._pumpe(runs)
+        elif cmd == self.CMD_BELADEN:
+            self._start_band("beladen")
+        elif cmd == self.CMD_ENTLADEN:
+            self._start_band("entladen")
+        elif cmd == self.CMD_STOP:
+            self.stop_all()
+
+    def _pumpe(self, runs: list):
+        # Einzel- und Mehrfachbefehl stoppen zuerst alle laufenden Pumpen.
+        self.busy = True
+        self.pumps = {}
+        for pump_id, duration_ms in runs:
+            if not 1 <= int(pump_id) <= self.PUMP_COUNT:
+                continue
+            duration_ms = min(int(duration_ms), self.PUMP_MS_MAX)
+            if duration_ms == 0:
+                self.pumps.pop(int(pump_id), None)
+                continue
+            self.pumps[int(pump_id)] = duration_ms / 1000.0
+        self.busy = bool(self.pumps)
+
+    def _start_band(self, mode: str):
+        self.pumps = {}
+        self.band.halt()
+        forward = mode == "beladen"
+        self.band.move_to(self.band.pos + (self.BAND_CONTINUOUS_STEPS if forward else -self.BAND_CONTINUOUS_STEPS))
+        self.band_mode = mode
+        self.band_stop_at = self.machine.sim_time + self.BAND_TIMEOUT_S if mode == "entladen" else None
+        self.band_stopping = False
+        if forward:
+            self.glass_moved = False
+        self.plf.stop()
+        self.busy = True
+
+    def stop_all(self):
+        self.pumps = {}
+        self.band.halt()
+        self.band_mode = None
+        self.band_stop_at = None
+        self.band_stopping = False
+        self.plf.halt()
+        self.busy = False
+
+    # --- loop() ---
+
+    def step(self, dt: float):
+        if self.homing is not None:
+            self._step_homing(dt)
+            return
+        self.plf.step(dt)
+        self._step_band(dt)
+        self._step_pumps(dt)
+        if not self.is_active():
+            self.busy = False
+
+    def _step_homing(self, dt: float):
+        self.plf.pos -= self.homing.speed * dt
+        self.plf.target = self.plf.pos
+        if self.plf.pos + self._offset <= 0:
+            self._offset = 0.0
+            self.plf.set_position(0)
+            self.homing = None
+            self.busy = False
+            self.is_homed = True
+            if self.pending is not None:
+                pending, self.pending = self.pending, None
+                self._execute(pending)
+
+    def _step_band(self, dt: float):
+        if self.band_mode is None:
+            return
+        self.band.step(dt)
+        if not self.band_stopping:
+            if self.band_stop_at is not None:
+                # Timer-Modus (Entladen).
+                if self.machine.sim_time >= self.band_stop_at:
+                    self.band.stop()
+                    self.band_stopping = True
+            elif self.machine.mixer_glass:
+                # Sensor-Modus (Beladen): Band bremst, sobald ein Glas erkannt wird.
+                self.band.stop()
+                self.band_stopping = True
+        if self.band_stopping and not self.band.moving():
+            self.band_mode = None
+            self.band_stop_at = None
+            self.band_stopping = False
+            self.busy = False
+
+    def _step_pumps(self, dt: float):
+        if not self.pumps:
+            return
+        for pump_id in list(self.pumps):
+            self.pumps[pump_id] -= dt
+            if self.pumps[pump_id] <= 0:
+                del self.pumps[pump_id]
+        if not self.pumps:
+            self.busy = False
+
+
+class VirtualRegal:
+    # Regal.ino: Lift mit Rampe, Liftband, zwei Ebenen, Warteschiene.
+    CMD_LIFT = 0
+    CMD_HOME = 1
+    CMD_STATUS = 2
+    CMD_EBENE = 3
+    CMD_BELADEN = 4
+    CMD_ENTLADEN = 5
+    CMD_STOP = 8
+
+    LIFT_STEPS_PER_MM = 20.0
+    LIFT_MAX_SPEED = 1500.0
+    LIFT_ACCEL = 500.0
+    HOME_SPEED = 800.0
+    HOME_PREMOVE_MM = 70
+    LEVEL_WAIT_POSITION = 3
+    ENTLADEN_MIN_RUNTIME_S = 5.0
+    ENTLADEN_SENSOR_TIMEOUT_S = 30.0
+    BELADEN_LEVEL_REFILL_TIMEOUT_S = 10.0
+
+    def __init__(self, machine, start_mm: float = 50.0):
+        self.machine = machine
+        self.lift = _Axis(self.LIFT_MAX_SPEED, self.LIFT_ACCEL)
+        self._offset = float(start_mm) * self.LIFT_STEPS_PER_MM
+        self.busy = False
+        self.is_homed = False
+        self.homing = None
+        self.last_cmd = 0
+        self.pending = None
+        self.selected_level = 1
+        self.selected_forward = True
+        # Laufende Foerderbaender dieses loop()-Durchlaufs.
+        self.conveyors = set()
+        self._clear_band_modes()
+
+    def _clear_band_modes(self):
+        self.beladen_active = False
+        self.entladen_active = False
+        self.entladen_blocked = False
+        self.beladen_lift_done = False
+        self.beladen_level_cleared = False
+        self.beladen_level_done = False
+        self.beladen_started = None
+        self.beladen_refill_started = None
+        self.entladen_started = None
+        self.entladen_clear_started = None
+        self.entladen_wait_end_seen = False
+        self.conveyors = set()
+
+    def physical_mm(self) -> float:
+        return (self.lift.pos + self._offset) / self.LIFT_STEPS_PER_MM
+
+    def position_mm(self) -> int:
+        return int(round(self.lift.pos / self.LIFT_STEPS_PER_MM))
+
+    def is_active(self) -> bool:
+        return self.homing is not None or self.lift.moving() or self.beladen_active or self.entladen_active
+
+    def wait_level_selected(self) -> bool:
+        return self.selected_level == self.LEVEL_WAIT_POSITION
+
+    # --- I2C ---
+
+    def receive(self, data: bytes):
+        if not data:
+            return
+        self.last_cmd = data[0]
+        if self.homing is not None:
+            self.pending = bytes(data)
+            return
+        self._execute(bytes(data))
+
+    def request(self, length: int) -> bytes:
+        if self.last_cmd == self.CMD_STATUS:
+            return self._status_packet()
+        return bytes([ACK])
+
+    def _status_packet(self) -> bytes:
+        m = self.machine
+        flags = 0
+        if m.lift_occupied():
+            flags |= 1 << 0
+        if m.wait_start_occupied():
+            flags |= 1 << 1
+        if m.wait_end_occupied():
+            flags |= 1 << 2
+        if m.level_front.get(1):
+            flags |= 1 << 3
+        if m.level_front.get(2):
+            flags |= 1 << 4
+        if self.entladen_blocked:
+            flags |= 1 << 6
+        busy = self.busy or self.is_active()
+        pos = max(-32768, min(32767, self.position_mm())) & 0xFFFF
+        return bytes([1 if busy else 0, flags, pos & 0xFF, (pos >> 8) & 0xFF, 1 if self.is_homed else 0])
+
+    def _execute(self, data: bytes):
+        cmd = data[0]
+        if cmd == self.CMD_LIFT:
+            if len(data) >= 3:
+                mm = int.from_bytes(data[1:3], "little", signed=True)
+                self._clear_band_modes()
+                self.busy = True
+                self.lift.move_to(round(mm * self.LIFT_STEPS_PER_MM))
+        elif cmd == self.CMD_HOME:
+            self._clear_band_modes()
+            self.busy = True
+            self.is_homed = False
+            self.lift.halt()
+            premove = self.HOME_PREMOVE_MM * self.LIFT_STEPS_PER_MM
+            self.lift.move_to(self.lift.pos + premove)
+            self.homing = _Homing(premove, self.HOME_SPEED)
+        elif cmd == self.CMD_EBENE:
+            if len(data) >= 2:
+                self._select_level(data[1])
+        elif cmd == self.CMD_BELADEN:
+            self._beladen()
+        elif cmd == self.CMD_ENTLADEN:
+            self._entladen()
+        elif cmd == self.CMD_STOP:
+            self._clear_band_modes()
+            self.lift.halt()
+            self.busy = False
+
+    def _select_level(self, encoded: int):
+        has_direction = bool(encoded & 0x40)
+        level = encoded & 0x3F
+        if level == 2:
+            self.selected_level = 2
+        elif level == self.LEVEL_WAIT_POSITION:
+            self.selected_level = self.LEVEL_WAIT_POSITION
+        else:
+            self.selected_level = 1
+        self.selected_forward = bool(encoded & 0x80) if has_direction else True
+
+    def _beladen(self):
+        self.entladen_active = False
+        self.entladen_blocked = False
+        self.beladen_lift_done = False
+        self.beladen_level_cleared = False
+        self.beladen_level_done = False
+        self.beladen_started = self.machine.sim_time
+        self.beladen_refill_started = None
+        self.beladen_active = True
+        self.busy = True
+
+    def _entladen(self):
+        m = self.machine
+        if not m.lift_occupied() or (self.wait_level_selected() and m.wait_end_occupied()):
+            # Kein Glas auf dem Lift bzw. Warteschiene voll: Entladen blockiert.
+            self.entladen_blocked = True
+            self.entladen_active = False
+            self.beladen_active = False
+            self.busy = False
+            self.conveyors = set()
+            return
+        self.entladen_blocked = False
+        self.beladen_active = False
+        self.entladen_active = True
+        self.entladen_started = m.sim_time
+        self.entladen_clear_started = None
+        self.entladen_wait_end_seen = False
+        self.busy = True
+
+    # --- loop() ---
+
+    def step(self, dt: float):
+        if self.homing is not None:
+            self._step_homing(dt)
+            return
+        self.lift.step(dt)
+        self.conveyors = set()
+        self._step_beladen()
+        self._step_entladen()
+        if not self.is_active():
+            self.busy = False
+
+    def _step_homing(self, dt: float):
+        if self.homing.phase == "premove":
+            self.lift.step(dt)
+            if not self.lift.moving():
+                self.homing.phase = "seek"
+            return
+        self.lift.pos -= self.homing.speed * dt
+        self.lift.target = self.lift.pos
+        if self.lift.pos + self._offset <= 0:
+            self._offset = 0.0
+            self.lift.set_position(0)
+            self.homing = None
+            self.busy = False
+            self.is_homed = True
+            if self.pending is not None:
+                pending, self.pending = self.pending, None
+                self._execute(pending)
+
+    def _step_beladen(self):
+        if not self.beladen_active:
+            return
+        m = self.machine
+        now = m.sim_time
+        lift_occ = m.lift_occupied()
+
+        if self.wait_level_selected():
+            # Rueckgabe vom Mixer auf den Lift.
+            if not lift_occ:
+                self.conveyors.add("lift")
+            timeout = now - self.beladen_started >= self.ENTLADEN_SENSOR_TIMEOUT_S
+            if lift_occ or timeout:
+                self.beladen_active = False
+                self.busy = False
+                self.conveyors = set()
+            return
+
+        level = self.selected_level
+        level_occ = bool(m.level_front.get(level))
+        if not self.beladen_lift_done and not lift_occ:
+            self.conveyors.add("lift")
+        elif lift_occ:
+            self.beladen_lift_done = True
+
+        if not self.beladen_level_done:
+            if not self.beladen_level_cleared:
+                self.conveyors.add(f"level{level}")
+                if not level_occ:
+                    self.beladen_level_cleared = True
+                    self.beladen_refill_started = now
+            elif level_occ:
+                self.beladen_level_done = True
+            else:
+                self.conveyors.add(f"level{level}")
+                if now - self.beladen_refill_started >= self.BELADEN_LEVEL_REFILL_TIMEOUT_S:
+                    self.beladen_level_done = True
+
+        if self.beladen_lift_done and self.beladen_level_done:
+            self.beladen_active = False
+            self.busy = False
+            self.conveyors = set()
+
+    def _step_entladen(self):
+        if not self.entladen_active:
+            return
+        m = self.machine
+        now = m.sim_time
+        self.entladen_blocked = False
+        timeout = now - self.entladen_started >= self.ENTLADEN_SENSOR_TIMEOUT_S
+
+        if self.wait_level_selected():
+            self.conveyors.update(("lift", "wait"))
+            if m.wait_end_occupied():
+                self.entladen_wait_end_seen = True
+            start_cleared = self.entladen_wait_end_seen and not m.wait_start_occupied()
+            if start_cleared or timeout:
+                self.entladen_active = False
+                self.entladen_blocked = timeout and not start_cleared
+                self.entladen_wait_end_seen = False
+                self.busy = False
+                self.conveyors = set()
+            return
+
+        self.conveyors.add("lift")
+        if not m.lift_occupied():
+            if self.entladen_clear_started is None:
+                self.entladen_clear_started = now
+        else:
+            self.entladen_clear_started = None
+        clear_elapsed = (
+            self.entladen_clear_started is not None
+            and now - self.entladen_clear_started >= self.ENTLADEN_MIN_RUNTIME_S
+        )
+        if clear_elapsed or timeout:
+            self.entladen_active = False
+            self.busy = False
+            self.conveyors = set()
+
+
+class VirtualMachine:
+    # Gemeinsame Welt beider Controller: Zeit, Glaeser und die Uebergaben dazwischen.
+    # Zeit laeuft nur bei Buszugriffen (oder advance()) weiter, in festen Simulationsschritten.
+
+    STEP_S = 0.005
+
+    def __init__(
+        self,
+        time_scale: float = 1.0,
+        regal: bool = True,
+        status_len: int = 5,
+        level_stock: dict = None,
+        auto_take_s: float = 5.0,
+        auto_place_s: float = 3.0,
+        bus_hz: int = 0,
+        clock=None,
+        transfer_position_mm: float = None,
+        transfer_height_mm: float = None,
+        transfer_tol_mm: float = 2.0,
+    ):
+        if float(time_scale) <= 0:
+            raise ValueError("time_scale muss groesser 0 sein")
+        self.time_scale = float(time_scale)
+        # clock liefert Sekunden (Standard: time.monotonic); Simulationszeit = Wandzeit * Skala.
+        self._clock = clock if clock is not None else time.monotonic
+        self._t0 = self._clock()
+        self.sim_time = 0.0
+        self._lock = threading.RLock()
+        self.bus_hz = int(bus_hz or 0)
+
+        # Glaeser: je Ebene eins am Sensor plus Vorrat dahinter.
+        stock = level_stock if level_stock is not None else {1: 50, 2: 50}
+        self.level_front = {}
+        self.level_stock = {}
+        for level, count in stock.items():
+            count = max(0, int(count))
+            self.level_front[int(level)] = count > 0
+            self.level_stock[int(level)] = max(0, count - 1)
+        self._refill_mm = {level: 0.0 for level in self.level_front}
+        self._level_xfer = None
+        self.lift_glass = False
+        self.mixer_glass = False
+        self._handover = None
+        # Glaeser auf der Warteschiene: {"x": Vorderkante in mm, "rest_s": Standzeit}.
+        self.wait_glasses = []
+        # Gast nimmt ruhende Glaeser von der Warteschiene (None = nie).
+        self.auto_take_s = auto_take_s
+        # Mixer-only: Gast stellt nach dieser Zeit ein Glas auf den Mixer (None = nie).
+        self.auto_place_s = auto_place_s
+        self._place_timer = 0.0
+        # Optionale Pruefung der Uebergabeposition; None = jede Position gilt als passend.
+        self.transfer_position_mm = transfer_position_mm
+        self.transfer_height_mm = transfer_height_mm
+        self.transfer_tol_mm = float(transfer_tol_mm)
+        self.counters = {"transactions": 0, "glasses_served": 0, "glasses_dropped": 0}
+        # Simulierte Belegungszeit je Ressource (Schlitten, Lift, Baender, Pumpen) fuer Auslastungen.
+        self.busy_s = {}
+
+        self.mixer = VirtualMixer(self, status_len=status_len)
+        self.regal = VirtualRegal(self) if regal else None
+        self.devices = {MIXER_ADDR: self.mixer}
+        if self.regal is not None:
+            self.devices[REGAL_ADDR] = self.regal
+
+    # --- Zeit ---
+
+    def _sim_now(self) -> float:
+        return (self._clock() - self._t0) * self.time_scale
+
+    def advance(self):
+        # Simulation bis zur aktuellen (skalierten) Zeit nachziehen.
+        with self._lock:
+            self._advance_locked()
+
+    def _advance_locked(self):
+        now = self._sim_now()
+        if now <= self.sim_time:
+            return
+        if not self._needs_steps():
+            self.sim_time = now
+            return
+        while self.sim_time < now:
+            dt = min(self.STEP_S, now - self.sim_time)
+            self.sim_time += dt
+            self._step(dt)
+
+    def _needs_steps(self) -> bool:
+        if self.mixer.is_active() or (self.regal is not None and self.regal.is_active()):
+            return True
+        if self._handover is not None or self._level_xfer is not None:
+            return True
+        if self.wait_glasses and self.auto_take_s is not None:
+            return True
+        return self.regal is None and not self.mixer_glass and self.auto_place_s is not None
+
+    def _step(self, dt: float):
+        self.mixer.step(dt)
+        if self.regal is not None:
+            self.regal.step(dt)
+        self._move_glasses(dt)
+        self._account_busy(dt)
+
+    def _account_busy(self, dt: float):
+        active = []
+        if self.mixer.homing is not None or self.mixer.plf.moving():
+            active.append("mixer_carriage")
+        if self.mixer.band_mode is not None:
+            active.append("mixer_band")
+        active += [f"pump_{pump_id}" for pump_id in self.mixer.pumps]
+        if self.regal is not None:
+            if self.regal.homing is not None or self.regal.lift.moving():
+                active.append("lift")
+            if self.regal.conveyors:
+                active.append("regal_conveyors")
+        for name in active:
+            self.busy_s[name] = self.busy_s.get(name, 0.0) + dt
+
+    # --- Sensoren ---
+
+    def lift_occupied(self) -> bool:
+        if self.lift_glass:
+            return True
+        if self._handover is not None:
+            mm = self._handover["mm"]
+            if self._handover["to"] == "mixer" and mm < HANDOVER_CLEAR_MM:
+                return True
+        return any(g["x"] < -LIFT_SENSOR_CLEAR_MM for g in self.wait_glasses)
+
+    def wait_start_occupied(self) -> bool:
+        return any(g["x"] >= WAIT_START_SENSOR_MM > g["x"] - GLASS_MM for g in self.wait_glasses)
+
+    def wait_end_occupied(self) -> bool:
+        return any(g["x"] >= WAIT_END_SENSOR_MM > g["x"] - GLASS_MM for g in self.wait_glasses)
+
+    # --- Glastransport ---
+
+    def _conveyor(self, name: str) -> bool:
+        return self.regal is not None and name in self.regal.conveyors
+
+    def _move_glasses(self, dt: float):
+        travel = CONVEYOR_MM_S * dt
+        self._move_level_glasses(travel)
+        self._move_handover(dt)
+        self._move_wait_glasses(travel, dt)
+        if self.regal is None and not self.mixer_glass and self._handover is None and self.auto_place_s is not None:
+            self._place_timer += dt
+            if self._place_timer >= self.auto_place_s:
+                self._place_timer = 0.0
+                self.mixer_glass = True
+
+    def _move_level_glasses(self, travel: float):
+        for level in self.level_front:
+            name = f"level{level}"
+            if not self._conveyor(name):
+                continue
+            if self._level_xfer is None and self.level_front[level] and not self.lift_occupied() and self._conveyor("lift"):
+                self._level_xfer = {"level": level, "mm": 0.0, "cleared": False}
+            if not self.level_front[level] and self.level_stock[level] > 0:
+                self._refill_mm[level] += travel
+                if self._refill_mm[level] >= LEVEL_REFILL_MM:
+                    self._refill_mm[level] = 0.0
+                    self.level_stock[level] -= 1
+                    self.level_front[level] = True
+        xfer = self._level_xfer
+        if xfer is None:
+            return
+        if self._conveyor(f"level{xfer['level']}") or self._conveyor("lift"):
+            xfer["mm"] += travel
+        if xfer["mm"] >= LEVEL_FRONT_CLEAR_MM and not xfer["cleared"]:
+            xfer["cleared"] = True
+            self.level_front[xfer["level"]] = False
+        if xfer["mm"] >= LEVEL_TO_LIFT_MM:
+            self._level_xfer = None
+            self.lift_glass = True
+
+    def _move_handover(self, dt: float):
+        band_mm_s = self.mixer.band_speed_mm_s()
+        lift_mm_s = CONVEYOR_MM_S if self._conveyor("lift") else 0.0
+        if self._handover is None:
+            if self.lift_glass and lift_mm_s > 0 and self.regal.entladen_active and not self.regal.wait_level_selected():
+                self.lift_glass = False
+                self._handover = {"to": "mixer", "mm": 0.0}
+            elif self.mixer_glass and band_mm_s < 0:
+                self.mixer_glass = False
+                self._handover = {"to": "lift", "mm": 0.0}
+            else:
+                return
+
+        handover = self._handover
+        if handover["to"] == "mixer":
+            speed = max(lift_mm_s, band_mm_s)
+        else:
+            speed = max(lift_mm_s, -band_mm_s)
+        handover["mm"] += speed * dt
+        if handover["mm"] < HANDOVER_MM:
+            return
+
+        self._handover = None
+        if self.regal is None:
+            # Mixer-only: Gast nimmt das Glas am Bandende.
+            self.counters["glasses_served"] += 1
+            return
+        if not self._transfer_aligned():
+            self.counters["glasses_dropped"] += 1
+            print(
+                f"[VirtualI2C] Glas bei Uebergabe verloren: Mixer {self.mixer.physical_mm():.0f} mm, "
+                f"Lift {self.regal.physical_mm():.0f} mm"
+            )
+            return
+        if handover["to"] == "mixer":
+            self.mixer_glass = True
+        else:
+            self.lift_glass = True
+
+    def _transfer_aligned(self) -> bool:
+        if self.transfer_position_mm is not None:
+            if abs(self.mixer.physical_mm() - float(self.transfer_position_mm)) > self.transfer_tol_mm:
+                return False
+        if self.transfer_height_mm is not None:
+            if abs(self.regal.physical_mm() - float(self.transfer_height_mm)) > self.transfer_tol_mm:
+                return False
+        return True
+
+    def _move_wait_glasses(self, travel: float, dt: float):
+        if self.lift_glass and self._conveyor("wait") and self._conveyor("lift"):
+            # Entladen zur Warteposition: Glas verlaesst den Lift Richtung Warteschiene.
+            self.lift_glass = False
+            self.wait_glasses.append({"x": -LIFT_TO_WAIT_MM, "rest_s": 0.0})
+        if not self.wait_glasses:
+            return
+
+        # Vorderstes Glas zuerst: stoppt am Schienenende, die anderen stauen sich dahinter.
+        self.wait_glasses.sort(key=lambda g: g["x"], reverse=True)
+        limit = WAIT_BAND_MM
+        for glass in self.wait_glasses:
+            moving = self._conveyor("lift") if glass["x"] < 0 else self._conveyor("wait")
+            new_x = min(glass["x"] + travel, limit) if moving else glass["x"]
+            if new_x > glass["x"]:
+                glass["x"] = new_x
+                glass["rest_s"] = 0.0
+            else:
+                glass["rest_s"] += dt
+            limit = glass["x"] - GLASS_MM
+
+        if self.auto_take_s is None:
+            return
+        # Gast nimmt Glaeser, die vollstaendig auf der Schiene liegen und lange genug ruhen.
+        taken = [
+            g for g in self.wait_glasses
+            if g["x"] - GLASS_MM >= WAIT_START_SENSOR_MM and g["rest_s"] >= self.auto_take_s
+        ]
+        for glass in taken:
+            self.wait_glasses.remove(glass)
+            self.counters["glasses_served"] += 1
+
+    # --- Eingriffe fuer Tests ---
+
+    def place_glass_on_mixer(self):
+        with self._lock:
+            self._advance_locked()
+            self.mixer_glass = True
+
+    def take_glass_from_mixer(self):
+        # Glas waehrend des Ablaufs entnehmen; erweiterte Firmware meldet glass_moved.
+        with self._lock:
+            self._advance_locked()
+            if self.mixer_glass and self.mixer.is_active():
+                self.mixer.glass_moved = True
+            self.mixer_glass = False
+
+    def set_level_stock(self, level: int, count: int):
+        with self._lock:
+            self._advance_locked()
+            count = max(0, int(count))
+            self.level_front[int(level)] = count > 0
+            self.level_stock[int(level)] = max(0, count - 1)
+            self._refill_mm.setdefault(int(level), 0.0)
+
+    def clear_wait_area(self):
+        with self._lock:
+            self._advance_locked()
+            self.counters["glasses_served"] += len(self.wait_glasses)
+            self.wait_glasses = []
+
+    def snapshot(self) -> dict:
+        # Zustand fuer Tests und Benchmarks.
+        with self._lock:
+            self._advance_locked()
+            return {
+                "sim_time_s": self.sim_time,
+                "mixer_position_mm": self.mixer.position_mm(),
+                "mixer_homed": self.mixer.is_homed,
+                "mixer_busy": self.mixer.busy or self.mixer.is_active(),
+                "pumps": dict(self.mixer.pumps),
+                "mixer_glass": self.mixer_glass,
+                "lift_position_mm": self.regal.position_mm() if self.regal is not None else None,
+                "lift_glass": self.lift_occupied(),
+                "level_front": dict(self.level_front),
+                "level_stock": dict(self.level_stock),
+                "wait_glasses": len(self.wait_glasses),
+                "counters": dict(self.counters),
+                "busy_s": dict(self.busy_s),
+            }
+
+    # --- Bus ---
+
+    def transfer(self, msgs):
+        # Eine i2c_rdwr-Transaktion: Schreiben loest das Kommando aus, Lesen liefert die Antwort.
+        with self._lock:
+            self._advance_locked()
+            self.counters["transactions"] += 1
+            for msg in msgs:
+                device = self.devices.get(msg.addr)
+                if device is None:
+                    # Wie smbus2 ohne ACK vom Slave.
+                    raise OSError(121, "Remote I/O error")
+                if msg.flags & I2C_M_RD:
+                    out = device.request(len(msg))
+                    # Fehlende Bytes liest der Master als 0xFF.
+                    msg.buf[:] = (bytes(out) + b"\xff" * len(msg))[: len(msg)]
+                else:
+                    device.receive(bytes(msg))
+            cost_s = 0.0
+            if self.bus_hz > 0:
+                # Start/Adresse/Stop plus 9 Bit pro Byte.
+                cost_s = sum((1 + len(msg)) * 9 for msg in msgs) / float(self.bus_hz)
+        if cost_s > 0:
+            time.sleep(cost_s)
+
+
+_MACHINES = {}
+_MACHINES_LOCK = threading.Lock()
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return float(value)
+
+
+def get_virtual_machine(bus_number: int = 1) -> VirtualMachine:
+    # Eine Welt pro Busnummer; Optionen beim ersten Zugriff aus der Umgebung.
+    with _MACHINES_LOCK:
+        machine = _MACHINES.get(int(bus_number))
+        if machine is None:
+            machine = VirtualMachine(
+                time_scale=_env_float(TIME_SCALE_ENV, 1.0),
+                regal=os.environ.get(REGAL_ENV, "1").strip() != "0",
+                status_len=int(_env_float(STATUS_LEN_ENV, 5)),
+                bus_hz=int(_env_float(BUS_HZ_ENV, 0)),
+            )
+            _MACHINES[int(bus_number)] = machine
+        return machine
+
+
+def reset_virtual_machine(bus_number: int = 1, **options) -> VirtualMachine:
+    # Neue Welt (z.B. pro Testlauf) mit expliziten Optionen.
+    with _MACHINES_LOCK:
+        machine = VirtualMachine(**options)
+        _MACHINES[int(bus_number)] = machine
+        return machine
+
+
+class SMBus:
+    # Nachbau von smbus2.SMBus fuer i2c_rdwr; alle Instanzen eines Busses teilen die Welt.
+
+    def __init__(self, bus: int = 1, force: bool = False):
+        self.bus_number = int(bus if bus is not None else 1)
+        self.machine = get_virtual_machine(self.bus_number)
+        self.fd = None
+
+    def i2c_rdwr(self, *i2c_msgs):
+        self.machine.transfer(i2c_msgs)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
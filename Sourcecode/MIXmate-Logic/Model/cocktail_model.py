@@ -1,6 +1,5 @@
-import sqlite3
 import os
-from Model.db_bootstrap import ensure_database
+from Model.db_connection import get_connection
 
 class CocktailModel:
     def __init__(self, db_path=None):
@@ -9,12 +8,10 @@ class CocktailModel:
             base = os.path.dirname(os.path.dirname(__file__))
             db_path = os.path.join(base, "Database", "MIXmate.db")
 
-        # DB-Struktur vor dem ersten Zugriff absichern.
-        ensure_database(db_path)
+        # DB-Struktur wird beim ersten Zugriff im Prozess abgesichert.
         self.db_path = db_path
-        self.connection = sqlite3.connect(self.db_path)
-        # Row-Factory erlaubt Spaltenzugriff per Name.
-        self.connection.row_factory = sqlite3.Row
+        # Gemeinsame Verbindung des Threads; Row-Factory erlaubt Spaltenzugriff per Name.
+        self.connection = get_connection(self.db_path)
         self.cursor = self.connection.cursor()
 
     def get_all_cocktails(self):
@@ -84,7 +81,8 @@ class CocktailModel:
                 ci.ingredient_id,
                 i.name AS ingredient_name,
                 ci.amount_ml,
-                ci.order_index
+                ci.order_index,
+                ci.order_group
             FROM cocktail_ingredients ci
             JOIN ingredients i ON i.ingredient_id = ci.ingredient_id
             WHERE ci.cocktail_id = ?
@@ -101,11 +99,12 @@ class CocktailModel:
                 "ingredient_id": row["ingredient_id"],
                 "ingredient_name": row["ingredient_name"],
                 "amount_ml": row["amount_ml"],
-                "order_index": row["order_index"]
+                "order_index": row["order_index"],
+                "order_group": row["order_group"]
             })
         return recipe
     # Rezeptzeile mit Menge und Reihenfolge anlegen.
-    def add_recipe_item(self, cocktail_id: int, ingredient_id: int, amount_ml: float, order_index: int):
+    def add_recipe_item(self, cocktail_id: int, ingredient_id: int, amount_ml: float, order_index: int, order_group: int | None = None):
         if amount_ml <= 0:
             # Nullmenge waere im Mixablauf wirkungslos.
             raise ValueError("amount_ml muss > 0 sein")
@@ -115,16 +114,17 @@ class CocktailModel:
         if self._order_index_exists(cocktail_id, order_index):
             # Doppelte Reihenfolge macht den Pumpenablauf uneindeutig.
             raise ValueError(f"order_index {order_index} ist für diesen Cocktail bereits vergeben")
+        order_group = self._normalize_order_group(order_group)
 
         query = """
-            INSERT INTO cocktail_ingredients (cocktail_id, ingredient_id, amount_ml, order_index)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO cocktail_ingredients (cocktail_id, ingredient_id, amount_ml, order_index, order_group)
+            VALUES (?, ?, ?, ?, ?)
         """
-        self.cursor.execute(query, (cocktail_id, ingredient_id, amount_ml, order_index))
+        self.cursor.execute(query, (cocktail_id, ingredient_id, amount_ml, order_index, order_group))
         self.connection.commit()
         
     # Bestehende Rezeptzeile korrigieren.
-    def update_recipe_item(self, cocktail_id: int, ingredient_id: int, amount_ml: float, order_index: int):
+    def update_recipe_item(self, cocktail_id: int, ingredient_id: int, amount_ml: float, order_index: int, order_group: int | None = None):
         if amount_ml <= 0:
             raise ValueError("amount_ml muss > 0 sein")
         if order_index <= 0:
@@ -134,12 +134,22 @@ class CocktailModel:
             # Aktuelle Zutat wird beim Duplikat-Check ausgenommen.
             raise ValueError(f"order_index {order_index} ist für diesen Cocktail bereits vergeben")
 
-        query = """
-            UPDATE cocktail_ingredients
-            SET amount_ml = ?, order_index = ?
-            WHERE cocktail_id = ? AND ingredient_id = ?
-        """
-        self.cursor.execute(query, (amount_ml, order_index, cocktail_id, ingredient_id))
+        if order_group is None:
+            # Ohne Gruppenangabe bleibt die gespeicherte Gruppe erhalten.
+            query = """
+                UPDATE cocktail_ingredients
+                SET amount_ml = ?, order_index = ?
+                WHERE cocktail_id = ? AND ingredient_id = ?
+            """
+            self.cursor.execute(query, (amount_ml, order_index, cocktail_id, ingredient_id))
+        else:
+            query = """
+                UPDATE cocktail_ingredients
+                SET amount_ml = ?, order_index = ?, order_group = ?
+                WHERE cocktail_id = ? AND ingredient_id = ?
+            """
+            order_group = self._normalize_order_group(order_group)
+            self.cursor.execute(query, (amount_ml, order_index, order_group, cocktail_id, ingredient_id))
         self.connection.commit()
 
         if self.cursor.rowcount == 0:
@@ -159,6 +169,14 @@ class CocktailModel:
         if self.cursor.rowcount == 0:
             raise ValueError("Rezeptzeile nicht gefunden (cocktail_id/ingredient_id stimmt nicht)")
         
+    def _normalize_order_group(self, order_group):
+        # 0 oder leer bedeutet: keine Gruppe, Schritt bleibt fest.
+        if order_group is None or int(order_group) == 0:
+            return None
+        if int(order_group) < 0:
+            raise ValueError("order_group muss >= 0 sein")
+        return int(order_group)
+
     def _order_index_exists(self, cocktail_id: int, order_index: int, exclude_ingredient_id: int = None) -> bool:
         # Beim Update darf die eigene Rezeptzeile den Index behalten.
         if exclude_ingredient_id is None:
@@ -181,8 +199,8 @@ class CocktailModel:
         return (row["cnt"] if row else 0) > 0
 
     def close(self):
-        # DB-Verbindung defensiv schliessen.
+        # Verbindung gehoert dem Verbindungsmanager; nur den eigenen Cursor freigeben.
         try:
-            self.connection.close()
+            self.cursor.close()
         except Exception:
             pass
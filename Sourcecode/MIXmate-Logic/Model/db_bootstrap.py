@@ -54,6 +54,8 @@ def ensure_database(db_path: str) -> None:
                 amount_ml REAL NOT NULL CHECK (amount_ml > 0),
                 -- Reihenfolge der Dosierung innerhalb eines Cocktails.
                 order_index INTEGER NOT NULL CHECK (order_index >= 1),
+                -- Aufeinanderfolgende Schritte mit gleicher Gruppe duerfen umsortiert werden.
+                order_group INTEGER,
                 -- Eine Zutat darf pro Cocktail nur einmal vorkommen.
                 PRIMARY KEY (cocktail_id, ingredient_id),
                 -- Jede Reihenfolge darf pro Cocktail nur einmal vergeben sein.
@@ -99,8 +101,135 @@ def ensure_database(db_path: str) -> None:
                 -- Zahlenwert fuer Hoehen, Richtungen, Zuordnungen und Flags.
                 param_value REAL NOT NULL
             );
+
+            -- Aenderungszaehler pro Tabelle, gepflegt per Trigger (auch bei Aenderungen von aussen).
+            CREATE TABLE IF NOT EXISTS data_revisions (
+                table_name TEXT PRIMARY KEY,
+                revision INTEGER NOT NULL DEFAULT 0
+            );
+
+            -- Persistente Auftragswarteschlange, ueberlebt Neustarts.
+            CREATE TABLE IF NOT EXISTS order_queue (
+                -- Fortlaufende ID bestimmt FIFO innerhalb einer Prioritaet.
+                order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                -- Bestellter Cocktail.
+                cocktail_id INTEGER NOT NULL,
+                -- Mengenfaktor fuer das Rezept.
+                factor REAL NOT NULL DEFAULT 1.0 CHECK (factor > 0),
+                -- Hoehere Prioritaet wird zuerst gemixt.
+                priority INTEGER NOT NULL DEFAULT 0,
+                -- queued, running, done, failed oder cancelled.
+                status TEXT NOT NULL DEFAULT 'queued',
+                -- Zeitstempel als Unix-Sekunden.
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                -- Fehlertext bei abgebrochenen Auftraegen.
+                error_msg TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_order_queue_status ON order_queue (status, priority, order_id);
+
+            -- Homing-Gueltigkeit pro Achse (mixer, regal), ueberlebt Neustarts.
+            CREATE TABLE IF NOT EXISTS homing_state (
+                axis TEXT PRIMARY KEY,
+                -- Zeitpunkt der letzten bestaetigten Referenzfahrt.
+                homed_at REAL,
+                -- Abgeschlossene Mixe seit dieser Referenzfahrt.
+                mixes_since_home INTEGER NOT NULL DEFAULT 0,
+                -- 1 waehrend eines Mixes; bleibt nach Absturz stehen.
+                mix_running INTEGER NOT NULL DEFAULT 0,
+                -- Grund fuer erzwungenes Homing (Fehler, Stop, Reset), sonst NULL.
+                invalid_reason TEXT,
+                last_position_mm INTEGER,
+                updated_at REAL
+            );
+
+            -- Homing-, Fehler- und Positionsereignisse fuer die Diagnose.
+            CREATE TABLE IF NOT EXISTS homing_events (
+                event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                axis TEXT NOT NULL,
+                ts REAL NOT NULL,
+                -- homed, i2c_error, stop, homing_lost oder mix_aborted.
+                kind TEXT NOT NULL,
+                position_mm INTEGER,
+                detail TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_homing_events_axis ON homing_events (axis, event_id);
+
+            -- Gelernte Phasenzeiten des Dauerschaetzers (gewichtete Regressionssummen).
+            CREATE TABLE IF NOT EXISTS mix_estimator_stats (
+                -- mixer_travel, pump, regal_fetch oder regal_return.
+                name TEXT PRIMARY KEY,
+                weight REAL NOT NULL DEFAULT 0,
+                sum_x REAL NOT NULL DEFAULT 0,
+                sum_y REAL NOT NULL DEFAULT 0,
+                sum_xx REAL NOT NULL DEFAULT 0,
+                sum_xy REAL NOT NULL DEFAULT 0,
+                samples INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL
+            );
+
+            -- Fortschritt des laufenden Mixes fuer Fortsetzen nach Fehler oder Stop.
+            CREATE TABLE IF NOT EXISTS mix_checkpoints (
+                checkpoint_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                -- Zugehoeriger Queue-Auftrag, NULL bei Direktmix oder Batch.
+                order_id INTEGER,
+                cocktail_id INTEGER,
+                factor REAL NOT NULL DEFAULT 1.0,
+                -- running, interrupted, done oder discarded.
+                status TEXT NOT NULL DEFAULT 'running',
+                -- fetch, dispense, return oder done.
+                phase TEXT NOT NULL DEFAULT 'fetch',
+                -- regal, mixer oder wait.
+                glass_location TEXT NOT NULL DEFAULT 'regal',
+                -- Rezeptschritte als JSON, damit spaetere Rezeptaenderungen nicht stoeren.
+                mix_data TEXT NOT NULL,
+                -- Fertig dosierte order_index-Werte (JSON-Liste).
+                done_steps TEXT NOT NULL DEFAULT '[]',
+                -- Bereits gelaufene Pumpzeit angefangener Schritte (JSON, order_index -> ms).
+                partial_ms TEXT NOT NULL DEFAULT '{}',
+                error_msg TEXT,
+                resumes INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_mix_checkpoints_status ON mix_checkpoints (status, checkpoint_id);
+
+            -- Aufgezeichnete Mixe fuer die Zeitleiste im Adminbereich (begrenzte Historie).
+            CREATE TABLE IF NOT EXISTS mix_timeline_runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                label TEXT NOT NULL,
+                cocktail_id INTEGER,
+                started_at REAL NOT NULL,
+                finished_at REAL NOT NULL,
+                -- Fehlertext bei abgebrochenem Mix.
+                error_msg TEXT
+            );
+
+            -- Phasen eines Mixes (Homing, Regalschritte, Fahrten, Pumpen, Rueckgabe).
+            CREATE TABLE IF NOT EXISTS mix_timeline_spans (
+                span_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id INTEGER NOT NULL,
+                -- Verschachtelungstiefe, 0 = ganzer Mix.
+                depth INTEGER NOT NULL DEFAULT 0,
+                name TEXT NOT NULL,
+                detail TEXT,
+                start_ts REAL NOT NULL,
+                end_ts REAL NOT NULL,
+                -- I2C-Transaktionen waehrend der Phase (inkl. Hintergrund-Polling).
+                bus_transactions INTEGER NOT NULL DEFAULT 0,
+                -- Wartezeit auf Status und laengster Wartegrund.
+                wait_s REAL NOT NULL DEFAULT 0,
+                wait_reason TEXT,
+                -- Alle Wartegruende als JSON (Grund -> Sekunden).
+                waits TEXT NOT NULL DEFAULT '{}',
+                error_msg TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_mix_timeline_spans_run ON mix_timeline_spans (run_id, span_id);
             """
         )
+        _migrate_schema(con)
+        ensure_revision_triggers(con)
         _seed_database_if_empty(con)
         # Schema und Seed-Daten gemeinsam sichern.
         con.commit()
@@ -109,6 +238,38 @@ def ensure_database(db_path: str) -> None:
         con.close()
 
 
+def _migrate_schema(con: sqlite3.Connection) -> None:
+    # Spalten nachziehen, die aeltere Datenbanken noch nicht haben.
+    columns = [row[1] for row in con.execute("PRAGMA table_info(cocktail_ingredients)").fetchall()]
+    if "order_group" not in columns:
+        # NULL bedeutet: Schritt bleibt fest an seinem order_index.
+        con.execute("ALTER TABLE cocktail_ingredients ADD COLUMN order_group INTEGER")
+
+
+# Tabellen, deren Aenderungen vorberechnete Mixplaene ungueltig machen.
+REVISION_TABLES = ("cocktails", "ingredients", "cocktail_ingredients", "pumps", "machine_parameters")
+
+
+def ensure_revision_triggers(con: sqlite3.Connection) -> None:
+    # Jede Schreiboperation erhoeht den Zaehler der Tabelle in data_revisions.
+    # Tabellen-Neuaufbau (Migration) loescht Trigger, daher idempotent nachziehbar.
+    for table in REVISION_TABLES:
+        con.execute(
+            "INSERT OR IGNORE INTO data_revisions (table_name, revision) VALUES (?, 0)",
+            (table,),
+        )
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            con.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_rev_{table}_{op.lower()}
+                AFTER {op} ON {table}
+                BEGIN
+                    UPDATE data_revisions SET revision = revision + 1 WHERE table_name = '{table}';
+                END
+                """
+            )
+
+
 def _seed_database_if_empty(con: sqlite3.Connection) -> None:
     # Leere Datenbank mit Startdaten fuellen.
     cur = con.cursor()
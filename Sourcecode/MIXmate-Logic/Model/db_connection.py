@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import threading
+
+from Model.db_bootstrap import ensure_database
+
+
+# Wartezeit bei gesperrter DB, bevor SQLite "database is locked" meldet.
+BUSY_TIMEOUT_S = 5.0
+
+_bootstrap_lock = threading.RLock()
+# Pfade, fuer die ensure_database in diesem Prozess schon lief.
+_bootstrapped = set()
+# Pfade, deren Datei schon auf WAL umgestellt ist.
+_wal_enabled = set()
+# Einmalige Schema-Migrationen der Models pro Pfad.
+_migrations_done = set()
+# Pro Thread eine Verbindung je Datenbankpfad.
+_local = threading.local()
+# Optionaler Zaehler aller SQL-Anweisungen (Benchmarks); None = aus.
+_query_count = None
+_query_count_lock = threading.Lock()
+
+
+def default_db_path() -> str:
+    # Standardpfad zur lokalen MIXmate-Datenbank.
+    base = os.path.dirname(os.path.dirname(__file__))
+    return os.path.join(base, "Database", "MIXmate.db")
+
+
+def _path_key(db_path: str) -> str:
+    return os.path.abspath(db_path)
+
+
+def ensure_database_once(db_path: str) -> None:
+    # Schema und Seed-Check nur beim ersten Zugriff pro Prozess.
+    key = _path_key(db_path)
+    with _bootstrap_lock:
+        if key in _bootstrapped:
+            return
+        ensure_database(db_path)
+        _bootstrapped.add(key)
+
+
+def _apply_pragmas(con: sqlite3.Connection) -> None:
+    # Pro Verbindung gueltige Einstellungen.
+    # NORMAL reicht mit WAL: nach Stromausfall geht hoechstens der letzte Commit verloren.
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("PRAGMA temp_store=MEMORY")
+
+
+def _count_query(_statement: str) -> None:
+    global _query_count
+    with _query_count_lock:
+        _query_count += 1
+
+
+def enable_query_counter() -> None:
+    # Zaehlt ab jetzt jede Anweisung auf neu geoeffneten Verbindungen.
+    # Vorher geoeffnete Verbindungen bleiben ungezaehlt, daher vor dem ersten Model aufrufen.
+    global _query_count
+    with _query_count_lock:
+        if _query_count is None:
+            _query_count = 0
+
+
+def get_query_count() -> int:
+    with _query_count_lock:
+        return int(_query_count or 0)
+
+
+def open_connection(db_path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    # Eigene Verbindung, z.B. fuer Services, die selbst per Lock serialisieren.
+    ensure_database_once(db_path)
+    con = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_S, check_same_thread=check_same_thread)
+    con.row_factory = sqlite3.Row
+    if _query_count is not None:
+        con.set_trace_callback(_count_query)
+    key = _path_key(db_path)
+    if key not in _wal_enabled:
+        # WAL: Leser blockieren Schreiber nicht; Einstellung bleibt in der DB-Datei.
+        con.execute("PRAGMA journal_mode=WAL")
+        _wal_enabled.add(key)
+    _apply_pragmas(con)
+    return con
+
+
+def get_connection(db_path: str) -> sqlite3.Connection:
+    # Gemeinsame Verbindung des aktuellen Threads fuer diesen Pfad.
+    # Models im selben Thread teilen sie sich, jeder mit eigenem Cursor.
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = {}
+        _local.connections = connections
+    key = _path_key(db_path)
+    con = connections.get(key)
+    if con is None:
+        con = open_connection(db_path)
+        connections[key] = con
+    return con
+
+
+def run_migration_once(db_path: str, name: str, fn) -> None:
+    # Model-spezifische Migration nur einmal pro Prozess und Pfad ausfuehren.
+    key = (_path_key(db_path), name)
+    with _bootstrap_lock:
+        if key in _migrations_done:
+            return
+        fn()
+        _migrations_done.add(key)
+
+
+def close_thread_connections() -> None:
+    # Verbindungen des aktuellen Threads schliessen, z.B. beim Beenden eines Workers.
+    connections = getattr(_local, "connections", None) or {}
+    for con in connections.values():
+        try:
+            con.close()
+        except Exception:
+            pass
+    _local.connections = {}
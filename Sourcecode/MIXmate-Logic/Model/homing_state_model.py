@@ -0,0 +1,155 @@
+import os
+import time
+
+from Model.db_connection import open_connection, run_migration_once
+
+
+class HomingStateModel:
+    # Achsen mit eigenem Referenzpunkt.
+    AXES = ("mixer", "regal")
+    # Ereignisse pro Achse, die fuer die Diagnose aufgehoben werden.
+    EVENT_HISTORY_LIMIT = 200
+
+    def __init__(self, db_path: str | None = None):
+        # Standardpfad zur lokalen MIXmate-Datenbank.
+        if db_path is None:
+            base = os.path.dirname(os.path.dirname(__file__))
+            db_path = os.path.join(base, "Database", "MIXmate.db")
+
+        self.db_path = db_path
+        # Tracker schreibt aus Engine- und Monitor-Thread und serialisiert selbst per Lock.
+        self.connection = open_connection(self.db_path, check_same_thread=False)
+        self.cursor = self.connection.cursor()
+        run_migration_once(self.db_path, "homing_state", self._ensure_axes)
+
+    def _ensure_axes(self) -> None:
+        # Tabellen legt Model/db_bootstrap.py an; hier nur die Zeile pro Achse.
+        for axis in self.AXES:
+            self.cursor.execute("INSERT OR IGNORE INTO homing_state (axis) VALUES (?)", (axis,))
+        self.connection.commit()
+
+    def _row_to_dict(self, row) -> dict:
+        return {
+            "axis": str(row["axis"]),
+            "homed_at": row["homed_at"],
+            "mixes_since_home": int(row["mixes_since_home"]),
+            "mix_running": bool(row["mix_running"]),
+            "invalid_reason": row["invalid_reason"],
+            "last_position_mm": row["last_position_mm"],
+            "updated_at": row["updated_at"],
+        }
+
+    def get_state(self, axis: str) -> dict:
+        self.cursor.execute("SELECT * FROM homing_state WHERE axis = ?", (str(axis),))
+        row = self.cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Unbekannte Achse: {axis}")
+        return self._row_to_dict(row)
+
+    def get_states(self) -> list[dict]:
+        self.cursor.execute("SELECT * FROM homing_state ORDER BY axis")
+        return [self._row_to_dict(row) for row in self.cursor.fetchall()]
+
+    def mark_homed(self, axis: str, position_mm: int | None = None) -> None:
+        # Referenzfahrt bestaetigt: Zaehler und Invalidierung zuruecksetzen.
+        now = time.time()
+        self.cursor.execute(
+            """
+            UPDATE homing_state
+            SET homed_at = ?, mixes_since_home = 0, invalid_reason = NULL,
+                last_position_mm = ?, updated_at = ?
+            WHERE axis = ?
+            """,
+            (now, position_mm, now, str(axis)),
+        )
+        self._add_event_locked(axis, "homed", position_mm, None, now)
+        self.connection.commit()
+
+    def mark_mix_started(self, axes) -> None:
+        # Laufender Mix wird markiert, damit ein Absturz beim naechsten Start auffaellt.
+        now = time.time()
+        for axis in axes:
+            self.cursor.execute(
+                "UPDATE homing_state SET mix_running = 1, updated_at = ? WHERE axis = ?",
+                (now, str(axis)),
+            )
+        self.connection.commit()
+
+    def mark_mix_finished(self, axes, positions: dict | None = None) -> None:
+        now = time.time()
+        positions = positions or {}
+        for axis in axes:
+            self.cursor.execute(
+                """
+                UPDATE homing_state
+                SET mix_running = 0, mixes_since_home = mixes_since_home + 1,
+                    last_position_mm = COALESCE(?, last_position_mm), updated_at = ?
+                WHERE axis = ?
+                """,
+                (positions.get(axis), now, str(axis)),
+            )
+        self.connection.commit()
+
+    def mark_invalid(self, axis: str, reason: str) -> None:
+        # Erste Ursache bleibt stehen, bis erneut referenziert wurde.
+        self.cursor.execute(
+            """
+            UPDATE homing_state
+            SET invalid_reason = COALESCE(invalid_reason, ?), updated_at = ?
+            WHERE axis = ?
+            """,
+            (str(reason), time.time(), str(axis)),
+        )
+        self.connection.commit()
+
+    def clear_mix_running(self, axis: str) -> None:
+        self.cursor.execute("UPDATE homing_state SET mix_running = 0 WHERE axis = ?", (str(axis),))
+        self.connection.commit()
+
+    def add_event(self, axis: str, kind: str, position_mm: int | None = None, detail: str | None = None) -> None:
+        self._add_event_locked(axis, kind, position_mm, detail, time.time())
+        self.connection.commit()
+
+    def _add_event_locked(self, axis, kind, position_mm, detail, ts) -> None:
+        self.cursor.execute(
+            "INSERT INTO homing_events (axis, ts, kind, position_mm, detail) VALUES (?, ?, ?, ?, ?)",
+            (str(axis), float(ts), str(kind), position_mm, detail),
+        )
+        # Historie pro Achse begrenzen, damit die Tabelle nicht waechst.
+        self.cursor.execute(
+            """
+            DELETE FROM homing_events
+            WHERE axis = ? AND event_id <= (
+                SELECT event_id FROM homing_events WHERE axis = ?
+                ORDER BY event_id DESC LIMIT 1 OFFSET ?
+            )
+            """,
+            (str(axis), str(axis), int(self.EVENT_HISTORY_LIMIT)),
+        )
+
+    def get_events(self, axis: str | None = None, limit: int = 50) -> list[dict]:
+        # Neueste Ereignisse zuerst.
+        if axis is None:
+            self.cursor.execute(
+                "SELECT * FROM homing_events ORDER BY event_id DESC LIMIT ?",
+                (int(limit),),
+            )
+        else:
+            self.cursor.execute(
+                "SELECT * FROM homing_events WHERE axis = ? ORDER BY event_id DESC LIMIT ?",
+                (str(axis), int(limit)),
+            )
+        return [
+            {
+                "event_id": int(row["event_id"]),
+                "axis": str(row["axis"]),
+                "ts": float(row["ts"]),
+                "kind": str(row["kind"]),
+                "position_mm": row["position_mm"],
+                "detail": row["detail"],
+            }
+            for row in self.cursor.fetchall()
+        ]
+
+    def close(self):
+        self.connection.close()
@@ -1,6 +1,5 @@
-import sqlite3
 import os
-from Model.db_bootstrap import ensure_database
+from Model.db_connection import get_connection
 
 
 class IngredientModel:
@@ -10,12 +9,10 @@ class IngredientModel:
             base = os.path.dirname(os.path.dirname(__file__))
             db_path = os.path.join(base, "Database", "MIXmate.db")
 
-        # Tabellen bei Bedarf vor dem Zugriff erstellen.
-        ensure_database(db_path)
+        # Tabellen werden beim ersten Zugriff im Prozess erstellt.
         self.db_path = db_path
-        self.connection = sqlite3.connect(self.db_path)
-        # Spaltennamen bleiben beim Mapping lesbar.
-        self.connection.row_factory = sqlite3.Row
+        # Gemeinsame Verbindung des Threads; Spaltennamen bleiben beim Mapping lesbar.
+        self.connection = get_connection(self.db_path)
         self.cursor = self.connection.cursor()
 
     def get_all_ingredients(self):
@@ -65,8 +62,8 @@ class IngredientModel:
 
 
     def close(self):
-        # DB-Verbindung defensiv schliessen.
+        # Verbindung gehoert dem Verbindungsmanager; nur den eigenen Cursor freigeben.
         try:
-            self.connection.close()
+            self.cursor.close()
         except Exception:
             pass
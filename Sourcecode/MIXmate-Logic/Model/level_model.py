@@ -1,7 +1,6 @@
 import os
-import sqlite3
 
-from Model.db_bootstrap import ensure_database
+from Model.db_connection import get_connection, run_migration_once
 
 
 class LevelModel:
@@ -11,14 +10,13 @@ class LevelModel:
             base = os.path.dirname(os.path.dirname(__file__))
             db_path = os.path.join(base, "Database", "MIXmate.db")
 
-        # Datenbank und Levels-Tabelle vor Zugriff vorbereiten.
-        ensure_database(db_path)
+        # Datenbank wird beim ersten Zugriff im Prozess vorbereitet.
         self.db_path = db_path
-        self.connection = sqlite3.connect(self.db_path)
-        # Spaltenzugriff per Name erleichtert Migrationen.
-        self.connection.row_factory = sqlite3.Row
+        # Gemeinsame Verbindung des Threads; Spaltenzugriff per Name erleichtert Migrationen.
+        self.connection = get_connection(self.db_path)
         self.cursor = self.connection.cursor()
-        self._ensure_schema()
+        # Levels-Migration reicht einmal pro Prozess.
+        run_migration_once(self.db_path, "levels", self._ensure_schema)
 
     def _ensure_schema(self) -> None:
         # Levels-Tabelle auf aktuelles Schema migrieren.
@@ -43,8 +41,8 @@ class LevelModel:
             raise
 
     def close(self) -> None:
-        # Datenbankverbindung schliessen.
-        self.connection.close()
+        # Verbindung gehoert dem Verbindungsmanager; nur den eigenen Cursor freigeben.
+        self.cursor.close()
 
     def get_all_levels(self) -> list[dict]:
         # Alle vorhandenen Ebenennummern lesen.
@@ -0,0 +1,117 @@
+import json
+import os
+import time
+
+from Model.db_connection import open_connection
+
+
+class MixCheckpointModel:
+    # running: Mix laeuft, interrupted: fortsetzbar, done/discarded: abgeschlossen.
+    OPEN_STATES = ("running", "interrupted")
+    # Abgeschlossene Checkpoints, die fuer die Diagnose aufgehoben werden.
+    CLOSED_HISTORY_LIMIT = 50
+
+    def __init__(self, db_path: str | None = None):
+        # Standardpfad zur lokalen MIXmate-Datenbank.
+        if db_path is None:
+            base = os.path.dirname(os.path.dirname(__file__))
+            db_path = os.path.join(base, "Database", "MIXmate.db")
+
+        self.db_path = db_path
+        # Engine- und Queue-Thread schreiben; der Service serialisiert per Lock.
+        # Tabelle und Index legt Model/db_bootstrap.py an.
+        self.connection = open_connection(self.db_path, check_same_thread=False)
+        self.cursor = self.connection.cursor()
+
+    def _row_to_dict(self, row) -> dict:
+        return {
+            "checkpoint_id": int(row["checkpoint_id"]),
+            "order_id": row["order_id"],
+            "cocktail_id": row["cocktail_id"],
+            "factor": float(row["factor"]),
+            "status": str(row["status"]),
+            "phase": str(row["phase"]),
+            "glass_location": str(row["glass_location"]),
+            "mix_data": json.loads(row["mix_data"]),
+            "done_steps": json.loads(row["done_steps"]),
+            # JSON kennt nur String-Keys, order_index wieder als int.
+            "partial_ms": {int(k): int(v) for k, v in json.loads(row["partial_ms"]).items()},
+            "error_msg": row["error_msg"],
+            "resumes": int(row["resumes"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    def create(self, mix_data: list, factor: float, order_id: int | None = None) -> dict:
+        # Neuer Checkpoint vor dem Glasholen; aeltere offene gelten als ersetzt.
+        now = time.time()
+        cocktail_id = mix_data[0].get("cocktail_id") if mix_data else None
+        self.cursor.execute(
+            "UPDATE mix_checkpoints SET status = 'discarded', updated_at = ? WHERE status IN ('running', 'interrupted')",
+            (now,),
+        )
+        self.cursor.execute(
+            """
+            INSERT INTO mix_checkpoints (order_id, cocktail_id, factor, mix_data, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (order_id, cocktail_id, float(factor), json.dumps(mix_data), now, now),
+        )
+        checkpoint_id = int(self.cursor.lastrowid)
+        # Jeder Mix legt einen Checkpoint an; Historie begrenzen, damit die Tabelle nicht waechst.
+        self.cursor.execute(
+            """
+            DELETE FROM mix_checkpoints
+            WHERE status IN ('done', 'discarded') AND checkpoint_id <= (
+                SELECT checkpoint_id FROM mix_checkpoints
+                WHERE status IN ('done', 'discarded')
+                ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?
+            )
+            """,
+            (int(self.CLOSED_HISTORY_LIMIT),),
+        )
+        self.connection.commit()
+        return self.get(checkpoint_id)
+
+    def get(self, checkpoint_id: int) -> dict | None:
+        self.cursor.execute("SELECT * FROM mix_checkpoints WHERE checkpoint_id = ?", (int(checkpoint_id),))
+        row = self.cursor.fetchone()
+        return self._row_to_dict(row) if row is not None else None
+
+    def get_open(self) -> dict | None:
+        # Es gibt hoechstens einen offenen Checkpoint (den juengsten).
+        self.cursor.execute(
+            """
+            SELECT * FROM mix_checkpoints
+            WHERE status IN ('running', 'interrupted')
+            ORDER BY checkpoint_id DESC LIMIT 1
+            """
+        )
+        row = self.cursor.fetchone()
+        return self._row_to_dict(row) if row is not None else None
+
+    def save(self, checkpoint: dict) -> None:
+        # Fortschritt sichern; wird nach jedem abgeschlossenen Schritt aufgerufen.
+        self.cursor.execute(
+            """
+            UPDATE mix_checkpoints
+            SET status = ?, phase = ?, glass_location = ?, done_steps = ?, partial_ms = ?,
+                error_msg = ?, resumes = ?, updated_at = ?
+            WHERE checkpoint_id = ?
+            """,
+            (
+                checkpoint["status"],
+                checkpoint["phase"],
+                checkpoint["glass_location"],
+                json.dumps(checkpoint["done_steps"]),
+                json.dumps({str(k): int(v) for k, v in checkpoint["partial_ms"].items()}),
+                checkpoint["error_msg"],
+                int(checkpoint["resumes"]),
+                time.time(),
+                int(checkpoint["checkpoint_id"]),
+            ),
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
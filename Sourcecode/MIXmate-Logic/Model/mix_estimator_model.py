@@ -0,0 +1,71 @@
+import os
+import time
+
+from Model.db_connection import open_connection
+
+
+class MixEstimatorModel:
+    def __init__(self, db_path: str | None = None):
+        # Standardpfad zur lokalen MIXmate-Datenbank.
+        if db_path is None:
+            base = os.path.dirname(os.path.dirname(__file__))
+            db_path = os.path.join(base, "Database", "MIXmate.db")
+
+        self.db_path = db_path
+        # Schaetzer lernt im Engine-Thread und schaetzt im UI-Thread; Service serialisiert per Lock.
+        # Tabelle legt Model/db_bootstrap.py an.
+        self.connection = open_connection(self.db_path, check_same_thread=False)
+        self.cursor = self.connection.cursor()
+
+    def load_all(self) -> dict:
+        self.cursor.execute("SELECT * FROM mix_estimator_stats")
+        return {
+            str(row["name"]): {
+                "weight": float(row["weight"]),
+                "sum_x": float(row["sum_x"]),
+                "sum_y": float(row["sum_y"]),
+                "sum_xx": float(row["sum_xx"]),
+                "sum_xy": float(row["sum_xy"]),
+                "samples": int(row["samples"]),
+            }
+            for row in self.cursor.fetchall()
+        }
+
+    def save_all(self, stats: dict) -> None:
+        # Alle Lernwerte in einer Transaktion sichern.
+        now = time.time()
+        self.cursor.executemany(
+            """
+            INSERT INTO mix_estimator_stats (name, weight, sum_x, sum_y, sum_xx, sum_xy, samples, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                weight = excluded.weight,
+                sum_x = excluded.sum_x,
+                sum_y = excluded.sum_y,
+                sum_xx = excluded.sum_xx,
+                sum_xy = excluded.sum_xy,
+                samples = excluded.samples,
+                updated_at = excluded.updated_at
+            """,
+            [
+                (
+                    name,
+                    s["weight"],
+                    s["sum_x"],
+                    s["sum_y"],
+                    s["sum_xx"],
+                    s["sum_xy"],
+                    s["samples"],
+                    now,
+                )
+                for name, s in stats.items()
+            ],
+        )
+        self.connection.commit()
+
+    def reset(self) -> None:
+        self.cursor.execute("DELETE FROM mix_estimator_stats")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
@@ -1,6 +1,5 @@
-import sqlite3
 import os
-from Model.db_bootstrap import ensure_database
+from Model.db_connection import get_connection
 
 class MixModel:
 
@@ -10,16 +9,14 @@ class MixModel:
             base = os.path.dirname(os.path.dirname(__file__))
             db_path = os.path.join(base, "Database", "MIXmate.db")
 
-        ensure_database(db_path)
         print("DB-Pfad:", db_path)
 
         # DB-Pfad fuer spaetere Zugriffe merken.
         self.db_path = db_path
 
-        # Eine Verbindung pro Model-Instanz.
-        self.connection = sqlite3.connect(self.db_path)
+        # Eine Verbindung pro Thread, Schema-Check nur beim ersten Zugriff im Prozess.
         # Row-Factory erlaubt Dict-aehnlichen Spaltenzugriff.
-        self.connection.row_factory = sqlite3.Row
+        self.connection = get_connection(self.db_path)
         # Cursor fuehrt alle Rezept- und Debugabfragen aus.
         self.cursor = self.connection.cursor()
 
@@ -37,6 +34,7 @@ class MixModel:
             i.name AS ingredient_name,
             ci.amount_ml,
             ci.order_index,
+            ci.order_group,
             p.pump_number,
             p.flow_rate_ml_s,
             p.position_steps AS position_mm,
@@ -92,8 +90,8 @@ class MixModel:
         return data
 
     def close(self):
-        # Datenbankverbindung schliessen.
+        # Verbindung gehoert dem Verbindungsmanager; nur den eigenen Cursor freigeben.
         try:
-            self.connection.close()
+            self.cursor.close()
         except Exception:
             pass
@@ -0,0 +1,113 @@
+import json
+import os
+
+from Model.db_connection import open_connection
+
+
+class MixTimelineModel:
+    # Aufgezeichnete Mixe, deren Phasen fuer die Zeitleiste aufgehoben werden.
+    RUN_HISTORY_LIMIT = 50
+
+    def __init__(self, db_path: str | None = None):
+        # Standardpfad zur lokalen MIXmate-Datenbank.
+        if db_path is None:
+            base = os.path.dirname(os.path.dirname(__file__))
+            db_path = os.path.join(base, "Database", "MIXmate.db")
+
+        self.db_path = db_path
+        # Engine schreibt nach dem Mix, die Adminansicht liest im UI-Thread; Service serialisiert per Lock.
+        # Tabellen und Index legt Model/db_bootstrap.py an.
+        self.connection = open_connection(self.db_path, check_same_thread=False)
+        self.cursor = self.connection.cursor()
+
+    def add_run(self, run: dict, spans: list) -> int:
+        # Mix mit allen Phasen in einer Transaktion sichern.
+        self.cursor.execute(
+            """
+            INSERT INTO mix_timeline_runs (label, cocktail_id, started_at, finished_at, error_msg)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (str(run["label"]), run.get("cocktail_id"), float(run["started_at"]), float(run["finished_at"]), run.get("error_msg")),
+        )
+        run_id = int(self.cursor.lastrowid)
+        self.cursor.executemany(
+            """
+            INSERT INTO mix_timeline_spans (
+                run_id, depth, name, detail, start_ts, end_ts, bus_transactions, wait_s, wait_reason, waits, error_msg
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    run_id,
+                    int(s["depth"]),
+                    str(s["name"]),
+                    s.get("detail"),
+                    float(s["start_ts"]),
+                    float(s["end_ts"]),
+                    int(s["bus_transactions"]),
+                    float(s["wait_s"]),
+                    s.get("wait_reason"),
+                    json.dumps(s["waits"]),
+                    s.get("error_msg"),
+                )
+                for s in spans
+            ],
+        )
+        # Historie begrenzen, damit die Tabellen nicht wachsen.
+        self.cursor.execute(
+            """
+            SELECT run_id FROM mix_timeline_runs
+            ORDER BY run_id DESC LIMIT 1 OFFSET ?
+            """,
+            (int(self.RUN_HISTORY_LIMIT),),
+        )
+        row = self.cursor.fetchone()
+        if row is not None:
+            self.cursor.execute("DELETE FROM mix_timeline_spans WHERE run_id <= ?", (int(row["run_id"]),))
+            self.cursor.execute("DELETE FROM mix_timeline_runs WHERE run_id <= ?", (int(row["run_id"]),))
+        self.connection.commit()
+        return run_id
+
+    def get_runs(self, limit: int = 20) -> list[dict]:
+        # Neueste Mixe zuerst.
+        self.cursor.execute(
+            "SELECT * FROM mix_timeline_runs ORDER BY run_id DESC LIMIT ?",
+            (int(limit),),
+        )
+        return [
+            {
+                "run_id": int(row["run_id"]),
+                "label": str(row["label"]),
+                "cocktail_id": row["cocktail_id"],
+                "started_at": float(row["started_at"]),
+                "finished_at": float(row["finished_at"]),
+                "error_msg": row["error_msg"],
+            }
+            for row in self.cursor.fetchall()
+        ]
+
+    def get_spans(self, run_id: int) -> list[dict]:
+        # Phasen in Aufzeichnungsreihenfolge (Start der Phase).
+        self.cursor.execute(
+            "SELECT * FROM mix_timeline_spans WHERE run_id = ? ORDER BY start_ts, span_id",
+            (int(run_id),),
+        )
+        return [
+            {
+                "depth": int(row["depth"]),
+                "name": str(row["name"]),
+                "detail": row["detail"],
+                "start_ts": float(row["start_ts"]),
+                "end_ts": float(row["end_ts"]),
+                "bus_transactions": int(row["bus_transactions"]),
+                "wait_s": float(row["wait_s"]),
+                "wait_reason": row["wait_reason"],
+                "waits": json.loads(row["waits"]),
+                "error_msg": row["error_msg"],
+            }
+            for row in self.cursor.fetchall()
+        ]
+
+    def close(self):
+        self.connection.close()
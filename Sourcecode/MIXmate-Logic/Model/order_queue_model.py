@@ -0,0 +1,145 @@
+import os
+import time
+
+from Model.db_connection import open_connection
+
+
+class OrderQueueModel:
+    # Offene Auftraege, die ein Neustart wieder aufnehmen muss.
+    OPEN_STATES = ("queued", "running")
+    # Abgeschlossene Auftraege, die fuer ETA und Diagnose aufgehoben werden.
+    FINISHED_HISTORY_LIMIT = 200
+
+    def __init__(self, db_path: str | None = None):
+        # Standardpfad zur lokalen MIXmate-Datenbank.
+        if db_path is None:
+            base = os.path.dirname(os.path.dirname(__file__))
+            db_path = os.path.join(base, "Database", "MIXmate.db")
+
+        self.db_path = db_path
+        # Queue-Service greift aus UI- und Worker-Thread zu und serialisiert selbst per Lock.
+        # Deshalb eine eigene Verbindung statt der threadgebundenen Standardverbindung.
+        # Tabelle und Index legt Model/db_bootstrap.py an.
+        self.connection = open_connection(self.db_path, check_same_thread=False)
+        self.cursor = self.connection.cursor()
+
+    def _row_to_dict(self, row) -> dict:
+        return {
+            "order_id": int(row["order_id"]),
+            "cocktail_id": int(row["cocktail_id"]),
+            "factor": float(row["factor"]),
+            "priority": int(row["priority"]),
+            "status": str(row["status"]),
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "error_msg": row["error_msg"],
+        }
+
+    def add_order(self, cocktail_id: int, factor: float = 1.0, priority: int = 0) -> dict:
+        # Neuen Auftrag am Ende seiner Prioritaetsstufe einreihen.
+        if float(factor) <= 0:
+            raise ValueError("factor muss > 0 sein")
+        self.cursor.execute(
+            """
+            INSERT INTO order_queue (cocktail_id, factor, priority, status, created_at)
+            VALUES (?, ?, ?, 'queued', ?)
+            """,
+            (int(cocktail_id), float(factor), int(priority), time.time()),
+        )
+        self.connection.commit()
+        return self.get_order(int(self.cursor.lastrowid))
+
+    def get_order(self, order_id: int) -> dict | None:
+        self.cursor.execute("SELECT * FROM order_queue WHERE order_id = ?", (int(order_id),))
+        row = self.cursor.fetchone()
+        return self._row_to_dict(row) if row is not None else None
+
+    def get_open_orders(self) -> list[dict]:
+        # Laufender Auftrag zuerst, danach hoehere Prioritaet vor FIFO.
+        self.cursor.execute(
+            """
+            SELECT *
+            FROM order_queue
+            WHERE status IN ('queued', 'running')
+            ORDER BY
+                CASE status WHEN 'running' THEN 0 ELSE 1 END,
+                priority DESC,
+                order_id ASC
+            """
+        )
+        return [self._row_to_dict(row) for row in self.cursor.fetchall()]
+
+    def get_recent_durations(self, cocktail_id: int, limit: int = 5) -> list[float]:
+        # Gemessene Laufzeiten erfolgreicher Auftraege fuer die ETA.
+        self.cursor.execute(
+            """
+            SELECT finished_at - started_at AS duration_s
+            FROM order_queue
+            WHERE cocktail_id = ? AND status = 'done'
+              AND started_at IS NOT NULL AND finished_at IS NOT NULL
+            ORDER BY order_id DESC
+            LIMIT ?
+            """,
+            (int(cocktail_id), int(limit)),
+        )
+        return [float(row["duration_s"]) for row in self.cursor.fetchall() if row["duration_s"] is not None]
+
+    def mark_running(self, order_id: int) -> None:
+        self.cursor.execute(
+            "UPDATE order_queue SET status = 'running', started_at = ?, error_msg = NULL WHERE order_id = ?",
+            (time.time(), int(order_id)),
+        )
+        self.connection.commit()
+
+    def mark_finished(self, order_id: int, status: str, error_msg: str | None = None) -> None:
+        # Abschluss mit Endstatus done, failed oder cancelled.
+        if status not in ("done", "failed", "cancelled"):
+            raise ValueError(f"Ungueltiger Endstatus: {status}")
+        self.cursor.execute(
+            "UPDATE order_queue SET status = ?, finished_at = ?, error_msg = ? WHERE order_id = ?",
+            (status, time.time(), error_msg, int(order_id)),
+        )
+        self._trim_history()
+        self.connection.commit()
+
+    def _trim_history(self) -> None:
+        # Historie begrenzen, damit get_recent_durations keine wachsende Tabelle durchsucht.
+        self.cursor.execute(
+            """
+            DELETE FROM order_queue
+            WHERE status IN ('done', 'failed', 'cancelled') AND order_id <= (
+                SELECT order_id FROM order_queue
+                WHERE status IN ('done', 'failed', 'cancelled')
+                ORDER BY order_id DESC LIMIT 1 OFFSET ?
+            )
+            """,
+            (int(self.FINISHED_HISTORY_LIMIT),),
+        )
+
+    def requeue_running_orders(self) -> int:
+        # Nach einem Absturz unterbrochene Auftraege wieder einreihen.
+        self.cursor.execute(
+            "UPDATE order_queue SET status = 'queued', started_at = NULL WHERE status = 'running'"
+        )
+        self.connection.commit()
+        return int(self.cursor.rowcount)
+
+    def cancel_order(self, order_id: int) -> None:
+        # Nur wartende Auftraege lassen sich aus der Queue nehmen.
+        self.cursor.execute(
+            "UPDATE order_queue SET status = 'cancelled', finished_at = ? WHERE order_id = ? AND status = 'queued'",
+            (time.time(), int(order_id)),
+        )
+        cancelled = self.cursor.rowcount
+        self._trim_history()
+        self.connection.commit()
+        if cancelled == 0:
+            raise ValueError(f"order_id={order_id} wartet nicht (mehr) in der Queue")
+
+    def close(self) -> None:
+        # DB-Verbindung defensiv schliessen.
+        try:
+            self.connection.close()
+        except Exception:
+            pass
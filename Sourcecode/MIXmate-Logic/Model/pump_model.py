@@ -1,6 +1,6 @@
-import sqlite3
 import os
-from Model.db_bootstrap import ensure_database
+from Model.db_bootstrap import ensure_revision_triggers
+from Model.db_connection import get_connection, run_migration_once
 
 
 class PumpModel:
@@ -12,16 +12,15 @@ class PumpModel:
             db_path = os.path.join(base, "Database", "MIXmate.db")
         print("DB-Pfad:", db_path)
 
-        # Datenbank und Tabellen vor Pumpenzugriff absichern.
-        ensure_database(db_path)
         # DB-Pfad fuer spaetere Zugriffe merken.
         self.db_path = db_path
 
-        self.connection = sqlite3.connect(self.db_path)
+        # Gemeinsame Verbindung des Threads; Tabellen werden beim ersten Zugriff abgesichert.
         # Row-Objekte erlauben Zugriff per Spaltenname.
-        self.connection.row_factory = sqlite3.Row
+        self.connection = get_connection(self.db_path)
         self.cursor = self.connection.cursor()
-        self._ensure_pump_schema()
+        # Pumpen-Migration reicht einmal pro Prozess.
+        run_migration_once(self.db_path, "pumps", self._ensure_pump_schema)
 
 
         
@@ -89,6 +88,8 @@ class PumpModel:
             # Alte Tabelle durch aktualisierte Kopie ersetzen.
             self.cursor.execute("DROP TABLE pumps")
             self.cursor.execute("ALTER TABLE pumps_new RENAME TO pumps")
+            # DROP TABLE hat die Aenderungszaehler-Trigger mitgenommen.
+            ensure_revision_triggers(self.connection)
             self.connection.commit()
         except Exception:
             # Bei Fehlern bleibt das alte Schema erhalten.
@@ -204,8 +205,8 @@ class PumpModel:
             raise ValueError(f"pump_number={pump_number} nicht gefunden")
 
     def close(self):
-        # DB-Verbindung defensiv schliessen.
+        # Verbindung gehoert dem Verbindungsmanager; nur den eigenen Cursor freigeben.
         try:
-            self.connection.close()
+            self.cursor.close()
         except Exception:
             pass
@@ -0,0 +1,86 @@
+import os
+import threading
+
+from Model.db_connection import open_connection
+
+
+class SettingsCache:
+    # Alle machine_parameters einer Datenbank im Speicher halten.
+    # Lesen kostet nur eine Abfrage des Aenderungszaehlers statt Verbindung plus Schema-Check.
+    # Der Zaehler in data_revisions steigt per Trigger nur bei Aenderungen an machine_parameters,
+    # Checkpoints, Zeitleiste oder Queue loesen also kein Neuladen aus.
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # Eine Verbindung fuer alle Threads, serialisiert ueber das Lock.
+        self.connection = open_connection(self.db_path, check_same_thread=False)
+        self._values = {}
+        # Stand von machine_parameters beim letzten Laden; None = neu laden.
+        self._revision = None
+
+    def _current_revision_locked(self) -> int:
+        row = self.connection.execute(
+            "SELECT revision FROM data_revisions WHERE table_name = 'machine_parameters'"
+        ).fetchone()
+        return int(row[0]) if row is not None else 0
+
+    def _sync_locked(self):
+        # Bei Aenderungen (auch aus anderen Verbindungen/Prozessen) alle Parameter neu laden.
+        revision = self._current_revision_locked()
+        if revision == self._revision:
+            return
+        rows = self.connection.execute("SELECT param_key, param_value FROM machine_parameters").fetchall()
+        self._values = {str(key): float(value) for key, value in rows}
+        self._revision = revision
+
+    def get_value(self, key: str):
+        # Nicht gesetzte Parameter werden als None zurueckgegeben.
+        with self._lock:
+            self._sync_locked()
+            return self._values.get(key)
+
+    def get_all(self) -> dict:
+        with self._lock:
+            self._sync_locked()
+            return dict(self._values)
+
+    def set_value(self, key: str, value: float):
+        # Write-through: erst DB, dann Cache; der Trigger erhoeht auch bei eigenen Schreibzugriffen den Zaehler.
+        with self._lock:
+            self.connection.execute(
+                """
+                INSERT INTO machine_parameters (param_key, param_value)
+                VALUES (?, ?)
+                ON CONFLICT(param_key) DO UPDATE SET param_value=excluded.param_value
+                """,
+                (key, float(value)),
+            )
+            self.connection.commit()
+            self._sync_locked()
+
+    def invalidate(self):
+        # Naechster Zugriff laedt alle Parameter neu.
+        with self._lock:
+            self._revision = None
+
+    def close(self):
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_settings_cache(db_path: str) -> SettingsCache:
+    # Ein Cache pro Datenbankdatei fuer den ganzen Prozess.
+    key = os.path.abspath(db_path)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = SettingsCache(db_path)
+            _CACHES[key] = cache
+        return cache
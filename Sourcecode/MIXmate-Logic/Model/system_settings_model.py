@@ -1,6 +1,5 @@
 import os
-import sqlite3
-from Model.db_bootstrap import ensure_database
+from Model.settings_cache import get_settings_cache
 
 
 class SystemSettingsModel:
@@ -10,52 +9,21 @@ class SystemSettingsModel:
             base = os.path.dirname(os.path.dirname(__file__))
             db_path = os.path.join(base, "Database", "MIXmate.db")
 
-        # Grundschema vor Parameterzugriff sicherstellen.
-        ensure_database(db_path)
         self.db_path = db_path
-        self.connection = sqlite3.connect(self.db_path)
-        # Parameterwerte koennen per Spaltenname gelesen werden.
-        self.connection.row_factory = sqlite3.Row
-        self.cursor = self.connection.cursor()
-        self._ensure_schema()
-
-    def _ensure_schema(self):
-        # Key-Value-Tabelle fuer Maschinenparameter.
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS machine_parameters (
-                param_key TEXT PRIMARY KEY,
-                param_value REAL NOT NULL
-            )
-            """
-        )
-        self.connection.commit()
+        # Prozessweiter Cache: Schema-Check und Verbindung nur beim ersten Zugriff.
+        # Dadurch sind kurzlebige Instanzen (z.B. pro Statusabfrage) billig.
+        self.cache = get_settings_cache(self.db_path)
 
     def set_value(self, key: str, value: float):
         # Leere Keys wuerden spaeter nicht mehr eindeutig wartbar sein.
         if not key:
             raise ValueError("param_key darf nicht leer sein")
-        # Upsert haelt Speichern und Aktualisieren an einer Stelle.
-        self.cursor.execute(
-            """
-            INSERT INTO machine_parameters (param_key, param_value)
-            VALUES (?, ?)
-            ON CONFLICT(param_key) DO UPDATE SET param_value=excluded.param_value
-            """,
-            (key, float(value)),
-        )
-        self.connection.commit()
+        # Upsert in der DB, Cache wird direkt mitgefuehrt.
+        self.cache.set_value(key, float(value))
 
     def get_value(self, key: str):
         # Nicht gesetzte Parameter werden als None zurueckgegeben.
-        self.cursor.execute(
-            "SELECT param_value FROM machine_parameters WHERE param_key = ?",
-            (key,),
-        )
-        row = self.cursor.fetchone()
-        if row is None:
-            return None
-        return float(row["param_value"])
+        return self.cache.get_value(key)
 
     def set_mixer_height(self, mm: float):
         self.set_value("mixer_height_mm", mm)
@@ -108,6 +76,26 @@ class SystemSettingsModel:
     def get_homing_safe_height(self):
         return self.get_value("homing_safe_height_mm")
 
+    def set_rehome_every_n_mixes(self, count: int):
+        # 0 schaltet das regelmaessige Nach-Homing ab.
+        self.set_value("rehome_every_n_mixes", int(count))
+
+    def get_rehome_every_n_mixes(self) -> int:
+        val = self.get_value("rehome_every_n_mixes")
+        if val is None:
+            return 0
+        return int(val)
+
+    def set_rehome_after_fault(self, enabled: bool):
+        self.set_value("rehome_after_fault", 1.0 if bool(enabled) else 0.0)
+
+    def get_rehome_after_fault(self) -> bool:
+        val = self.get_value("rehome_after_fault")
+        if val is None:
+            # Nach Fehlern neu referenzieren ist der sichere Standard.
+            return True
+        return bool(int(val))
+
     def set_level_direction(self, levelnumber: int, forward: bool):
         # Jede Ebene bekommt einen eigenen Richtungs-Key.
         self.set_value(f"level_direction_{int(levelnumber)}", 1.0 if bool(forward) else 0.0)
@@ -155,8 +143,5 @@ class SystemSettingsModel:
         return bool(int(val))
 
     def close(self):
-        # DB-Verbindung defensiv schliessen.
-        try:
-            self.connection.close()
-        except Exception:
-            pass
+        # Verbindung gehoert dem prozessweiten Cache und bleibt offen.
+        pass
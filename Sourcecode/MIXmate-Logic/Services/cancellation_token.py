@@ -0,0 +1,72 @@
+import threading
+import time
+
+
+class CancellationToken:
+    # Stop-Signal fuer blockierende Ablaufschritte.
+    # Wartestellen schlafen ueber wait() oder pruefen is_set(); cancel() weckt alle sofort.
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        # Weckfunktionen fuer Warter, die nicht direkt auf dem Token schlafen (z.B. Monitore).
+        self._callbacks = []
+        self._requested_ts = None
+        self._observed = False
+
+    def cancel(self):
+        # Stop anfordern; Zeitpunkt dient der Latenzmessung.
+        with self._lock:
+            if self._requested_ts is None:
+                self._requested_ts = time.monotonic()
+                self._observed = False
+            callbacks = list(self._callbacks)
+        self._event.set()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                # Ein fehlerhafter Warter darf den Stop nicht verhindern.
+                print(f"[CancellationToken] Wecken fehlgeschlagen: {e}")
+
+    def reset(self):
+        # Neuer Ablauf startet ohne alten Stop-Zustand.
+        with self._lock:
+            self._event.clear()
+            self._requested_ts = None
+            self._observed = False
+
+    def is_set(self) -> bool:
+        # Gleiche Schnittstelle wie threading.Event fuer StatusMonitor.wait_for.
+        return self._event.is_set()
+
+    def wait(self, timeout_s: float) -> bool:
+        # Abbrechbares Schlafen; True, wenn waehrenddessen ein Stop kam.
+        return self._event.wait(timeout_s)
+
+    def on_cancel(self, callback):
+        # Weckfunktion registrieren; Rueckgabe meldet sie wieder ab.
+        with self._lock:
+            self._callbacks.append(callback)
+
+        def _unsubscribe():
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+        return _unsubscribe
+
+    def elapsed_s(self):
+        # Sekunden seit dem Stop-Wunsch, None ohne Stop.
+        with self._lock:
+            if self._requested_ts is None:
+                return None
+            return time.monotonic() - self._requested_ts
+
+    def observe(self):
+        # Erste Reaktion des Ablaufs auf den Stop: liefert einmalig die Latenz in Sekunden.
+        with self._lock:
+            if self._requested_ts is None or self._observed:
+                return None
+            self._observed = True
+            return time.monotonic() - self._requested_ts
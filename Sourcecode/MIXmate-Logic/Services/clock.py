@@ -0,0 +1,106 @@
+import threading
+import time
+
+
+class SystemClock:
+    # Echte Zeit; Standard fuer MixEngine, StatusService und StatusMonitor.
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def wait(self, waitable, timeout_s: float) -> bool:
+        # waitable: threading.Event, threading.Condition (gehalten) oder CancellationToken.
+        return waitable.wait(timeout_s)
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+class VirtualClock:
+    # Simulierte Zeit fuer Discrete-Event-Laeufe (benchmarks/sim_evening.py).
+    # Die Zeit steht, solange ein beteiligter Thread rechnet, und springt auf die naechste Frist,
+    # sobald alle beteiligten Threads in wait()/sleep() stecken. Rechenzeit kostet so keine
+    # simulierte Zeit; Event.set und notify wecken Warter weiterhin sofort.
+    # Beteiligt ist jeder Thread, der einmal wait()/sleep() dieser Uhr aufgerufen hat.
+
+    # Echtzeit-Takt, in dem Warter ihre Frist pruefen.
+    SLICE_REAL_S = 0.0002
+    # Steckt ein Beteiligter so lange ausserhalb der Uhr (z.B. in einem Lock), springt die Zeit trotzdem.
+    STALL_REAL_S = 0.05
+
+    def __init__(self, start_ts: float = None):
+        # time() startet bei start_ts (Unix-Sekunden), monotonic() bei 0.
+        self._epoch = float(start_ts) if start_ts is not None else time.time()
+        self._now = 0.0
+        self._lock = threading.Lock()
+        self._participants = {}
+        # Thread-ID -> (Frist, waitable) aller gerade wartenden Beteiligten.
+        self._waiting = {}
+        self._last_progress_real = time.monotonic()
+        # Anzahl Zeitspruenge (= verarbeitete Ereignisse) fuer die Auswertung.
+        self.jumps = 0
+
+    def time(self) -> float:
+        with self._lock:
+            return self._epoch + self._now
+
+    def monotonic(self) -> float:
+        with self._lock:
+            return self._now
+
+    def sleep(self, seconds: float):
+        self.wait(None, seconds)
+
+    def wait(self, waitable, timeout_s: float) -> bool:
+        if timeout_s is None:
+            return waitable.wait()
+        thread = threading.current_thread()
+        with self._lock:
+            deadline = self._now + max(0.0, float(timeout_s))
+            self._participants[thread.ident] = thread
+            self._waiting[thread.ident] = (deadline, waitable)
+            self._try_advance_locked()
+        try:
+            while True:
+                if waitable is None:
+                    time.sleep(self.SLICE_REAL_S)
+                elif waitable.wait(self.SLICE_REAL_S):
+                    return True
+                with self._lock:
+                    if self._now >= deadline:
+                        return False
+                    self._try_advance_locked()
+        finally:
+            with self._lock:
+                self._waiting.pop(thread.ident, None)
+                self._last_progress_real = time.monotonic()
+
+    def _try_advance_locked(self):
+        # Auf die naechste Frist springen, wenn niemand mehr rechnet.
+        for ident, thread in list(self._participants.items()):
+            if not thread.is_alive():
+                del self._participants[ident]
+                self._waiting.pop(ident, None)
+        if not self._waiting:
+            return
+        all_waiting = all(ident in self._waiting for ident in self._participants)
+        stalled = time.monotonic() - self._last_progress_real > self.STALL_REAL_S
+        if not all_waiting and not stalled:
+            return
+        for _, waitable in self._waiting.values():
+            # Ein gesetztes Event laeuft gleich weiter; erst danach springt die Zeit.
+            is_set = getattr(waitable, "is_set", None)
+            if is_set is not None and is_set():
+                return
+        next_deadline = min(deadline for deadline, _ in self._waiting.values())
+        if next_deadline > self._now:
+            self._now = next_deadline
+            self.jumps += 1
+        self._last_progress_real = time.monotonic()
@@ -0,0 +1,142 @@
+class DispensePlanner:
+    # Fahrzeit-Schaetzung fuer die Mixer-Plattform.
+    # 3000 steps/s bei 17 steps/mm, mit Rampen grob 120 mm/s im Mittel.
+    EST_MIXER_SPEED_MM_S = 120.0
+    # Anfahren, Abbremsen und Statuspruefung pro Fahrt.
+    EST_MOVE_OVERHEAD_S = 1.5
+
+    def _position(self, item: dict):
+        # Position wie in der Engine lesen; None bleibt fuer ungueltige Schritte.
+        position_mm = item.get("position_mm", item.get("position_steps"))
+        if position_mm is None:
+            return None
+        return int(position_mm)
+
+    def _split_blocks(self, mix_data: list) -> list:
+        # Aufeinanderfolgende Schritte derselben order_group bilden einen Block.
+        blocks = []
+        for item in mix_data:
+            group = item.get("order_group")
+            if group is not None and blocks and blocks[-1]["group"] == group:
+                blocks[-1]["items"].append(item)
+                continue
+            blocks.append({"group": group, "items": [item]})
+        return blocks
+
+    def _sweep(self, items: list, start_mm: int, first_low: bool) -> list:
+        # Alle Punkte auf einer Strecke in einer Richtung einsammeln, dann umkehren.
+        lower = [x for x in items if self._position(x) <= start_mm]
+        upper = [x for x in items if self._position(x) > start_mm]
+        lower.sort(key=lambda x: self._position(x), reverse=True)
+        upper.sort(key=lambda x: self._position(x))
+        return lower + upper if first_low else upper + lower
+
+    def _travel_mm(self, items: list, start_mm, end_mm=None) -> int:
+        # Summe der Fahrwege ab Startposition, optional bis zum naechsten Fixpunkt.
+        distance = 0
+        current = start_mm
+        for item in items:
+            pos = self._position(item)
+            if pos is None:
+                continue
+            if current is not None:
+                distance += abs(pos - current)
+            current = pos
+        if end_mm is not None and current is not None:
+            distance += abs(end_mm - current)
+        return distance
+
+    def _plan_block(self, items: list, start_mm, next_mm):
+        # Innerhalb eines Blocks gibt es auf einer Linie nur zwei sinnvolle Touren:
+        # zuerst zur unteren oder zuerst zur oberen Grenze.
+        skipped = [x for x in items if self._position(x) is None]
+        movable = [x for x in items if self._position(x) is not None]
+        if len(movable) < 2 or start_mm is None:
+            return items
+
+        candidates = [
+            self._sweep(movable, start_mm, first_low=True),
+            self._sweep(movable, start_mm, first_low=False),
+        ]
+        best = min(candidates, key=lambda order: self._travel_mm(order, start_mm, next_mm))
+        # Ungueltige Schritte werden von der Engine uebersprungen und stoeren hier nicht.
+        return skipped + best
+
+    def _count_moves(self, items: list, start_mm) -> int:
+        moves = 0
+        current = start_mm
+        for item in items:
+            pos = self._position(item)
+            if pos is None:
+                continue
+            if current is None or pos != current:
+                moves += 1
+            current = pos
+        return moves
+
+    def estimate_travel_s(self, distance_mm: float, moves: int) -> float:
+        # Fahrzeit aus Strecke und Anzahl Fahrten.
+        return float(distance_mm) / self.EST_MIXER_SPEED_MM_S + moves * self.EST_MOVE_OVERHEAD_S
+
+    def plan(self, mix_data: list, start_mm=None):
+        # Dosierreihenfolge mit minimalem Fahrweg bestimmen.
+        # Rueckgabe: (geplante Schritte, Bericht mit naiver und geplanter Strecke).
+        if start_mm is not None:
+            start_mm = int(start_mm)
+
+        blocks = self._split_blocks(list(mix_data or []))
+        planned = []
+        current = start_mm
+        for index, block in enumerate(blocks):
+            items = block["items"]
+            if block["group"] is not None and len(items) > 1:
+                # Vorausschau: erster Fixpunkt des folgenden Blocks.
+                next_mm = None
+                if index + 1 < len(blocks) and blocks[index + 1]["group"] is None:
+                    next_mm = self._position(blocks[index + 1]["items"][0])
+                items = self._plan_block(items, current, next_mm)
+            planned.extend(items)
+            for item in items:
+                pos = self._position(item)
+                if pos is not None:
+                    current = pos
+
+        naive_mm = self._travel_mm(mix_data or [], start_mm)
+        planned_mm = self._travel_mm(planned, start_mm)
+        report = {
+            "start_mm": start_mm,
+            "naive_mm": naive_mm,
+            "planned_mm": planned_mm,
+            "naive_s": self.estimate_travel_s(naive_mm, self._count_moves(mix_data or [], start_mm)),
+            "planned_s": self.estimate_travel_s(planned_mm, self._count_moves(planned, start_mm)),
+        }
+        return planned, report
+
+    def group_parallel(self, planned: list, max_pumps: int) -> list:
+        # Geplante Schritte in gleichzeitig dosierbare Gruppen zusammenfassen.
+        # Zusammen laufen nur Schritte derselben order_group an derselben Position
+        # mit unterschiedlichen Pumpen; alles andere bleibt ein Einzelschritt.
+        batches = []
+        for item in planned:
+            if batches and len(batches[-1]) < max_pumps and self._can_join(batches[-1], item):
+                batches[-1].append(item)
+                continue
+            batches.append([item])
+        return batches
+
+    def _can_join(self, batch: list, item: dict) -> bool:
+        first = batch[0]
+        group = item.get("order_group")
+        if group is None or first.get("order_group") != group:
+            return False
+        pos = self._position(item)
+        if pos is None or pos != self._position(first):
+            return False
+        pump_number = item.get("pump_number")
+        return pump_number is not None and all(x.get("pump_number") != pump_number for x in batch)
+
+    def format_report(self, report: dict) -> str:
+        return (
+            f"Fahrweg geplant {report['planned_mm']} mm (~{report['planned_s']:.1f} s), "
+            f"naiv {report['naive_mm']} mm (~{report['naive_s']:.1f} s)"
+        )
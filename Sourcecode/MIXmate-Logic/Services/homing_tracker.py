@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import deque
+
+from Model.homing_state_model import HomingStateModel
+from Model.system_settings_model import SystemSettingsModel
+
+
+class HomingTracker:
+    # Merkt sich pro Achse die letzte Referenzfahrt und alle Ereignisse, die sie entwerten.
+    # Homing wird nur wiederholt, wenn die Firmware homing_ok verliert oder die Policy es verlangt.
+
+    # Positionsverlauf pro Achse im Speicher (Diagnose, nicht persistiert).
+    POSITION_HISTORY_LEN = 100
+
+    def __init__(self, db_path: str | None = None):
+        self.model = HomingStateModel(db_path=db_path)
+        self.settings = SystemSettingsModel(db_path=db_path)
+        # Monitor-Threads und Engine melden gleichzeitig, daher ein Lock fuer Zustand und DB.
+        self._lock = threading.Lock()
+        # Zustand aus der DB spiegeln; Entscheidungen kosten dann keinen DB-Zugriff.
+        self._states = {state["axis"]: state for state in self.model.get_states()}
+        self._positions = {axis: deque(maxlen=self.POSITION_HISTORY_LEN) for axis in self._states}
+        # Letzter beobachteter Status pro Achse fuer Flankenerkennung.
+        self._last_seen = {}
+        # Waehrend eigener Referenzfahrten ist homing_ok=False erwartet.
+        self._homing_axes = set()
+
+    def rehome_reason(self, axis: str):
+        # Grund fuer ein erzwungenes Homing trotz homing_ok, sonst None.
+        with self._lock:
+            state = self._states[axis]
+            if state["invalid_reason"] is not None:
+                return state["invalid_reason"]
+            every_n = self.settings.get_rehome_every_n_mixes()
+            if every_n > 0 and state["homed_at"] is not None and state["mixes_since_home"] >= every_n:
+                return f"{state['mixes_since_home']} Mixe seit letzter Referenzfahrt"
+        return None
+
+    def is_valid(self, axis: str) -> bool:
+        # Gueltig heisst: protokollierte Referenzfahrt und kein Grund zum Nach-Homing.
+        with self._lock:
+            homed = self._states[axis]["homed_at"] is not None
+        return homed and self.rehome_reason(axis) is None
+
+    def homing_started(self, axis: str):
+        with self._lock:
+            self._homing_axes.add(axis)
+
+    def homing_aborted(self, axis: str):
+        # Abgebrochene Referenzfahrt: homing_ok-Verlust wieder als Fehler werten.
+        with self._lock:
+            self._homing_axes.discard(axis)
+
+    def record_homed(self, axis: str, position_mm=None):
+        # Referenzfahrt bestaetigt: Zaehler und Invalidierung zuruecksetzen.
+        with self._lock:
+            self._homing_axes.discard(axis)
+            self.model.mark_homed(axis, position_mm)
+            self._states[axis] = self.model.get_state(axis)
+
+    def adopt_firmware_homing(self, axis: str, position_mm=None):
+        # Firmware meldet homing_ok, aber es gibt noch keinen Eintrag (z.B. erste Inbetriebnahme).
+        with self._lock:
+            if self._states[axis]["homed_at"] is not None:
+                return
+        self.record_homed(axis, position_mm)
+
+    def record_fault(self, axis: str, kind: str, detail: str = None, position_mm=None):
+        # Fehlerereignis protokollieren; je nach Policy ist das Homing danach ungueltig.
+        rehome = self.settings.get_rehome_after_fault()
+        with self._lock:
+            self.model.add_event(axis, kind, position_mm, detail)
+            if rehome:
+                self.model.mark_invalid(axis, kind)
+                self._states[axis] = self.model.get_state(axis)
+        print(f"[HomingTracker] {axis}: {kind}{f' ({detail})' if detail else ''}")
+
+    def mix_started(self, axes):
+        # Noch als laufend markierter Mix wurde nie sauber beendet (Fehler oder Absturz).
+        with self._lock:
+            # Bereits entwertete Achsen (z.B. nach Stop) nicht doppelt melden.
+            aborted = [
+                axis for axis in axes
+                if self._states[axis]["mix_running"] and self._states[axis]["invalid_reason"] is None
+            ]
+        for axis in aborted:
+            self.record_fault(axis, "mix_aborted", "Vorheriger Mix nicht sauber beendet")
+        with self._lock:
+            self.model.mark_mix_started(axes)
+            for axis in axes:
+                self._states[axis]["mix_running"] = True
+
+    def mix_finished(self, axes, positions: dict = None):
+        with self._lock:
+            self.model.mark_mix_finished(axes, positions)
+            for axis in axes:
+                self._states[axis] = self.model.get_state(axis)
+
+    def observe_status(self, axis: str, status: dict):
+        # Monitor-Beobachter: Positionsverlauf fuehren und Fehlerflanken erkennen.
+        ok = bool(status.get("ok", False))
+        homing_ok = bool(status.get("homing_ok", False))
+        position_mm = status.get("ist_position")
+        with self._lock:
+            last = self._last_seen.get(axis)
+            self._last_seen[axis] = (ok, homing_ok)
+            if ok and position_mm is not None:
+                history = self._positions[axis]
+                if not history or history[-1][1] != position_mm:
+                    history.append((status.get("ts", time.time()), int(position_mm)))
+            in_homing = axis in self._homing_axes
+        if last is None:
+            return
+        if not ok and last[0]:
+            self.record_fault(axis, "i2c_error", status.get("error_code"))
+        elif ok and last[0] and last[1] and not homing_ok and not in_homing:
+            # homing_ok faellt ohne eigene Referenzfahrt: Firmware-Reset oder Schrittverlust.
+            self.record_fault(axis, "homing_lost", None, position_mm)
+
+    def get_position_history(self, axis: str) -> list:
+        with self._lock:
+            return list(self._positions.get(axis, ()))
+
+    def get_snapshot(self) -> dict:
+        # Zustand und letzte Ereignisse fuer Adminanzeige und Diagnose.
+        with self._lock:
+            states = {axis: dict(state) for axis, state in self._states.items()}
+            events = self.model.get_events(limit=20)
+        for axis, state in states.items():
+            state["rehome_reason"] = self.rehome_reason(axis)
+        return {
+            "states": states,
+            "events": events,
+            "rehome_every_n_mixes": self.settings.get_rehome_every_n_mixes(),
+            "rehome_after_fault": self.settings.get_rehome_after_fault(),
+        }
+
+    def close(self):
+        with self._lock:
+            self.model.close()
@@ -0,0 +1,163 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# smbus2 oder der virtuelle Bus (MIXMATE_I2C_BACKEND=virtual).
+from Hardware.i2c_backend import IMPORT_ERROR as _IMPORT_ERROR, SMBus
+
+I2C_BUS = 1
+
+# Prioritaetsklassen: kleinere Zahl kommt zuerst an den Bus.
+PRIO_STOP = 0
+PRIO_COMMAND = 1
+# Statusread, auf den ein Ablaufschritt gerade wartet.
+PRIO_WAIT_POLL = 2
+# Ruhetakt-Polling ohne wartenden Ablauf.
+PRIO_BACKGROUND_POLL = 3
+
+PRIORITY_NAMES = {
+    PRIO_STOP: "stop",
+    PRIO_COMMAND: "command",
+    PRIO_WAIT_POLL: "wait_poll",
+    PRIO_BACKGROUND_POLL: "background_poll",
+}
+
+
+class I2CBusService:
+    # Einziger Besitzer des physischen I2C-Busses fuer Mixer (0x13) und Regal (0x12).
+    # Geraete melden Transaktionen an; vergeben wird nach Prioritaetsklasse,
+    # innerhalb einer Klasse reihum pro Geraet, danach in Ankunftsreihenfolge.
+
+    # Laengere Wartezeiten auf den Bus werden im Log gemeldet.
+    SLOW_WAIT_WARN_S = 0.1
+
+    def __init__(self, bus_number: int = I2C_BUS, bus=None):
+        self.bus_number = int(bus_number)
+        # SMBus wird erst bei Bedarf geoeffnet (Monitore ohne Hardware brauchen nur den Scheduler).
+        self._bus = bus
+        self._owns_bus = bus is None
+        self._cond = threading.Condition()
+        self._busy = False
+        self._pending = []
+        self._next_ticket = 0
+        # Zaehler der letzten Zuteilung pro Geraet fuer faire Reihenfolge.
+        self._grants = 0
+        self._last_grant = {}
+        self._stats = {}
+
+    @property
+    def smbus(self):
+        # Gemeinsames SMBus-Objekt fuer alle Geraetetreiber.
+        with self._cond:
+            if self._bus is None:
+                if _IMPORT_ERROR is not None:
+                    raise RuntimeError(
+                        "smbus2 ist nicht installiert. Bitte im Zielsystem installieren: pip install smbus2"
+                    ) from _IMPORT_ERROR
+                self._bus = SMBus(self.bus_number)
+            return self._bus
+
+    def _next_locked(self) -> dict:
+        # Prioritaet, dann das Geraet, das am laengsten nicht dran war, dann FIFO.
+        return min(
+            self._pending,
+            key=lambda t: (t["priority"], self._last_grant.get(t["device"], -1), t["ticket"]),
+        )
+
+    def acquire(self, device: str, priority: int = PRIO_COMMAND) -> dict:
+        # Bus fuer eine Transaktion belegen; blockiert, bis der Scheduler sie zuteilt.
+        with self._cond:
+            self._next_ticket += 1
+            ticket = {
+                "ticket": self._next_ticket,
+                "device": str(device),
+                "priority": int(priority),
+                "queued_ts": time.monotonic(),
+            }
+            self._pending.append(ticket)
+            while self._busy or self._next_locked() is not ticket:
+                self._cond.wait()
+            self._pending.remove(ticket)
+            self._busy = True
+            self._grants += 1
+            self._last_grant[ticket["device"]] = self._grants
+        ticket["granted_ts"] = time.monotonic()
+        return ticket
+
+    def release(self, ticket: dict):
+        # Bus freigeben und Warte- sowie Belegungszeit verbuchen.
+        now = time.monotonic()
+        wait_s = ticket["granted_ts"] - ticket["queued_ts"]
+        hold_s = now - ticket["granted_ts"]
+        with self._cond:
+            self._busy = False
+            self._record_locked(ticket["device"], ticket["priority"], wait_s, hold_s)
+            self._cond.notify_all()
+        if wait_s > self.SLOW_WAIT_WARN_S:
+            print(
+                f"[I2CBus] {ticket['device']} ({PRIORITY_NAMES.get(ticket['priority'], ticket['priority'])}) "
+                f"wartete {wait_s * 1000:.0f} ms auf den Bus"
+            )
+
+    def _record_locked(self, device: str, priority: int, wait_s: float, hold_s: float):
+        key = (device, PRIORITY_NAMES.get(priority, str(priority)))
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = {"count": 0, "wait_total_s": 0.0, "wait_max_s": 0.0, "hold_total_s": 0.0, "hold_max_s": 0.0}
+            self._stats[key] = stats
+        stats["count"] += 1
+        stats["wait_total_s"] += wait_s
+        stats["wait_max_s"] = max(stats["wait_max_s"], wait_s)
+        stats["hold_total_s"] += hold_s
+        stats["hold_max_s"] = max(stats["hold_max_s"], hold_s)
+
+    @contextmanager
+    def transaction(self, device: str, priority: int = PRIO_COMMAND):
+        # Kontextmanager fuer eine exklusive Bus-Transaktion.
+        ticket = self.acquire(device, priority)
+        try:
+            yield self
+        finally:
+            self.release(ticket)
+
+    def run(self, device: str, priority: int, fn, *args, **kwargs):
+        # Funktion als eine Transaktion am Bus ausfuehren.
+        with self.transaction(device, priority):
+            return fn(*args, **kwargs)
+
+    def get_transaction_count(self) -> int:
+        # Bisher zugeteilte Transaktionen aller Geraete (z.B. fuer Phasen-Zeitleisten).
+        with self._cond:
+            return self._grants
+
+    def get_stats(self) -> list:
+        # Latenzen pro Geraet und Prioritaetsklasse fuer Diagnose.
+        with self._cond:
+            rows = []
+            for (device, priority), stats in sorted(self._stats.items()):
+                count = stats["count"]
+                rows.append({
+                    "device": device,
+                    "priority": priority,
+                    "count": count,
+                    "wait_avg_ms": 1000.0 * stats["wait_total_s"] / count,
+                    "wait_max_ms": 1000.0 * stats["wait_max_s"],
+                    "hold_avg_ms": 1000.0 * stats["hold_total_s"] / count,
+                    "hold_max_ms": 1000.0 * stats["hold_max_s"],
+                })
+            return rows
+
+    def reset_stats(self):
+        with self._cond:
+            self._stats.clear()
+
+    def close(self):
+        # Nur einen selbst geoeffneten Bus schliessen.
+        with self._cond:
+            bus = self._bus if self._owns_bus else None
+            self._bus = None
+        if bus is not None:
+            try:
+                bus.close()
+            except Exception:
+                pass
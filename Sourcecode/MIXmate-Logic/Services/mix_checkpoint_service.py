@@ -0,0 +1,160 @@
+import threading
+
+from Model.mix_checkpoint_model import MixCheckpointModel
+from Services.mix_plan_service import pump_ms
+
+
+class MixCheckpointService:
+    # Haelt den Fortschritt des laufenden Mixes persistent, damit er nach Fehler oder Stop
+    # fortgesetzt statt neu gemixt werden kann.
+    # Phasen: fetch (Glas holen), dispense (dosieren), return (Glas zurueckgeben).
+    # Glasort: regal, mixer oder wait (Warteposition).
+
+    # Kleinere Restlaufzeiten werden beim Fortsetzen nicht mehr gepumpt.
+    MIN_REMAINING_MS = 50
+
+    def __init__(self, db_path: str | None = None):
+        self.model = MixCheckpointModel(db_path=db_path)
+        self._lock = threading.Lock()
+        self._current = self.model.get_open()
+        if self._current is not None and self._current["status"] == "running":
+            # Offener Mix beim Start: Programm wurde waehrend des Mixes beendet.
+            self._current["status"] = "interrupted"
+            if not self._current["error_msg"]:
+                self._current["error_msg"] = "Programm wurde waehrend des Mixes beendet."
+            self.model.save(self._current)
+            print(f"[MixCheckpoint] Unterbrochener Mix aus letzter Sitzung (Checkpoint {self._current['checkpoint_id']})")
+
+    def start(self, mix_data: list, factor: float, order_id: int | None = None) -> dict:
+        # Checkpoint vor dem Glasholen anlegen.
+        with self._lock:
+            self._current = self.model.create(mix_data, factor, order_id)
+            return dict(self._current)
+
+    def resume(self) -> dict | None:
+        # Unterbrochenen Checkpoint wieder aufnehmen.
+        with self._lock:
+            if self._current is None or self._current["status"] != "interrupted":
+                return None
+            self._current["status"] = "running"
+            self._current["error_msg"] = None
+            self._current["resumes"] += 1
+            self.model.save(self._current)
+            return dict(self._current)
+
+    def set_phase(self, phase: str, glass_location: str | None = None):
+        with self._lock:
+            if self._current is None:
+                return
+            self._current["phase"] = phase
+            if glass_location is not None:
+                self._current["glass_location"] = glass_location
+            self.model.save(self._current)
+
+    def step_done(self, order_indexes: list):
+        # Schritte vollstaendig dosiert; Teilmengen sind damit erledigt.
+        with self._lock:
+            if self._current is None:
+                return
+            for order_index in order_indexes:
+                if order_index not in self._current["done_steps"]:
+                    self._current["done_steps"].append(order_index)
+                self._current["partial_ms"].pop(order_index, None)
+            self.model.save(self._current)
+
+    def step_partial(self, pumped_ms: dict):
+        # Bei Abbruch waehrend des Pumpens bereits gelaufene Zeit je Schritt merken.
+        with self._lock:
+            if self._current is None:
+                return
+            for order_index, ms in pumped_ms.items():
+                self._current["partial_ms"][order_index] = self._current["partial_ms"].get(order_index, 0) + int(ms)
+            self.model.save(self._current)
+
+    def fail(self, error_msg: str):
+        # Mix abgebrochen: Checkpoint bleibt zum Fortsetzen stehen.
+        with self._lock:
+            if self._current is None or self._current["status"] != "running":
+                return
+            self._current["status"] = "interrupted"
+            self._current["error_msg"] = str(error_msg)
+            self.model.save(self._current)
+
+    def finish(self):
+        with self._lock:
+            if self._current is None:
+                return
+            self._current["status"] = "done"
+            self._current["phase"] = "done"
+            self._current["glass_location"] = "wait"
+            self.model.save(self._current)
+            self._current = None
+
+    def discard(self) -> dict | None:
+        # Unterbrochenen Mix verwerfen (z.B. Glas entnommen); Rueckgabe fuer die Queue.
+        with self._lock:
+            if self._current is None or self._current["status"] != "interrupted":
+                return None
+            checkpoint = self._current
+            checkpoint["status"] = "discarded"
+            self.model.save(checkpoint)
+            self._current = None
+            return dict(checkpoint)
+
+    def get_resumable(self) -> dict | None:
+        with self._lock:
+            if self._current is None or self._current["status"] != "interrupted":
+                return None
+            return dict(self._current)
+
+    def remaining_mix_data(self) -> list:
+        # Noch offene Schritte; angefangene nur mit ihrer Restlaufzeit.
+        with self._lock:
+            if self._current is None:
+                return []
+            checkpoint = dict(self._current)
+
+        factor = float(checkpoint["factor"])
+        remaining = []
+        for item in checkpoint["mix_data"]:
+            order_index = item.get("order_index")
+            if order_index in checkpoint["done_steps"]:
+                continue
+            step = dict(item)
+            pumped = checkpoint["partial_ms"].get(order_index)
+            if pumped is not None:
+                duration_ms = step.get("pump_ms")
+                if duration_ms is None or step.get("plan_factor") != factor:
+                    flow_rate = step.get("flow_rate_ml_s")
+                    if step.get("pump_number") is None or flow_rate is None or float(flow_rate) <= 0:
+                        remaining.append(step)
+                        continue
+                    duration_ms = pump_ms(float(step["amount_ml"]) * factor, flow_rate)
+                rest_ms = int(duration_ms) - int(pumped)
+                if rest_ms < self.MIN_REMAINING_MS:
+                    continue
+                step["pump_ms"] = rest_ms
+                step["plan_factor"] = factor
+            remaining.append(step)
+        return remaining
+
+    def describe(self, checkpoint: dict | None) -> dict | None:
+        # Kurzfassung fuer die UI.
+        if checkpoint is None:
+            return None
+        mix_data = checkpoint["mix_data"]
+        return {
+            "checkpoint_id": checkpoint["checkpoint_id"],
+            "order_id": checkpoint["order_id"],
+            "cocktail_id": checkpoint["cocktail_id"],
+            "cocktail_name": mix_data[0].get("cocktail_name") if mix_data else None,
+            "phase": checkpoint["phase"],
+            "glass_location": checkpoint["glass_location"],
+            "steps_done": len(checkpoint["done_steps"]),
+            "steps_total": len(mix_data),
+            "error_msg": checkpoint["error_msg"],
+        }
+
+    def close(self):
+        with self._lock:
+            self.model.close()
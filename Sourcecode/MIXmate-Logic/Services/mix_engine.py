@@ -1,9 +1,19 @@
 import threading
-import time
+from collections import deque
+from contextlib import contextmanager
 
-from Hardware.i2C_logic import i2C_logic
+from Hardware.i2C_logic import PUMP_MULTI_MAX, i2C_logic
 from Hardware.regal_i2c_logic import RegalI2CLogic
 from Model.system_settings_model import SystemSettingsModel
+from Services.cancellation_token import CancellationToken
+from Services.clock import SYSTEM_CLOCK
+from Services.dispense_planner import DispensePlanner
+from Services.homing_tracker import HomingTracker
+from Services.i2c_bus_service import PRIO_COMMAND, I2CBusService
+from Services.mix_checkpoint_service import MixCheckpointService
+from Services.mix_estimator_service import get_mix_estimator_service
+from Services.mix_plan_service import get_mix_plan_service, pump_ms
+from Services.mix_timeline_service import MixTimelineService
 from Services.simulation_trace_service import get_simulation_trace_service
 from Services.status_monitor import StatusMonitor
 from Services.status_service import StatusService
@@ -16,6 +26,8 @@ class MixEngine:
     MOVE_TIMEOUT = 1800
     # Zusatzpuffer fuer Pumpenlaufzeiten.
     PUMP_TIMEOUT_EXTRA = 1000
+    # Kuerzere Pumpenlaeufe koennen zwischen zwei Statusreads schon vorbei sein.
+    PUMP_BUSY_VISIBLE_MS = 500
     # Prefix fuer Hinweise, die in der UI nicht als Crash wirken sollen.
     USER_INFO_PREFIX = "HINWEIS: "
     # Prefix fuer bewusst ausgeloeste Stop-Meldungen.
@@ -36,17 +48,62 @@ class MixEngine:
     MIXER_GLASS_WAIT_TIMEOUT = 60.0
     # Ebene 3 ist im Regal-Protokoll die Warteposition.
     REGAL_WAIT_LEVEL_ID = 3
-
-    def __init__(self):
+    # Aelterer Cache gilt in get_status als veraltet.
+    STATUS_STALE_S = 3.0
+    # Wartezeit auf den naechsten Monitorstatus statt eigener Busreads.
+    STATUS_FRESH_TIMEOUT = 1.0
+    # Bei gueltigem Homing-Tracker reicht ein so junger Monitorstatus (Ruhetakt) als Nachweis.
+    HOMING_STATUS_MAX_AGE_S = 1.0
+    # Zielwert fuer die Stop-Latenz (Anforderung bis Stop-Befehl bzw. Ablaufende).
+    STOP_LATENCY_TARGET_S = 0.1
+
+    def __init__(self, clock=None, db_path: str | None = None):
+        # Uhr fuer Fristen und Messungen; die Discrete-Event-Simulation setzt eine VirtualClock ein.
+        self.clock = clock if clock is not None else SYSTEM_CLOCK
+        # Eigene DB (z.B. Kopie fuer Simulationen); None = Standarddatenbank.
+        self.db_path = db_path
+        # Ein Settings-Model fuer alle Abfragen; der Cache laedt nur nach Parameter-Aenderungen neu.
+        self.settings = SystemSettingsModel(db_path=self.db_path)
+        # Ein Busbesitzer fuer Mixer und Regal: Stop vor Befehl vor wartendem vor Ruhetakt-Poll.
+        self.bus = I2CBusService()
         # Mixer-Arduino an Adresse 0x13.
-        self.i2c = i2C_logic()
+        self.i2c = i2C_logic(bus=self.bus.smbus)
         # StatusService uebersetzt Rohbytes in Dicts.
-        self.status_service = StatusService()
-        # Hintergrund-Poller: hält den letzten Status bereit und serialisiert I2C-Zugriffe.
-        self.monitor = StatusMonitor(self.i2c, self.status_service, poll_s=0.3)
+        self.status_service = StatusService(clock=self.clock)
+        # Hintergrund-Poller: hält den letzten Status bereit, Buszugriffe laufen ueber den Busbesitzer.
+        # Ruhetakt 1 s; waehrend Bewegung und nach Befehlen fragt der Monitor schnell ab.
+        self.monitor = StatusMonitor(
+            self.i2c,
+            self.status_service,
+            poll_s=1.0,
+            fast_poll_s=0.03,
+            bus=self.bus,
+            device="mixer",
+            clock=self.clock,
+        )
         self.monitor.start()
+        # Firmware-Faehigkeiten (z.B. Pumpenlauf in ms) einmal abfragen.
+        self.monitor.run_i2c(self.i2c.detect_capabilities, refresh_after=False)
         # Regal-Controller an Adresse 0x12 ist optional.
         self.regal = self._init_regal()
+        # Eigener Poller fuer das Regal; teilt sich den Busbesitzer mit dem Mixer-Monitor.
+        self.regal_monitor = None
+        if self.regal is not None:
+            self.regal_monitor = StatusMonitor(
+                self.regal,
+                None,
+                poll_s=1.0,
+                fast_poll_s=0.03,
+                read_fn=self.regal.get_status_raw,
+                parse_fn=self.regal.parse_status,
+                bus=self.bus,
+                device="regal",
+                name="RegalMonitor",
+                clock=self.clock,
+            )
+            # Erster Read synchron, damit has_regal_controller sofort stimmt.
+            self.regal_monitor.refresh()
+            self.regal_monitor.start()
         # Trace zeigt simulierte I2C-Befehle im Adminmonitor.
         self.sim_trace = get_simulation_trace_service()
         # Simulationsposition ersetzt echte Encoderwerte.
@@ -55,15 +112,65 @@ class MixEngine:
         self._sim_homed = False
         # Regal-Homing wird nur einmal pro Lauf erzwungen.
         self._regal_homed_once = False
-        # Thread-sicheres Stop-Signal fuer lange Ablaufschritte.
-        self._stop_requested = threading.Event()
+        # Dauerschaetzer lernt aus gemessenen Fahr-, Pump- und Regalzeiten.
+        self.estimator = get_mix_estimator_service(self.db_path)
+        self.estimator.configure(
+            parallel_dispense=self.i2c.supports_pump_multi(),
+            with_regal=self.regal is not None,
+        )
+        # Zaehlt Referenzfahrten; Phasen mit Homing verfaelschen die Lernwerte.
+        self._homing_runs = 0
+        # Homing-Gueltigkeit ueber Neustarts hinweg; Monitore melden Fehlerflanken.
+        self.homing = HomingTracker(db_path=self.db_path)
+        self.monitor.subscribe(lambda st: self.homing.observe_status("mixer", st))
+        if self.regal_monitor is not None:
+            self.regal_monitor.subscribe(lambda st: self.homing.observe_status("regal", st))
+        # Fortschritt des laufenden Mixes fuer Fortsetzen nach Fehler oder Stop.
+        self.checkpoints = MixCheckpointService(db_path=self.db_path)
+        # Zeitleiste pro Mix: Phasen mit Dauer, Bus-Transaktionen und Wartegruenden.
+        self.timeline = MixTimelineService(db_path=self.db_path, clock=self.clock, bus=self.bus)
+        # Gepumpte Zeit im laufenden Dosierschritt, fuer Teilmengen bei Abbruch.
+        self._pumped_ms = 0
+        self._pump_command_ts = None
+        # Waehrend des Dosierens bricht ein entferntes Glas den Mix ab.
+        self._glass_guard_active = False
+        self._glass_moved_reported = False
+        # Stop-Signal fuer lange Ablaufschritte; weckt beim Stop alle Statuswarter sofort.
+        self._stop_requested = CancellationToken()
+        self._stop_requested.on_cancel(self.monitor.interrupt_waiters)
+        if self.regal_monitor is not None:
+            self._stop_requested.on_cancel(self.regal_monitor.interrupt_waiters)
+        # Planer sortiert freie Rezeptgruppen nach kuerzestem Fahrweg.
+        self.planner = DispensePlanner()
+        # Genau ein Ablauf steuert die Maschine: Mix, Batch, manuelle Fahrt oder Kalibrierung.
+        self._run_lock = threading.Lock()
+        self._run_owner = None
+
+    @contextmanager
+    def exclusive_run(self, name: str, wait: bool = False):
+        # Maschine fuer einen Ablauf belegen. Queue-Mixe warten (wait=True), alles andere wird abgewiesen.
+        # Das Stop-Signal wird erst zurueckgesetzt, wenn die Maschine frei war; ein Stop fuer einen
+        # laufenden Mix geht so nicht verloren.
+        if not self._run_lock.acquire(blocking=wait):
+            self._raise_user_info(f"Maschine ist belegt ({self._run_owner}). {name} ist danach wieder moeglich.")
+        self._run_owner = name
+        try:
+            self._reset_stop_request()
+            yield
+        finally:
+            self._run_owner = None
+            self._run_lock.release()
+
+    def is_running(self) -> bool:
+        # True, solange ein Ablauf die Maschine belegt.
+        return self._run_lock.locked()
 
     def _init_regal(self):
         # Regal-Controller am I2C-Bus suchen.
         try:
-            regal = RegalI2CLogic()
-            # Erster Statusread prueft, ob der zweite Controller antwortet.
-            raw = regal.get_status_raw()
+            regal = RegalI2CLogic(bus=self.bus.smbus)
+            # Erster Statusread prueft, ob der zweite Controller antwortet (Mixer-Monitor laeuft schon).
+            raw = self.bus.run("regal", PRIO_COMMAND, regal.get_status_raw)
             if len(raw) == 5:
                 print("[MixEngine] Regal-Controller erkannt (I2C 0x12)")
                 return regal
@@ -78,7 +185,8 @@ class MixEngine:
             return True
         if self.regal is None:
             return False
-        st = self.regal.get_status()
+        # Gecachter Regalstatus, kein Buszugriff.
+        st = self.regal_monitor.get_latest()
         return bool(st.get("ok", False))
 
     def get_regal_status(self) -> dict:
@@ -107,10 +215,15 @@ class MixEngine:
                 "error_code": "REGAL_NOT_CONNECTED",
                 "error_msg": "Kein Regal-Controller an I2C 0x12 erkannt.",
             }
-        st = self.regal.get_status()
+        # Zuletzt gepollter Regalstatus, ohne Buszugriff im UI-Thread.
+        st = self.regal_monitor.get_latest()
         st["connected"] = bool(st.get("ok", False))
         return st
 
+    def get_bus_stats(self) -> list:
+        # Warte- und Belegungszeiten pro Geraet und Prioritaetsklasse.
+        return self.bus.get_stats()
+
     def get_status(self) -> dict:
         # Mixerstatus und Regalstatus fuer die UI zusammenfuehren.
         if self.is_simulation_mode():
@@ -134,18 +247,41 @@ class MixEngine:
         status["regal_ist_position"] = regal_status.get("ist_position", None)
         status["regal_homing_ok"] = regal_status.get("homing_ok", False)
         status["regal_error_msg"] = regal_status.get("error_msg", None)
+        # Zeitstempel zeigen, wie alt die gecachten Werte sind.
+        now = self.clock.time()
+        status["status_ts"] = status.get("ts")
+        status["status_age_s"] = None if status.get("ts") is None else max(0.0, now - float(status["ts"]))
+        status["regal_status_ts"] = regal_status.get("ts")
+        status["regal_status_age_s"] = (
+            None if regal_status.get("ts") is None else max(0.0, now - float(regal_status["ts"]))
+        )
+        ages = [x for x in (status["status_age_s"], status["regal_status_age_s"]) if x is not None]
+        status["status_stale"] = bool(ages) and max(ages) > self.STATUS_STALE_S
         return status
 
+    def subscribe_status(self, callback):
+        # Kombinierten Status nach jedem Mixer- oder Regal-Poll melden; Aufruf im Poller-Thread.
+        # Rueckgabe meldet den Beobachter bei beiden Monitoren wieder ab.
+        def _forward(_status):
+            callback(self.get_status())
+
+        unsubscribers = [self.monitor.subscribe(_forward)]
+        if self.regal_monitor is not None:
+            unsubscribers.append(self.regal_monitor.subscribe(_forward))
+
+        def _unsubscribe():
+            for unsubscribe in unsubscribers:
+                unsubscribe()
+
+        return _unsubscribe
+
     def is_simulation_mode(self) -> bool:
-        # Einstellung wird bewusst frisch aus der DB gelesen.
-        settings = SystemSettingsModel()
+        # Cache erkennt Umschalten im Adminbereich ueber den Aenderungszaehler von machine_parameters.
         try:
-            return bool(settings.get_simulation_mode())
+            return bool(self.settings.get_simulation_mode())
         except Exception:
             # Bei Settings-Fehlern bleibt Hardwarebetrieb der sichere Default.
             return False
-        finally:
-            settings.close()
 
     def _sim_status(self) -> dict:
         # Minimaler Status fuer Betrieb ohne I2C-Hardware.
@@ -158,6 +294,9 @@ class MixEngine:
             "band_belegt": True,
             "ist_position": int(self._sim_position_mm),
             "homing_ok": bool(self._sim_homed),
+            "glass_present": True,
+            "glass_moved": False,
+            "status_version": 2,
             "raw": b"",
         }
 
@@ -184,9 +323,59 @@ class MixEngine:
     def _refresh_status(self) -> dict:
         if self.is_simulation_mode():
             return self._sim_status()
-        # Exklusiv lesen, damit Polling und aktive Kommandos sich nicht kollidieren
-        raw = self.monitor.run_i2c(self.i2c.getstatus_raw)
-        return self.status_service.parse_status(raw)
+        # Naechsten Status vom Monitor abwarten statt selbst den Bus zu lesen.
+        self.monitor.request_poll()
+        _, status = self.monitor.wait_for(
+            lambda st: True,
+            self.STATUS_FRESH_TIMEOUT,
+            stop_event=self._stop_requested,
+            after_seq=self.monitor.get_seq(),
+        )
+        return status
+
+    def _regal_refresh_status(self) -> dict:
+        # Naechsten Regalstatus vom Regal-Monitor abwarten.
+        if self.regal_monitor is None:
+            return {"ok": False, "error_code": "REGAL_NOT_CONNECTED"}
+        self.regal_monitor.request_poll()
+        _, status = self.regal_monitor.wait_for(
+            lambda st: True,
+            self.STATUS_FRESH_TIMEOUT,
+            stop_event=self._stop_requested,
+            after_seq=self.regal_monitor.get_seq(),
+        )
+        return status
+
+    def _regal_command(self, fn, *args, **kwargs):
+        # Regalbefehl exklusiv am Bus senden; danach pollt der Regal-Monitor schnell.
+        return self.regal_monitor.run_i2c(fn, *args, **kwargs)
+
+    def _glass_detected(self, status: dict) -> bool:
+        # Erweiterte Firmware meldet glass_present, sonst bleibt der Bandsensor massgeblich.
+        status = status or {}
+        if status.get("status_version") and status.get("status_version") >= 2:
+            return bool(status.get("glass_present", False))
+        return bool(status.get("band_belegt", False))
+
+    def _glass_removed(self, status: dict) -> bool:
+        # Nur waehrend des Dosierens und nur mit glass_present der erweiterten Firmware.
+        # Der Bandsensor alter Firmware ist dafuer nicht zuverlaessig genug.
+        if not self._glass_guard_active:
+            return False
+        status = status or {}
+        if not status.get("ok", False) or not status.get("status_version") or status.get("status_version") < 2:
+            return False
+        return not bool(status.get("glass_present", False))
+
+    def _check_glass_status(self, status: dict):
+        # Entferntes Glas stoppt Pumpen und Schlitten sofort.
+        if self._glass_removed(status):
+            self._abort_hardware_now()
+            self._raise_user_info("Glas wurde waehrend des Mixens entfernt. Mixvorgang abgebrochen.")
+        if (status or {}).get("glass_moved") and not self._glass_moved_reported:
+            # Verschobenes Glas nur melden; der Mix laeuft weiter.
+            self._glass_moved_reported = True
+            print("[MixEngine] Warnung: Glas wurde auf dem Foerderband verschoben")
 
     def _raise_user_info(self, message: str):
         # Prefix trennt Bedienhinweise von echten Fehlern.
@@ -196,148 +385,203 @@ class MixEngine:
         # Stop-Meldung wird in der UI gesondert behandelt.
         raise RuntimeError(f"{self.STOP_INFO_PREFIX}{message}")
 
+    @property
+    def stop_token(self) -> CancellationToken:
+        # Gemeinsames Stop-Signal fuer Dienste, die am selben Geraet warten (z.B. Kalibrierung).
+        return self._stop_requested
+
     def _reset_stop_request(self):
         # Neuer Mix startet ohne alten Stop-Zustand.
-        self._stop_requested.clear()
+        self._stop_requested.reset()
 
     def _check_stop_requested(self):
         # Stop-Flag wird in laengeren Warteschleifen regelmaessig geprueft.
         if not self._stop_requested.is_set():
             return
         self._abort_hardware_now()
+        latency_s = self._stop_requested.observe()
+        if latency_s is not None:
+            self._report_stop_latency("Ablauf angehalten", latency_s)
         self._raise_stop_info()
 
+    def _report_stop_latency(self, phase: str, latency_s: float):
+        # Stop-Latenz im Trace ablegen, damit sie im Adminmonitor sichtbar ist.
+        latency_ms = latency_s * 1000.0
+        note = "" if latency_s <= self.STOP_LATENCY_TARGET_S else " (ueber Zielwert)"
+        message = f"[Stop] {phase} nach {latency_ms:.1f} ms{note}"
+        print(f"[MixEngine] {message}")
+        self.sim_trace.log_text(message)
+
     def _abort_hardware_now(self):
         # Laufende Mixer- und Regalbewegungen stoppen.
         if self.is_simulation_mode():
             self.sim_trace.log_text("[SIM] STOP angefordert")
             return
 
+        # Stop ueberholt wartende Statusabfragen am Bus-Lock.
         try:
-            self.monitor.run_i2c(self.i2c.stop, refresh_after=False)
+            self.monitor.run_i2c(self.i2c.stop, refresh_after=False, urgent=True)
         except Exception as e:
             print(f"[MixEngine] Stop Mixer fehlgeschlagen: {e}")
 
         try:
             if self.regal is not None:
-                self.regal.stop()
+                self._regal_command(self.regal.stop, refresh_after=False, urgent=True)
         except Exception as e:
             print(f"[MixEngine] Stop Regal fehlgeschlagen: {e}")
 
     def request_stop(self):
-        # Sofortigen Stop anfordern.
-        self._stop_requested.set()
+        # Sofortigen Stop anfordern; das Token weckt wartende Ablaufschritte sofort.
+        self._stop_requested.cancel()
         self._abort_hardware_now()
+        latency_s = self._stop_requested.elapsed_s()
+        if latency_s is not None:
+            self._report_stop_latency("Stop-Befehle gesendet", latency_s)
+        if self.is_simulation_mode():
+            return
+        # Abgebrochene Fahrten koennen Schritte verlieren; ein Stop im Leerlauf erzwingt kein neues Homing.
+        moving = {"mixer": bool(self.monitor.get_latest().get("busy", False))}
+        if self.regal_monitor is not None:
+            moving["regal"] = bool(self.regal_monitor.get_latest().get("busy", False))
+        running = self.is_running()
+        for axis in self._homing_axes():
+            if running or moving.get(axis, False):
+                self.homing.record_fault(axis, "stop")
+
+    def _homing_axes(self) -> list:
+        # Achsen, deren Homing der Tracker fuer einen Mix verfolgt.
+        return ["mixer", "regal"] if self.regal is not None else ["mixer"]
 
     def _get_regal_homing_safe_height(self) -> int:
         # Sichere Lift-Hoehe fuer Homing aus den Maschinenparametern.
-        settings = SystemSettingsModel()
-        try:
-            safe_height_mm = settings.get_homing_safe_height()
-        finally:
-            settings.close()
+        safe_height_mm = self.settings.get_homing_safe_height()
         if safe_height_mm is None:
             # Null bleibt Fallback, wenn kein Parameter gesetzt ist.
             return 0
         return int(round(float(safe_height_mm)))
 
+    def _wait_for_status(self, predicate, timeout_s: float, reason: str = "Status"):
+        # Blockierend auf einen passenden Mixerstatus warten.
+        # Jeder frische Status weckt den Warter, request_stop weckt sofort.
+        self._check_stop_requested()
+        if self.is_simulation_mode():
+            last = self._sim_status()
+            return bool(predicate(last)), last
+        started_ts = self.clock.monotonic()
+        # Glasverlust beendet das Warten ebenfalls, damit der Abbruch sofort greift.
+        matched, last = self.monitor.wait_for(
+            lambda st: predicate(st) or self._glass_removed(st),
+            timeout_s,
+            stop_event=self._stop_requested,
+            after_seq=self.monitor.get_seq(),
+        )
+        # Wartezeit fuer die Zeitleiste dem Grund zurechnen.
+        self.timeline.note_wait(f"Mixer: {reason}", self.clock.monotonic() - started_ts)
+        self._check_stop_requested()
+        self._check_glass_status(last)
+        return matched, last
+
     def _wait_until_idle(self, timeout_s: float, context: str):
         # Auf freien Mixer warten.
         # Zentraler Safety-Wait: viele Schritte dürfen nur im Idle starten.
-        start = time.time()
-        last = None
-
-        while time.time() - start < timeout_s:
-            self._check_stop_requested()
-            last = self._refresh_status()
-            if not last.get("ok", False):
-                raise RuntimeError(f"{context}: Ungueltiger Status (ok=False). Status={last}")
-            if last.get("busy") is False:
-                return
-            time.sleep(0.2)
+        matched, last = self._wait_for_status(
+            lambda st: (not st.get("ok", False)) or st.get("busy") is False,
+            timeout_s,
+            context,
+        )
+        if not last.get("ok", False):
+            raise RuntimeError(f"{context}: Ungueltiger Status (ok=False). Status={last}")
+        if matched:
+            return
 
         raise RuntimeError(f"{context}: Timeout. busy blieb True. Status={last}")
 
     def _wait_for_homing_ok(self, timeout_s: float, context: str):
         # Auf bestaetigtes Homing warten.
-        start = time.time()
-        last = None
-
-        while time.time() - start < timeout_s:
-            self._check_stop_requested()
-            last = self._refresh_status()
-            if (not self._busy(last)) and self._homing_ok(last):
-                return
-            time.sleep(0.2)
+        matched, last = self._wait_for_status(
+            lambda st: (not self._busy(st)) and self._homing_ok(st),
+            timeout_s,
+            context,
+        )
+        if matched:
+            return last
 
         raise RuntimeError(f"{context}: homing_ok wurde nicht True. Status={last}")
 
+    def _position_matches(self, status: dict, target_mm: int, tol_mm: int) -> bool:
+        # Ziel gilt erst bei Positionstreffer und Stillstand als erreicht.
+        pos = self._position_mm(status)
+        if pos is None:
+            return False
+        try:
+            # Positionswerte koennen aus DB/UI als floatartige Werte kommen.
+            pos_i = int(pos)
+        except Exception:
+            return False
+        return abs(pos_i - target_mm) <= tol_mm and (not self._busy(status))
+
     def _wait_until_position_reached(self, target_mm: int, timeout_s: float, context: str, tol_mm: int = 0):
         # Auf Zielposition und Stillstand warten.
-        start = time.time()
-        last = None
         target_mm = int(target_mm)
         tol_mm = int(tol_mm)
-
-        while time.time() - start < timeout_s:
-            self._check_stop_requested()
-            last = self._refresh_status()
-            pos = self._position_mm(last)
-
-            if pos is not None:
-                try:
-                    # Positionswerte koennen aus DB/UI als floatartige Werte kommen.
-                    pos_i = int(pos)
-                except Exception:
-                    pos_i = None
-
-                if pos_i is not None and abs(pos_i - target_mm) <= tol_mm and (not self._busy(last)):
-                    # Ziel gilt erst bei Positionstreffer und Stillstand als erreicht.
-                    return
-
-            time.sleep(0.2)
+        matched, last = self._wait_for_status(
+            lambda st: self._position_matches(st, target_mm, tol_mm),
+            timeout_s,
+            context,
+        )
+        if matched:
+            return
 
         raise RuntimeError(f"{context}: Zielposition nicht erreicht. target_mm={target_mm}, Status={last}")
 
+    def _move_started(self, status: dict, old_pos_mm) -> bool:
+        # Busy oder eine geaenderte Position zeigen den Bewegungsstart.
+        if self._busy(status):
+            return True
+        pos = self._position_mm(status)
+        if pos is not None and old_pos_mm is not None:
+            try:
+                return int(pos) != int(old_pos_mm)
+            except Exception:
+                return False
+        return False
+
     def _wait_move_started(self, old_pos_mm: int, timeout_s: float, context: str):
         # Bewegungsstart erkennen.
-        start = time.time()
-        last = None
-
-        while time.time() - start < timeout_s:
-            self._check_stop_requested()
-            last = self._refresh_status()
-            if self._busy(last):
-                return
-
-            pos = self._position_mm(last)
-            if pos is not None and old_pos_mm is not None:
-                try:
-                    if int(pos) != int(old_pos_mm):
-                        return
-                except Exception:
-                    pass
-
-            time.sleep(0.05)
+        matched, last = self._wait_for_status(
+            lambda st: self._move_started(st, old_pos_mm),
+            timeout_s,
+            context,
+        )
+        if matched:
+            return
 
         raise RuntimeError(f"{context}: Bewegung hat nicht gestartet. Status={last}")
 
     def _wait_until_busy(self, timeout_s: float, context: str):
         # Auf Busy-Signal einer Aktion warten.
-        start = time.time()
-        last = None
-
-        while time.time() - start < timeout_s:
-            self._check_stop_requested()
-            last = self._refresh_status()
-            if self._busy(last):
-                return
-            time.sleep(0.05)
+        matched, last = self._wait_for_status(self._busy, timeout_s, context)
+        if matched:
+            return
 
         raise RuntimeError(f"{context}: Aktion hat nicht gestartet. Status={last}")
 
+    def _homing_confirmed_cached(self, monitor, axis: str) -> bool:
+        # Gueltiges Homing laut Tracker plus frisches homing_ok im Cache spart den Statusread.
+        if monitor is None or not self.homing.is_valid(axis):
+            return False
+        age_s = monitor.get_age_s()
+        if age_s is None or age_s > self.HOMING_STATUS_MAX_AGE_S:
+            return False
+        st = monitor.get_latest()
+        return bool(st.get("ok", False)) and bool(st.get("homing_ok", False))
+
     def ensure_homed(self):
         # Mixer-Schlitten bei Bedarf referenzieren.
+        with self.timeline.span("ensure_homed"):
+            self._ensure_homed()
+
+    def _ensure_homed(self):
         if self.is_simulation_mode():
             if self._sim_homed:
                 self.sim_trace.log_text("[SIM] Homing uebersprungen (bereits gehomed)")
@@ -348,24 +592,39 @@ class MixEngine:
             self.sim_trace.log_text("[SIM] Homing abgeschlossen")
             return
 
+        rehome_reason = self.homing.rehome_reason("mixer")
+        if rehome_reason is None and self._homing_confirmed_cached(self.monitor, "mixer"):
+            return
+
         st = self._refresh_status()
         homing_ok = self._homing_ok(st)
 
-        if homing_ok:
+        if homing_ok and rehome_reason is None:
             print("[MixEngine] Schlitten ist bereits gehomed")
+            self.homing.adopt_firmware_homing("mixer", self._position_mm(st))
             return
 
-        print("[MixEngine] Schlitten ist nicht gehomed, starte Homing")
+        if homing_ok:
+            print(f"[MixEngine] Schlitten wird neu referenziert: {rehome_reason}")
+        else:
+            print("[MixEngine] Schlitten ist nicht gehomed, starte Homing")
 
         self._wait_until_idle(self.HOME_TIMEOUT, "Homing vor Start")
 
         old_pos = self._position_mm(self._refresh_status())
-        # Kommando über den Monitor schicken, damit der Bus exklusiv genutzt wird.
-        self.monitor.run_i2c(self.i2c.home)
+        self.homing.homing_started("mixer")
+        self._homing_runs += 1
+        try:
+            # Kommando über den Monitor schicken, damit der Bus exklusiv genutzt wird.
+            self.monitor.run_i2c(self.i2c.home)
 
-        self._wait_move_started(old_pos, self.BUSY_START_TIMEOUT, "Homing Start")
-        self._wait_until_idle(self.HOME_TIMEOUT, "Homing nach Start")
-        self._wait_for_homing_ok(self.POST_HOME_STATUS_SYNC_TIMEOUT, "Status-Sync nach Homing")
+            self._wait_move_started(old_pos, self.BUSY_START_TIMEOUT, "Homing Start")
+            self._wait_until_idle(self.HOME_TIMEOUT, "Homing nach Start")
+            st = self._wait_for_homing_ok(self.POST_HOME_STATUS_SYNC_TIMEOUT, "Status-Sync nach Homing")
+        except Exception:
+            self.homing.homing_aborted("mixer")
+            raise
+        self.homing.record_homed("mixer", self._position_mm(st))
 
         print("[MixEngine] Homing abgeschlossen")
 
@@ -375,6 +634,10 @@ class MixEngine:
             raise ValueError("Zielposition darf nicht None sein")
 
         target_mm = int(target_mm)
+        with self.timeline.span("move_to_position", f"{target_mm} mm"):
+            self._move_to_position(target_mm)
+
+    def _move_to_position(self, target_mm: int):
         if self.is_simulation_mode():
             low = target_mm & 0xFF
             high = (target_mm >> 8) & 0xFF
@@ -388,6 +651,7 @@ class MixEngine:
         st = self._refresh_status()
         old_pos = self._position_mm(st)
 
+        old_pos_i = None
         if old_pos is not None:
             try:
                 old_pos_i = int(old_pos)
@@ -400,6 +664,7 @@ class MixEngine:
 
         print(f"[MixEngine] Fahre Schlitten von {old_pos} nach {target_mm}")
 
+        started_ts = self.clock.monotonic()
         self.monitor.run_i2c(self.i2c.move_to_position, target_mm)
 
         self._wait_move_started(old_pos, self.BUSY_START_TIMEOUT, "Bewegung Start")
@@ -409,6 +674,8 @@ class MixEngine:
             context="Bewegung nach Start",
             tol_mm=self.POSITION_TOL_MM,
         )
+        if old_pos_i is not None:
+            self.estimator.observe("mixer_travel", abs(old_pos_i - target_mm), self.clock.monotonic() - started_ts)
 
         print("[MixEngine] Position erreicht")
 
@@ -470,13 +737,16 @@ class MixEngine:
 
     def admin_move_mixer_to_position(self, target_mm: int):
         # Manuelle Mixerfahrt aus dem Adminbereich.
-        self._reset_stop_request()
-        self.ensure_homed()
-        self.move_to_position(int(target_mm))
+        with self.exclusive_run("Manuelle Mixerfahrt"):
+            self.ensure_homed()
+            self.move_to_position(int(target_mm))
 
     def admin_move_regal_lift_to_position(self, target_mm: int):
         # Manuelle Regal-Liftfahrt aus dem Adminbereich.
-        self._reset_stop_request()
+        with self.exclusive_run("Manuelle Liftfahrt"):
+            self._admin_move_regal_lift_to_position(target_mm)
+
+    def _admin_move_regal_lift_to_position(self, target_mm: int):
         if self.is_simulation_mode():
             target_mm = int(target_mm)
             low = target_mm & 0xFF
@@ -491,77 +761,150 @@ class MixEngine:
 
         self._regal_ensure_homed_for_calibration(self._get_regal_homing_safe_height())
         self._regal_wait_until_idle(self.REGAL_MOVE_TIMEOUT, "Regal-Kalibrierung vor Liftfahrt")
-        self.regal.lift_to_mm(int(target_mm))
+        self._regal_command(self.regal.lift_to_mm, int(target_mm))
         self._regal_wait_for_position(int(target_mm), self.REGAL_MOVE_TIMEOUT, "Regal-Kalibrierung Liftfahrt")
 
-    def _dispense(self, pump_number: int, seconds: int):
+    def _dispense(self, pump_number: int, duration_ms: int):
         # Pumpe fuer die berechnete Zeit laufen lassen.
-        seconds = int(seconds)
+        duration_ms = int(duration_ms)
         if self.is_simulation_mode():
-            self._sim_log_mixer([3, int(pump_number), max(0, min(255, seconds))], note=f"CMD_PUMPE {pump_number} fuer {seconds}s")
-            self.sim_trace.log_text(f"[SIM] Pumpe {pump_number} lief {seconds} s")
+            self._check_stop_requested()
+            self._sim_log_mixer(
+                [7, int(pump_number)] + list(duration_ms.to_bytes(4, "little")),
+                note=f"CMD_PUMPE_MS {pump_number} fuer {duration_ms} ms",
+            )
+            self.sim_trace.log_text(f"[SIM] Pumpe {pump_number} lief {duration_ms} ms")
             return
 
-        timeout = seconds + self.PUMP_TIMEOUT_EXTRA
+        if self.i2c.capabilities is None:
+            # Firmware war beim Start evtl. noch nicht erreichbar.
+            self.monitor.run_i2c(self.i2c.detect_capabilities, refresh_after=False)
 
-        self._wait_until_idle(timeout, "Pumpen vor Start")
+        # Alte Firmware: ganze Sekunden, max. 255 s pro Befehl; neue: ms-genau.
+        segments = self.i2c.pump_segments(duration_ms)
+        if len(segments) > 1:
+            print(f"[MixEngine] Pumpe {pump_number}: {duration_ms} ms in {len(segments)} Abschnitten")
+        for segment_ms in segments:
+            self._check_stop_requested()
+            self._dispense_segment(pump_number, segment_ms)
 
-        print(f"[MixEngine] Starte Pumpe {pump_number} fuer {seconds} Sekunden")
-        self.monitor.run_i2c(self.i2c.activate_pump, int(pump_number), seconds)
+        print(f"[MixEngine] Pumpe {pump_number} beendet")
 
-        self._wait_until_busy(self.BUSY_START_TIMEOUT, "Pumpen Start")
-        self._wait_until_idle(timeout, "Pumpen nach Start")
+    def _dispense_segment(self, pump_number: int, duration_ms: int):
+        # Einen einzelnen Pumpenbefehl ausfuehren und auf sein Ende warten.
+        print(f"[MixEngine] Starte Pumpe {pump_number} fuer {duration_ms} ms")
+        self._run_pump_command(duration_ms, self.i2c.activate_pump_ms, int(pump_number), int(duration_ms))
 
-        print(f"[MixEngine] Pumpe {pump_number} beendet")
+    def _dispense_parallel(self, runs: list):
+        # Mehrere Pumpen an derselben Position gleichzeitig laufen lassen.
+        # runs: [(pumpe, ms), ...]; Dauer ist das Maximum statt der Summe.
+        if self.is_simulation_mode():
+            self._check_stop_requested()
+            payload = [9, len(runs)]
+            for pump_number, duration_ms in runs:
+                payload += [int(pump_number)] + list(int(duration_ms).to_bytes(4, "little"))
+            pumps = ", ".join(f"{p}:{ms} ms" for p, ms in runs)
+            self._sim_log_mixer(payload, note=f"CMD_PUMPE_MULTI {pumps}")
+            self.sim_trace.log_text(f"[SIM] Pumpen parallel: {pumps}")
+            return
+
+        for round_runs in self.i2c.pump_multi_rounds(runs):
+            self._check_stop_requested()
+            pumps = ", ".join(f"{p}:{ms} ms" for p, ms in round_runs)
+            print(f"[MixEngine] Starte Pumpen parallel ({pumps})")
+            self._run_pump_command(max(ms for _, ms in round_runs), self.i2c.activate_pumps_ms, round_runs)
+
+        print(f"[MixEngine] Pumpen {', '.join(str(p) for p, _ in runs)} beendet")
+
+    def _parallel_dispense_available(self) -> bool:
+        # Simulation loggt den Mehrfachbefehl, Hardware braucht die Firmware-Faehigkeit.
+        if self.is_simulation_mode():
+            return True
+        if self.i2c.capabilities is None:
+            self.monitor.run_i2c(self.i2c.detect_capabilities, refresh_after=False)
+        return self.i2c.supports_pump_multi()
+
+    def _run_pump_command(self, duration_ms: int, fn, *args):
+        # Pumpenbefehl senden und warten, bis die Firmware wieder idle meldet.
+        duration_s = duration_ms / 1000.0
+        timeout = duration_s + self.PUMP_TIMEOUT_EXTRA
+
+        self._wait_until_idle(timeout, "Pumpen vor Start")
+
+        started_ts = self.clock.monotonic()
+        self.monitor.run_i2c(fn, *args)
+        self._pump_command_ts = started_ts
+
+        if duration_ms < self.PUMP_BUSY_VISIBLE_MS:
+            # Kurzer Lauf: busy muss nicht sichtbar werden, Ablauf der Laufzeit reicht.
+            done_ts = started_ts + duration_s
+            matched, last = self._wait_for_status(
+                lambda st: self._busy(st) or self.clock.monotonic() >= done_ts,
+                self.BUSY_START_TIMEOUT,
+                "Pumpen Start",
+            )
+            if not matched:
+                raise RuntimeError(f"Pumpen Start: Aktion hat nicht gestartet. Status={last}")
+        else:
+            self._wait_until_busy(self.BUSY_START_TIMEOUT, "Pumpen Start")
+        self._wait_until_idle(timeout, "Pumpen nach Start")
+        self._pump_command_ts = None
+        self._pumped_ms += int(duration_ms)
+        self.estimator.observe("pump", duration_s, self.clock.monotonic() - started_ts)
+
+    def _regal_wait_for(self, predicate, timeout_s: float, context: str, after_seq: int = None):
+        # Auf einen passenden Regalstatus aus dem Regal-Monitor warten.
+        # Ungueltiger Status beendet das Warten mit Fehler, Stop weckt sofort.
+        # after_seq: Status muss neuer sein als diese Nummer (Standard: jetzt).
+        self._check_stop_requested()
+        if self.regal_monitor is None:
+            raise RuntimeError(f"{context}: Regal-Controller nicht verfuegbar.")
+        if after_seq is None:
+            after_seq = self.regal_monitor.get_seq()
+        started_ts = self.clock.monotonic()
+        matched, last = self.regal_monitor.wait_for(
+            lambda st: (not st.get("ok", False)) or predicate(st),
+            timeout_s,
+            stop_event=self._stop_requested,
+            after_seq=after_seq,
+        )
+        self.timeline.note_wait(f"Regal: {context}", self.clock.monotonic() - started_ts)
+        self._check_stop_requested()
+        if not last.get("ok", False):
+            raise RuntimeError(f"{context}: Regal-Status ungueltig. Status={last}")
+        return matched, last
 
     def _regal_wait_until_idle(self, timeout_s: float, context: str):
         # Auf freien Regal-Controller warten.
-        start = time.time()
-        last = None
-        while time.time() - start < timeout_s:
-            self._check_stop_requested()
-            last = self.regal.get_status() if self.regal else {"ok": False}
-            if not last.get("ok", False):
-                raise RuntimeError(f"{context}: Regal-Status ungueltig. Status={last}")
-            if not bool(last.get("busy", False)):
-                return last
-            time.sleep(0.2)
+        matched, last = self._regal_wait_for(
+            lambda st: not bool(st.get("busy", False)),
+            timeout_s,
+            context,
+        )
+        if matched:
+            return last
         raise RuntimeError(f"{context}: Timeout, Regal blieb busy. Status={last}")
 
     def _regal_wait_for_position(self, target_mm: int, timeout_s: float, context: str):
         # Auf Zielhoehe des Regal-Lifts warten.
-        start = time.time()
-        last = None
         target_mm = int(target_mm)
-        while time.time() - start < timeout_s:
-            self._check_stop_requested()
-            last = self.regal.get_status() if self.regal else {"ok": False}
-            if not last.get("ok", False):
-                raise RuntimeError(f"{context}: Regal-Status ungueltig. Status={last}")
-
-            pos = last.get("ist_position")
-            busy = bool(last.get("busy", False))
-            try:
-                pos_i = int(pos)
-            except Exception:
-                pos_i = None
-
-            if pos_i is not None and (not busy) and abs(pos_i - target_mm) <= self.POSITION_TOL_MM:
-                return last
-            time.sleep(0.2)
+        matched, last = self._regal_wait_for(
+            lambda st: self._position_matches(st, target_mm, self.POSITION_TOL_MM),
+            timeout_s,
+            context,
+        )
+        if matched:
+            return last
         raise RuntimeError(f"{context}: Zielhoehe nicht erreicht. target_mm={target_mm}, Status={last}")
 
     def _regal_wait_for_homing_ok(self, timeout_s: float, context: str):
-        start = time.time()
-        last = None
-        while time.time() - start < timeout_s:
-            self._check_stop_requested()
-            last = self.regal.get_status() if self.regal else {"ok": False}
-            if not last.get("ok", False):
-                raise RuntimeError(f"{context}: Regal-Status ungueltig. Status={last}")
-            if bool(last.get("homing_ok", False)) and (not bool(last.get("busy", False))):
-                return last
-            time.sleep(0.2)
+        matched, last = self._regal_wait_for(
+            lambda st: bool(st.get("homing_ok", False)) and (not bool(st.get("busy", False))),
+            timeout_s,
+            context,
+        )
+        if matched:
+            return last
         raise RuntimeError(f"{context}: homing_ok wurde nicht True. Status={last}")
 
     def _mixer_side_to_forward(self, mixer_direction_left: bool) -> bool:
@@ -580,24 +923,40 @@ class MixEngine:
         if self.regal is None:
             raise RuntimeError("Regal-Homing nicht moeglich: Regal-Controller nicht verfuegbar.")
 
-        st = self.regal.get_status()
+        rehome_reason = self.homing.rehome_reason("regal")
+        if rehome_reason is None and self._homing_confirmed_cached(self.regal_monitor, "regal"):
+            self._regal_homed_once = True
+            return
+
+        st = self._regal_refresh_status()
         if not st.get("ok", False):
             raise RuntimeError(f"Regal-Homing: Status ungueltig. Status={st}")
 
-        if bool(st.get("homing_ok", False)):
+        if bool(st.get("homing_ok", False)) and rehome_reason is None:
             self._regal_homed_once = True
             print("[MixEngine] Regal: Lift bereits gehomed")
+            self.homing.adopt_firmware_homing("regal", st.get("ist_position"))
             return
 
-        print("[MixEngine] Regal: Lift nicht gehomed, starte Homing")
+        if bool(st.get("homing_ok", False)):
+            print(f"[MixEngine] Regal: Lift wird neu referenziert: {rehome_reason}")
+        else:
+            print("[MixEngine] Regal: Lift nicht gehomed, starte Homing")
         if load_unload_i is not None:
             self._ensure_mixer_clear_for_lift(load_unload_i)
         self._regal_wait_until_idle(self.REGAL_HOME_TIMEOUT, "Regal Homing vor Start")
-        self.regal.home()
-        self._regal_wait_for_homing_ok(self.REGAL_HOME_TIMEOUT, "Regal Homing")
+        self.homing.homing_started("regal")
+        self._homing_runs += 1
+        try:
+            self._regal_command(self.regal.home)
+            st = self._regal_wait_for_homing_ok(self.REGAL_HOME_TIMEOUT, "Regal Homing")
+        except Exception:
+            self.homing.homing_aborted("regal")
+            raise
+        self.homing.record_homed("regal", st.get("ist_position"))
 
         print(f"[MixEngine] Regal: Fahre auf sichere Homing-Hoehe ({safe_height_mm} mm)")
-        self.regal.lift_to_mm(int(safe_height_mm))
+        self._regal_command(self.regal.lift_to_mm, int(safe_height_mm))
         self._regal_wait_for_position(int(safe_height_mm), self.REGAL_MOVE_TIMEOUT, "Regal sichere Homing-Hoehe")
 
         self._regal_homed_once = True
@@ -606,7 +965,7 @@ class MixEngine:
         if self.regal is None:
             raise RuntimeError("Regal-Kalibrierung nicht moeglich: Regal-Controller nicht verfuegbar.")
 
-        st = self.regal.get_status()
+        st = self._regal_refresh_status()
         if not st.get("ok", False):
             raise RuntimeError(f"Regal-Kalibrierung: Status ungueltig. Status={st}")
 
@@ -621,67 +980,96 @@ class MixEngine:
         self._regal_ensure_homed(safe_height_mm)
 
     def _regal_wait_for_glass_at_lift(self, timeout_s: float, context: str):
-        start = time.time()
-        last = None
-        while time.time() - start < timeout_s:
-            self._check_stop_requested()
-            last = self.regal.get_status() if self.regal else {"ok": False}
-            if not last.get("ok", False):
-                raise RuntimeError(f"{context}: Regal-Status ungueltig. Status={last}")
-            if bool(last.get("band_belegt", False)):
-                return last
-            time.sleep(0.2)
+        matched, last = self._regal_wait_for(
+            lambda st: bool(st.get("band_belegt", False)),
+            timeout_s,
+            context,
+        )
+        if matched:
+            return last
         raise RuntimeError(f"{context}: Kein Glas am Lift erkannt (band_belegt blieb False). Status={last}")
 
     def _regal_wait_for_wait_position_transfer(self, timeout_s: float, context: str):
         # Glasuebergabe in die Warteposition ueberwachen.
-        start = time.time()
+        # Der Monitor haelt nur den letzten Status; ein kurzer wait_start-Impuls zwischen zwei
+        # Auswertungen waere verloren. Daher jeden veroeffentlichten Status mitschreiben und der Reihe nach pruefen.
+        if self.regal_monitor is None:
+            raise RuntimeError(f"{context}: Regal-Controller nicht verfuegbar.")
+        start = self.clock.time()
         last = None
         state = "waiting_busy"
-
-        while time.time() - start < timeout_s:
-            last = self.regal.get_status() if self.regal else {"ok": False}
-            if not last.get("ok", False):
-                raise RuntimeError(f"{context}: Regal-Status ungueltig. Status={last}")
-
-            busy = bool(last.get("busy", False))
-            wait_start = bool(last.get("wait_start_belegt", False))
-            wait_end = bool(last.get("wait_end_belegt", False))
-            blocked = bool(last.get("entladen_blocked", False))
-
-            if blocked:
-                self._raise_user_info("Warteposition ist voll. Bitte Glaeser im Wartebereich entfernen.")
-
-            # STATE 1: Warte bis Bewegung startet (busy=TRUE)
-            if state == "waiting_busy":
-                if busy:
-                    state = "waiting_start_true"
-                    print(f"[MixEngine] {context}: Bewegung gestartet (busy=1)")
-
-            # STATE 2: Warte bis wait_start_belegt=TRUE (Glas tritt in Warteschiene ein)
-            if state == "waiting_start_true":
-                if wait_start:
-                    state = "waiting_start_false"
-                    print(f"[MixEngine] {context}: Glas tritt in Warteschiene ein (wait_start=1)")
-
-            # STATE 3: Warte bis wait_start_belegt=FALSE (Glas hat Sensor passiert, liegt auf Schiene)
-            if state == "waiting_start_false":
-                if not wait_start:
-                    print(f"[MixEngine] {context}: Glas vollstaendig auf Warteschiene (wait_start=0) - stoppe Foerderband")
-                    self.regal.stop()
-                    self._regal_wait_until_idle(self.REGAL_MOVE_TIMEOUT, f"{context} Stop")
-                    return last
-
-            time.sleep(0.2)
+        pending = deque()
+        unsubscribe = self.regal_monitor.subscribe(pending.append)
+        seq = self.regal_monitor.get_seq()
+        try:
+            while self.clock.time() - start < timeout_s:
+                if not pending:
+                    # Auf den naechsten Status nach dem zuletzt ausgewerteten warten.
+                    self._regal_wait_for(
+                        lambda st: True,
+                        max(0.0, timeout_s - (self.clock.time() - start)),
+                        context,
+                        after_seq=seq,
+                    )
+                while pending:
+                    last = pending.popleft()
+                    if last.get("seq", 0) <= seq:
+                        continue
+                    seq = last.get("seq", 0)
+                    # Gleiche Pruefungen wie _regal_wait_for, auch fuer mitgeschriebene Zwischenstaende.
+                    self._check_stop_requested()
+                    if not last.get("ok", False):
+                        raise RuntimeError(f"{context}: Regal-Status ungueltig. Status={last}")
+
+                    busy = bool(last.get("busy", False))
+                    wait_start = bool(last.get("wait_start_belegt", False))
+                    wait_end = bool(last.get("wait_end_belegt", False))
+                    blocked = bool(last.get("entladen_blocked", False))
+
+                    if blocked:
+                        self._raise_user_info("Warteposition ist voll. Bitte Glaeser im Wartebereich entfernen.")
+
+                    # STATE 1: Warte bis Bewegung startet (busy=TRUE)
+                    if state == "waiting_busy":
+                        if busy:
+                            state = "waiting_start_true"
+                            print(f"[MixEngine] {context}: Bewegung gestartet (busy=1)")
+
+                    # STATE 2: Warte bis wait_start_belegt=TRUE (Glas tritt in Warteschiene ein)
+                    if state == "waiting_start_true":
+                        if wait_start:
+                            state = "waiting_start_false"
+                            print(f"[MixEngine] {context}: Glas tritt in Warteschiene ein (wait_start=1)")
+
+                    # STATE 3: Warte bis wait_start_belegt=FALSE (Glas hat Sensor passiert, liegt auf Schiene)
+                    if state == "waiting_start_false":
+                        if not wait_start:
+                            print(f"[MixEngine] {context}: Glas vollstaendig auf Warteschiene (wait_start=0) - stoppe Foerderband")
+                            self._regal_command(self.regal.stop)
+                            self._regal_wait_until_idle(self.REGAL_MOVE_TIMEOUT, f"{context} Stop")
+                            return last
+        finally:
+            unsubscribe()
 
         raise RuntimeError(f"{context}: Timeout bei Warteposition-Uebergabe. State={state}")
 
-    def _run_regal_sequence_if_available(self, mix_data: list):
+    def _load_regal_fetch_params(self, mix_data: list) -> dict:
+        # Regal-Parameter fuer die Glasentnahme aus dem vorberechneten Mixplan.
+        cocktail_id = mix_data[0].get("cocktail_id")
+        if cocktail_id is None:
+            raise RuntimeError("Regal-Sequenz: cocktail_id fehlt in den Mix-Daten.")
+
+        plan = get_mix_plan_service(self.db_path).get_plan(int(cocktail_id))
+        params = plan.get_regal_params()
+        if params is None:
+            raise RuntimeError(plan.regal_error)
+        return params
+
+    def _run_regal_sequence_if_available(self, mix_data: list, regal_params: dict = None):
         # Glas aus dem Regal holen und an den Mixer uebergeben.
-        settings = SystemSettingsModel()
         if self.is_simulation_mode():
+            settings = self.settings
             if not mix_data:
-                settings.close()
                 return
             cocktail_id = mix_data[0].get("cocktail_id")
             level = settings.get_cocktail_source_level(int(cocktail_id)) if cocktail_id is not None else None
@@ -726,72 +1114,35 @@ class MixEngine:
             self._sim_log_mixer([4], note="CMD_BELADEN Mixerband")
             self._sim_log_regal([5], note="CMD_ENTLADEN")
             self.sim_trace.log_text("[SIM] Regal-Sequenz abgeschlossen")
-            settings.close()
             return
 
         if not self.has_regal_controller():
             # Ohne Regal-Controller kann der Mix trotzdem laufen (nur ohne Regal-Automation).
             print("[MixEngine] Regal nicht erkannt, Regal-Sequenz wird uebersprungen")
-            settings.close()
             return
 
         if not mix_data:
-            settings.close()
             return
 
-        cocktail_id = mix_data[0].get("cocktail_id")
-        if cocktail_id is None:
-            settings.close()
-            raise RuntimeError("Regal-Sequenz: cocktail_id fehlt in den Mix-Daten.")
-
-        level = settings.get_cocktail_source_level(int(cocktail_id))
-        if level is None:
-            settings.close()
-            raise RuntimeError(f"Regal-Sequenz: Keine Quell-Ebene fuer Cocktail {cocktail_id} gesetzt.")
-
-        level_direction = settings.get_level_direction(int(level))
-        if level_direction is None:
-            level_direction = True
-        mixer_direction = settings.get_mixer_direction()
-        if mixer_direction is None:
-            mixer_direction = True
-        load_unload_pos_mm = settings.get_load_unload_position()
-        if load_unload_pos_mm is None:
-            settings.close()
-            raise RuntimeError("Regal-Sequenz: load_unload_position_mm ist nicht gesetzt.")
-        load_unload_height_mm = settings.get_load_unload_height()
-        if load_unload_height_mm is None:
-            load_unload_height_mm = settings.get_mixer_height()
-        homing_safe_height_mm = settings.get_homing_safe_height()
-        if homing_safe_height_mm is None:
-            settings.close()
-            raise RuntimeError("Regal-Sequenz: homing_safe_height_mm ist nicht gesetzt.")
-
-        source_height_mm = settings.get_level_height(int(level))
-        if source_height_mm is None:
-            settings.close()
-            raise RuntimeError(f"Regal-Sequenz: Hoehe fuer Ebene {level} nicht gesetzt.")
-
-        mixer_height_mm = settings.get_mixer_height()
-        if mixer_height_mm is None:
-            settings.close()
-            raise RuntimeError("Regal-Sequenz: mixer_height_mm ist nicht gesetzt.")
-
-        settings.close()
-
-        source_mm = int(round(float(source_height_mm)))
-        mixer_mm = int(round(float(mixer_height_mm)))
-        load_unload_i = int(round(float(load_unload_pos_mm)))
-        load_unload_height_i = int(round(float(load_unload_height_mm)))
-        homing_safe_i = int(round(float(homing_safe_height_mm)))
-
+        # Vorbereitete Parameter (Batch) sparen die Settings-Abfragen im kritischen Pfad.
+        params = regal_params if regal_params is not None else self._load_regal_fetch_params(mix_data)
+        level = params["level"]
+        level_direction = params["level_direction"]
+        mixer_direction = params["mixer_direction"]
+        source_mm = params["source_mm"]
+        load_unload_i = params["load_unload_i"]
+        load_unload_height_i = params["load_unload_height_i"]
+        homing_safe_i = params["homing_safe_i"]
+
+        self.timeline.step("regal_homing")
         self._regal_ensure_homed(homing_safe_i, load_unload_i)
 
+        self.timeline.step("regal_lift_to_level", f"Ebene {level}, {source_mm} mm")
         print(f"[MixEngine] Regal: Fahre Lift auf Ebene {level} (hoehe={source_mm} mm)")
         self._move_mixer_away_from_transfer_position(load_unload_i, self.TRANSFER_APPROACH_MARGIN_MM)
         self._ensure_mixer_clear_for_lift(load_unload_i)
         self._regal_wait_until_idle(self.REGAL_MOVE_TIMEOUT, "Regal vor Ebenenfahrt")
-        self.regal.lift_to_mm(source_mm)
+        self._regal_command(self.regal.lift_to_mm, source_mm)
         self._regal_wait_for_position(source_mm, self.REGAL_MOVE_TIMEOUT, "Regal Ebenenfahrt")
 
         print(
@@ -800,41 +1151,44 @@ class MixEngine:
         )
         self._move_mixer_away_from_transfer_position(load_unload_i, self.TRANSFER_APPROACH_MARGIN_MM)
 
+        self.timeline.step("regal_beladen", f"Ebene {level}")
         direction_name = "vorwaerts" if level_direction else "rueckwaerts"
         print(
             f"[MixEngine] Regal: Waehle Ebene {level} (Richtung={direction_name}) "
             "und starte Beladen bis Glas erkannt"
         )
-        self.regal.select_level(int(level), forward=bool(level_direction))
-        self.regal.beladen()
+        self._regal_command(self.regal.select_level, int(level), forward=bool(level_direction))
+        self._regal_command(self.regal.beladen)
         self._regal_wait_for_glass_at_lift(self.REGAL_GLASS_WAIT_TIMEOUT, "Regal Beladen")
 
+        self.timeline.step("regal_lift_to_transfer", f"{load_unload_height_i} mm")
         print(f"[MixEngine] Regal: Fahre Lift auf Uebergabehoehe ({load_unload_height_i} mm)")
         self._ensure_mixer_clear_for_lift(load_unload_i)
-        self.regal.lift_to_mm(load_unload_height_i)
+        self._regal_command(self.regal.lift_to_mm, load_unload_height_i)
         self._regal_wait_for_position(load_unload_height_i, self.REGAL_MOVE_TIMEOUT, "Regal Fahrt zur Uebergabehoehe")
 
+        self.timeline.step("transfer_to_mixer", f"Uebergabe {load_unload_i} mm")
         print(f"[MixEngine] Mixer: Fahre auf Uebergabeposition ({load_unload_i} mm) vor Entladen")
         self.move_to_position(load_unload_i)
 
         mixer_direction_name = "links" if bool(mixer_direction) else "rechts"
         mixer_forward = self._mixer_side_to_forward(bool(mixer_direction))
         print(f"[MixEngine] Regal: Master setzt Richtung fuer Lift -> Mixer auf {mixer_direction_name}")
-        self.regal.select_level(int(level), forward=mixer_forward)
+        self._regal_command(self.regal.select_level, int(level), forward=mixer_forward)
 
         print("[MixEngine] Mixer: Starte Beladen fuer Bandlauf zur Uebergabe")
         self.monitor.run_i2c(self.i2c.beladen)
 
         print("[MixEngine] Regal: Uebergabe an Mixer (Entladen)")
-        st_before_unload = self.regal.get_status()
+        st_before_unload = self._regal_refresh_status()
         if st_before_unload.get("entladen_blocked", False) or st_before_unload.get("wait_end_belegt", False):
             raise RuntimeError(
                 "Regal Entladen blockiert: Wartepositions-Sensor 2 ist belegt. "
                 "Entladen erst moeglich, wenn Sensor 2 frei ist."
             )
-        self.regal.entladen()
+        self._regal_command(self.regal.entladen)
         self._regal_wait_until_idle(self.REGAL_MOVE_TIMEOUT, "Regal Entladen")
-        st_after_unload = self.regal.get_status()
+        st_after_unload = self._regal_refresh_status()
         if st_after_unload.get("entladen_blocked", False):
             raise RuntimeError(
                 "Regal Entladen blockiert waehrend Ablauf: Wartepositions-Sensor 2 belegt."
@@ -846,12 +1200,11 @@ class MixEngine:
 
     def _return_glass_to_wait_position_if_available(self):
         # Glas nach dem Mix in die Warteposition zurueckgeben.
-        settings = SystemSettingsModel()
+        settings = self.settings
         if self.is_simulation_mode():
             load_unload_pos_mm = settings.get_load_unload_position()
             waiting_height_mm = settings.get_waiting_position()
             waiting_direction = settings.get_waiting_direction()
-            settings.close()
 
             if load_unload_pos_mm is None:
                 load_unload_pos_mm = 0.0
@@ -889,17 +1242,14 @@ class MixEngine:
 
         load_unload_pos_mm = settings.get_load_unload_position()
         if load_unload_pos_mm is None:
-            settings.close()
             raise RuntimeError("Regal-Rueckgabe: load_unload_position_mm ist nicht gesetzt.")
 
         waiting_height_mm = settings.get_waiting_position()
         if waiting_height_mm is None:
-            settings.close()
             raise RuntimeError("Regal-Rueckgabe: waiting_position_mm ist nicht gesetzt.")
 
         mixer_direction = settings.get_mixer_direction()
         waiting_direction = settings.get_waiting_direction()
-        settings.close()
         if mixer_direction is None:
             mixer_direction = True
         if waiting_direction is None:
@@ -908,12 +1258,13 @@ class MixEngine:
         load_unload_i = int(round(float(load_unload_pos_mm)))
         waiting_height_i = int(round(float(waiting_height_mm)))
 
-        st = self.regal.get_status()
+        st = self._regal_refresh_status()
         if not st.get("ok", False):
             raise RuntimeError(f"Regal-Rueckgabe: Regal-Status ungueltig. Status={st}")
         if bool(st.get("wait_end_belegt", False)) or bool(st.get("wait_start_belegt", False)):
             self._raise_user_info("Warteposition ist voll. Bitte Glaeser im Wartebereich entfernen.")
 
+        self.timeline.step("transfer_to_lift", f"Uebergabe {load_unload_i} mm")
         print(f"[MixEngine] Mixer: Fahre auf Uebergabeposition ({load_unload_i} mm) fuer Rueckgabe")
         self.move_to_position(load_unload_i)
 
@@ -924,8 +1275,8 @@ class MixEngine:
             f"[MixEngine] Regal: Master setzt Richtung fuer Mixer -> Lift auf "
             f"{'links' if mixer_to_lift_direction else 'rechts'}"
         )
-        self.regal.select_level(int(self.REGAL_WAIT_LEVEL_ID), forward=mixer_to_lift_direction)
-        self.regal.beladen()
+        self._regal_command(self.regal.select_level, int(self.REGAL_WAIT_LEVEL_ID), forward=mixer_to_lift_direction)
+        self._regal_command(self.regal.beladen)
 
         print("[MixEngine] Mixer: Starte Entladen zur Rueckgabe auf den Lift")
         self.monitor.run_i2c(self.i2c.entladen)
@@ -935,17 +1286,19 @@ class MixEngine:
         self._regal_wait_until_idle(self.REGAL_GLASS_WAIT_TIMEOUT, "Rueckgabe Mixer -> Lift (Regal)")
         self._wait_until_idle(self.MOVE_TIMEOUT, "Rueckgabe Mixer -> Lift (Mixer)")
 
+        self.timeline.step("regal_lift_to_wait", f"{waiting_height_i} mm")
         print(f"[MixEngine] Regal: Fahre Lift auf Wartehoehe ({waiting_height_i} mm)")
         self._ensure_mixer_clear_for_lift(load_unload_i)
-        self.regal.lift_to_mm(waiting_height_i)
+        self._regal_command(self.regal.lift_to_mm, waiting_height_i)
         self._regal_wait_for_position(waiting_height_i, self.REGAL_MOVE_TIMEOUT, "Regal Fahrt zur Warteposition")
 
-        st_before_wait = self.regal.get_status()
+        st_before_wait = self._regal_refresh_status()
         if not st_before_wait.get("ok", False):
             raise RuntimeError(f"Regal-Rueckgabe: Regal-Status vor Wartepositionsfahrt ungueltig. Status={st_before_wait}")
         if bool(st_before_wait.get("wait_end_belegt", False)) or bool(st_before_wait.get("wait_start_belegt", False)):
             self._raise_user_info("Warteposition ist voll. Bitte Glaeser im Wartebereich entfernen.")
 
+        self.timeline.step("transfer_to_wait")
         print("[MixEngine] Regal: Uebergabe vom Lift an die Warteposition")
         self._regal_wait_until_idle(self.REGAL_WAIT_TRANSFER_TIMEOUT, "Regal vor Wartepositions-Uebergabe")
         waiting_forward = self._waiting_side_to_forward(bool(waiting_direction))
@@ -953,8 +1306,8 @@ class MixEngine:
             f"[MixEngine] Regal: Master setzt Richtung fuer Lift -> Warteposition auf "
             f"{'links' if bool(waiting_direction) else 'rechts'}"
         )
-        self.regal.select_level(int(self.REGAL_WAIT_LEVEL_ID), forward=waiting_forward)
-        self.regal.entladen()
+        self._regal_command(self.regal.select_level, int(self.REGAL_WAIT_LEVEL_ID), forward=waiting_forward)
+        self._regal_command(self.regal.entladen)
         self._regal_wait_for_wait_position_transfer(
             self.REGAL_WAIT_TRANSFER_TIMEOUT,
             "Regal Wartepositions-Uebergabe",
@@ -966,34 +1319,42 @@ class MixEngine:
             self.sim_trace.log_text("[SIM] Mixer-Sensor: Glas erkannt")
             return
 
-        start = time.time()
-        last_raw = b""
-
-        while time.time() - start < timeout_s:
-            self._check_stop_requested()
-            last_raw = self.monitor.run_i2c(self.i2c.getstatus_raw)
-            if len(last_raw) == 5 and bool(last_raw[1] & 0x01):
-                return
-            time.sleep(0.2)
+        matched, last = self._wait_for_status(
+            lambda st: bool(st.get("ok", False)) and self._glass_detected(st),
+            timeout_s,
+            context,
+        )
+        if matched:
+            return
 
+        last_raw = last.get("raw") or b""
         raise RuntimeError(
-            f"{context}: Mixer-Sensor hat kein Glas erkannt (band_belegt blieb False). "
+            f"{context}: Mixer-Sensor hat kein Glas erkannt (Glas-Flag blieb False). "
             f"raw={list(last_raw) if last_raw else []}"
         )
 
-    def mix_cocktail(self, mix_data: list, factor: float = 1.0):
-        # Vollstaendigen Mixablauf fuer ein Rezept ausfuehren.
-        if not mix_data:
-            raise ValueError("Mix-Daten sind leer")
-
-        self._reset_stop_request()
-
-        order_list = [(x.get("order_index"), x.get("ingredient_name")) for x in mix_data]
-        print("[MixEngine] Reihenfolge:", order_list)
-
+    def fetch_glass_for_mix(self, mix_data: list, regal_params: dict = None):
+        # Mixer referenzieren und Glas bereitstellen (Regal oder Bediener).
+        if not self.is_simulation_mode():
+            # Laufender Mix wird persistiert; ein nie beendeter entwertet das Homing.
+            self.homing.mix_started(self._homing_axes())
         self.ensure_homed()
         # Vor dem Pumpen Regal-Sequenz fahren, falls Regal vorhanden.
-        self._run_regal_sequence_if_available(mix_data)
+        if self.is_simulation_mode() or not self.has_regal_controller() or not mix_data:
+            self._run_regal_sequence_if_available(mix_data, regal_params)
+        else:
+            if regal_params is None:
+                regal_params = self._load_regal_fetch_params(mix_data)
+            homing_runs = self._homing_runs
+            started_ts = self.clock.monotonic()
+            with self.timeline.span("regal_fetch"):
+                self._run_regal_sequence_if_available(mix_data, regal_params)
+            if homing_runs == self._homing_runs:
+                self.estimator.observe(
+                    "regal_fetch",
+                    self.estimator.fetch_distance_mm(regal_params),
+                    self.clock.monotonic() - started_ts,
+                )
 
         # Mixer-only Modus ohne Lift und Ebenen.
         # Glas-Sensor am Mixer bleibt der Startschutz.
@@ -1004,36 +1365,308 @@ class MixEngine:
                 context="Mixer-only Start",
             )
 
-        for item in mix_data:
+    def plan_mix_steps(self, mix_data: list) -> list:
+        # Reihenfolge ab der aktuellen Schlittenposition planen.
+        if self.is_simulation_mode():
+            start_mm = self._sim_position_mm
+        else:
+            # Gecachter Status reicht, kein zusaetzlicher Buszugriff noetig.
+            start_mm = self._position_mm(self.monitor.get_latest())
+        planned, report = self.planner.plan(mix_data, start_mm)
+        print(f"[MixEngine] {self.planner.format_report(report)}")
+        if self.is_simulation_mode():
+            self.sim_trace.log_text(f"[SIM] {self.planner.format_report(report)}")
+        return planned
+
+    def dispense_mix_steps(self, mix_data: list, factor: float = 1.0):
+        # Alle Rezeptschritte anfahren und dosieren.
+        # Glaswache ueber den Monitorcache, ohne zusaetzliche Buszugriffe.
+        planned = self.plan_mix_steps(mix_data)
+        self._glass_moved_reported = False
+        self._glass_guard_active = not self.is_simulation_mode()
+        try:
+            self._dispense_planned_steps(planned, factor)
+        finally:
+            self._glass_guard_active = False
+
+    def _dispense_planned_steps(self, planned: list, factor: float):
+        # Schritte derselben order_group an derselben Position laufen gleichzeitig.
+        if self._parallel_dispense_available():
+            batches = self.planner.group_parallel(planned, PUMP_MULTI_MAX)
+        else:
+            batches = [[item] for item in planned]
+
+        for batch in batches:
             self._check_stop_requested()
-            ingredient = item["ingredient_name"]
-            amount_ml = float(item["amount_ml"]) * float(factor)
-            pump_number = item["pump_number"]
-            flow_rate = item["flow_rate_ml_s"]
-            position_mm = item.get("position_mm", item.get("position_steps"))
-
-            if pump_number is None or flow_rate is None or float(flow_rate) <= 0:
-                print(f"[MixEngine] {ingredient}: ungueltige Pumpendaten, uebersprungen")
+            if self._glass_guard_active:
+                self._check_glass_status(self.monitor.get_latest())
+
+            runs = []
+            names = []
+            order_indexes = []
+            position_mm = None
+            for item in batch:
+                ingredient = item["ingredient_name"]
+                pump_number = item["pump_number"]
+                flow_rate = item["flow_rate_ml_s"]
+
+                if pump_number is None or flow_rate is None or float(flow_rate) <= 0:
+                    print(f"[MixEngine] {ingredient}: ungueltige Pumpendaten, uebersprungen")
+                    continue
+
+                if item.get("pump_ms") is not None and item.get("plan_factor") == float(factor):
+                    # Pumpenzeit ist im Mixplan schon fuer diesen Faktor berechnet.
+                    duration_ms = int(item["pump_ms"])
+                else:
+                    duration_ms = pump_ms(float(item["amount_ml"]) * float(factor), flow_rate)
+                runs.append((int(pump_number), duration_ms))
+                order_indexes.append(item.get("order_index"))
+                names.append(f"{ingredient} (Pumpe {pump_number})")
+                position_mm = item.get("position_mm", item.get("position_steps"))
+
+            if not runs:
                 continue
 
-            print(f"[MixEngine] Fahre zu {ingredient} (Pumpe {pump_number})")
+            print(f"[MixEngine] Fahre zu {', '.join(names)}")
             self.move_to_position(position_mm)
 
-            dispense_time_s = amount_ml / float(flow_rate)
-            seconds = max(1, min(255, int(round(dispense_time_s))))
-
-            self._dispense(pump_number, seconds)
+            self._pumped_ms = 0
+            self._pump_command_ts = None
+            try:
+                with self.timeline.span("dispense", ", ".join(f"Pumpe {p}: {ms} ms" for p, ms in runs)):
+                    if len(runs) == 1:
+                        self._dispense(*runs[0])
+                    else:
+                        self._dispense_parallel(runs)
+            except Exception:
+                self._record_partial_dispense(runs, order_indexes)
+                raise
+            self.checkpoints.step_done(order_indexes)
+
+    def _record_partial_dispense(self, runs: list, order_indexes: list):
+        # Bei Abbruch gelaufene Pumpzeit je Schritt sichern (parallel laufen alle gleichzeitig an).
+        pumped_ms = self._pumped_ms
+        if self._pump_command_ts is not None:
+            pumped_ms += int((self.clock.monotonic() - self._pump_command_ts) * 1000)
+        self._pump_command_ts = None
+        if pumped_ms <= 0:
+            return
+        self.checkpoints.step_partial({
+            order_index: min(int(duration_ms), pumped_ms)
+            for order_index, (_, duration_ms) in zip(order_indexes, runs)
+        })
 
+    def return_glass_after_mix(self):
+        # Fertiges Glas ueber den Lift in die Warteposition bringen.
         self._check_stop_requested()
-        self._return_glass_to_wait_position_if_available()
+        started_ts = self.clock.monotonic()
+        with self.timeline.span("regal_return"):
+            self._return_glass_to_wait_position_if_available()
+        if not self.is_simulation_mode() and self.has_regal_controller():
+            self.estimator.observe(
+                "regal_return",
+                self.estimator.return_distance_mm(),
+                self.clock.monotonic() - started_ts,
+            )
+        self._finish_mix_tracking()
+
+    def _finish_mix_tracking(self):
+        if not self.is_simulation_mode():
+            # Lernwerte einmal pro Mix sichern.
+            self.estimator.save()
+            positions = {"mixer": self._position_mm(self.monitor.get_latest())}
+            if self.regal_monitor is not None:
+                positions["regal"] = self.regal_monitor.get_latest().get("ist_position")
+            self.homing.mix_finished(self._homing_axes(), positions)
+
+    def mix_cocktail(self, mix_data: list, factor: float = 1.0, order_id: int = None):
+        # Vollstaendigen Mixablauf fuer ein Rezept ausfuehren.
+        if not mix_data:
+            raise ValueError("Mix-Daten sind leer")
+        with self.exclusive_run("Mix", wait=True):
+            return self._mix_cocktail(mix_data, factor, order_id)
+
+    def _mix_cocktail(self, mix_data: list, factor: float, order_id: int):
+        order_list = [(x.get("order_index"), x.get("ingredient_name")) for x in mix_data]
+        print("[MixEngine] Reihenfolge:", order_list)
+
+        self.checkpoints.start(mix_data, factor, order_id)
+        self.timeline.begin_run(self._timeline_label(mix_data), mix_data[0].get("cocktail_id"))
+        try:
+            with self.timeline.span("fetch_glass"):
+                self.fetch_glass_for_mix(mix_data)
+            self.checkpoints.set_phase("dispense", "mixer")
+            with self.timeline.span("dispense_steps"):
+                self.dispense_mix_steps(mix_data, factor)
+            self.checkpoints.set_phase("return")
+            with self.timeline.span("return_glass"):
+                self.return_glass_after_mix()
+        except Exception as e:
+            # Checkpoint bleibt stehen; der Rest kann per resume_mix nachgeholt werden.
+            self.checkpoints.fail(str(e))
+            self.timeline.end_run(str(e))
+            raise
+        self.checkpoints.finish()
+        self.timeline.end_run()
 
         print("[MixEngine] Cocktail vollstaendig gemixt")
         return mix_data
 
+    def _timeline_label(self, mix_data: list, prefix: str = "") -> str:
+        name = mix_data[0].get("cocktail_name") if mix_data else None
+        if name is None and mix_data:
+            name = f"Cocktail {mix_data[0].get('cocktail_id')}"
+        return f"{prefix}{name or 'Mix'}"
+
+    def _glass_on_mixer(self) -> bool:
+        if self.is_simulation_mode():
+            return True
+        return self._glass_detected(self._refresh_status())
+
+    def resume_mix(self) -> dict:
+        # Unterbrochenen Mix ab dem letzten Checkpoint fortsetzen.
+        # Bereits dosierte Zutaten werden nicht wiederholt, angefangene nur mit Restzeit.
+        with self.exclusive_run("Mix fortsetzen", wait=True):
+            return self._resume_mix()
+
+    def _resume_mix(self) -> dict:
+        checkpoint = self.checkpoints.resume()
+        if checkpoint is None:
+            self._raise_user_info("Kein unterbrochener Mix zum Fortsetzen vorhanden.")
+
+        phase = checkpoint["phase"]
+        print(
+            f"[MixEngine] Setze Mix fort: Phase {phase}, "
+            f"{len(checkpoint['done_steps'])}/{len(checkpoint['mix_data'])} Zutaten fertig"
+        )
+        self.timeline.begin_run(
+            self._timeline_label(checkpoint["mix_data"], "Fortsetzung: "),
+            checkpoint["cocktail_id"],
+        )
+        try:
+            if phase == "fetch" and not (self.has_regal_controller() and self._glass_on_mixer()):
+                # Glas war noch nicht am Mixer: Holen komplett wiederholen.
+                with self.timeline.span("fetch_glass"):
+                    self.fetch_glass_for_mix(checkpoint["mix_data"])
+            else:
+                if not self.is_simulation_mode():
+                    self.homing.mix_started(self._homing_axes())
+                self.ensure_homed()
+            if phase in ("fetch", "dispense"):
+                self.checkpoints.set_phase("dispense", "mixer")
+                self._wait_for_mixer_glass_detected(self.MIXER_GLASS_WAIT_TIMEOUT, "Mix fortsetzen")
+                with self.timeline.span("dispense_steps"):
+                    self.dispense_mix_steps(self.checkpoints.remaining_mix_data(), checkpoint["factor"])
+                self.checkpoints.set_phase("return")
+                with self.timeline.span("return_glass"):
+                    self.return_glass_after_mix()
+            elif self.has_regal_controller() and not self._glass_on_mixer():
+                # Bediener hat das fertige Glas schon entnommen.
+                print("[MixEngine] Kein Glas am Mixer, Rueckgabe entfaellt")
+                self._finish_mix_tracking()
+            else:
+                with self.timeline.span("return_glass"):
+                    self.return_glass_after_mix()
+        except Exception as e:
+            self.checkpoints.fail(str(e))
+            self.timeline.end_run(str(e))
+            raise
+        self.checkpoints.finish()
+        self.timeline.end_run()
+
+        print("[MixEngine] Unterbrochener Mix fertig")
+        return checkpoint
+
+    def mix_batch(
+        self,
+        mix_data: list,
+        count: int,
+        factor: float = 1.0,
+        regal_params: dict = None,
+        order_id: int = None,
+    ) -> dict:
+        # Mehrere Glaeser desselben Rezepts direkt nacheinander mixen.
+        # Rezept und Regal-Parameter kommen einmal rein, Homing wird vor dem ersten Glas geprueft;
+        # danach entscheidet der Homing-Tracker ohne zusaetzliche Statusreads.
+        if not mix_data:
+            raise ValueError("Mix-Daten sind leer")
+        count = int(count)
+        if count < 1:
+            raise ValueError("Anzahl Glaeser muss mindestens 1 sein")
+        with self.exclusive_run("Batch"):
+            return self._mix_batch(mix_data, count, factor, regal_params, order_id)
+
+    def _mix_batch(self, mix_data: list, count: int, factor: float, regal_params: dict, order_id: int) -> dict:
+        start = self.clock.time()
+
+        if not self.is_simulation_mode() and self.has_regal_controller():
+            if regal_params is None:
+                regal_params = self._load_regal_fetch_params(mix_data)
+            self.ensure_homed()
+            self._regal_ensure_homed(regal_params["homing_safe_i"], regal_params["load_unload_i"])
+        else:
+            self.ensure_homed()
+        setup_s = self.clock.time() - start
+
+        results = []
+        try:
+            for index in range(count):
+                glass_start = self.clock.time()
+                print(f"[MixEngine] Batch: Glas {index + 1}/{count} startet")
+                self.checkpoints.start(mix_data, factor, order_id)
+                # Jedes Glas ist ein eigener Lauf in der Zeitleiste, wie bei mix_cocktail.
+                self.timeline.begin_run(
+                    self._timeline_label(mix_data, f"Batch {index + 1}/{count}: "),
+                    mix_data[0].get("cocktail_id"),
+                )
+                with self.timeline.span("fetch_glass"):
+                    self.fetch_glass_for_mix(mix_data, regal_params)
+                fetched = self.clock.time()
+                self.checkpoints.set_phase("dispense", "mixer")
+                with self.timeline.span("dispense_steps"):
+                    self.dispense_mix_steps(mix_data, factor)
+                dispensed = self.clock.time()
+                self.checkpoints.set_phase("return")
+                with self.timeline.span("return_glass"):
+                    self.return_glass_after_mix()
+                finished = self.clock.time()
+                self.checkpoints.finish()
+                self.timeline.end_run()
+                results.append({
+                    "index": index,
+                    "fetch_s": fetched - glass_start,
+                    "dispense_s": dispensed - fetched,
+                    "return_s": finished - dispensed,
+                    "duration_s": finished - glass_start,
+                })
+                print(f"[MixEngine] Batch: Glas {index + 1}/{count} fertig nach {finished - glass_start:.1f} s")
+        except Exception as e:
+            self.checkpoints.fail(str(e))
+            self.timeline.end_run(str(e))
+            print(f"[MixEngine] Batch abgebrochen nach {len(results)} von {count} Glaesern")
+            raise
+
+        wall_s = self.clock.time() - start
+        report = {
+            "glasses": len(results),
+            "setup_s": setup_s,
+            "wall_s": wall_s,
+            "avg_glass_s": sum(r["duration_s"] for r in results) / len(results),
+            "cocktails_per_hour": (3600.0 * len(results) / wall_s) if wall_s > 0 else 0.0,
+            "results": results,
+        }
+        print(
+            f"[MixEngine] Batch: {len(results)} Glaeser in {wall_s:.1f} s "
+            f"(Setup {setup_s:.1f} s, {report['cocktails_per_hour']:.1f}/h)"
+        )
+        return report
+
     def close(self):
         # Polling stoppen und Hardwareverbindungen schliessen.
         try:
             self.monitor.stop()
+            if self.regal_monitor is not None:
+                self.regal_monitor.stop()
         finally:
             try:
                 self.i2c.close()
@@ -1042,4 +1675,7 @@ class MixEngine:
                     if self.regal is not None:
                         self.regal.close()
                 finally:
-                    pass
+                    self.homing.close()
+                    self.checkpoints.close()
+                    self.timeline.close()
+                    self.bus.close()
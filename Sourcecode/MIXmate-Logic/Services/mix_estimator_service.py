@@ -0,0 +1,216 @@
+import os
+import threading
+
+from Hardware.i2C_logic import PUMP_MULTI_MAX
+from Model.db_connection import default_db_path
+from Model.mix_estimator_model import MixEstimatorModel
+from Model.system_settings_model import SystemSettingsModel
+from Services.dispense_planner import DispensePlanner
+from Services.mix_plan_service import get_mix_plan_service
+
+
+class MixEstimatorService:
+    # Sagt die Mixdauer voraus und lernt aus gemessenen Phasenzeiten.
+    # Jede Phase ist eine Gerade dauer_s = a + b * x, geschaetzt per gewichteter Regression:
+    #   mixer_travel: x = Fahrweg Schlitten (mm)
+    #   pump:         x = Pumpenlaufzeit laut Plan (s)
+    #   regal_fetch:  x = Liftweg beim Glasholen (mm)
+    #   regal_return: x = Liftweg bei der Rueckgabe (mm)
+
+    # Startwerte (a, b, x_ref) aus Firmware-Geschwindigkeiten, bis Messwerte vorliegen.
+    # Schlitten ca. 3000 Schritte/s bei 17 Schritten/mm, Lift ca. 1500 Schritte/s bei 20 Schritten/mm.
+    PRIORS = {
+        "mixer_travel": (0.5, 1.0 / 150.0, 500.0),
+        "pump": (0.5, 1.0, 10.0),
+        "regal_fetch": (20.0, 2.0 / 75.0, 300.0),
+        "regal_return": (15.0, 2.0 / 75.0, 300.0),
+    }
+    # Gewicht der Startwerte (zwei Stuetzpunkte auf der Startgeraden).
+    PRIOR_WEIGHT = 1.0
+    # Aeltere Messungen verblassen, damit Verschleiss und Umbauten eingelernt werden.
+    DECAY = 0.95
+
+    def __init__(self, db_path: str | None = None):
+        self.db_path = db_path or default_db_path()
+        self._lock = threading.Lock()
+        self.model = MixEstimatorModel(db_path=self.db_path)
+        self.settings = SystemSettingsModel(db_path=self.db_path)
+        self.plans = get_mix_plan_service(self.db_path)
+        self.planner = DispensePlanner()
+        self._stats = self.model.load_all()
+        self._dirty = False
+        # Von der Engine gesetzt: Firmware kann Pumpen parallel, Regal ist verbaut.
+        self.parallel_dispense = False
+        self.with_regal = True
+
+    def configure(self, parallel_dispense: bool = None, with_regal: bool = None):
+        with self._lock:
+            if parallel_dispense is not None:
+                self.parallel_dispense = bool(parallel_dispense)
+            if with_regal is not None:
+                self.with_regal = bool(with_regal)
+
+    def _fit_locked(self, name: str):
+        # Regression aus Messungen plus zwei Stuetzpunkten der Startgeraden.
+        a0, b0, x_ref = self.PRIORS[name]
+        w = self.PRIOR_WEIGHT
+        weight = 2.0 * w
+        sum_x = w * x_ref
+        sum_y = w * (2.0 * a0 + b0 * x_ref)
+        sum_xx = w * x_ref * x_ref
+        sum_xy = w * x_ref * (a0 + b0 * x_ref)
+        stats = self._stats.get(name)
+        if stats is not None:
+            weight += stats["weight"]
+            sum_x += stats["sum_x"]
+            sum_y += stats["sum_y"]
+            sum_xx += stats["sum_xx"]
+            sum_xy += stats["sum_xy"]
+
+        denom = weight * sum_xx - sum_x * sum_x
+        if denom <= 1e-9:
+            return a0, b0
+        b = (weight * sum_xy - sum_x * sum_y) / denom
+        a = (sum_y - b * sum_x) / weight
+        # Negative Werte waeren physikalisch unsinnig (z.B. bei wenigen, gleichen x).
+        return max(0.0, a), max(0.0, b)
+
+    def predict(self, name: str, x: float) -> float:
+        with self._lock:
+            a, b = self._fit_locked(name)
+        return a + b * max(0.0, float(x))
+
+    def observe(self, name: str, x: float, duration_s: float):
+        # Gemessene Phase einlernen; gespeichert wird erst mit save().
+        if name not in self.PRIORS or duration_s is None or duration_s < 0:
+            return
+        x = max(0.0, float(x))
+        y = float(duration_s)
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = {"weight": 0.0, "sum_x": 0.0, "sum_y": 0.0, "sum_xx": 0.0, "sum_xy": 0.0, "samples": 0}
+                self._stats[name] = stats
+            for key in ("weight", "sum_x", "sum_y", "sum_xx", "sum_xy"):
+                stats[key] *= self.DECAY
+            stats["weight"] += 1.0
+            stats["sum_x"] += x
+            stats["sum_y"] += y
+            stats["sum_xx"] += x * x
+            stats["sum_xy"] += x * y
+            stats["samples"] += 1
+            self._dirty = True
+
+    def save(self):
+        # Lernwerte nach einem Mix sichern (ein Commit statt einem pro Messung).
+        with self._lock:
+            if not self._dirty:
+                return
+            self.model.save_all(self._stats)
+            self._dirty = False
+
+    def reset(self):
+        # Zurueck auf die Startwerte, z.B. nach Umbau der Mechanik.
+        with self._lock:
+            self._stats = {}
+            self._dirty = False
+            self.model.reset()
+
+    def fetch_distance_mm(self, regal_params: dict) -> float:
+        # Lift von der Uebergabehoehe zur Quell-Ebene und zurueck.
+        if not regal_params:
+            return 0.0
+        return 2.0 * abs(float(regal_params["source_mm"]) - float(regal_params["load_unload_height_i"]))
+
+    def return_distance_mm(self) -> float:
+        # Lift von der Uebergabehoehe zur Warteposition.
+        waiting_mm = self.settings.get_waiting_position()
+        load_unload_height_mm = self.settings.get_load_unload_height()
+        if load_unload_height_mm is None:
+            load_unload_height_mm = self.settings.get_mixer_height()
+        if waiting_mm is None or load_unload_height_mm is None:
+            return 0.0
+        return abs(float(waiting_mm) - float(load_unload_height_mm))
+
+    def estimate(self, cocktail_id: int, factor: float = 1.0, cached_only: bool = False) -> dict | None:
+        # Gesamtdauer eines Mixes aus Plan, Fahrwegen und Lernwerten.
+        # cached_only: ohne gecachten Plan None statt Kompilieren aus SQLite.
+        if cached_only:
+            plan = self.plans.peek_plan(int(cocktail_id), float(factor))
+            if plan is None:
+                return None
+        else:
+            plan = self.plans.get_plan(int(cocktail_id), float(factor))
+        regal_params = plan.get_regal_params()
+        with self._lock:
+            parallel = self.parallel_dispense
+            with_regal = self.with_regal
+
+        # Dosieren beginnt an der Uebergabeposition, dorthin geht es zur Rueckgabe auch zurueck.
+        start_mm = regal_params["load_unload_i"] if regal_params is not None else 0
+        planned, _ = self.planner.plan(plan.to_mix_data(), start_mm)
+        if parallel:
+            batches = self.planner.group_parallel(planned, PUMP_MULTI_MAX)
+        else:
+            batches = [[step] for step in planned]
+
+        travel_s = 0.0
+        pump_s = 0.0
+        current_mm = start_mm
+        for batch in batches:
+            runs = [step for step in batch if step.get("pump_ms") is not None]
+            if not runs:
+                continue
+            target_mm = runs[0].get("position_mm", runs[0].get("position_steps"))
+            if target_mm is not None:
+                distance_mm = abs(int(target_mm) - int(current_mm))
+                if distance_mm > 0:
+                    travel_s += self.predict("mixer_travel", distance_mm)
+                current_mm = int(target_mm)
+            pump_s += self.predict("pump", max(int(step["pump_ms"]) for step in runs) / 1000.0)
+
+        fetch_s = 0.0
+        return_s = 0.0
+        if with_regal:
+            if current_mm != start_mm:
+                travel_s += self.predict("mixer_travel", abs(int(current_mm) - int(start_mm)))
+            fetch_s = self.predict("regal_fetch", self.fetch_distance_mm(regal_params))
+            return_s = self.predict("regal_return", self.return_distance_mm())
+
+        with self._lock:
+            samples = sum(stats["samples"] for stats in self._stats.values())
+        return {
+            "cocktail_id": int(cocktail_id),
+            "factor": float(factor),
+            "total_s": fetch_s + travel_s + pump_s + return_s,
+            "fetch_s": fetch_s,
+            "travel_s": travel_s,
+            "pump_s": pump_s,
+            "return_s": return_s,
+            "samples": samples,
+        }
+
+    def get_stats(self) -> dict:
+        # Aktuelle Geraden pro Phase fuer Diagnose.
+        with self._lock:
+            result = {}
+            for name in self.PRIORS:
+                a, b = self._fit_locked(name)
+                stats = self._stats.get(name)
+                result[name] = {"a": a, "b": b, "samples": stats["samples"] if stats else 0}
+            return result
+
+
+_SERVICES = {}
+_SERVICES_LOCK = threading.Lock()
+
+
+def get_mix_estimator_service(db_path: str | None = None) -> MixEstimatorService:
+    # Ein Schaetzer pro Datenbankdatei fuer den ganzen Prozess.
+    key = os.path.abspath(db_path or default_db_path())
+    with _SERVICES_LOCK:
+        service = _SERVICES.get(key)
+        if service is None:
+            service = MixEstimatorService(db_path)
+            _SERVICES[key] = service
+        return service
@@ -0,0 +1,237 @@
+import os
+import threading
+from types import MappingProxyType
+
+from Model.db_connection import default_db_path, open_connection
+from Model.mix_model import MixModel
+from Model.system_settings_model import SystemSettingsModel
+
+
+# Kuerzester Pumpenlauf; Aufteilung langer Laeufe uebernimmt der I2C-Treiber.
+PUMP_MS_MIN = 1
+
+
+def pump_ms(amount_ml: float, flow_rate_ml_s: float) -> int:
+    # Menge und Flow-Rate in Pumpenlaufzeit (ms) umrechnen.
+    duration_ms = int(round(float(amount_ml) / float(flow_rate_ml_s) * 1000.0))
+    return max(PUMP_MS_MIN, duration_ms)
+
+
+def load_regal_params(cocktail_id: int, settings: SystemSettingsModel = None) -> dict:
+    # Regal-Parameter fuer die Glasentnahme aus den Maschinenparametern lesen.
+    owns_settings = settings is None
+    if owns_settings:
+        settings = SystemSettingsModel()
+    try:
+        level = settings.get_cocktail_source_level(int(cocktail_id))
+        if level is None:
+            raise RuntimeError(f"Regal-Sequenz: Keine Quell-Ebene fuer Cocktail {cocktail_id} gesetzt.")
+
+        level_direction = settings.get_level_direction(int(level))
+        if level_direction is None:
+            level_direction = True
+        mixer_direction = settings.get_mixer_direction()
+        if mixer_direction is None:
+            mixer_direction = True
+        load_unload_pos_mm = settings.get_load_unload_position()
+        if load_unload_pos_mm is None:
+            raise RuntimeError("Regal-Sequenz: load_unload_position_mm ist nicht gesetzt.")
+        load_unload_height_mm = settings.get_load_unload_height()
+        if load_unload_height_mm is None:
+            load_unload_height_mm = settings.get_mixer_height()
+        homing_safe_height_mm = settings.get_homing_safe_height()
+        if homing_safe_height_mm is None:
+            raise RuntimeError("Regal-Sequenz: homing_safe_height_mm ist nicht gesetzt.")
+
+        source_height_mm = settings.get_level_height(int(level))
+        if source_height_mm is None:
+            raise RuntimeError(f"Regal-Sequenz: Hoehe fuer Ebene {level} nicht gesetzt.")
+
+        mixer_height_mm = settings.get_mixer_height()
+        if mixer_height_mm is None:
+            raise RuntimeError("Regal-Sequenz: mixer_height_mm ist nicht gesetzt.")
+    finally:
+        if owns_settings:
+            settings.close()
+
+    return {
+        "cocktail_id": int(cocktail_id),
+        "level": int(level),
+        "level_direction": bool(level_direction),
+        "mixer_direction": bool(mixer_direction),
+        "source_mm": int(round(float(source_height_mm))),
+        "mixer_mm": int(round(float(mixer_height_mm))),
+        "load_unload_i": int(round(float(load_unload_pos_mm))),
+        "load_unload_height_i": int(round(float(load_unload_height_mm))),
+        "homing_safe_i": int(round(float(homing_safe_height_mm))),
+    }
+
+
+class MixPlan:
+    # Unveraenderlicher, vorberechneter Ablauf fuer Rezept + Faktor.
+    # Schritte enthalten Position und Pumpenlaufzeit (ms); die Engine rechnet nichts nach.
+    __slots__ = (
+        "cocktail_id",
+        "factor",
+        "cocktail_name",
+        "steps",
+        "regal_params",
+        "regal_error",
+        "pump_total_s",
+        "revisions",
+    )
+
+    def __init__(self, cocktail_id, factor, cocktail_name, steps, regal_params, regal_error, revisions):
+        values = {
+            "cocktail_id": int(cocktail_id),
+            "factor": float(factor),
+            "cocktail_name": cocktail_name,
+            "steps": tuple(MappingProxyType(dict(step)) for step in steps),
+            "regal_params": MappingProxyType(dict(regal_params)) if regal_params is not None else None,
+            # Fehlende Regal-Konfiguration ist erst beim Glasholen ein Fehler (Mixer-only geht ohne).
+            "regal_error": regal_error,
+            "pump_total_s": sum(int(step["pump_ms"] or 0) for step in steps) / 1000.0,
+            "revisions": MappingProxyType(dict(revisions)),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MixPlan ist unveraenderlich")
+
+    def to_mix_data(self) -> list:
+        # Veraenderbare Kopie im bisherigen mix_data-Format fuer Engine und Planer.
+        return [dict(step) for step in self.steps]
+
+    def get_regal_params(self):
+        return dict(self.regal_params) if self.regal_params is not None else None
+
+
+class MixPlanService:
+    # Kompiliert Rezepte zu MixPlan-Objekten und haelt sie im Speicher.
+    # Ungueltig werden Plaene ueber die Aenderungszaehler in data_revisions;
+    # geprueft wird nur, wenn PRAGMA data_version einen fremden Commit meldet.
+
+    def __init__(self, db_path: str | None = None):
+        self.db_path = db_path or default_db_path()
+        self._lock = threading.Lock()
+        # Eigene Verbindung fuer Revisionsabfragen aus beliebigen Threads.
+        self.connection = open_connection(self.db_path, check_same_thread=False)
+        # MixModel ist threadgebunden, jeder Thread kompiliert mit seinem eigenen.
+        self._local = threading.local()
+        self._plans = {}
+        self._revisions = {}
+        self._data_version = None
+        self.hits = 0
+        self.misses = 0
+
+    def _mix_model(self) -> MixModel:
+        mix_model = getattr(self._local, "mix_model", None)
+        if mix_model is None:
+            mix_model = MixModel(db_path=self.db_path)
+            self._local.mix_model = mix_model
+        return mix_model
+
+    def _sync_revisions_locked(self):
+        # Nur nach fremden Commits die Zaehler lesen und veraltete Plaene verwerfen.
+        version = int(self.connection.execute("PRAGMA data_version").fetchone()[0])
+        if version == self._data_version:
+            return
+        rows = self.connection.execute("SELECT table_name, revision FROM data_revisions").fetchall()
+        revisions = {str(row["table_name"]): int(row["revision"]) for row in rows}
+        if revisions != self._revisions:
+            self._plans = {
+                key: plan for key, plan in self._plans.items() if dict(plan.revisions) == revisions
+            }
+            self._revisions = revisions
+        self._data_version = version
+
+    def _compile(self, cocktail_id: int, factor: float, revisions: dict) -> MixPlan:
+        # Rezept + Pumpen + Maschinenparameter in einen fertigen Ablauf uebersetzen.
+        mix_data = self._mix_model().get_full_mix_data(int(cocktail_id))
+        if not mix_data:
+            raise ValueError(f"Kein Rezept fuer Cocktail-ID {cocktail_id} gefunden.")
+
+        steps = []
+        for item in mix_data:
+            step = dict(item)
+            # Cocktail-ID bleibt pro Schritt fuer Regal- und Level-Logik verfuegbar.
+            step["cocktail_id"] = int(cocktail_id)
+            if step.get("position_mm") is not None:
+                step["position_mm"] = int(step["position_mm"])
+            step["plan_factor"] = float(factor)
+            flow_rate = step.get("flow_rate_ml_s")
+            if step.get("pump_number") is None or flow_rate is None or float(flow_rate) <= 0:
+                # Ungueltige Pumpendaten: Engine ueberspringt den Schritt wie bisher.
+                step["pump_ms"] = None
+            else:
+                step["pump_ms"] = pump_ms(float(step["amount_ml"]) * float(factor), flow_rate)
+            steps.append(step)
+
+        try:
+            regal_params = load_regal_params(int(cocktail_id), SystemSettingsModel(db_path=self.db_path))
+            regal_error = None
+        except RuntimeError as e:
+            regal_params = None
+            regal_error = str(e)
+
+        return MixPlan(
+            cocktail_id,
+            factor,
+            mix_data[0].get("cocktail_name"),
+            steps,
+            regal_params,
+            regal_error,
+            revisions,
+        )
+
+    def get_plan(self, cocktail_id: int, factor: float = 1.0) -> MixPlan:
+        # Gecachten Plan liefern oder neu kompilieren.
+        key = (int(cocktail_id), float(factor))
+        with self._lock:
+            self._sync_revisions_locked()
+            plan = self._plans.get(key)
+            if plan is not None:
+                self.hits += 1
+                return plan
+            revisions = dict(self._revisions)
+
+        plan = self._compile(int(cocktail_id), float(factor), revisions)
+        with self._lock:
+            self.misses += 1
+            # Nur speichern, wenn sich waehrend des Kompilierens nichts geaendert hat.
+            self._sync_revisions_locked()
+            if dict(plan.revisions) == self._revisions:
+                self._plans[key] = plan
+        return plan
+
+    def peek_plan(self, cocktail_id: int, factor: float = 1.0) -> MixPlan | None:
+        # Nur gecachten Plan liefern, nie kompilieren (z.B. fuer Anzeigen im UI-Thread).
+        key = (int(cocktail_id), float(factor))
+        with self._lock:
+            self._sync_revisions_locked()
+            return self._plans.get(key)
+
+    def invalidate(self):
+        # Alle Plaene verwerfen, z.B. nach manuellen Eingriffen.
+        with self._lock:
+            self._plans = {}
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"plans": len(self._plans), "hits": self.hits, "misses": self.misses}
+
+
+_SERVICES = {}
+_SERVICES_LOCK = threading.Lock()
+
+
+def get_mix_plan_service(db_path: str | None = None) -> MixPlanService:
+    # Ein Plan-Cache pro Datenbankdatei fuer den ganzen Prozess.
+    key = os.path.abspath(db_path or default_db_path())
+    with _SERVICES_LOCK:
+        service = _SERVICES.get(key)
+        if service is None:
+            service = MixPlanService(db_path)
+            _SERVICES[key] = service
+        return service
@@ -0,0 +1,158 @@
+import threading
+from contextlib import contextmanager
+
+from Model.mix_timeline_model import MixTimelineModel
+from Services.clock import SYSTEM_CLOCK
+
+
+class MixTimelineService:
+    # Zeichnet pro Mix eine Zeitleiste verschachtelter Phasen (Spans) auf:
+    # Start/Ende, Bus-Transaktionen und worauf die Phase gewartet hat.
+    # Ausserhalb von begin_run/end_run wird nichts aufgezeichnet; gespeichert wird einmal am Mixende.
+
+    def __init__(self, db_path: str | None = None, clock=None, bus=None):
+        self.clock = clock if clock is not None else SYSTEM_CLOCK
+        # Busbesitzer liefert den Transaktionszaehler; ohne Bus bleibt er 0 (Laptop-Modus).
+        self.bus = bus
+        self.model = MixTimelineModel(db_path=db_path)
+        self._lock = threading.Lock()
+        # Offene Spans pro Thread; ein zweiter Thread schliesst keine fremden Spans.
+        self._local = threading.local()
+        self._run = None
+
+    def _bus_count(self) -> int:
+        return self.bus.get_transaction_count() if self.bus is not None else 0
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    def _open(self, name: str, detail: str = None, step: bool = False):
+        stack = self._stack()
+        span = {
+            "depth": len(stack),
+            "name": str(name),
+            "detail": detail,
+            "start_ts": self.clock.time(),
+            "end_ts": None,
+            "bus_start": self._bus_count(),
+            "bus_transactions": 0,
+            "waits": {},
+            "error_msg": None,
+            "step": step,
+        }
+        with self._lock:
+            if self._run is None:
+                return None
+            self._run["spans"].append(span)
+        stack.append(span)
+        return span
+
+    def _close(self, span: dict, error: str = None):
+        # Noch offene Kinder (z.B. ein laufender step) enden mit ihrem Elternspan.
+        stack = self._stack()
+        while stack and stack[-1] is not span:
+            self._close(stack[-1], error)
+        if stack:
+            stack.pop()
+        span["end_ts"] = self.clock.time()
+        span["bus_transactions"] = self._bus_count() - span["bus_start"]
+        span["error_msg"] = error
+
+    def begin_run(self, label: str, cocktail_id: int = None):
+        # Neue Aufzeichnung; der Wurzel-Span umfasst den ganzen Mix.
+        with self._lock:
+            self._run = {"label": str(label), "cocktail_id": cocktail_id, "spans": []}
+        self._local.stack = []
+        self._open("mix", str(label))
+
+    def end_run(self, error: str = None):
+        # Aufzeichnung abschliessen und speichern; Fehler beim Speichern brechen den Mix nicht ab.
+        stack = self._stack()
+        if stack:
+            self._close(stack[0], error)
+        with self._lock:
+            run = self._run
+            self._run = None
+        if run is None or not run["spans"]:
+            return None
+
+        root = run["spans"][0]
+        spans = []
+        for span in run["spans"]:
+            if span["end_ts"] is None:
+                # Span eines anderen Threads lief beim Mixende noch.
+                span["end_ts"] = root["end_ts"]
+            waits = {reason: round(s, 3) for reason, s in span["waits"].items()}
+            span["wait_s"] = sum(waits.values())
+            span["wait_reason"] = max(waits, key=waits.get) if waits else None
+            span["waits"] = waits
+            spans.append(span)
+        try:
+            with self._lock:
+                run_id = self.model.add_run(
+                    {
+                        "label": run["label"],
+                        "cocktail_id": run["cocktail_id"],
+                        "started_at": root["start_ts"],
+                        "finished_at": root["end_ts"],
+                        "error_msg": error,
+                    },
+                    spans,
+                )
+        except Exception as e:
+            print(f"[MixTimeline] Zeitleiste konnte nicht gespeichert werden: {e}")
+            return None
+        print(
+            f"[MixTimeline] {run['label']}: {len(spans)} Phasen, "
+            f"{root['end_ts'] - root['start_ts']:.1f} s, {root['bus_transactions']} Bus-Transaktionen"
+        )
+        return run_id
+
+    @contextmanager
+    def span(self, name: str, detail: str = None):
+        # Phase als Block aufzeichnen; Ausnahmen werden am Span vermerkt und weitergereicht.
+        span = self._open(name, detail)
+        if span is None:
+            yield
+            return
+        try:
+            yield
+        except BaseException as e:
+            self._close(span, str(e) or type(e).__name__)
+            raise
+        self._close(span)
+
+    def step(self, name: str, detail: str = None):
+        # Naechster Schritt einer linearen Sequenz: beendet den vorherigen Schritt und startet einen neuen.
+        # Der letzte Schritt endet mit dem umgebenden Span.
+        stack = self._stack()
+        if stack and stack[-1]["step"]:
+            self._close(stack[-1])
+        self._open(name, detail, step=True)
+
+    def note_wait(self, reason: str, waited_s: float):
+        # Wartezeit allen offenen Spans des Threads zurechnen (Eltern enthalten die Wartezeiten der Kinder).
+        if waited_s <= 0:
+            return
+        for span in self._stack():
+            span["waits"][reason] = span["waits"].get(reason, 0.0) + float(waited_s)
+
+    def get_runs(self, limit: int = 20) -> list:
+        # Letzte Mixe fuer die Auswahl in der Adminansicht.
+        with self._lock:
+            runs = self.model.get_runs(limit)
+        for run in runs:
+            run["duration_s"] = run["finished_at"] - run["started_at"]
+        return runs
+
+    def get_spans(self, run_id: int) -> list:
+        with self._lock:
+            return self.model.get_spans(int(run_id))
+
+    def close(self):
+        with self._lock:
+            self.model.close()
@@ -0,0 +1,251 @@
+import threading
+import time
+
+from Model.db_connection import close_thread_connections
+from Model.order_queue_model import OrderQueueModel
+from Services.mix_estimator_service import get_mix_estimator_service
+from Services.mix_plan_service import get_mix_plan_service
+
+
+class OrderQueueService:
+    # Rueckfallwert, wenn sich ein Rezept nicht schaetzen laesst.
+    EST_GLASS_CYCLE_S = 45.0
+
+    def __init__(self, run_fn, db_path: str | None = None, resume_fn=None, checkpoints=None):
+        # run_fn(mix_data, factor, order_id=...) fuehrt einen vorbereiteten Mix aus.
+        self._run_fn = run_fn
+        # resume_fn() setzt einen unterbrochenen Mix fort; checkpoints kennt dessen Stand.
+        self._resume_fn = resume_fn
+        self._checkpoints = checkpoints
+        self.db_path = db_path
+        self.model = OrderQueueModel(db_path=db_path)
+        # Rezepte kommen als vorberechnete Mixplaene aus dem gemeinsamen Cache.
+        self.plans = get_mix_plan_service(db_path)
+        # Ein Lock schuetzt DB-Verbindung und Snapshot gegen UI- und Worker-Thread.
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stop_event = threading.Event()
+        self._thread = None
+        # Geschaetzte Dauer pro Cocktail, damit 50+ Auftraege keine Rezeptabfragen ausloesen.
+        self._duration_cache = {}
+        self._last_error = None
+        # Unterbrochener Mix wird nur nach ausdruecklicher Freigabe fortgesetzt.
+        self._resume_armed = False
+        # Schaetzung aus Plan und gelernten Phasenzeiten.
+        self.estimator = get_mix_estimator_service(db_path)
+
+        # Unterbrochene Auftraege eines Absturzes wieder einreihen.
+        requeued = self.model.requeue_running_orders()
+        # Nach einem Neustart wartet die Queue auf Freigabe, statt sofort zu mixen.
+        self._paused = bool(self.model.get_open_orders()) or self._resumable_checkpoint() is not None
+        if requeued:
+            print(f"[OrderQueue] {requeued} unterbrochene(r) Auftrag/Auftraege wieder eingereiht")
+        if self._paused:
+            print("[OrderQueue] Offene Auftraege aus letzter Sitzung, Queue ist pausiert")
+
+    def start(self):
+        # Worker-Thread einmalig starten.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # Worker beenden; laufender Mix wird ueber den Controller gestoppt.
+        self._stop_event.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self.model.close()
+
+    def _load_mix_data(self, cocktail_id: int, factor: float = 1.0) -> list:
+        # Rezept als Kopie des gecachten Mixplans laden.
+        return self.plans.get_plan(int(cocktail_id), float(factor)).to_mix_data()
+
+    def enqueue(self, cocktail_id: int, factor: float = 1.0, priority: int = 0) -> dict:
+        # Auftrag persistieren und Worker wecken.
+        with self._wakeup:
+            order = self.model.add_order(int(cocktail_id), float(factor), int(priority))
+            self._wakeup.notify_all()
+        print(f"[OrderQueue] Auftrag {order['order_id']} eingereiht (Cocktail {cocktail_id}, Prio {priority})")
+        return order
+
+    def cancel(self, order_id: int):
+        # Wartenden Auftrag entfernen.
+        with self._lock:
+            self.model.cancel_order(int(order_id))
+
+    def resume(self):
+        # Pausierte Queue (nach Fehler, Stop oder Neustart) wieder freigeben.
+        with self._wakeup:
+            self._paused = False
+            self._last_error = None
+            self._resume_armed = self._resumable_checkpoint() is not None
+            self._wakeup.notify_all()
+
+    def pause(self):
+        with self._lock:
+            self._paused = True
+
+    def _resumable_checkpoint(self):
+        if self._checkpoints is None or self._resume_fn is None:
+            return None
+        return self._checkpoints.get_resumable()
+
+    def discard_interrupted(self):
+        # Unterbrochenen Mix verwerfen statt fortsetzen; sein Auftrag gilt als abgebrochen.
+        if self._checkpoints is None:
+            return None
+        checkpoint = self._checkpoints.discard()
+        if checkpoint is not None and checkpoint["order_id"] is not None:
+            with self._lock:
+                self.model.mark_finished(int(checkpoint["order_id"]), "cancelled", "Unterbrochener Mix verworfen")
+        return checkpoint
+
+    def get_snapshot(self) -> dict:
+        # Queue-Zustand mit ETA pro Auftrag fuer die UI.
+        # Unter dem Lock nur DB lesen; geschaetzt wird danach, damit der Worker nicht wartet.
+        with self._lock:
+            orders = self.model.get_open_orders()
+            paused = self._paused
+            last_error = self._last_error
+            checkpoint = self._resumable_checkpoint()
+            durations = {}
+            measured = {}
+            for order in orders:
+                key = (int(order["cocktail_id"]), float(order["factor"]))
+                if key in durations or key in measured:
+                    continue
+                cached = self._duration_cache.get(key)
+                if cached is not None:
+                    durations[key] = cached
+                else:
+                    measured[key] = self.model.get_recent_durations(key[0])
+
+        computed = {}
+        for key, recent in measured.items():
+            estimate = self._estimate_duration(key[0], key[1], recent)
+            durations[key] = self.EST_GLASS_CYCLE_S if estimate is None else estimate
+            if estimate is not None:
+                computed[key] = estimate
+        if computed:
+            with self._lock:
+                self._duration_cache.update(computed)
+
+        now = time.time()
+        elapsed_total = 0.0
+        for order in orders:
+            duration_s = durations[(int(order["cocktail_id"]), float(order["factor"]))]
+            if order["status"] == "running" and order["started_at"] is not None:
+                # Laufender Auftrag zaehlt nur mit seiner Restzeit.
+                remaining_s = max(0.0, duration_s - (now - float(order["started_at"])))
+            else:
+                remaining_s = duration_s
+            elapsed_total += remaining_s
+            order["estimated_duration_s"] = duration_s
+            order["eta_s"] = elapsed_total
+            order["eta_ts"] = now + elapsed_total
+        return {
+            "orders": orders,
+            "paused": paused,
+            "last_error": last_error,
+            "total_eta_s": elapsed_total,
+            # Unterbrochener Mix, den "Fortsetzen" zuerst zu Ende mixt.
+            "checkpoint": self._checkpoints.describe(checkpoint) if checkpoint is not None else None,
+        }
+
+    def invalidate_estimates(self):
+        # Nach Rezept- oder Pumpenaenderungen neu schaetzen.
+        with self._lock:
+            self._duration_cache.clear()
+
+    def _estimate_duration(self, cocktail_id: int, factor: float, recent_durations: list) -> float | None:
+        # Gemessene Laufzeiten schlagen die Schaetzung aus den Rezeptschritten.
+        if recent_durations and float(factor) == 1.0:
+            return sum(recent_durations) / len(recent_durations)
+        # Nur aus gecachten Plaenen schaetzen; None = Plan noch nicht kompiliert, spaeter erneut versuchen.
+        try:
+            estimate = self.estimator.estimate(int(cocktail_id), float(factor), cached_only=True)
+        except Exception:
+            return self.EST_GLASS_CYCLE_S
+        return None if estimate is None else estimate["total_s"]
+
+    def _next_order(self):
+        # Naechsten Auftrag holen oder auf neue Auftraege warten.
+        with self._wakeup:
+            while not self._stop_event.is_set():
+                checkpoint = self._resumable_checkpoint()
+                if not self._paused and checkpoint is not None:
+                    # Unterbrochener Mix hat Vorrang; ohne Freigabe wartet die Queue.
+                    if self._resume_armed:
+                        self._resume_armed = False
+                        if checkpoint["order_id"] is not None:
+                            self.model.mark_running(int(checkpoint["order_id"]))
+                        return {
+                            "order_id": checkpoint["order_id"],
+                            "cocktail_id": checkpoint["cocktail_id"],
+                            "factor": checkpoint["factor"],
+                            "resume": True,
+                        }
+                elif not self._paused:
+                    for order in self.model.get_open_orders():
+                        if order["status"] == "queued":
+                            self.model.mark_running(order["order_id"])
+                            return order
+                self._wakeup.wait(timeout=1.0)
+        return None
+
+    def _run(self):
+        # Genau ein Worker fuehrt Auftraege nacheinander auf der Engine aus.
+        try:
+            self._run_orders()
+        finally:
+            # Threadgebundene DB-Verbindungen des Workers freigeben.
+            close_thread_connections()
+
+    def _run_orders(self):
+        while not self._stop_event.is_set():
+            order = self._next_order()
+            if order is None:
+                return
+
+            order_id = order["order_id"]
+            try:
+                if order.get("resume"):
+                    print(f"[OrderQueue] Setze unterbrochenen Mix fort (Auftrag {order_id})")
+                    self._resume_fn()
+                else:
+                    print(f"[OrderQueue] Starte Auftrag {order_id} (Cocktail {order['cocktail_id']})")
+                    mix_data = self._load_mix_data(order["cocktail_id"], order["factor"])
+                    self._run_fn(mix_data, order["factor"], order_id=order_id)
+            except Exception as e:
+                msg = str(e)
+                status = "cancelled" if msg.startswith("STOP: ") else "failed"
+                checkpoint = self._resumable_checkpoint()
+                with self._lock:
+                    if order_id is None:
+                        pass
+                    elif checkpoint is not None and checkpoint["order_id"] == order_id:
+                        # Auftrag bleibt offen, bis der Mix fortgesetzt oder verworfen wird.
+                        pass
+                    else:
+                        self.model.mark_finished(order_id, status, msg)
+                    # Nach Fehlern oder Stop erst nach Freigabe weitermachen.
+                    self._paused = True
+                    self._last_error = msg
+                print(f"[OrderQueue] Auftrag {order_id} abgebrochen: {msg}")
+                continue
+
+            if order_id is None:
+                continue
+            with self._lock:
+                self.model.mark_finished(order_id, "done")
+                # Messwert fliesst in die naechste ETA ein.
+                self._duration_cache.pop((int(order["cocktail_id"]), float(order["factor"])), None)
+            print(f"[OrderQueue] Auftrag {order_id} fertig")
@@ -3,18 +3,23 @@ from Services.status_monitor import StatusMonitor
 
 
 class PumpCalibrationService:
-    def __init__(self, monitor: StatusMonitor, status_service: StatusService):
+    def __init__(self, monitor: StatusMonitor, status_service: StatusService, cancel_token=None):
         # Monitor verhindert parallele I2C-Zugriffe.
         # StatusService kapselt das Warten auf idle.
         self.monitor = monitor
         self.status_service = status_service
+        # Stop-Signal der Engine beendet auch Kalibrierlaeufe sofort.
+        self.cancel_token = cancel_token
 
     def _wait_until_idle(self, timeout_s: float, context: str):
         ok = self.status_service.wait_until_idle_cached(
             self.monitor.get_latest,
             timeout_s=timeout_s,
-            poll_s=0.2
+            poll_s=0.2,
+            cancel_token=self.cancel_token,
         )
+        if self.cancel_token is not None and self.cancel_token.is_set():
+            raise RuntimeError("STOP: Kalibrierlauf wurde gestoppt.")
         if not ok:
             status = self.monitor.get_latest()
             raise RuntimeError(f"{context}: busy blieb True oder Status ok=False. Status={status}")
@@ -27,6 +32,7 @@ class PumpCalibrationService:
         seconds = max(1, min(255, int(seconds)))
         timeout_s = seconds + timeout_extra_s
 
+        # Stop-Signal wird hier nicht zurueckgesetzt: es gehoert dem laufenden Ablauf der Engine.
         self._wait_until_idle(timeout_s=timeout_s, context="Vor Pumpenlauf")
 
         # run_i2c pausiert paralleles Polling fuer den Befehl.
@@ -1,13 +1,55 @@
+import logging
+import logging.handlers
+import os
 import threading
 import time
 
+# Optionaler Dateipfad: jeder Eintrag wird zusaetzlich in eine rotierende Datei geschrieben.
+SPILL_FILE_ENV = "MIXMATE_SIM_TRACE_FILE"
+
 
 class SimulationTraceService:
-    def __init__(self):
+    # Ringpuffer fester Groesse; IDs steigen fortlaufend, auch ueber clear() hinweg.
+    # Eintrag mit ID n liegt in Slot (n - 1) % capacity, Nachladen ab einer ID braucht keine Suche.
+
+    # Eintraege im Speicher; aeltere werden ueberschrieben und als verworfen gezaehlt.
+    CAPACITY = 5000
+    # Rotation der Spill-Datei.
+    SPILL_MAX_BYTES = 1000000
+    SPILL_BACKUPS = 3
+
+    def __init__(self, capacity: int = None, spill_path: str = None):
         # Trace wird aus UI- und Worker-Threads beschrieben.
         self._lock = threading.Lock()
-        self._entries = []
+        self.capacity = int(capacity or self.CAPACITY)
+        if self.capacity < 1:
+            raise ValueError("capacity muss mindestens 1 sein")
+        self._slots = [None] * self.capacity
         self._next_id = 1
+        # Kleinste noch lesbare ID; clear() schiebt sie auf _next_id.
+        self._first_id = 1
+        self.dropped = 0
+        self._spill = None
+        if spill_path:
+            self.configure_spill(spill_path)
+
+    def configure_spill(self, path: str, max_bytes: int = None, backups: int = None):
+        # Lange Sitzungen vollstaendig auf Platte, der Speicher bleibt begrenzt.
+        handler = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=int(max_bytes or self.SPILL_MAX_BYTES),
+            backupCount=int(backups if backups is not None else self.SPILL_BACKUPS),
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger(f"mixmate.sim_trace.{id(self)}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        for old in list(logger.handlers):
+            logger.removeHandler(old)
+            old.close()
+        logger.addHandler(handler)
+        self._spill = logger
 
     def log_i2c(self, addr: int, payload: list[int], note: str = ""):
         # Adresse fuer den Monitor lesbar als Hex formatieren.
@@ -26,22 +68,42 @@ class SimulationTraceService:
                 "ts": time.strftime("%H:%M:%S"),
                 "message": str(message),
             }
-            self._entries.append(item)
+            if self._next_id - self._first_id >= self.capacity:
+                # Puffer voll: aeltester Eintrag wird ueberschrieben.
+                self._first_id += 1
+                self.dropped += 1
+            self._slots[(self._next_id - 1) % self.capacity] = item
             self._next_id += 1
+            spill = self._spill
+        if spill is not None:
+            # Dateizugriff ausserhalb des Locks, der Handler serialisiert selbst.
+            spill.info(f"{item['id']} [{item['ts']}] {item['message']}")
 
     def get_entries_since(self, last_id: int = 0) -> list[dict]:
         with self._lock:
+            # Start direkt aus der ID berechnet; verworfene IDs werden uebersprungen.
+            start = max(int(last_id) + 1, self._first_id)
             # Kopien verhindern Aenderungen am internen Trace-Speicher.
-            return [dict(x) for x in self._entries if int(x["id"]) > int(last_id)]
+            return [dict(self._slots[(i - 1) % self.capacity]) for i in range(start, self._next_id)]
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "size": self._next_id - self._first_id,
+                "dropped": self.dropped,
+                "last_id": self._next_id - 1,
+                "spill": self._spill is not None,
+            }
 
     def clear(self):
         with self._lock:
-            # Monitor-Reset beginnt wieder bei ID 1.
-            self._entries.clear()
-            self._next_id = 1
+            # IDs laufen weiter, damit andere Leser keine Eintraege doppelt oder gar nicht sehen.
+            self._slots = [None] * self.capacity
+            self._first_id = self._next_id
 
 
-_SIM_TRACE_SINGLETON = SimulationTraceService()
+_SIM_TRACE_SINGLETON = SimulationTraceService(spill_path=os.environ.get(SPILL_FILE_ENV) or None)
 
 
 def get_simulation_trace_service() -> SimulationTraceService:
@@ -6,16 +6,31 @@ class StartupSequenceService:
     def __init__(self, relay_board: RelayBoard):
         self.relay_board = relay_board
 
-    def run(self, first_pair: list[int], second_pair: list[int], delay_secs: float):
+    def _wait(self, delay_secs: float, cancel_token=None) -> bool:
+        # Wartezeit zwischen den Paaren; True, wenn ein Stop sie beendet hat.
+        if cancel_token is None:
+            time.sleep(delay_secs)
+            return False
+        return cancel_token.wait(delay_secs)
+
+    def run(self, first_pair: list[int], second_pair: list[int], delay_secs: float, cancel_token=None) -> bool:
         # Relaispaare nacheinander einschalten.
+        # Stop ueber cancel_token bricht ab; bereits geschaltete Relais gehen wieder aus.
         print("Starte Initialisierungssequenz für Relais...")
 
         print("Einschalten des ersten Relais-Paares...")
         self.relay_board.set_many(first_pair, True)
-        time.sleep(delay_secs)
+        if self._wait(delay_secs, cancel_token):
+            self.relay_board.set_many(first_pair, False)
+            print("Initialisierungssequenz abgebrochen.")
+            return False
 
         print("Einschalten des zweiten Relais-Paares...")
         self.relay_board.set_many(second_pair, True)
-        time.sleep(delay_secs)
+        if self._wait(delay_secs, cancel_token):
+            self.relay_board.set_many(first_pair + second_pair, False)
+            print("Initialisierungssequenz abgebrochen.")
+            return False
 
         print("Initialisierungssequenz abgeschlossen.")
+        return True
@@ -1,18 +1,82 @@
 import threading
-import time
+
+from Services.clock import SYSTEM_CLOCK
+from Services.i2c_bus_service import (
+    PRIO_BACKGROUND_POLL,
+    PRIO_COMMAND,
+    PRIO_STOP,
+    PRIO_WAIT_POLL,
+    I2CBusService,
+)
 
 
 class StatusMonitor:
-    def __init__(self, i2c, status_service, poll_s: float = 0.3):
-        # Cache, Sperre und Polling-Intervall initialisieren.
+    # Schneller Takt waehrend Bewegung, nach Befehlen und solange jemand wartet.
+    FAST_POLL_S = 0.03
+    # So lange nach einem Befehl oder busy bleibt der schnelle Takt aktiv.
+    ACTIVE_HOLD_S = 2.0
+    # Danach waechst das Intervall pro Abfrage um diesen Faktor bis zum Ruhetakt.
+    DECAY_FACTOR = 1.5
+    # Obergrenze fuer das Intervall, wenn der Slave nicht antwortet.
+    ERROR_BACKOFF_MAX_S = 5.0
+
+    def __init__(
+        self,
+        i2c,
+        status_service,
+        poll_s: float = 0.3,
+        fast_poll_s: float = None,
+        active_hold_s: float = None,
+        error_backoff_max_s: float = None,
+        read_fn=None,
+        parse_fn=None,
+        bus=None,
+        device: str = None,
+        name: str = "StatusMonitor",
+        clock=None,
+    ):
+        # Cache, Sperre und Polling-Intervalle initialisieren.
+        # poll_s ist der Ruhetakt, wenn die Maschine nichts tut.
+        # read_fn/parse_fn erlauben weitere Controller (z.B. Regal) mit gleichem Ablauf.
         self.i2c = i2c
         self.status_service = status_service
-        self.poll_s = poll_s
+        self.name = name
+        self._read_fn = read_fn if read_fn is not None else i2c.getstatus_raw
+        self._parse_fn = parse_fn if parse_fn is not None else status_service.parse_status
+        self.poll_s = float(poll_s)
+        self.fast_poll_s = float(fast_poll_s if fast_poll_s is not None else self.FAST_POLL_S)
+        self.active_hold_s = float(active_hold_s if active_hold_s is not None else self.ACTIVE_HOLD_S)
+        self.error_backoff_max_s = float(
+            error_backoff_max_s if error_backoff_max_s is not None else self.ERROR_BACKOFF_MAX_S
+        )
+        if self.fast_poll_s <= 0 or self.poll_s <= 0:
+            raise ValueError("Polling-Intervalle muessen > 0 sein")
+        # Schneller Takt darf nie langsamer als der Ruhetakt sein.
+        self.fast_poll_s = min(self.fast_poll_s, self.poll_s)
 
-        self._lock = threading.Lock()
-        # Lock schuetzt I2C-Bus und Statuscache gemeinsam.
+        # Mehrere Monitore am selben Bus teilen sich einen I2CBusService;
+        # er vergibt Transaktionen nach Prioritaet und reihum pro Geraet.
+        self._bus = bus if bus is not None else I2CBusService()
+        self.device = device or name
+        # Uhr fuer Takt, Zeitstempel und Wartefristen (VirtualClock in Simulationen).
+        self.clock = clock if clock is not None else SYSTEM_CLOCK
+        # Lock schuetzt den I2C-Bus, die Condition den Statuscache.
+        self._cond = threading.Condition()
         self._stop_event = threading.Event()
+        # Weckt den Poller vorzeitig, z.B. wenn ein Warter frischen Status braucht.
+        self._wake_event = threading.Event()
         self._thread = None
+        # Laufende Nummer jedes veroeffentlichten Status.
+        self._seq = 0
+        # Anzahl aktiver wait_for-Aufrufe steuert den Polling-Takt.
+        self._waiters = 0
+        # Beobachter bekommen jeden frischen Status als Kopie.
+        self._subscribers = []
+        # Zustand des adaptiven Takts.
+        self._last_activity_ts = None
+        self._decay_poll_s = self.poll_s
+        self._error_count = 0
+        self._effective_poll_s = self.poll_s
 
         # Startwert zeigt der UI klar, dass noch kein Polling lief.
         self._latest = {
@@ -24,9 +88,21 @@ class StatusMonitor:
             "band_belegt": None,
             "ist_position": None,
             "homing_ok": None,
+            "glass_present": None,
+            "glass_moved": None,
+            "status_version": None,
             "raw": b"",
+            "effective_poll_s": self.poll_s,
+            # Zeitpunkt des Reads (Unix-Sekunden) und laufende Nummer.
+            "ts": None,
+            "seq": 0,
         }
 
+    @property
+    def bus(self) -> I2CBusService:
+        # Busbesitzer fuer weitere Monitore oder Befehle am selben Bus.
+        return self._bus
+
     def start(self):
         # Status-Polling im Hintergrund starten.
         if self._thread and self._thread.is_alive():
@@ -40,34 +116,160 @@ class StatusMonitor:
     def stop(self):
         # Polling-Thread stoppen.
         self._stop_event.set()
+        self._wake_event.set()
+        self.interrupt_waiters()
         if self._thread:
             self._thread.join(timeout=1.0)
 
+    def _mark_activity(self):
+        # Befehl oder Bewegung: sofort wieder schnell abfragen.
+        self._last_activity_ts = self.clock.monotonic()
+        self._decay_poll_s = self.fast_poll_s
+
+    def _update_interval_locked(self, status: dict) -> float:
+        # Naechstes Intervall aus dem frischen Status ableiten.
+        if status.get("error_code") == "I2C_NO_RESPONSE":
+            # Stummer Slave: Intervall verdoppeln statt den Bus zu fluten.
+            self._error_count += 1
+            interval = min(self.error_backoff_max_s, self.poll_s * (2 ** (self._error_count - 1)))
+            self._effective_poll_s = max(interval, self.fast_poll_s)
+            return self._effective_poll_s
+
+        self._error_count = 0
+        if status.get("busy"):
+            self._mark_activity()
+
+        if self._waiters > 0:
+            interval = self.fast_poll_s
+        elif self._last_activity_ts is not None and self.clock.monotonic() - self._last_activity_ts < self.active_hold_s:
+            interval = self.fast_poll_s
+        else:
+            # Nach der Haltezeit langsam Richtung Ruhetakt abklingen.
+            interval = self._decay_poll_s
+            self._decay_poll_s = min(self.poll_s, self._decay_poll_s * self.DECAY_FACTOR)
+        self._effective_poll_s = interval
+        return interval
+
+    def _poll_interval(self) -> float:
+        with self._cond:
+            if self._waiters > 0 and self._error_count == 0:
+                return self.fast_poll_s
+            return self._effective_poll_s
+
+    def get_poll_interval(self) -> float:
+        # Aktuell wirksames Polling-Intervall in Sekunden.
+        with self._cond:
+            return self._effective_poll_s
+
     def _run(self):
-        # Statuscache in festem Takt aktualisieren.
+        # Statuscache im Takt aktualisieren; Warter verkuerzen den Takt.
         while not self._stop_event.is_set():
             self.refresh()
-            time.sleep(self.poll_s)
+            self.clock.wait(self._wake_event, self._poll_interval())
+            self._wake_event.clear()
+
+    def _publish(self, status: dict):
+        # Neuen Status ablegen, Warter wecken und Beobachter informieren.
+        with self._cond:
+            # Wirksamer Takt wird fuer UI und Diagnose mitgeliefert.
+            status["effective_poll_s"] = self._update_interval_locked(status)
+            self._seq += 1
+            status["seq"] = self._seq
+            status["ts"] = self.clock.time()
+            self._latest = status
+            self._cond.notify_all()
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(dict(status))
+            except Exception as e:
+                # Fehlerhafte Beobachter duerfen das Polling nicht stoppen.
+                print(f"[{self.name}] Beobachter fehlgeschlagen: {e}")
 
     def refresh(self) -> dict:
         # Status einmal neu lesen und Cache aktualisieren.
-        with self._lock:
+        with self._cond:
+            # Wartet ein Ablaufschritt, hat der Read Vorrang vor Ruhetakt-Polls.
+            priority = PRIO_WAIT_POLL if self._waiters > 0 else PRIO_BACKGROUND_POLL
+        with self._bus.transaction(self.device, priority):
             # Rohdaten erst lesen, dann direkt in ein UI-taugliches Dict parsen.
-            raw = self.i2c.getstatus_raw()
-            self._latest = self.status_service.parse_status(raw)
-            return dict(self._latest)
+            raw = self._read_fn()
+            status = self._parse_fn(raw)
+        self._publish(status)
+        return dict(status)
 
     def get_latest(self) -> dict:
         # Zuletzt gelesenen Status zurueckgeben.
-        with self._lock:
+        with self._cond:
             return dict(self._latest)
 
-    def run_i2c(self, fn, *args, refresh_after: bool = True, **kwargs):
-        # I2C-Befehl exklusiv ausfuehren.
-        with self._lock:
+    def get_age_s(self):
+        # Alter des Cache in Sekunden; None, solange noch nichts gelesen wurde.
+        with self._cond:
+            ts = self._latest.get("ts")
+        if ts is None:
+            return None
+        return max(0.0, self.clock.time() - float(ts))
+
+    def get_seq(self) -> int:
+        # Nummer des zuletzt veroeffentlichten Status.
+        with self._cond:
+            return self._seq
+
+    def subscribe(self, callback):
+        # Beobachter registrieren; Rueckgabe meldet ihn wieder ab.
+        with self._cond:
+            self._subscribers.append(callback)
+
+        def _unsubscribe():
+            with self._cond:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return _unsubscribe
+
+    def request_poll(self):
+        # Poller sofort einen frischen Status lesen lassen.
+        self._wake_event.set()
+
+    def interrupt_waiters(self):
+        # Alle wait_for-Aufrufe aufwecken, damit sie ihr Stop-Signal pruefen.
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait_for(self, predicate, timeout_s: float, stop_event: threading.Event = None, after_seq: int = None):
+        # Blockierend warten, bis ein Status das Praedikat erfuellt.
+        # after_seq verlangt einen Status, der nach diesem Zeitpunkt gelesen wurde.
+        # Rueckgabe: (erfuellt, letzter Status).
+        deadline = self.clock.monotonic() + float(timeout_s)
+        with self._cond:
+            self._waiters += 1
+            try:
+                self._wake_event.set()
+                while True:
+                    if stop_event is not None and stop_event.is_set():
+                        return False, dict(self._latest)
+                    if after_seq is None or self._seq > after_seq:
+                        if predicate(self._latest):
+                            return True, dict(self._latest)
+                    remaining = deadline - self.clock.monotonic()
+                    if remaining <= 0:
+                        return False, dict(self._latest)
+                    self.clock.wait(self._cond, remaining)
+            finally:
+                self._waiters -= 1
+
+    def run_i2c(self, fn, *args, refresh_after: bool = True, urgent: bool = False, **kwargs):
+        # I2C-Befehl exklusiv ausfuehren; urgent ueberholt alle anderen Anfragen (nur fuer Stop).
+        with self._bus.transaction(self.device, PRIO_STOP if urgent else PRIO_COMMAND):
             # Polling kann waehrend aktiver Befehle nicht dazwischenfunken.
             result = fn(*args, **kwargs)
 
+        with self._cond:
+            # Nach einem Befehl bewegt sich meist gleich etwas.
+            self._mark_activity()
+
         if refresh_after:
             # Nach Befehlen sofort einen frischen Status bereitstellen.
             self.refresh()
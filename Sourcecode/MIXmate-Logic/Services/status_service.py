@@ -1,17 +1,26 @@
-import time
+from Services.clock import SYSTEM_CLOCK
 
 
 class StatusService:
     
    # Statuspakete vom Mixer-Arduino auswerten.
 
-    # Statusformat (5 Bytes):
+    # Statusformat (5 Bytes, status_version 1):
     # Byte 0: busy
     # Byte 1: band_belegt
     # Byte 2: ist_position (LSB)
     # Byte 3: ist_position (MSB)
     # Byte 4: homing_ok
-    
+    # Erweitertes Format (7 Bytes, status_version 2):
+    # Byte 5: glass_present
+    # Byte 6: glass_moved
+
+    # Gueltige Paketlaengen je Statusversion.
+    STATUS_LENGTHS = {5: 1, 7: 2}
+
+    def __init__(self, clock=None):
+        # Uhr fuer Warteschleifen; Simulationen setzen eine VirtualClock ein.
+        self.clock = clock if clock is not None else SYSTEM_CLOCK
 
     def parse_status(self, raw: bytes) -> dict:
         # Grundstruktur des Statusobjekts.
@@ -32,6 +41,11 @@ class StatusService:
             "ist_position": None,
             # homing_ok zeigt eine gueltige Referenzfahrt.
             "homing_ok": None,
+            # Glas-Flags gibt es nur mit erweiterter Firmware, sonst None.
+            "glass_present": None,
+            "glass_moved": None,
+            # 1 = 5-Byte-Status, 2 = 7-Byte-Status mit Glas-Flags.
+            "status_version": None,
             # raw bleibt fuer Diagnose erhalten.
             "raw": raw
         }
@@ -43,9 +57,9 @@ class StatusService:
             return status
 
         # Falsche Paketlaenge bedeutet Protokollfehler.
-        if len(raw) != 5:
+        if len(raw) not in self.STATUS_LENGTHS:
             status["error_code"] = "I2C_BAD_LENGTH"
-            status["error_msg"] = f"Statuspaket hat Länge {len(raw)} statt 5."
+            status["error_msg"] = f"Statuspaket hat Länge {len(raw)} statt 5 oder 7."
             return status
 
         # Rohbytes in Werte umwandeln.
@@ -54,6 +68,10 @@ class StatusService:
         # Position besteht aus Low- und High-Byte im Little-Endian-Format.
         status["ist_position"] = int.from_bytes(raw[2:4], "little", signed=True)
         status["homing_ok"] = bool(raw[4] & 0x01)
+        status["status_version"] = self.STATUS_LENGTHS[len(raw)]
+        if status["status_version"] >= 2:
+            status["glass_present"] = bool(raw[5] & 0x01)
+            status["glass_moved"] = bool(raw[6] & 0x01)
 
         # Statuspaket ist gueltig; fehlendes Homing ist ein Betriebszustand,
         # kein Kommunikationsfehler.
@@ -66,6 +84,13 @@ class StatusService:
             status["severity"] = "WARN"
             return status
 
+        # Verschobenes Glas meldet nur die erweiterte Firmware.
+        if status["glass_moved"]:
+            status["error_code"] = "GLASS_MOVED"
+            status["error_msg"] = "Glas wurde auf dem Förderband verschoben."
+            status["severity"] = "WARN"
+            return status
+
         # Fehlendes Glas ist eine Warnung, kein Kommunikationsfehler.
         if not status["band_belegt"] and not status["busy"]:
             status["severity"] = "LOW"
@@ -85,45 +110,61 @@ class StatusService:
             status.get("homing_ok")
         )
 
-    def wait_until_idle(self, i2c, timeout_s: float = 10.0, poll_s: float = 0.2) -> bool:
+    def _sleep(self, poll_s: float, cancel_token=None) -> bool:
+        # Pause zwischen zwei Abfragen; True, wenn ein Stop das Warten beendet.
+        if cancel_token is None:
+            self.clock.sleep(poll_s)
+            return False
+        return self.clock.wait(cancel_token, poll_s)
+
+    def wait_until_idle(self, i2c, timeout_s: float = 10.0, poll_s: float = 0.2, cancel_token=None) -> bool:
         # Warten, bis der Mixer frei ist oder das Timeout greift.
-        start = time.time()
+        # Ein Stop ueber cancel_token beendet das Warten sofort (Rueckgabe False).
+        start = self.clock.time()
 
-        while time.time() - start < timeout_s:
+        while self.clock.time() - start < timeout_s:
+            if cancel_token is not None and cancel_token.is_set():
+                return False
             raw = i2c.getstatus_raw()
             status = self.parse_status(raw)
 
             # Bei ungueltiger Kommunikation weiter pollen bis Timeout.
             if not status["ok"]:
-                time.sleep(poll_s)
+                if self._sleep(poll_s, cancel_token):
+                    return False
                 continue
 
             # Maschine ist frei.
             if not status["busy"]:
                 return True
 
-            time.sleep(poll_s)
+            if self._sleep(poll_s, cancel_token):
+                return False
 
         # Timeout erreicht.
         return False
 
 
-    def wait_until_idle_cached(self, get_status_fn, timeout_s: float = 10.0, poll_s: float = 0.2) -> bool:
+    def wait_until_idle_cached(self, get_status_fn, timeout_s: float = 10.0, poll_s: float = 0.2, cancel_token=None) -> bool:
         # Variante fuer bereits gepollte Statuswerte aus dem Monitor.
-        start = time.time()
+        start = self.clock.time()
 
-        while time.time() - start < timeout_s:
+        while self.clock.time() - start < timeout_s:
+            if cancel_token is not None and cancel_token.is_set():
+                return False
             status = get_status_fn()
 
             # Initiale/temporare Statusfehler tolerieren, bis ein gueltiger Status da ist.
             if not status.get("ok"):
-                time.sleep(poll_s)
+                if self._sleep(poll_s, cancel_token):
+                    return False
                 continue
 
             if not status.get("busy"):
                 # Cache meldet freien Mixer.
                 return True
 
-            time.sleep(poll_s)
+            if self._sleep(poll_s, cancel_token):
+                return False
 
         return False
@@ -1,6 +1,5 @@
 from pathlib import Path
 
-from PySide6.QtCore import QTimer
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import (
     QDialog,
@@ -21,6 +20,7 @@ from View.qt.screens.calibration_screen import CalibrationScreen
 from View.qt.screens.cocktail_screen import CocktailScreen
 from View.qt.screens.home_screen import HomeScreen
 from View.qt.screens.status_screen import StatusScreen
+from View.qt.status_bridge import StatusBridge
 
 
 class AdminLoginDialog(QDialog):
@@ -68,6 +68,8 @@ class MainWindow(QMainWindow):
         self.pump_controller = pump_controller
         self.admin_controller = admin_controller
         self.admin_auth = AdminAuthService()
+        # Statusaenderungen kommen per Signal aus den Monitor-Threads; kein Polling im GUI-Thread.
+        self.status_bridge = StatusBridge(self.mix_controller, self)
 
         self.stack = QStackedWidget()
         self.setCentralWidget(self.stack)
@@ -88,7 +90,7 @@ class MainWindow(QMainWindow):
         )
 
         self.status_screen = StatusScreen(
-            mix_controller=self.mix_controller,
+            status_bridge=self.status_bridge,
             on_back=self.show_home,
         )
 
@@ -110,10 +112,8 @@ class MainWindow(QMainWindow):
         self.stack.addWidget(self.calibration_screen)
         self.stack.addWidget(self.admin_screen)
 
-        self._home_state_timer = QTimer(self)
-        self._home_state_timer.setInterval(1000)
-        self._home_state_timer.timeout.connect(self._refresh_home_if_visible)
-        self._home_state_timer.start()
+        self.status_bridge.statusChanged.connect(self._on_status_changed)
+        self.status_bridge.start()
 
         self.show_home()
 
@@ -129,31 +129,22 @@ class MainWindow(QMainWindow):
                 break
 
     def _hardware_ready(self) -> bool:
-        try:
-            status = self.mix_controller.get_status() or {}
-        except Exception:
-            return False
-        return bool(status.get("ok", False))
+        return bool(self.status_bridge.latest().get("ok", False))
 
     def _update_home_state(self):
-        ready = False
-        regal_connected = False
-        try:
-            status = self.mix_controller.get_status() or {}
-            ready = bool(status.get("ok", False))
-            regal_connected = bool(status.get("regal_connected", False))
-        except Exception:
-            ready = False
-            regal_connected = False
+        status = self.status_bridge.latest()
+        ready = bool(status.get("ok", False))
         self.home.set_ready(ready)
         self.home.set_hardware_actions_enabled(ready)
-        self.home.set_regal_connected(regal_connected)
+        self.home.set_regal_connected(bool(status.get("regal_connected", False)))
 
-    def _refresh_home_if_visible(self):
-        if self.stack.currentWidget() is self.home:
+    def _on_status_changed(self, changed: dict):
+        # Startseite haengt nur an Bereitschaft und Regal; andere Felder aendern dort nichts.
+        if "ok" in changed or "regal_connected" in changed:
             self._update_home_state()
 
     def _stop_live_views(self):
+        self.cocktails.stop()
         self.status_screen.stop()
         self.calibration_screen.stop()
 
@@ -196,6 +187,7 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         self._stop_live_views()
+        self.status_bridge.stop()
         try:
             self.mix_controller.shutdown()
         except Exception:
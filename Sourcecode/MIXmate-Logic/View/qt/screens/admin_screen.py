@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from PySide6.QtCore import Qt, QTimer
+import time
+
+from PySide6.QtCore import QEvent, QRectF, Qt, QTimer
+from PySide6.QtGui import QColor, QPainter, QPen
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, QFrame,
     QStackedWidget, QTableWidget, QTableWidgetItem, QMessageBox,
-    QInputDialog, QDialog, QDialogButtonBox, QTextEdit, QComboBox, QDoubleSpinBox
+    QInputDialog, QDialog, QDialogButtonBox, QTextEdit, QComboBox, QDoubleSpinBox,
+    QScrollArea, QToolTip
 )
 from Services.simulation_trace_service import get_simulation_trace_service
 
@@ -56,13 +60,18 @@ class SimulationTraceDialog(QDialog):
 
     def _clear(self):
         self.trace_service.clear()
-        self.last_id = 0
+        # IDs laufen nach dem Leeren weiter.
+        self.last_id = self.trace_service.get_stats()["last_id"]
         self.text.clear()
 
     def _poll(self):
         items = self.trace_service.get_entries_since(self.last_id)
         if not items:
             return
+        skipped = int(items[0]["id"]) - self.last_id - 1
+        if self.last_id > 0 and skipped > 0:
+            # Ringpuffer war schneller voll, als der Dialog nachgeladen hat.
+            self.text.append(f"... {skipped} Eintraege verworfen (Puffer voll)")
         for item in items:
             self.text.append(f"[{item['ts']}] {item['message']}")
             self.last_id = int(item["id"])
@@ -73,6 +82,202 @@ class SimulationTraceDialog(QDialog):
         super().closeEvent(event)
 
 
+class MixTimelineWidget(QWidget):
+    # Gantt-Ansicht eines Mixes: eine Zeile pro Phase, Balken auf gemeinsamer Zeitachse.
+    # Der dunkle Streifen unter einem Balken zeigt den Anteil, in dem die Phase auf Status gewartet hat.
+    ROW_H = 22
+    LABEL_W = 280
+    AXIS_H = 26
+    # Achsenschritte in Sekunden; gewaehlt wird der erste mit hoechstens 10 Strichen.
+    TICK_STEPS_S = (0.5, 1, 2, 5, 10, 15, 30, 60, 120, 300)
+
+    def __init__(self, parent: QWidget = None):
+        super().__init__(parent)
+        self.spans = []
+        self.setMouseTracking(True)
+        self.setMinimumWidth(self.LABEL_W + 300)
+
+    def set_spans(self, spans: list):
+        self.spans = list(spans or [])
+        self.setMinimumHeight(self.AXIS_H + self.ROW_H * max(1, len(self.spans)) + 8)
+        self.update()
+
+    def _time_range(self):
+        start = min(s["start_ts"] for s in self.spans)
+        end = max(s["end_ts"] for s in self.spans)
+        return start, max(end - start, 0.001)
+
+    def _color(self, span: dict) -> QColor:
+        # Farbe nach Phasengruppe.
+        name = span["name"]
+        if span.get("error_msg"):
+            return QColor(220, 80, 80)
+        if name == "mix":
+            return QColor(120, 130, 145)
+        if name == "ensure_homed" or name == "regal_homing":
+            return QColor(160, 110, 220)
+        if name == "move_to_position":
+            return QColor(240, 160, 60)
+        if name.startswith("dispense"):
+            return QColor(60, 150, 240)
+        if name.startswith("regal") or name.startswith("transfer"):
+            return QColor(0, 200, 170)
+        return QColor(150, 170, 190)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        if not self.spans:
+            painter.setPen(QColor(234, 240, 246, 140))
+            painter.drawText(self.rect(), Qt.AlignCenter, "Keine Phasen aufgezeichnet.")
+            return
+
+        start, total_s = self._time_range()
+        chart_w = max(50, self.width() - self.LABEL_W - 12)
+        bottom = self.AXIS_H + self.ROW_H * len(self.spans)
+
+        # Zeitachse mit Hilfslinien.
+        step_s = next((s for s in self.TICK_STEPS_S if total_s / s <= 10), self.TICK_STEPS_S[-1])
+        tick = 0.0
+        while tick <= total_s + 1e-9:
+            x = self.LABEL_W + tick / total_s * chart_w
+            painter.setPen(QPen(QColor(255, 255, 255, 30)))
+            painter.drawLine(int(x), self.AXIS_H - 4, int(x), bottom)
+            painter.setPen(QColor(234, 240, 246, 150))
+            painter.drawText(int(x) + 3, self.AXIS_H - 8, f"{tick:g} s")
+            tick += step_s
+
+        for index, span in enumerate(self.spans):
+            y = self.AXIS_H + index * self.ROW_H
+            label = span["name"] if not span.get("detail") else f"{span['name']}  {span['detail']}"
+            painter.setPen(QColor(234, 240, 246, 220 if span["depth"] <= 1 else 170))
+            painter.drawText(
+                QRectF(6 + 14 * span["depth"], y, self.LABEL_W - 12 - 14 * span["depth"], self.ROW_H),
+                Qt.AlignVCenter | Qt.AlignLeft,
+                label,
+            )
+
+            duration_s = max(0.0, span["end_ts"] - span["start_ts"])
+            x = self.LABEL_W + (span["start_ts"] - start) / total_s * chart_w
+            w = max(2.0, duration_s / total_s * chart_w)
+            bar = QRectF(x, y + 4, w, self.ROW_H - 10)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self._color(span))
+            painter.drawRoundedRect(bar, 3, 3)
+            if duration_s > 0 and span["wait_s"] > 0:
+                share = min(1.0, span["wait_s"] / duration_s)
+                painter.setBrush(QColor(0, 0, 0, 110))
+                painter.drawRect(QRectF(x, y + self.ROW_H - 8, w * share, 3))
+        painter.end()
+
+    def _tooltip(self, span: dict) -> str:
+        duration_s = span["end_ts"] - span["start_ts"]
+        lines = [span["name"] if not span.get("detail") else f"{span['name']} ({span['detail']})"]
+        lines.append(f"Dauer {duration_s:.2f} s, Bus-Transaktionen {span['bus_transactions']}")
+        if span["wait_s"] > 0:
+            lines.append(f"Warten {span['wait_s']:.2f} s:")
+            for reason, wait_s in sorted(span["waits"].items(), key=lambda item: -item[1])[:4]:
+                lines.append(f"  {reason}: {wait_s:.2f} s")
+        if span.get("error_msg"):
+            lines.append(f"Fehler: {span['error_msg']}")
+        return "\n".join(lines)
+
+    def event(self, event):
+        if event.type() == QEvent.ToolTip:
+            index = int((event.pos().y() - self.AXIS_H) // self.ROW_H)
+            if 0 <= index < len(self.spans) and event.pos().y() >= self.AXIS_H:
+                QToolTip.showText(event.globalPos(), self._tooltip(self.spans[index]), self)
+            else:
+                QToolTip.hideText()
+                event.ignore()
+            return True
+        return super().event(event)
+
+
+class MixTimelineDialog(QDialog):
+    def __init__(self, parent: QWidget, mix_controller):
+        super().__init__(parent)
+        self.setWindowTitle("Mix-Zeitleiste")
+        self.resize(1000, 640)
+        self.mix_controller = mix_controller
+
+        root = QVBoxLayout(self)
+        root.setContentsMargins(12, 12, 12, 12)
+        root.setSpacing(8)
+
+        top = QHBoxLayout()
+        self.run_combo = QComboBox(self)
+        btn_refresh = QPushButton("Aktualisieren", self)
+        top.addWidget(self.run_combo, 1)
+        top.addWidget(btn_refresh)
+        root.addLayout(top)
+
+        self.summary = QLabel("-", self)
+        self.summary.setObjectName("InfoLabel")
+        self.summary.setWordWrap(True)
+        root.addWidget(self.summary)
+
+        self.chart = MixTimelineWidget(self)
+        scroll = QScrollArea(self)
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(self.chart)
+        root.addWidget(scroll, 1)
+
+        actions = QHBoxLayout()
+        btn_close = QPushButton("Schließen", self)
+        actions.addStretch(1)
+        actions.addWidget(btn_close)
+        root.addLayout(actions)
+
+        btn_refresh.clicked.connect(self.refresh_runs)
+        btn_close.clicked.connect(self.accept)
+        self.run_combo.currentIndexChanged.connect(self._show_selected)
+
+        self.refresh_runs()
+
+    def refresh_runs(self):
+        try:
+            runs = self.mix_controller.get_mix_timeline_runs(30)
+        except Exception as e:
+            _msg_error(self, str(e))
+            return
+        self.run_combo.blockSignals(True)
+        self.run_combo.clear()
+        for run in runs:
+            started = time.strftime("%d.%m. %H:%M:%S", time.localtime(run["started_at"]))
+            text = f"{started}  {run['label']}  {run['duration_s']:.1f} s"
+            if run["error_msg"]:
+                text += "  (abgebrochen)"
+            self.run_combo.addItem(text, run["run_id"])
+        self.run_combo.blockSignals(False)
+        self._show_selected()
+
+    def _show_selected(self):
+        run_id = self.run_combo.currentData()
+        if run_id is None:
+            self.chart.set_spans([])
+            self.summary.setText("Noch kein Mix aufgezeichnet.")
+            return
+        try:
+            spans = self.mix_controller.get_mix_timeline(int(run_id))
+        except Exception as e:
+            _msg_error(self, str(e))
+            return
+        self.chart.set_spans(spans)
+        # Kurzfassung: Hauptphasen, Wartezeit und Busverkehr des ganzen Mixes.
+        root_span = next((s for s in spans if s["depth"] == 0), None)
+        parts = [
+            f"{s['name']} {s['end_ts'] - s['start_ts']:.1f} s"
+            for s in spans if s["depth"] == 1
+        ]
+        if root_span is not None:
+            parts.append(f"Warten gesamt {root_span['wait_s']:.1f} s")
+            parts.append(f"{root_span['bus_transactions']} Bus-Transaktionen")
+            if root_span.get("error_msg"):
+                parts.append(f"Fehler: {root_span['error_msg']}")
+        self.summary.setText(" · ".join(parts))
+
+
 class RecipeEditorDialog(QDialog):
     def __init__(self, parent: QWidget, admin_controller, cocktail_id: int, cocktail_name: str):
         super().__init__(parent)
@@ -97,8 +302,8 @@ class RecipeEditorDialog(QDialog):
         level_row.addWidget(self.btn_set_level)
         root.addLayout(level_row)
 
-        self.table = QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["order_index", "ingredient_id", "Zutat", "ml"])
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["order_index", "ingredient_id", "Zutat", "ml", "Gruppe"])
         self.table.setSelectionBehavior(QTableWidget.SelectRows)
         self.table.setEditTriggers(QTableWidget.NoEditTriggers)
         root.addWidget(self.table, 1)
@@ -158,6 +363,9 @@ class RecipeEditorDialog(QDialog):
             self.table.setItem(row, 1, QTableWidgetItem(str(r["ingredient_id"])))
             self.table.setItem(row, 2, QTableWidgetItem(str(r["ingredient_name"])))
             self.table.setItem(row, 3, QTableWidgetItem(str(r["amount_ml"])))
+            # Gleiche Gruppe in Folge: Reihenfolge darf nach Fahrweg optimiert werden.
+            group = r.get("order_group")
+            self.table.setItem(row, 4, QTableWidgetItem("" if group is None else str(group)))
 
         self.table.resizeColumnsToContents()
         self._refresh_glass_level_info()
@@ -195,7 +403,9 @@ class RecipeEditorDialog(QDialog):
         order_index = int(self.table.item(idx, 0).text())
         ingredient_id = int(self.table.item(idx, 1).text())
         amount_ml = float(self.table.item(idx, 3).text())
-        return ingredient_id, amount_ml, order_index
+        group_text = self.table.item(idx, 4).text().strip() if self.table.item(idx, 4) else ""
+        order_group = int(group_text) if group_text else 0
+        return ingredient_id, amount_ml, order_index, order_group
 
     def add_item(self):
         try:
@@ -223,8 +433,14 @@ class RecipeEditorDialog(QDialog):
         if not ok:
             return
 
+        order_group, ok = QInputDialog.getInt(
+            self, "Gruppe", "Reihenfolge-Gruppe (0 = feste Reihenfolge):", 0, 0, 9999, 1
+        )
+        if not ok:
+            return
+
         try:
-            self.admin_controller.add_recipe_item(self.cocktail_id, ingredient_id, ml, order_index)
+            self.admin_controller.add_recipe_item(self.cocktail_id, ingredient_id, ml, order_index, order_group)
             self.refresh()
         except Exception as e:
             _msg_error(self, str(e))
@@ -235,7 +451,7 @@ class RecipeEditorDialog(QDialog):
             _msg_info(self, "Bitte zuerst eine Zeile auswählen.")
             return
 
-        ingredient_id, old_ml, old_order = selected
+        ingredient_id, old_ml, old_order, old_group = selected
 
         ml, ok = QInputDialog.getDouble(self, "Menge ändern", "Neue Menge in ml:", old_ml, 0.1, 9999.0, 1)
         if not ok:
@@ -245,8 +461,14 @@ class RecipeEditorDialog(QDialog):
         if not ok:
             return
 
+        order_group, ok = QInputDialog.getInt(
+            self, "Gruppe ändern", "Reihenfolge-Gruppe (0 = feste Reihenfolge):", old_group, 0, 9999, 1
+        )
+        if not ok:
+            return
+
         try:
-            self.admin_controller.update_recipe_item(self.cocktail_id, ingredient_id, ml, order_index)
+            self.admin_controller.update_recipe_item(self.cocktail_id, ingredient_id, ml, order_index, order_group)
             self.refresh()
         except Exception as e:
             _msg_error(self, str(e))
@@ -257,7 +479,7 @@ class RecipeEditorDialog(QDialog):
             _msg_info(self, "Bitte zuerst eine Zeile auswählen.")
             return
 
-        ingredient_id, _, _ = selected
+        ingredient_id, _, _, _ = selected
 
         if not _confirm(self, "Entfernen", f"Zutat (ingredient_id={ingredient_id}) wirklich entfernen?"):
             return
@@ -385,6 +607,7 @@ class AdminScreen(QWidget):
         self.mix_controller = mix_controller
         self.on_back = on_back
         self.sim_trace_dialog = None
+        self.timeline_dialog = None
 
         # Eine zentrale Stack-Navigation statt vieler einzelner Dialoge.
         self.stack = QStackedWidget()
@@ -938,8 +1161,9 @@ class AdminScreen(QWidget):
         btn_levels = QPushButton("Ebenen")
         btn_toggle_sim = QPushButton("Simulation EIN/AUS")
         btn_show_sim = QPushButton("Simulation-Monitor")
+        btn_timeline = QPushButton("Mix-Zeitleiste")
 
-        for b in (btn_refresh, btn_toggle_sim, btn_show_sim):
+        for b in (btn_refresh, btn_toggle_sim, btn_show_sim, btn_timeline):
             b.setProperty("role", "nav")
         for b in (btn_mixer, btn_levels):
             b.setProperty("role", "cocktail")
@@ -963,6 +1187,7 @@ class AdminScreen(QWidget):
         sim_row.setSpacing(10)
         sim_row.addWidget(btn_toggle_sim)
         sim_row.addWidget(btn_show_sim)
+        sim_row.addWidget(btn_timeline)
         sim_row.addStretch(1)
         c.addLayout(sim_row)
 
@@ -978,6 +1203,7 @@ class AdminScreen(QWidget):
         btn_levels.clicked.connect(self.show_level_settings)
         btn_toggle_sim.clicked.connect(self.toggle_simulation_mode)
         btn_show_sim.clicked.connect(self.open_simulation_monitor)
+        btn_timeline.clicked.connect(self.open_mix_timeline)
 
         return w
 
@@ -1018,6 +1244,8 @@ class AdminScreen(QWidget):
         btn_set_safe_home = QPushButton("Sichere Homing-Höhe setzen")
         btn_set_load_unload = QPushButton("Beladen/Entladen-Position setzen")
         btn_calibrate = QPushButton("Distanz kalibrieren")
+        btn_rehome_n = QPushButton("Homing alle N Mixe")
+        btn_rehome_fault = QPushButton("Homing nach Fehler EIN/AUS")
         btn_refresh = QPushButton("Aktualisieren")
         for b in (
             btn_set_mixer,
@@ -1027,6 +1255,8 @@ class AdminScreen(QWidget):
             btn_set_safe_home,
             btn_set_load_unload,
             btn_calibrate,
+            btn_rehome_n,
+            btn_rehome_fault,
             btn_refresh,
         ):
             b.setProperty("role", "nav")
@@ -1039,6 +1269,8 @@ class AdminScreen(QWidget):
             btn_set_safe_home,
             btn_set_load_unload,
             btn_calibrate,
+            btn_rehome_n,
+            btn_rehome_fault,
             btn_refresh,
         ]
         for i, b in enumerate(action_buttons):
@@ -1051,6 +1283,7 @@ class AdminScreen(QWidget):
         self.lbl_waiting_direction = QLabel("-")
         self.lbl_homing_safe_height = QLabel("-")
         self.lbl_load_unload_position = QLabel("-")
+        self.lbl_homing_policy = QLabel("-")
         for lbl in (
             self.lbl_mixer_height,
             self.lbl_mixer_direction,
@@ -1058,6 +1291,7 @@ class AdminScreen(QWidget):
             self.lbl_waiting_direction,
             self.lbl_homing_safe_height,
             self.lbl_load_unload_position,
+            self.lbl_homing_policy,
         ):
             lbl.setObjectName("InfoLabel")
             c.addWidget(lbl)
@@ -1073,6 +1307,8 @@ class AdminScreen(QWidget):
         btn_set_safe_home.clicked.connect(self.set_homing_safe_height)
         btn_set_load_unload.clicked.connect(self.set_load_unload_position)
         btn_calibrate.clicked.connect(self.open_mixer_distance_calibration)
+        btn_rehome_n.clicked.connect(self.set_rehome_every_n_mixes)
+        btn_rehome_fault.clicked.connect(self.toggle_rehome_after_fault)
 
         return w
 
@@ -1160,6 +1396,8 @@ class AdminScreen(QWidget):
             homing_safe_h = self.admin_controller.get_homing_safe_height()
             load_unload_pos = self.admin_controller.get_load_unload_position()
             sim_mode = self.admin_controller.get_simulation_mode()
+            rehome_n = self.admin_controller.get_rehome_every_n_mixes()
+            rehome_fault = self.admin_controller.get_rehome_after_fault()
             levels = self.admin_controller.list_levels()
         except Exception as e:
             _msg_error(self, str(e))
@@ -1188,6 +1426,10 @@ class AdminScreen(QWidget):
         self.lbl_load_unload_position.setText(
             f"Beladen/Entladen-Position: {'-' if load_unload_pos is None else f'{float(load_unload_pos):.2f} mm'}"
         )
+        self.lbl_homing_policy.setText(
+            f"Homing: {'nur bei Bedarf' if rehome_n <= 0 else f'alle {rehome_n} Mixe'}, "
+            f"nach Fehler {'EIN' if rehome_fault else 'AUS'}"
+        )
         self.lbl_sim_mode.setText(
             f"Simulation: {'AKTIV' if sim_mode else 'INAKTIV'}"
         )
@@ -1278,6 +1520,33 @@ class AdminScreen(QWidget):
         except Exception as e:
             _msg_error(self, str(e))
 
+    def set_rehome_every_n_mixes(self):
+        current = self.admin_controller.get_rehome_every_n_mixes()
+        val, ok = QInputDialog.getInt(
+            self,
+            "Homing alle N Mixe",
+            "Anzahl Mixe (0 = nur bei Bedarf):",
+            int(current),
+            0,
+            9999,
+            1,
+        )
+        if not ok:
+            return
+        try:
+            self.admin_controller.set_rehome_every_n_mixes(int(val))
+            self.refresh_setup()
+        except Exception as e:
+            _msg_error(self, str(e))
+
+    def toggle_rehome_after_fault(self):
+        try:
+            new_state = not bool(self.admin_controller.get_rehome_after_fault())
+            self.admin_controller.set_rehome_after_fault(new_state)
+            self.refresh_setup()
+        except Exception as e:
+            _msg_error(self, str(e))
+
     def set_waiting_direction(self):
         current = self.admin_controller.get_waiting_direction()
         if current is None:
@@ -1476,5 +1745,12 @@ class AdminScreen(QWidget):
         self.sim_trace_dialog.raise_()
         self.sim_trace_dialog.activateWindow()
 
-
-
+    def open_mix_timeline(self):
+        # Zeitleiste der letzten Mixe; ein offenes Fenster wird nur nach vorne geholt.
+        if self.timeline_dialog is None or not self.timeline_dialog.isVisible():
+            self.timeline_dialog = MixTimelineDialog(self, self.mix_controller)
+            self.timeline_dialog.show()
+        else:
+            self.timeline_dialog.refresh_runs()
+        self.timeline_dialog.raise_()
+        self.timeline_dialog.activateWindow()
@@ -1,31 +1,37 @@
 from __future__ import annotations
 
-from PySide6.QtCore import Qt, QObject, Signal, QThread, QTimer
+from PySide6.QtCore import QObject, QThread, Qt, QTimer, Signal
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame,
     QScrollArea, QProgressBar
 )
 
+from Model.db_connection import close_thread_connections
 
-class MixWorker(QObject):
-    finished = Signal(list)
-    failed = Signal(str)
 
-    def __init__(self, mix_controller, mix_data):
+class EstimateWorker(QObject):
+    estimated = Signal(int, float)
+    finished = Signal()
+
+    def __init__(self, mix_controller, cocktail_ids: list):
         super().__init__()
-        # Controller und vorbereitete Rezeptdaten bleiben im Worker.
         self.mix_controller = mix_controller
-        self.mix_data = mix_data
+        self.cocktail_ids = [int(cid) for cid in cocktail_ids]
 
     def run(self):
-        # Mix im Hintergrund-Thread starten.
+        # Dauer je Kachel im Hintergrund schaetzen; ein Plan-Cache-Miss kompiliert aus SQLite.
         try:
-            recipe = self.mix_controller.run_mix(self.mix_data, factor=1.0)
-            # Leere Liste verhindert None-Handling in der UI.
-            self.finished.emit(recipe if recipe is not None else [])
-        except Exception as e:
-            # Fehlertext wird im Overlay angezeigt.
-            self.failed.emit(str(e))
+            for cid in self.cocktail_ids:
+                try:
+                    estimate = self.mix_controller.estimate_mix(cid)
+                except Exception:
+                    # Nicht mixbare Rezepte bleiben ohne Zeitangabe.
+                    continue
+                self.estimated.emit(cid, float(estimate["total_s"]))
+        finally:
+            # Threadgebundene DB-Verbindungen des Workers freigeben.
+            close_thread_connections()
+            self.finished.emit()
 
 
 class CocktailScreen(QWidget):
@@ -38,10 +44,16 @@ class CocktailScreen(QWidget):
         self.cocktail_model = cocktail_model
         self.on_back = on_back
 
-        self.thread: QThread | None = None
-        self.worker: MixWorker | None = None
-        # Sperrt doppelte Starts per Mehrfachklick.
-        self.mix_running = False
+        # Namen fuer die Queue-Anzeige, gefuellt beim Aufbau der Liste.
+        self._cocktail_names: dict[int, str] = {}
+        # Kacheln pro Cocktail, damit die Dauer nachgetragen werden kann.
+        self._cocktail_buttons: dict[int, QPushButton] = {}
+        self.estimate_thread: QThread | None = None
+        self.estimate_worker: EstimateWorker | None = None
+        # Neuer Aufbau waehrend laufender Schaetzung: danach noch einmal schaetzen.
+        self._estimate_again = False
+        # Fehler eines Auftrags nur einmal als Overlay zeigen.
+        self._shown_error = None
 
         root = QVBoxLayout(self)
         root.setContentsMargins(24, 24, 24, 24)
@@ -103,6 +115,36 @@ class CocktailScreen(QWidget):
         self.info_label.setAlignment(Qt.AlignCenter)
         card_layout.addWidget(self.info_label)
 
+        self.queue_label = QLabel("")
+        self.queue_label.setObjectName("InfoLabel")
+        self.queue_label.setWordWrap(True)
+        card_layout.addWidget(self.queue_label)
+
+        queue_actions = QHBoxLayout()
+        queue_actions.setSpacing(10)
+        self.queue_stop_btn = QPushButton("Stoppen")
+        self.queue_stop_btn.setProperty("role", "nav")
+        self.queue_stop_btn.clicked.connect(self._request_stop)
+        self.queue_resume_btn = QPushButton("Fortsetzen")
+        self.queue_resume_btn.setProperty("role", "nav")
+        self.queue_resume_btn.clicked.connect(self._resume_queue)
+        # Unterbrochenen Mix verwerfen, wenn das Glas nicht fertig gemixt werden soll.
+        self.queue_discard_btn = QPushButton("Verwerfen")
+        self.queue_discard_btn.setProperty("role", "nav")
+        self.queue_discard_btn.clicked.connect(self._discard_interrupted_mix)
+        self.queue_discard_btn.setVisible(False)
+        queue_actions.addStretch(1)
+        queue_actions.addWidget(self.queue_stop_btn)
+        queue_actions.addWidget(self.queue_resume_btn)
+        queue_actions.addWidget(self.queue_discard_btn)
+        queue_actions.addStretch(1)
+        card_layout.addLayout(queue_actions)
+
+        # Queue-Anzeige wird aus dem In-Memory-Snapshot gepollt, Mixen laeuft im Queue-Worker.
+        self._queue_timer = QTimer(self)
+        self._queue_timer.setInterval(1000)
+        self._queue_timer.timeout.connect(self._refresh_queue)
+
         root.addWidget(card, 1)
 
         self.overlay = QFrame(self)
@@ -155,7 +197,11 @@ class CocktailScreen(QWidget):
     def refresh(self):
         # Liste bei jedem Betreten frisch aus der DB aufbauen.
         self._clear_list()
+        self._cocktail_names = {}
+        self._cocktail_buttons = {}
         self.info_label.setText("Lade Cocktails…")
+        self._refresh_queue()
+        self._queue_timer.start()
 
         try:
             cocktails = self.cocktail_model.get_all_cocktails()
@@ -168,10 +214,45 @@ class CocktailScreen(QWidget):
                 # DB-Werte fuer Buttonaufbau in einfache Typen bringen.
                 cid = int(c["cocktail_id"])
                 name = str(c["cocktail_name"])
+                self._cocktail_names[cid] = name
                 self._add_cocktail_button(cid, name)
 
         except Exception as e:
             self.info_label.setText(f"Fehler beim Laden: {e}")
+            return
+        self._start_estimates()
+
+    def _start_estimates(self):
+        # Geschaetzte Dauer nicht im UI-Thread berechnen; Kacheln werden nachgetragen.
+        if self.estimate_thread is not None:
+            self._estimate_again = True
+            return
+        self._estimate_again = False
+
+        self.estimate_thread = QThread()
+        self.estimate_worker = EstimateWorker(self.mix_controller, list(self._cocktail_buttons))
+        self.estimate_worker.moveToThread(self.estimate_thread)
+
+        self.estimate_thread.started.connect(self.estimate_worker.run)
+        self.estimate_worker.estimated.connect(self._estimate_ready)
+        self.estimate_worker.finished.connect(self.estimate_thread.quit)
+        self.estimate_thread.finished.connect(self._estimates_done)
+        self.estimate_thread.finished.connect(self.estimate_thread.deleteLater)
+
+        self.estimate_thread.start()
+
+    def _estimate_ready(self, cocktail_id: int, total_s: float):
+        btn = self._cocktail_buttons.get(int(cocktail_id))
+        if btn is None:
+            return
+        name = self._cocktail_names.get(int(cocktail_id), "")
+        btn.setText(f"{name}\nca. {self._format_eta(total_s)}")
+
+    def _estimates_done(self):
+        self.estimate_thread = None
+        self.estimate_worker = None
+        if self._estimate_again:
+            self._start_estimates()
 
     def _clear_list(self):
         # Alte Buttons entfernen, bevor neue DB-Daten angezeigt werden.
@@ -184,6 +265,7 @@ class CocktailScreen(QWidget):
 
     def _add_cocktail_button(self, cocktail_id: int, name: str):
         # Button merkt sich die Cocktail-ID ueber die Lambda-Bindung.
+        # Geschaetzte Dauer traegt der EstimateWorker nach.
         btn = QPushButton(name)
         btn.setProperty("role", "cocktail")
         btn.setMinimumHeight(72)
@@ -191,42 +273,98 @@ class CocktailScreen(QWidget):
         btn.clicked.connect(lambda _, cid=cocktail_id: self.start_mix(cid))
 
         self.list_layout.insertWidget(self.list_layout.count() - 1, btn)
+        self._cocktail_buttons[cocktail_id] = btn
+
+    def stop(self):
+        # Queue-Anzeige pausieren, wenn der Screen nicht sichtbar ist.
+        self._queue_timer.stop()
 
     def start_mix(self, cocktail_id: int):
         try:
-            mix_data = self.mix_controller.prepare_mix(cocktail_id)
+            # Rezept im UI-Thread pruefen, damit Fehler sofort sichtbar sind.
+            self.mix_controller.prepare_mix(cocktail_id)
+            order = self.mix_controller.enqueue_order(cocktail_id, factor=1.0)
         except Exception as e:
             self._show_overlay("Fehler!", str(e), show_busy=False, allow_back=True, allow_stop=False)
             return
 
-        self.mix_running = True
-        self.back_btn.setEnabled(False)
-        self._show_overlay("Bitte warten…", "Cocktail wird gemischt", show_busy=True, allow_back=False, allow_stop=True)
-
-        self.thread = QThread()
-        self.worker = MixWorker(self.mix_controller, mix_data)
-        self.worker.moveToThread(self.thread)
+        self._show_overlay("Bestellt", f"Auftrag #{order['order_id']} ist in der Warteschlange", show_busy=False)
+        QTimer.singleShot(1200, self._hide_overlay)
+        self._refresh_queue()
 
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self._mix_done)
-        self.worker.failed.connect(self._mix_failed)
+    def _format_eta(self, seconds: float) -> str:
+        seconds = max(0, int(round(seconds)))
+        if seconds < 60:
+            return f"{seconds} s"
+        return f"{seconds // 60} min {seconds % 60:02d} s"
 
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.failed.connect(self.thread.quit)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.finished.connect(self._thread_finished)
+    def _refresh_queue(self):
+        # Queue-Zustand mit ETA anzeigen.
+        try:
+            snapshot = self.mix_controller.get_order_queue() or {}
+        except Exception as e:
+            self.queue_label.setText(f"Warteschlange nicht verfuegbar: {e}")
+            return
 
-        self.thread.start()
+        orders = snapshot.get("orders", [])
+        paused = bool(snapshot.get("paused", False))
+        running = any(o.get("status") == "running" for o in orders)
+
+        if not orders:
+            text = "Keine Auftraege in der Warteschlange."
+        else:
+            lines = [f"Warteschlange: {len(orders)} Auftraege, alle fertig in ca. {self._format_eta(snapshot.get('total_eta_s', 0.0))}"]
+            # Nur die ersten Eintraege rendern, damit auch lange Queues fluessig bleiben.
+            for order in orders[:8]:
+                name = self._cocktail_names.get(order["cocktail_id"], f"Cocktail {order['cocktail_id']}")
+                state = "laeuft" if order.get("status") == "running" else "wartet"
+                lines.append(f"#{order['order_id']} {name} ({state}), fertig in ca. {self._format_eta(order.get('eta_s', 0.0))}")
+            if len(orders) > 8:
+                lines.append(f"… und {len(orders) - 8} weitere")
+            text = "\n".join(lines)
+        checkpoint = snapshot.get("checkpoint")
+        if checkpoint:
+            name = checkpoint.get("cocktail_name") or self._cocktail_names.get(checkpoint.get("cocktail_id"), "Cocktail")
+            phase = {"fetch": "Glas holen", "dispense": "Dosieren", "return": "Rueckgabe"}.get(checkpoint["phase"], checkpoint["phase"])
+            text = (
+                f"{text}\nUnterbrochener Mix: {name} ({phase}, {checkpoint['steps_done']}/{checkpoint['steps_total']} Zutaten dosiert). "
+                "Fortsetzen mixt nur den Rest."
+            )
+        if paused:
+            text = f"{text}\nWarteschlange pausiert."
+        self.queue_label.setText(text)
+
+        self.queue_stop_btn.setEnabled(running)
+        self.queue_resume_btn.setVisible(paused or bool(checkpoint))
+        self.queue_discard_btn.setVisible(bool(checkpoint) and not running)
+
+        last_error = snapshot.get("last_error")
+        if last_error and last_error != self._shown_error:
+            self._shown_error = last_error
+            self._mix_failed(last_error)
+        elif not last_error:
+            self._shown_error = None
+
+    def _resume_queue(self):
+        try:
+            self.mix_controller.resume_order_queue()
+        except Exception as e:
+            self._show_overlay("Fehler!", str(e), show_busy=False, allow_back=True, allow_stop=False)
+            return
+        self._hide_overlay()
+        self._refresh_queue()
 
-    def _mix_done(self, recipe: list):
-        self.mix_running = False
-        self._show_overlay("Fertig", "", show_busy=False, allow_back=False, allow_stop=False)
-        QTimer.singleShot(1200, self._hide_overlay)
+    def _discard_interrupted_mix(self):
+        try:
+            self.mix_controller.discard_mix_checkpoint()
+        except Exception as e:
+            self._show_overlay("Fehler!", str(e), show_busy=False, allow_back=True, allow_stop=False)
+            return
+        self._refresh_queue()
 
     def _mix_failed(self, msg: str):
         info_prefix = "HINWEIS: "
         stop_prefix = "STOP: "
-        self.mix_running = False
         if msg.startswith(info_prefix):
             self._show_overlay("Info", msg[len(info_prefix):].strip(), show_busy=False, allow_back=True, allow_stop=False)
             return
@@ -251,12 +389,9 @@ class CocktailScreen(QWidget):
         self.overlay_stop_btn.setVisible(False)
 
     def _request_stop(self):
-        if not self.mix_running:
-            return
         try:
             self.mix_controller.request_stop()
         except Exception as e:
-            self.mix_running = False
             self._show_overlay("Fehler!", str(e), show_busy=False, allow_back=True, allow_stop=False)
             return
 
@@ -265,9 +400,3 @@ class CocktailScreen(QWidget):
     def _overlay_back(self):
         self._hide_overlay()
         self.on_back()
-
-    def _thread_finished(self):
-        self.mix_running = False
-        self.back_btn.setEnabled(True)
-        self.thread = None
-        self.worker = None
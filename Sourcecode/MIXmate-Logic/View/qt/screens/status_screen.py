@@ -1,21 +1,43 @@
 from __future__ import annotations
 
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QFrame, QGridLayout, QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QWidget
 
 
 class StatusScreen(QWidget):
-    def __init__(self, mix_controller, on_back):
+    # Statusfeld -> Label-Attribut; Fehlertexte zeigen "-" statt None.
+    FIELDS = (
+        ("ok", "lbl_ok"),
+        ("severity", "lbl_severity"),
+        ("error_msg", "lbl_error"),
+        ("busy", "lbl_busy"),
+        ("band_belegt", "lbl_band"),
+        ("ist_position", "lbl_pos"),
+        ("homing_ok", "lbl_home"),
+        ("regal_connected", "lbl_regal_connected"),
+        ("regal_busy", "lbl_regal_busy"),
+        ("regal_band_belegt", "lbl_regal_band"),
+        ("regal_ist_position", "lbl_regal_pos"),
+        ("regal_homing_ok", "lbl_regal_home"),
+        ("regal_wait_start_belegt", "lbl_regal_wait_start"),
+        ("regal_wait_end_belegt", "lbl_regal_wait_end"),
+        ("regal_mixer_belegt", "lbl_regal_mixer"),
+        ("regal_level1_front_belegt", "lbl_regal_level1"),
+        ("regal_level2_front_belegt", "lbl_regal_level2"),
+        ("regal_entladen_blocked", "lbl_regal_entladen_blocked"),
+        ("regal_error_msg", "lbl_regal_error"),
+    )
+    TEXT_FIELDS = ("error_msg", "regal_error_msg")
+
+    def __init__(self, status_bridge, on_back):
         super().__init__()
         self.setObjectName("CocktailScreen")
         self.setAttribute(Qt.WA_StyledBackground, True)
 
-        self.mix_controller = mix_controller
+        # Status kommt per Signal von der Bruecke; der Screen liest selbst nichts vom Controller.
+        self.status_bridge = status_bridge
         self.on_back = on_back
-
-        self._timer = QTimer(self)
-        self._timer.setInterval(300)
-        self._timer.timeout.connect(self.refresh_status)
+        self._active = False
 
         root = QVBoxLayout(self)
         root.setContentsMargins(24, 24, 24, 24)
@@ -126,43 +148,33 @@ class StatusScreen(QWidget):
         self.on_back()
 
     def start(self):
-        self.refresh_status()
-        self._timer.start()
+        # Beim Oeffnen einmal alles setzen, danach nur noch geaenderte Felder.
+        if not self._active:
+            self._active = True
+            self.status_bridge.statusChanged.connect(self._on_status_changed)
+        self._apply(self.status_bridge.latest())
 
     def stop(self):
-        self._timer.stop()
-
-    def refresh_status(self):
-        try:
-            status = self.mix_controller.get_status() or {}
-        except Exception as e:
-            self.info.setText(f"Status konnte nicht gelesen werden: {e}")
+        if not self._active:
             return
-
-        self.lbl_ok.setText(str(status.get("ok")))
-        self.lbl_severity.setText(str(status.get("severity")))
-
-        error_msg = status.get("error_msg") or "-"
-        self.lbl_error.setText(str(error_msg))
-
-        self.lbl_busy.setText(str(status.get("busy")))
-        self.lbl_band.setText(str(status.get("band_belegt")))
-        self.lbl_pos.setText(str(status.get("ist_position")))
-        self.lbl_home.setText(str(status.get("homing_ok")))
-        self.lbl_regal_connected.setText(str(status.get("regal_connected")))
-        self.lbl_regal_busy.setText(str(status.get("regal_busy")))
-        self.lbl_regal_band.setText(str(status.get("regal_band_belegt")))
-        self.lbl_regal_pos.setText(str(status.get("regal_ist_position")))
-        self.lbl_regal_home.setText(str(status.get("regal_homing_ok")))
-        self.lbl_regal_wait_start.setText(str(status.get("regal_wait_start_belegt")))
-        self.lbl_regal_wait_end.setText(str(status.get("regal_wait_end_belegt")))
-        self.lbl_regal_mixer.setText(str(status.get("regal_mixer_belegt")))
-        self.lbl_regal_level1.setText(str(status.get("regal_level1_front_belegt")))
-        self.lbl_regal_level2.setText(str(status.get("regal_level2_front_belegt")))
-        self.lbl_regal_entladen_blocked.setText(str(status.get("regal_entladen_blocked")))
-        self.lbl_regal_error.setText(str(status.get("regal_error_msg") or "-"))
-
-        if status.get("ok"):
-            self.info.setText("Statusmonitor laeuft.")
-        else:
-            self.info.setText("Statusmonitor meldet einen Fehlerzustand.")
+        self._active = False
+        self.status_bridge.statusChanged.disconnect(self._on_status_changed)
+
+    def _on_status_changed(self, changed: dict):
+        if self._active:
+            self._apply(changed)
+
+    def _apply(self, changed: dict):
+        for key, attr in self.FIELDS:
+            if key not in changed:
+                continue
+            value = changed[key]
+            if key in self.TEXT_FIELDS:
+                value = value or "-"
+            getattr(self, attr).setText(str(value))
+
+        if "ok" in changed:
+            if changed["ok"]:
+                self.info.setText("Statusmonitor laeuft.")
+            else:
+                self.info.setText("Statusmonitor meldet einen Fehlerzustand.")
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import threading
+
+from PySide6.QtCore import QObject, Signal
+
+
+class StatusBridge(QObject):
+    # Bruecke zwischen Statusmonitor und Qt: Monitor-Threads melden jeden Poll,
+    # die Screens bekommen per Signal nur die Felder, die sich wirklich geaendert haben.
+    # Signal wird im Poller-Thread ausgeloest; Qt stellt es im GUI-Thread zu (QueuedConnection).
+    statusChanged = Signal(dict)
+
+    # Felder, die sich bei jedem Poll aendern, ohne dass sich am Zustand etwas aendert.
+    VOLATILE_KEYS = frozenset({
+        "seq",
+        "ts",
+        "raw",
+        "effective_poll_s",
+        "status_ts",
+        "status_age_s",
+        "regal_status_ts",
+        "regal_status_age_s",
+    })
+
+    def __init__(self, mix_controller, parent: QObject = None):
+        super().__init__(parent)
+        self.mix_controller = mix_controller
+        # RLock: beim Start wird direkt im GUI-Thread zugestellt, Slots duerfen latest() lesen.
+        self._lock = threading.RLock()
+        self._latest = {}
+        self._unsubscribe = None
+
+    def start(self):
+        if self._unsubscribe is not None:
+            return
+        # Startwert aus dem Cache des Monitors, damit die Screens nicht auf den ersten Poll warten.
+        try:
+            self._on_status(self.mix_controller.get_status() or {})
+        except Exception as e:
+            print(f"[StatusBridge] Startstatus konnte nicht gelesen werden: {e}")
+        self._unsubscribe = self.mix_controller.subscribe_status(self._on_status)
+
+    def stop(self):
+        if self._unsubscribe is None:
+            return
+        self._unsubscribe()
+        self._unsubscribe = None
+
+    def latest(self) -> dict:
+        # Vollstaendiger letzter Status, z.B. fuer Screens, die gerade sichtbar werden.
+        with self._lock:
+            return dict(self._latest)
+
+    def _on_status(self, status: dict):
+        # Mixer- und Regal-Monitor melden aus verschiedenen Threads; Vergleich daher unter Lock.
+        with self._lock:
+            changed = {
+                key: value
+                for key, value in status.items()
+                if key not in self.VOLATILE_KEYS and (key not in self._latest or self._latest[key] != value)
+            }
+            if not changed:
+                return
+            self._latest.update(changed)
+            # Reihenfolge der Signale entspricht der Reihenfolge der Aenderungen.
+            self.statusChanged.emit(changed)
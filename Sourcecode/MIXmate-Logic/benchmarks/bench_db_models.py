@@ -0,0 +1,106 @@
+# Benchmark: Kaltstart und Latenz pro Operation der SQLite-Models.
+# Arbeitet auf einer Kopie von Database/MIXmate.db, die echte Datenbank bleibt unveraendert.
+# Aufruf aus Sourcecode/MIXmate-Logic: python -m benchmarks.bench_db_models
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from Model.cocktail_model import CocktailModel
+from Model.ingredient_model import IngredientModel
+from Model.level_model import LevelModel
+from Model.mix_model import MixModel
+from Model.pump_model import PumpModel
+from Model.system_settings_model import SystemSettingsModel
+
+# Model-Klasse und eine typische Leseoperation.
+CASES = [
+    ("CocktailModel", CocktailModel, lambda m: m.get_all_cocktails()),
+    ("IngredientModel", IngredientModel, lambda m: m.get_all_ingredients()),
+    ("LevelModel", LevelModel, lambda m: m.get_all_levels()),
+    ("MixModel", MixModel, lambda m: m.get_full_mix_data(1)),
+    ("PumpModel", PumpModel, lambda m: m.get_all_pumps()),
+    ("SystemSettingsModel", SystemSettingsModel, lambda m: m.get_simulation_mode()),
+]
+
+COLD_START_SNIPPET = """
+import sys, time, contextlib, io
+sys.path.insert(0, {root!r})
+t = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    from Model.cocktail_model import CocktailModel
+    from Model.ingredient_model import IngredientModel
+    from Model.level_model import LevelModel
+    from Model.mix_model import MixModel
+    from Model.pump_model import PumpModel
+    from Model.system_settings_model import SystemSettingsModel
+    for cls in (CocktailModel, IngredientModel, LevelModel, MixModel, PumpModel, SystemSettingsModel):
+        cls(db_path={db_path!r})
+print(time.perf_counter() - t)
+"""
+
+
+def _cold_start_ms(db_path: str, runs: int) -> float:
+    # Frischer Prozess: Import plus erste Konstruktion aller Models.
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", COLD_START_SNIPPET.format(root=ROOT, db_path=db_path)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]) * 1000.0)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def _per_op_us(cls, op, db_path: str, iterations: int) -> tuple:
+    # Konstruktion + Operation + close, wie in kurzlebigen Controller-Aufrufen.
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            model = cls(db_path=db_path)
+            op(model)
+            model.close()
+        fresh_us = (time.perf_counter() - start) / iterations * 1000000.0
+
+        # Nur die Operation auf einer langlebigen Instanz.
+        model = cls(db_path=db_path)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            op(model)
+        warm_us = (time.perf_counter() - start) / iterations * 1000000.0
+        model.close()
+    return fresh_us, warm_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latenz der SQLite-Models messen")
+    parser.add_argument("--iterations", type=int, default=300, help="Wiederholungen pro Model")
+    parser.add_argument("--cold-runs", type=int, default=5, help="Kaltstarts (Median)")
+    args = parser.parse_args()
+
+    source = os.path.join(ROOT, "Database", "MIXmate.db")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "MIXmate.db")
+        shutil.copyfile(source, db_path)
+
+        print(f"Kaltstart (Import + alle Models): {_cold_start_ms(db_path, args.cold_runs):.1f} ms")
+        print(f"{'Model':<22} {'neu+op+close':>14} {'nur op':>10}")
+        for name, cls, op in CASES:
+            fresh_us, warm_us = _per_op_us(cls, op, db_path, args.iterations)
+            print(f"{name:<22} {fresh_us:11.0f} us {warm_us:7.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Micro-Benchmark: Statusreads pro Sekunde, kombiniert vs. zweistufig.
+# Laeuft ohne Hardware gegen einen Fake-Bus; i2c_msg kommt aus Hardware/virtual_i2c_bus.py,
+# damit der Benchmark auch ohne smbus2 startet.
+# Aufruf aus Sourcecode/MIXmate-Logic: python -m benchmarks.bench_status_read
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Backend muss vor dem ersten Hardware-Import feststehen.
+os.environ["MIXMATE_I2C_BACKEND"] = "virtual"
+
+from Hardware.i2C_logic import i2C_logic
+from Hardware.regal_i2c_logic import RegalI2CLogic
+
+
+class FakeStatusBus:
+    # Antwortet wie die Firmware: nach CMD_STATUS das Statuspaket, sonst ACK 0x06.
+    # Jede i2c_rdwr-Transaktion kostet Start/Adresse/Stop plus 9 Bit pro Byte.
+
+    def __init__(self, bus_hz: int = 100000, overhead_us: float = 150.0, combined_supported: bool = True):
+        self.bit_s = 1.0 / float(bus_hz)
+        self.overhead_s = overhead_us / 1000000.0
+        self.combined_supported = combined_supported
+        self.transactions = 0
+        self.last_cmd = 0
+
+    def _busy_wait(self, seconds: float):
+        # sleep ist fuer Mikrosekunden zu grob.
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+
+    def i2c_rdwr(self, *msgs):
+        self.transactions += 1
+        cost = self.overhead_s
+        for index, msg in enumerate(msgs):
+            cost += (1 + len(msg)) * 9 * self.bit_s
+            if msg.flags == 0:
+                self.last_cmd = msg.buf[0]
+                continue
+            if self.last_cmd == 2 and (index == 0 or self.combined_supported):
+                out = bytes([0, 1, 0x2C, 0x01, 1])
+            else:
+                out = bytes([0x06])
+            out = (out + b"\xff" * len(msg))[: len(msg)]
+            msg.buf[:] = out
+        self._busy_wait(cost)
+
+    def close(self):
+        pass
+
+
+def _bench(read_fn, bus: FakeStatusBus, duration_s: float) -> dict:
+    reads = 0
+    bus.transactions = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration_s:
+        raw = read_fn()
+        if len(raw) != 5:
+            raise RuntimeError(f"Ungueltiger Status: {raw!r}")
+        reads += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "reads_s": reads / elapsed,
+        "transactions_s": bus.transactions / elapsed,
+        "transactions_per_read": bus.transactions / max(1, reads),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statusread-Benchmark gegen einen Fake-I2C-Bus")
+    parser.add_argument("--duration", type=float, default=2.0, help="Sekunden pro Messung")
+    parser.add_argument("--bus-hz", type=int, default=100000, help="I2C-Takt")
+    parser.add_argument("--overhead-us", type=float, default=150.0, help="Fixkosten pro Transaktion")
+    args = parser.parse_args()
+
+    cases = []
+    bus = FakeStatusBus(args.bus_hz, args.overhead_us)
+    mixer = i2C_logic(bus=bus)
+    cases.append(("Mixer kombiniert", mixer.getstatus_raw, bus))
+    cases.append(("Mixer zweistufig", mixer._getstatus_raw_legacy, bus))
+
+    bus = FakeStatusBus(args.bus_hz, args.overhead_us)
+    regal = RegalI2CLogic(bus=bus)
+    cases.append(("Regal kombiniert", regal.get_status_raw, bus))
+    cases.append(("Regal zweistufig", regal._get_status_raw_legacy, bus))
+
+    # Alte Firmware: kombinierter Read wird erkannt und abgeschaltet.
+    bus = FakeStatusBus(args.bus_hz, args.overhead_us, combined_supported=False)
+    old_mixer = i2C_logic(bus=bus)
+    cases.append(("Mixer alte Firmware", old_mixer.getstatus_raw, bus))
+
+    print(f"Bus {args.bus_hz} Hz, Overhead {args.overhead_us:.0f} us, {args.duration:.1f} s pro Messung")
+    for name, read_fn, case_bus in cases:
+        result = _bench(read_fn, case_bus, args.duration)
+        print(
+            f"{name:<22} {result['reads_s']:8.0f} Reads/s  "
+            f"{result['transactions_s']:8.0f} Transaktionen/s  "
+            f"{result['transactions_per_read']:.2f} Transaktionen/Read"
+        )
+
+
+if __name__ == "__main__":
+    main()
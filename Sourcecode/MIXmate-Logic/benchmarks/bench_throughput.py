@@ -0,0 +1,262 @@
+# End-to-End-Benchmark: Cocktails pro Stunde ueber MixController.prepare_mix/run_mix.
+# Mixer und Regal laufen emuliert (Hardware/virtual_i2c_bus.py), die Zeit liefert eine
+# VirtualClock; das Menue sind die Seed-Cocktails mit Rezept aus Model/db_seed_data.py in einer frischen DB.
+# Zutaten ohne Seed-Pumpe bekommen in der Benchmark-DB eine eigene Pumpe, damit das ganze Menue laeuft.
+# Gemessen je Auftrag: Latenz (simulierte Sekunden), Bus-Transaktionen, SQL-Anweisungen, CPU-Zeit.
+# CPU-Zeit enthaelt die Emulation, die im aufrufenden Thread mitlaeuft.
+# Ergebnis als JSON (--out); mit --compare alt.json werden die Kennzahlen gegenuebergestellt.
+# Aufruf aus Sourcecode/MIXmate-Logic: python -m benchmarks.bench_throughput --rounds 3
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Backend muss vor dem ersten Hardware-Import feststehen.
+os.environ["MIXMATE_I2C_BACKEND"] = "virtual"
+
+from benchmarks.sim_evening import REGAL_DEFAULTS, assign_missing_pumps
+from Controller.mix_controller import MixController
+from Hardware.virtual_i2c_bus import reset_virtual_machine
+from Model.db_connection import enable_query_counter, get_query_count
+from Model.db_seed_data import SEED_COCKTAIL_INGREDIENTS, SEED_COCKTAILS
+from Model.system_settings_model import SystemSettingsModel
+from Services.clock import VirtualClock
+from Services.mix_plan_service import get_mix_plan_service
+
+# Skalare Kennzahlen fuer --compare; True = groesser ist besser.
+COMPARE_KEYS = [
+    ("cocktails_per_hour", True),
+    ("latency_p50_s", False),
+    ("latency_p95_s", False),
+    ("bus_transactions_per_mix", False),
+    ("db_queries_per_mix", False),
+    ("cpu_s_per_mix", False),
+    ("prepare_p95_ms", False),
+]
+
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5
+        )
+    except Exception:
+        return None
+    return out.stdout.strip() or None
+
+
+def _percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, int(round(q * (len(values) - 1)))))
+    return values[index]
+
+
+def _mean(values: list) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def _seed_menu() -> list:
+    # Seed-Cocktails mit Rezept; Eintraege ohne Zutaten (z.B. "Test") gehoeren nicht ins Menue.
+    with_recipe = {int(row["cocktail_id"]) for row in SEED_COCKTAIL_INGREDIENTS}
+    return [c for c in SEED_COCKTAILS if int(c["cocktail_id"]) in with_recipe]
+
+
+def _prepare_db(db_path: str, mixer_only: bool):
+    # Frische DB wird beim ersten Zugriff mit den Seed-Daten angelegt.
+    settings = SystemSettingsModel(db_path=db_path)
+    settings.set_simulation_mode(False)
+    assign_missing_pumps(db_path)
+    if mixer_only:
+        return
+    # Seed-Positionen stehen auf 0; fuer das Regal Beispielwerte setzen.
+    for key, value in REGAL_DEFAULTS:
+        settings.set_value(key, value)
+    for cocktail in _seed_menu():
+        settings.set_value(f"cocktail_source_level_{cocktail['cocktail_id']}", 1)
+
+
+def _menu(db_path: str) -> tuple:
+    # Seed-Cocktails, fuer die sich ein Mixplan kompilieren laesst.
+    plans = get_mix_plan_service(db_path)
+    menu = []
+    skipped = []
+    for cocktail in _seed_menu():
+        try:
+            plans.get_plan(int(cocktail["cocktail_id"]))
+        except Exception as e:
+            skipped.append({"cocktail": cocktail["cocktail_name"], "reason": str(e)})
+            continue
+        menu.append((int(cocktail["cocktail_id"]), cocktail["cocktail_name"]))
+    return menu, skipped
+
+
+def run_benchmark(
+    rounds: int = 3,
+    warmup: int = 1,
+    factor: float = 1.0,
+    mixer_only: bool = False,
+    quiet: bool = True,
+) -> dict:
+    # rounds: Durchlaeufe ueber das ganze Menue; warmup: Auftraege vorab, nicht gewertet (Homing, Caches).
+    tmp = tempfile.mkdtemp(prefix="mixmate_bench_")
+    db_path = os.path.join(tmp, "MIXmate.db")
+    # Vor dem ersten Model einschalten, sonst bleiben dessen Verbindungen ungezaehlt.
+    enable_query_counter()
+    controller = None
+    sink = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+            _prepare_db(db_path, mixer_only)
+            menu, skipped = _menu(db_path)
+            if not menu:
+                raise RuntimeError("Kein Seed-Cocktail laesst sich mixen.")
+            clock = VirtualClock()
+            total = int(warmup) + int(rounds) * len(menu)
+            machine = reset_virtual_machine(
+                time_scale=1.0,
+                regal=not mixer_only,
+                clock=clock.monotonic,
+                level_stock={1: total + 5, 2: total + 5},
+            )
+            controller = MixController(db_path=db_path, clock=clock)
+            # Gemessen wird prepare_mix/run_mix direkt; der Queue-Worker wuerde nur im Leerlauf pollen.
+            controller.order_queue.stop()
+
+            orders = [menu[i % len(menu)] for i in range(int(warmup))]
+            orders += [cocktail for _ in range(int(rounds)) for cocktail in menu]
+            records = []
+            for index, (cocktail_id, name) in enumerate(orders):
+                tx_start = machine.snapshot()["counters"]["transactions"]
+                queries_start = get_query_count()
+                cpu_start = time.process_time()
+                sim_start = clock.monotonic()
+                error = None
+                prepare_start = time.perf_counter()
+                try:
+                    mix_data = controller.prepare_mix(cocktail_id, factor)
+                    prepare_ms = (time.perf_counter() - prepare_start) * 1000.0
+                    controller.run_mix(mix_data, factor)
+                except Exception as e:
+                    prepare_ms = None
+                    error = str(e)
+                records.append({
+                    "cocktail": name,
+                    "warmup": index < int(warmup),
+                    "latency_s": clock.monotonic() - sim_start,
+                    "prepare_ms": prepare_ms,
+                    "bus_transactions": machine.snapshot()["counters"]["transactions"] - tx_start,
+                    "db_queries": get_query_count() - queries_start,
+                    "cpu_s": time.process_time() - cpu_start,
+                    "error": error,
+                })
+    finally:
+        if controller is not None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                controller.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    measured = [r for r in records if not r["warmup"]]
+    done = [r for r in measured if r["error"] is None]
+    latencies = [r["latency_s"] for r in done]
+    sim_total_s = sum(r["latency_s"] for r in measured)
+    per_cocktail = {}
+    for _, name in menu:
+        rows = [r for r in done if r["cocktail"] == name]
+        per_cocktail[name] = {
+            "count": len(rows),
+            "latency_p50_s": _percentile([r["latency_s"] for r in rows], 0.50),
+            "bus_transactions_per_mix": _mean([r["bus_transactions"] for r in rows]),
+            "db_queries_per_mix": _mean([r["db_queries"] for r in rows]),
+        }
+    return {
+        "benchmark": "throughput",
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {"rounds": int(rounds), "warmup": int(warmup), "factor": float(factor), "mixer_only": bool(mixer_only)},
+        "menu": [name for _, name in menu],
+        "skipped": skipped,
+        "orders": len(measured),
+        "completed": len(done),
+        "failed": [{"cocktail": r["cocktail"], "error": r["error"]} for r in measured if r["error"] is not None],
+        "cocktails_per_hour": len(done) / (sim_total_s / 3600.0) if sim_total_s > 0 else 0.0,
+        "latency_p50_s": _percentile(latencies, 0.50),
+        "latency_p95_s": _percentile(latencies, 0.95),
+        "bus_transactions_per_mix": _mean([r["bus_transactions"] for r in done]),
+        "db_queries_per_mix": _mean([r["db_queries"] for r in done]),
+        "cpu_s_per_mix": _mean([r["cpu_s"] for r in done]),
+        "prepare_p95_ms": _percentile([r["prepare_ms"] for r in done], 0.95),
+        "per_cocktail": per_cocktail,
+    }
+
+
+def _print_report(result: dict):
+    print(f"Commit {result['commit']}, Menue: {', '.join(result['menu'])}")
+    for row in result["skipped"]:
+        print(f"  uebersprungen {row['cocktail']}: {row['reason']}")
+    print(f"Auftraege {result['orders']}, fertig {result['completed']}")
+    for row in result["failed"]:
+        print(f"  Fehler {row['cocktail']}: {row['error']}")
+    print(f"{'Cocktail':<16} {'Anzahl':>7} {'p50 s':>8} {'Bus/Mix':>9} {'SQL/Mix':>9}")
+    for name, stats in result["per_cocktail"].items():
+        print(
+            f"{name:<16} {stats['count']:>7} {stats['latency_p50_s']:>8.1f} "
+            f"{stats['bus_transactions_per_mix']:>9.0f} {stats['db_queries_per_mix']:>9.0f}"
+        )
+    print(
+        f"Cocktails/h {result['cocktails_per_hour']:.1f}, Latenz p50 {result['latency_p50_s']:.1f} s, "
+        f"p95 {result['latency_p95_s']:.1f} s, CPU {result['cpu_s_per_mix']:.2f} s/Mix"
+    )
+
+
+def _print_compare(old: dict, new: dict):
+    print(f"Vergleich {old.get('commit')} -> {new.get('commit')}")
+    for key, higher_is_better in COMPARE_KEYS:
+        before = old.get(key)
+        after = new.get(key)
+        if before is None or after is None:
+            continue
+        delta = (after - before) / before * 100.0 if before else 0.0
+        worse = delta < 0 if higher_is_better else delta > 0
+        mark = "  schlechter" if worse and abs(delta) >= 5.0 else ""
+        print(f"  {key:<26} {before:>10.2f} -> {after:>10.2f} ({delta:+6.1f} %){mark}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MIXmate End-to-End-Durchsatz auf emulierter Hardware")
+    parser.add_argument("--rounds", type=int, default=3, help="Durchlaeufe ueber das Menue")
+    parser.add_argument("--warmup", type=int, default=1, help="ungewertete Auftraege vorab")
+    parser.add_argument("--factor", type=float, default=1.0)
+    parser.add_argument("--mixer-only", action="store_true", help="ohne Regal, Glaeser stehen bereits am Mixer")
+    parser.add_argument("--out", default="bench_throughput.json", help="Ziel fuer die JSON-Ergebnisse")
+    parser.add_argument("--compare", help="frueheres Ergebnis (JSON) zum Vergleich")
+    parser.add_argument("--verbose", action="store_true", help="Logausgaben der Engine anzeigen")
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        args.rounds, args.warmup, args.factor, args.mixer_only, quiet=not args.verbose
+    )
+    _print_report(result)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+    print(f"Ergebnis geschrieben: {args.out}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            _print_compare(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+# Discrete-Event-Simulation eines Abends: Auftraege laufen durch die echte MixEngine
+# gegen den virtuellen I2C-Bus, die Zeit liefert eine VirtualClock (Services/clock.py).
+# Ausgabe: Durchsatz, Wartezeit in der Queue, Zykluszeit und Auslastung je Ressource.
+# Arbeitet auf einer Kopie von Database/MIXmate.db, die echte Datenbank bleibt unveraendert.
+# Aufruf aus Sourcecode/MIXmate-Logic: python -m benchmarks.sim_evening --orders 40 --hours 3
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Backend muss vor dem ersten Hardware-Import feststehen.
+os.environ["MIXMATE_I2C_BACKEND"] = "virtual"
+
+from Hardware.virtual_i2c_bus import reset_virtual_machine
+from Model.cocktail_model import CocktailModel
+from Model.pump_model import PumpModel
+from Model.system_settings_model import SystemSettingsModel
+from Services.clock import VirtualClock
+from Services.mix_engine import MixEngine
+from Services.mix_plan_service import get_mix_plan_service
+
+# Beispielwerte fuer Regal-Parameter, die in der kopierten Datenbank fehlen.
+REGAL_DEFAULTS = [
+    ("load_unload_position_mm", 300),
+    ("load_unload_height_mm", 200),
+    ("homing_safe_height_mm", 50),
+    ("mixer_height_mm", 200),
+    ("waiting_position_mm", 400),
+    ("level_height_1", 100),
+]
+
+# Zusatzpumpen fuer Rezept-Zutaten ohne Pumpe: Flow-Rate und Positionen zwischen den vorhandenen Pumpen.
+EXTRA_PUMP_FLOW_ML_S = 10.0
+EXTRA_PUMP_POSITIONS_MM = (760, 820, 1000, 480, 400, 1200, 1300)
+
+
+def assign_missing_pumps(db_path: str) -> list:
+    # Zutaten aus Rezepten ohne Pumpe bekommen freie Pumpennummern, sonst faellt der Cocktail aus dem Menue.
+    cocktails = CocktailModel(db_path=db_path)
+    pumps = PumpModel(db_path=db_path)
+    try:
+        needed = {}
+        for row in cocktails.get_all_cocktails():
+            for item in cocktails.get_recipe(int(row["cocktail_id"])):
+                needed.setdefault(int(item["ingredient_id"]), item["ingredient_name"])
+        existing = pumps.get_all_pumps()
+        assigned = {int(p["ingredient_id"]) for p in existing if p["ingredient_id"] is not None}
+        used = {int(p["pump_number"]) for p in existing}
+        free = [n for n in range(1, 11) if n not in used]
+        missing = [(i, name) for i, name in sorted(needed.items()) if i not in assigned]
+        if len(missing) > min(len(free), len(EXTRA_PUMP_POSITIONS_MM)):
+            raise RuntimeError(f"Zu wenige freie Pumpen fuer {len(missing)} Zutaten ohne Pumpe.")
+        filled = []
+        for pump_number, position_mm, (ingredient_id, name) in zip(free, EXTRA_PUMP_POSITIONS_MM, missing):
+            pumps.add_pump(pump_number, EXTRA_PUMP_FLOW_ML_S, position_mm)
+            pumps.update_ingredient(pump_number, ingredient_id)
+            filled.append(f"pump_{pump_number}={name}")
+        return filled
+    finally:
+        pumps.close()
+        cocktails.close()
+
+
+def _prepare_db(db_path: str, mixer_only: bool) -> list:
+    # Kopie auf echten Ablauf stellen und fehlende Regal-Parameter ergaenzen.
+    settings = SystemSettingsModel(db_path=db_path)
+    settings.set_simulation_mode(False)
+    filled = assign_missing_pumps(db_path)
+    if mixer_only:
+        return filled
+    for key, value in REGAL_DEFAULTS:
+        if settings.get_value(key) is None:
+            settings.set_value(key, value)
+            filled.append(key)
+    for row in CocktailModel(db_path=db_path).get_all_cocktails():
+        # Ohne Quell-Ebene kommt das Glas im Modell von Ebene 1.
+        cocktail_id = row["cocktail_id"]
+        if settings.get_cocktail_source_level(int(cocktail_id)) is None:
+            key = f"cocktail_source_level_{int(cocktail_id)}"
+            settings.set_value(key, 1)
+            filled.append(key)
+    return filled
+
+
+def _mixable_cocktails(db_path: str, mixer_only: bool) -> tuple:
+    # Nur Cocktails, fuer die sich ein Mixplan kompilieren laesst.
+    plans = get_mix_plan_service(db_path)
+    cocktails = []
+    skipped = []
+    for row in CocktailModel(db_path=db_path).get_all_cocktails():
+        cocktail_id, name = row["cocktail_id"], row["cocktail_name"]
+        try:
+            plan = plans.get_plan(int(cocktail_id))
+        except Exception as e:
+            skipped.append((name, str(e)))
+            continue
+        if not mixer_only and plan.get_regal_params() is None:
+            skipped.append((name, "keine Regal-Parameter"))
+            continue
+        cocktails.append((int(cocktail_id), name))
+    return cocktails, skipped
+
+
+def _arrivals(rng: random.Random, orders: int, hours: float, cocktails: list) -> list:
+    # Poisson-Ankuenfte: exponentielle Abstaende mit orders/hours als Rate.
+    rate_s = orders / (hours * 3600.0)
+    arrivals = []
+    t = 0.0
+    for _ in range(orders):
+        t += rng.expovariate(rate_s)
+        arrivals.append((t, rng.choice(cocktails)[0]))
+    return arrivals
+
+
+def _percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, int(round(q * (len(values) - 1)))))
+    return values[index]
+
+
+def _summary(values: list) -> dict:
+    return {
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": _percentile(values, 0.50),
+        "p95": _percentile(values, 0.95),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def run_evening(orders: int = 40, hours: float = 3.0, seed: int = 1, mixer_only: bool = False, quiet: bool = True) -> dict:
+    # Einen Abend simulieren und die Kennzahlen als dict liefern.
+    tmp = tempfile.mkdtemp(prefix="mixmate_sim_")
+    db_path = os.path.join(tmp, "MIXmate.db")
+    shutil.copyfile(os.path.join(ROOT, "Database", "MIXmate.db"), db_path)
+    engine = None
+    sink = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+            filled = _prepare_db(db_path, mixer_only)
+            cocktails, skipped = _mixable_cocktails(db_path, mixer_only)
+        if not cocktails:
+            raise RuntimeError("Kein Cocktail laesst sich mit der kopierten Datenbank mixen.")
+        if len(skipped) > len(cocktails):
+            # Ein Abend mit halbem Menue misst nicht den echten Betrieb.
+            reasons = "; ".join(f"{name}: {reason}" for name, reason in skipped)
+            raise RuntimeError(f"Mehr als die Haelfte des Menues ist nicht mixbar ({reasons}).")
+        arrivals = _arrivals(random.Random(seed), int(orders), float(hours), cocktails)
+
+        clock = VirtualClock()
+        stock = int(orders) + 5
+        machine = reset_virtual_machine(
+            time_scale=1.0,
+            regal=not mixer_only,
+            clock=clock.monotonic,
+            level_stock={1: stock, 2: stock},
+        )
+        plans = get_mix_plan_service(db_path)
+        records = []
+        wall_start = time.perf_counter()
+        with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+            engine = MixEngine(clock=clock, db_path=db_path)
+            t0 = clock.monotonic()
+            pending = deque(arrivals)
+            waiting = deque()
+            while pending or waiting:
+                now = clock.monotonic() - t0
+                while pending and pending[0][0] <= now:
+                    waiting.append(pending.popleft())
+                if not waiting:
+                    # Maschine frei: bis zur naechsten Bestellung vorspulen.
+                    clock.sleep(pending[0][0] - now)
+                    continue
+                arrival_s, cocktail_id = waiting.popleft()
+                start_s = clock.monotonic() - t0
+                error = None
+                try:
+                    engine.mix_cocktail(plans.get_plan(cocktail_id).to_mix_data(), 1.0)
+                except Exception as e:
+                    error = str(e)
+                records.append({
+                    "cocktail_id": cocktail_id,
+                    "arrival_s": arrival_s,
+                    "start_s": start_s,
+                    "finish_s": clock.monotonic() - t0,
+                    "error": error,
+                })
+            span_s = clock.monotonic() - t0
+        wall_s = time.perf_counter() - wall_start
+
+        done = [r for r in records if r["error"] is None]
+        snapshot = machine.snapshot()
+        busy = snapshot.get("busy_s", {})
+        return {
+            "orders": len(records),
+            "completed": len(done),
+            "failed": [(r["cocktail_id"], r["error"]) for r in records if r["error"] is not None],
+            "filled_params": filled,
+            "cocktails": cocktails,
+            "skipped": skipped,
+            "span_s": span_s,
+            "throughput_per_h": len(done) / (span_s / 3600.0) if span_s > 0 else 0.0,
+            "queue_delay_s": _summary([r["start_s"] - r["arrival_s"] for r in records]),
+            "cycle_s": _summary([r["finish_s"] - r["start_s"] for r in done]),
+            "utilization": {name: (busy_s / span_s if span_s > 0 else 0.0) for name, busy_s in sorted(busy.items())},
+            "glasses_served": snapshot["counters"]["glasses_served"],
+            "wall_s": wall_s,
+            "speedup": span_s / wall_s if wall_s > 0 else 0.0,
+            "clock_jumps": clock.jumps,
+        }
+    finally:
+        if engine is not None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                engine.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _print_report(report: dict):
+    if report["filled_params"]:
+        print(f"Ergaenzte Beispielwerte: {', '.join(report['filled_params'])}")
+    print(f"Cocktails: {', '.join(name for _, name in report['cocktails'])}")
+    for name, reason in report["skipped"]:
+        print(f"  uebersprungen {name}: {reason}")
+    print(f"Auftraege {report['orders']}, fertig {report['completed']}, Glaeser ausgegeben {report['glasses_served']}")
+    for cocktail_id, error in report["failed"]:
+        print(f"  Fehler Cocktail {cocktail_id}: {error}")
+    print(f"Simulierte Dauer {report['span_s'] / 3600.0:.2f} h, Durchsatz {report['throughput_per_h']:.1f} Cocktails/h")
+    print(f"{'Kennzahl':<18} {'mean s':>9} {'p50 s':>9} {'p95 s':>9} {'max s':>9}")
+    for label, key in (("Wartezeit Queue", "queue_delay_s"), ("Zykluszeit", "cycle_s")):
+        stats = report[key]
+        print(f"{label:<18} {stats['mean']:>9.1f} {stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['max']:>9.1f}")
+    print("Auslastung:")
+    for name, share in report["utilization"].items():
+        print(f"  {name:<16} {share * 100:>6.1f} %")
+    print(
+        f"Echtzeit {report['wall_s']:.1f} s, Faktor {report['speedup']:.0f}x schneller als real, "
+        f"{report['clock_jumps']} Zeitspruenge"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MIXmate Abend-Simulation mit virtueller Uhr")
+    parser.add_argument("--orders", type=int, default=40)
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mixer-only", action="store_true", help="ohne Regal, Glaeser stehen bereits am Mixer")
+    parser.add_argument("--verbose", action="store_true", help="Logausgaben der Engine anzeigen")
+    args = parser.parse_args()
+
+    report = run_evening(args.orders, args.hours, args.seed, args.mixer_only, quiet=not args.verbose)
+    _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
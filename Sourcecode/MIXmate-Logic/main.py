@@ -1,31 +1,56 @@
 import os
+import threading
+import time
 from Controller.admin_controller import AdminController
 from Controller.mix_controller import MixController
 from Controller.pump_controller import PumpController
-from Model.mix_model import MixModel
+from Hardware.i2C_logic import PUMP_MULTI_MAX
 from Model.pump_model import PumpModel
 from Model.system_settings_model import SystemSettingsModel
+from Services.dispense_planner import DispensePlanner
+from Services.mix_estimator_service import get_mix_estimator_service
+from Services.mix_plan_service import get_mix_plan_service, pump_ms
+from Services.mix_timeline_service import MixTimelineService
+from Services.order_queue_service import OrderQueueService
 from Services.simulation_trace_service import get_simulation_trace_service
 from View.qt.run_qt import run_qt
 
 
 class NoHardwareMixController:
+    # Ohne Statusmonitor wird der Status in diesem Takt gelesen und an Beobachter gemeldet.
+    STATUS_PUSH_S = 1.0
+
     def __init__(self, db_path: str, init_error: Exception | None = None):
         # Mix-Controller fuer Betrieb ohne I2C-Hardware.
         # Startfehler der echten Hardware bleibt fuer Statusmeldungen erhalten.
         self._init_error = init_error
         # Gemeinsamer DB-Pfad fuer Models und Settings.
         self.db_path = db_path
-        # MixModel liefert Rezepte auch im Laptop-Modus.
-        self.model = MixModel(db_path=db_path)
+        # Mixplaene liefern Rezepte auch im Laptop-Modus.
+        self.plans = get_mix_plan_service(db_path)
+        # Dauerschaetzung mit Startwerten; die Simulation gruppiert Pumpen wie die neue Firmware.
+        self.estimator = get_mix_estimator_service(db_path)
+        self.estimator.configure(parallel_dispense=True)
         # Simulationsmonitor ersetzt sichtbare I2C-Aktivitaet.
         self.sim_trace = get_simulation_trace_service()
+        # Zeitleisten frueherer Hardware-Mixe bleiben im Adminbereich lesbar.
+        self.timeline = MixTimelineService(db_path=db_path)
         # Simulierter Positionswert fuer Statusanzeigen.
         self._sim_position_mm = 0
         # Simuliertes Homing-Flag fuer Startfreigaben.
         self._sim_homed = False
         # Einfaches Stop-Flag reicht im Fallback ohne Worker-Synchronisierung.
         self._stop_requested = False
+        # Gleicher Fahrweg-Planer wie in der Engine.
+        self.planner = DispensePlanner()
+        # Warteschlange verhaelt sich wie beim echten Controller.
+        self.order_queue = OrderQueueService(self.run_mix, db_path=db_path)
+        self.order_queue.start()
+        # Statusbeobachter; der Melde-Thread startet mit dem ersten Beobachter.
+        self._status_lock = threading.Lock()
+        self._status_subscribers = []
+        self._status_stop = threading.Event()
+        self._status_thread = None
 
     def _simulation_enabled(self) -> bool:
         # Simulationsstatus aus den Systemeinstellungen.
@@ -50,9 +75,13 @@ class NoHardwareMixController:
 
     def mix_cocktail(self, cocktail_id: int, factor: float = 1.0):
         # Rezept laden und simulierten Mix starten.
-        mix_data = self.prepare_mix(cocktail_id)
+        mix_data = self.prepare_mix(cocktail_id, factor)
         return self.run_mix(mix_data, factor=factor)
 
+    def estimate_mix(self, cocktail_id: int, factor: float = 1.0) -> dict:
+        # Voraussichtliche Mixdauer wie im Hardwarebetrieb.
+        return self.estimator.estimate(cocktail_id, factor)
+
     def get_status(self):
         # Maschinenstatus fuer den Laptop-Modus.
         if self._simulation_enabled():
@@ -111,20 +140,46 @@ class NoHardwareMixController:
             "regal_error_msg": "Regal nicht verfuegbar (Laptop-Modus).",
         }
 
-    def prepare_mix(self, cocktail_id: int):
-        # Rezeptdaten mit Cocktail-ID pro Schritt vorbereiten.
+    def subscribe_status(self, callback):
+        # Gleiche Schnittstelle wie MixController; callback laeuft im Melde-Thread.
+        with self._status_lock:
+            self._status_subscribers.append(callback)
+            if self._status_thread is None:
+                self._status_thread = threading.Thread(target=self._status_loop, name="NoHardwareStatus", daemon=True)
+                self._status_thread.start()
+
+        def _unsubscribe():
+            with self._status_lock:
+                if callback in self._status_subscribers:
+                    self._status_subscribers.remove(callback)
+
+        return _unsubscribe
+
+    def _status_loop(self):
+        while not self._status_stop.wait(self.STATUS_PUSH_S):
+            with self._status_lock:
+                subscribers = list(self._status_subscribers)
+            if not subscribers:
+                continue
+            try:
+                status = self.get_status()
+            except Exception as e:
+                print(f"[NoHardware] Status konnte nicht gelesen werden: {e}")
+                continue
+            for callback in subscribers:
+                try:
+                    callback(dict(status))
+                except Exception as e:
+                    # Fehlerhafte Beobachter duerfen die Meldungen nicht stoppen.
+                    print(f"[NoHardware] Beobachter fehlgeschlagen: {e}")
+
+    def prepare_mix(self, cocktail_id: int, factor: float = 1.0):
+        # Rezeptdaten mit Cocktail-ID pro Schritt aus dem Mixplan-Cache.
         self._assert_simulation_enabled()
-        mix_data = self.model.get_full_mix_data(cocktail_id)
-        if not mix_data:
-            # Leerer DB-Treffer bedeutet: Cocktail hat kein startbares Rezept.
-            raise ValueError(f"Kein Rezept fuer Cocktail-ID {cocktail_id} gefunden.")
-        for item in mix_data:
-            # Cocktail-ID wird in jedem Schritt fuer Level-Zuordnung gebraucht.
-            item["cocktail_id"] = int(cocktail_id)
-        return mix_data
+        return self.plans.get_plan(cocktail_id, factor).to_mix_data()
 
-    def run_mix(self, mix_data, factor: float = 1.0):
-        # Simulierter Regal-, Mixer- und Pumpenablauf.
+    def run_mix(self, mix_data, factor: float = 1.0, order_id: int = None):
+        # Simulierter Regal-, Mixer- und Pumpenablauf (ohne Checkpoints, Abbruch startet neu).
         self._assert_simulation_enabled()
         if not mix_data:
             # Ohne Schritte gibt es keinen Ablauf fuer den Monitor.
@@ -184,19 +239,37 @@ class NoHardwareMixController:
         self._sim_log_regal([5], note="CMD_ENTLADEN")
         self.sim_trace.log_text("[SIM] Regal-Sequenz abgeschlossen")
 
-        for item in mix_data:
+        planned, report = self.planner.plan(mix_data, self._sim_position_mm)
+        self.sim_trace.log_text(f"[SIM] {self.planner.format_report(report)}")
+
+        # Gleiche Gruppierung wie in der Engine: gleiche Position + order_group laufen parallel.
+        for batch in self.planner.group_parallel(planned, PUMP_MULTI_MAX):
             if self._stop_requested:
                 raise RuntimeError("STOP: Mixvorgang wurde gestoppt.")
-            # Rezeptzeile in pumpbare Werte umwandeln.
-            ingredient = str(item["ingredient_name"])
-            amount_ml = float(item["amount_ml"]) * float(factor)
-            pump_number = item["pump_number"]
-            flow_rate = item["flow_rate_ml_s"]
-            position_mm = int(item.get("position_mm", item.get("position_steps")))
-
-            if pump_number is None or flow_rate is None or float(flow_rate) <= 0:
-                # Ungueltige Pumpendaten werden in der Simulation nur protokolliert.
-                self.sim_trace.log_text(f"[SIM] {ingredient}: ungueltige Pumpendaten, uebersprungen")
+            runs = []
+            position_mm = None
+            for item in batch:
+                # Rezeptzeile in pumpbare Werte umwandeln.
+                ingredient = str(item["ingredient_name"])
+                amount_ml = float(item["amount_ml"]) * float(factor)
+                pump_number = item["pump_number"]
+                flow_rate = item["flow_rate_ml_s"]
+
+                if pump_number is None or flow_rate is None or float(flow_rate) <= 0:
+                    # Ungueltige Pumpendaten werden in der Simulation nur protokolliert.
+                    self.sim_trace.log_text(f"[SIM] {ingredient}: ungueltige Pumpendaten, uebersprungen")
+                    continue
+
+                # Pumpenlaufzeit aus dem Mixplan oder aus Menge und Kalibrierwert.
+                if item.get("pump_ms") is not None and item.get("plan_factor") == float(factor):
+                    duration_ms = int(item["pump_ms"])
+                else:
+                    duration_ms = pump_ms(amount_ml, flow_rate)
+                runs.append((int(pump_number), duration_ms))
+                position_mm = int(item.get("position_mm", item.get("position_steps")))
+                self.sim_trace.log_text(f"[SIM] Schritt: {ingredient}, {amount_ml:.1f} ml")
+
+            if not runs:
                 continue
 
             # Positionswert in zwei Bytes fuer CMD_FAHR aufteilen.
@@ -205,12 +278,18 @@ class NoHardwareMixController:
             self._sim_log_mixer([0, low, high], note=f"CMD_FAHR -> {position_mm} mm")
             self._sim_position_mm = position_mm
 
-            # Pumpenlaufzeit aus Menge und Kalibrierwert berechnen.
-            dispense_time_s = amount_ml / float(flow_rate)
-            # Firmware akzeptiert Sekunden als uint8.
-            seconds = max(1, min(255, int(round(dispense_time_s))))
-            self._sim_log_mixer([3, int(pump_number), seconds], note=f"CMD_PUMPE {pump_number} fuer {seconds}s")
-            self.sim_trace.log_text(f"[SIM] Schritt: {ingredient}, {amount_ml:.1f} ml")
+            if len(runs) == 1:
+                pump_number, duration_ms = runs[0]
+                self._sim_log_mixer(
+                    [7, pump_number] + list(duration_ms.to_bytes(4, "little")),
+                    note=f"CMD_PUMPE_MS {pump_number} fuer {duration_ms} ms",
+                )
+                continue
+            payload = [9, len(runs)]
+            for pump_number, duration_ms in runs:
+                payload += [pump_number] + list(duration_ms.to_bytes(4, "little"))
+            pumps = ", ".join(f"{p}:{ms} ms" for p, ms in runs)
+            self._sim_log_mixer(payload, note=f"CMD_PUMPE_MULTI {pumps}")
 
         if self._stop_requested:
             raise RuntimeError("STOP: Mixvorgang wurde gestoppt.")
@@ -231,6 +310,63 @@ class NoHardwareMixController:
         self.sim_trace.log_text("[SIM] Cocktail vollstaendig gemixt")
         return mix_data
 
+    def mix_batch(self, cocktail_id: int, count: int, factor: float = 1.0, order_id: int = None):
+        # Simulierter Batch: Plan einmal laden, Glaeser nacheinander mixen.
+        if int(count) < 1:
+            raise ValueError("Anzahl Glaeser muss mindestens 1 sein")
+        start = time.time()
+        mix_data = self.prepare_mix(cocktail_id, factor)
+        plan_s = time.time() - start
+        results = []
+        for index in range(int(count)):
+            glass_start = time.time()
+            self.run_mix(mix_data, factor=factor, order_id=order_id)
+            duration_s = time.time() - glass_start
+            results.append({
+                "index": index,
+                "fetch_s": 0.0,
+                "dispense_s": duration_s,
+                "return_s": 0.0,
+                "duration_s": duration_s,
+            })
+        wall_s = time.time() - start
+        return {
+            "glasses": len(results),
+            "plan_s": plan_s,
+            "setup_s": 0.0,
+            "wall_s": wall_s,
+            "avg_glass_s": sum(r["duration_s"] for r in results) / len(results),
+            "cocktails_per_hour": (3600.0 * len(results) / wall_s) if wall_s > 0 else 0.0,
+            "results": results,
+        }
+
+    def enqueue_order(self, cocktail_id: int, factor: float = 1.0, priority: int = 0):
+        # Auftrag in die Warteschlange stellen.
+        return self.order_queue.enqueue(cocktail_id, factor=factor, priority=priority)
+
+    def get_order_queue(self):
+        # Offene Auftraege mit ETA fuer die UI.
+        return self.order_queue.get_snapshot()
+
+    def cancel_order(self, order_id: int):
+        self.order_queue.cancel(order_id)
+
+    def resume_order_queue(self):
+        self.order_queue.resume()
+
+    def get_mix_checkpoint(self):
+        # Laptop-Modus fuehrt keine Checkpoints.
+        return None
+
+    def discard_mix_checkpoint(self):
+        return self.order_queue.discard_interrupted()
+
+    def get_mix_timeline_runs(self, limit: int = 20):
+        return self.timeline.get_runs(limit)
+
+    def get_mix_timeline(self, run_id: int):
+        return self.timeline.get_spans(run_id)
+
     def request_stop(self):
         # Stop-Wunsch fuer den laufenden simulierten Mix.
         self._stop_requested = True
@@ -251,7 +387,10 @@ class NoHardwareMixController:
 
 
     def shutdown(self):
-        return None
+        # Queue-Worker und Statusmeldungen beenden.
+        self._status_stop.set()
+        self.order_queue.close()
+        self.timeline.close()
 
 
 class NoHardwarePumpController:
@@ -0,0 +1,17 @@
+# Aufruf aus Sourcecode/MIXmate-Logic: python -m pytest tests
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Backend muss vor dem ersten Hardware-Import feststehen; Tests laufen nie gegen echte Hardware.
+os.environ["MIXMATE_I2C_BACKEND"] = "virtual"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    # Frische DB pro Test; Schema und Seed-Daten entstehen beim ersten Zugriff.
+    return str(tmp_path / "MIXmate.db")
@@ -0,0 +1,110 @@
+from Services.dispense_planner import DispensePlanner
+
+
+def _step(order_index, position_mm, order_group=None, pump_number=None):
+    return {
+        "order_index": order_index,
+        "order_group": order_group,
+        "position_mm": position_mm,
+        "pump_number": pump_number if pump_number is not None else order_index,
+    }
+
+
+def _indexes(items) -> list:
+    return [item["order_index"] for item in items]
+
+
+def test_group_is_dispensed_in_one_sweep():
+    planner = DispensePlanner()
+    mix_data = [_step(1, 800, 1), _step(2, 100, 1), _step(3, 500, 1)]
+
+    planned, report = planner.plan(mix_data, start_mm=0)
+
+    assert _indexes(planned) == [2, 3, 1]
+    assert report["naive_mm"] == 800 + 700 + 400
+    assert report["planned_mm"] == 800
+    assert report["planned_s"] < report["naive_s"]
+
+
+def test_sweep_looks_ahead_to_next_fixed_step():
+    planner = DispensePlanner()
+    # Start in der Mitte; danach geht es zu 1000 weiter, also zuerst nach unten.
+    mix_data = [_step(1, 700, 1), _step(2, 300, 1), _step(3, 1000)]
+
+    planned, report = planner.plan(mix_data, start_mm=500)
+
+    assert _indexes(planned) == [2, 1, 3]
+    assert report["planned_mm"] == 200 + 400 + 300
+
+
+def test_steps_without_group_keep_their_order():
+    planner = DispensePlanner()
+    mix_data = [_step(1, 800), _step(2, 100), _step(3, 500)]
+
+    planned, report = planner.plan(mix_data, start_mm=0)
+
+    assert _indexes(planned) == [1, 2, 3]
+    assert report["planned_mm"] == report["naive_mm"]
+
+
+def test_blocks_are_not_mixed_across_groups():
+    planner = DispensePlanner()
+    mix_data = [_step(1, 800, 1), _step(2, 100, 1), _step(3, 50, 2), _step(4, 900, 2)]
+
+    planned, _ = planner.plan(mix_data, start_mm=0)
+
+    assert set(_indexes(planned[:2])) == {1, 2}
+    assert set(_indexes(planned[2:])) == {3, 4}
+
+
+def test_steps_without_position_stay_in_plan():
+    planner = DispensePlanner()
+    mix_data = [_step(1, 800, 1), _step(2, None, 1), _step(3, 100, 1)]
+
+    planned, _ = planner.plan(mix_data, start_mm=0)
+
+    assert sorted(_indexes(planned)) == [1, 2, 3]
+    assert _indexes(planned)[0] == 2
+
+
+def test_unknown_start_keeps_recipe_order():
+    planner = DispensePlanner()
+    mix_data = [_step(1, 800, 1), _step(2, 100, 1)]
+
+    planned, report = planner.plan(mix_data)
+
+    assert _indexes(planned) == [1, 2]
+    assert report["start_mm"] is None
+
+
+def test_group_parallel_joins_same_position_and_group():
+    planner = DispensePlanner()
+    planned = [
+        _step(1, 500, 1, pump_number=1),
+        _step(2, 500, 1, pump_number=2),
+        _step(3, 500, 1, pump_number=3),
+        _step(4, 800, 1, pump_number=4),
+        _step(5, 800, 2, pump_number=5),
+    ]
+
+    batches = planner.group_parallel(planned, max_pumps=2)
+
+    assert [_indexes(batch) for batch in batches] == [[1, 2], [3], [4], [5]]
+
+
+def test_group_parallel_never_runs_one_pump_twice():
+    planner = DispensePlanner()
+    planned = [_step(1, 500, 1, pump_number=1), _step(2, 500, 1, pump_number=1)]
+
+    batches = planner.group_parallel(planned, max_pumps=4)
+
+    assert [_indexes(batch) for batch in batches] == [[1], [2]]
+
+
+def test_group_parallel_keeps_steps_without_group_single():
+    planner = DispensePlanner()
+    planned = [_step(1, 500, pump_number=1), _step(2, 500, pump_number=2)]
+
+    batches = planner.group_parallel(planned, max_pumps=4)
+
+    assert [_indexes(batch) for batch in batches] == [[1], [2]]
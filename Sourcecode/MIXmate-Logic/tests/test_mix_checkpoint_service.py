@@ -0,0 +1,166 @@
+import pytest
+
+from Services.mix_checkpoint_service import MixCheckpointService
+from Services.mix_plan_service import pump_ms
+
+
+def _step(order_index, pump_number, amount_ml, flow_rate_ml_s, factor=1.0, order_group=None, position_mm=100):
+    # Schritt wie aus MixPlan.to_mix_data().
+    return {
+        "cocktail_id": 1,
+        "cocktail_name": "RumCola",
+        "order_index": order_index,
+        "order_group": order_group,
+        "ingredient_name": f"Zutat {order_index}",
+        "pump_number": pump_number,
+        "amount_ml": amount_ml,
+        "flow_rate_ml_s": flow_rate_ml_s,
+        "position_mm": position_mm,
+        "plan_factor": factor,
+        "pump_ms": pump_ms(amount_ml * factor, flow_rate_ml_s) if pump_number is not None else None,
+    }
+
+
+@pytest.fixture
+def checkpoints(db_path):
+    service = MixCheckpointService(db_path=db_path)
+    yield service
+    service.close()
+
+
+def _remaining_by_index(service) -> dict:
+    return {step["order_index"]: step for step in service.remaining_mix_data()}
+
+
+def test_done_steps_are_not_repeated(checkpoints):
+    checkpoints.start([_step(1, 1, 50.0, 10.0), _step(2, 2, 150.0, 12.0)], 1.0)
+    checkpoints.step_done([1])
+
+    remaining = _remaining_by_index(checkpoints)
+
+    assert list(remaining) == [2]
+    assert remaining[2]["pump_ms"] == 12500
+
+
+def test_partial_step_resumes_with_remaining_time(checkpoints):
+    checkpoints.start([_step(1, 1, 50.0, 10.0)], 1.0)
+    checkpoints.step_partial({1: 1200})
+
+    step = _remaining_by_index(checkpoints)[1]
+
+    assert step["pump_ms"] == 5000 - 1200
+    assert step["plan_factor"] == 1.0
+
+
+def test_partial_time_accumulates_over_several_interruptions(checkpoints):
+    checkpoints.start([_step(1, 1, 50.0, 10.0)], 1.0)
+    checkpoints.step_partial({1: 1000})
+    # Fortgesetzt mit Restzeit, dann erneut gestoppt.
+    checkpoints.step_partial({1: 1500})
+
+    assert _remaining_by_index(checkpoints)[1]["pump_ms"] == 2500
+
+
+def test_rest_below_minimum_is_skipped(checkpoints):
+    checkpoints.start([_step(1, 1, 50.0, 10.0), _step(2, 2, 150.0, 12.0)], 1.0)
+    checkpoints.step_partial({1: 5000 - MixCheckpointService.MIN_REMAINING_MS + 1})
+
+    assert list(_remaining_by_index(checkpoints)) == [2]
+
+
+def test_rest_equal_to_minimum_is_still_pumped(checkpoints):
+    checkpoints.start([_step(1, 1, 50.0, 10.0)], 1.0)
+    checkpoints.step_partial({1: 5000 - MixCheckpointService.MIN_REMAINING_MS})
+
+    assert _remaining_by_index(checkpoints)[1]["pump_ms"] == MixCheckpointService.MIN_REMAINING_MS
+
+
+def test_partial_step_is_recomputed_for_a_different_factor(checkpoints):
+    # Plan wurde fuer Faktor 1.0 kompiliert, gemixt wird mit 1.5.
+    checkpoints.start([_step(1, 1, 50.0, 10.0, factor=1.0)], 1.5)
+    checkpoints.step_partial({1: 2000})
+
+    step = _remaining_by_index(checkpoints)[1]
+
+    assert step["pump_ms"] == pump_ms(50.0 * 1.5, 10.0) - 2000
+    assert step["plan_factor"] == 1.5
+
+
+def test_partial_step_without_pump_data_is_kept_unchanged(checkpoints):
+    checkpoints.start([_step(1, None, 50.0, None)], 1.0)
+    checkpoints.step_partial({1: 2000})
+
+    step = _remaining_by_index(checkpoints)[1]
+
+    assert step["pump_ms"] is None
+    assert step["pump_number"] is None
+
+
+def test_parallel_batch_records_each_step(checkpoints):
+    # Parallel gestartete Pumpen: kuerzere Schritte sind nach ihrer Laufzeit fertig.
+    checkpoints.start(
+        [
+            _step(1, 1, 10.0, 10.0, order_group=1),
+            _step(2, 2, 60.0, 12.0, order_group=1),
+            _step(3, 3, 80.0, 8.0, order_group=1),
+        ],
+        1.0,
+    )
+    pumped_ms = 3000
+    durations = {1: 1000, 2: 5000, 3: 10000}
+    checkpoints.step_partial({index: min(ms, pumped_ms) for index, ms in durations.items()})
+
+    remaining = _remaining_by_index(checkpoints)
+
+    assert list(remaining) == [2, 3]
+    assert remaining[2]["pump_ms"] == 2000
+    assert remaining[3]["pump_ms"] == 7000
+
+
+def test_step_done_clears_partial_time(checkpoints):
+    checkpoints.start([_step(1, 1, 50.0, 10.0)], 1.0)
+    checkpoints.step_partial({1: 1000})
+    checkpoints.step_done([1])
+
+    assert checkpoints.remaining_mix_data() == []
+    # Neue Teilmengen fuer den Schritt duerfen nicht auf alte Zeiten aufaddiert werden.
+    checkpoints.fail("STOP: Mixvorgang wurde gestoppt.")
+    assert checkpoints.get_resumable()["partial_ms"] == {}
+
+
+def test_progress_without_open_checkpoint_is_ignored(checkpoints):
+    checkpoints.step_done([1])
+    checkpoints.step_partial({1: 1000})
+
+    assert checkpoints.remaining_mix_data() == []
+    assert checkpoints.get_resumable() is None
+
+
+def test_interrupted_checkpoint_survives_restart(db_path, checkpoints):
+    checkpoints.start([_step(1, 1, 50.0, 10.0), _step(2, 2, 150.0, 12.0)], 1.0)
+    checkpoints.step_done([1])
+    checkpoints.step_partial({2: 4000})
+    checkpoints.close()
+
+    # Programm wurde waehrend des Mixes beendet.
+    restarted = MixCheckpointService(db_path=db_path)
+    try:
+        resumable = restarted.get_resumable()
+        assert resumable is not None
+        assert resumable["status"] == "interrupted"
+        remaining = _remaining_by_index(restarted)
+        assert list(remaining) == [2]
+        assert remaining[2]["pump_ms"] == 12500 - 4000
+    finally:
+        restarted.close()
+
+
+def test_finish_closes_checkpoint(checkpoints):
+    checkpoints.start([_step(1, 1, 50.0, 10.0)], 1.0)
+    checkpoints.fail("STOP: Mixvorgang wurde gestoppt.")
+    assert checkpoints.resume() is not None
+
+    checkpoints.finish()
+
+    assert checkpoints.get_resumable() is None
+    assert checkpoints.remaining_mix_data() == []
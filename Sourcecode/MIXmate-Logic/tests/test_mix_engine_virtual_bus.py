@@ -0,0 +1,96 @@
+# End-to-End ueber MixController/MixEngine gegen den emulierten Bus (Hardware/virtual_i2c_bus.py).
+# Zeit liefert eine VirtualClock, ein kompletter Mix dauert daher nur Sekundenbruchteile.
+import threading
+
+import pytest
+
+from benchmarks.bench_throughput import _prepare_db
+from Controller.mix_controller import MixController
+from Hardware.virtual_i2c_bus import reset_virtual_machine
+from Services.clock import VirtualClock
+
+RUMCOLA_ID = 1
+# Seed-Rezept RumCola: Pumpe 1 fuer 5000 ms, danach Pumpe 2 fuer 12500 ms.
+PLANNED_PUMP_S = {1: 5.0, 2: 12.5}
+STOP_PUMP = 2
+STOP_AFTER_S = 6.0
+# Emulation rechnet in 5-ms-Schritten; Stop und Statuspolling kosten etwas Nachlauf.
+PUMP_TOL_S = 0.1
+
+
+@pytest.fixture
+def machine_setup(db_path):
+    _prepare_db(db_path, mixer_only=False)
+    clock = VirtualClock()
+    machine = reset_virtual_machine(time_scale=1.0, regal=True, clock=clock.monotonic, level_stock={1: 5, 2: 5})
+    controller = MixController(db_path=db_path, clock=clock)
+    # Test ruft die Engine direkt auf; der Queue-Worker wuerde nur im Leerlauf pollen.
+    controller.order_queue.stop()
+    yield controller, machine, clock
+    controller.shutdown()
+
+
+def _stop_during_pump(controller, clock, pump_number: int, after_s: float):
+    # Stop kommt wie vom Bediener, waehrend die Pumpe laeuft.
+    i2c = controller.engine.i2c
+    original = i2c.activate_pump_ms
+    stopper = []
+
+    def activate_pump_ms(pump, duration_ms):
+        result = original(pump, duration_ms)
+        if int(pump) == pump_number and not stopper:
+            def _stop():
+                clock.sleep(after_s)
+                controller.request_stop()
+
+            stopper.append(threading.Thread(target=_stop, daemon=True))
+            stopper[0].start()
+        return result
+
+    i2c.activate_pump_ms = activate_pump_ms
+    return stopper
+
+
+def _pump_run_s(machine) -> dict:
+    busy = machine.snapshot()["busy_s"]
+    return {pump: busy.get(f"pump_{pump}", 0.0) for pump in PLANNED_PUMP_S}
+
+
+def test_mix_stop_and_resume_end_to_end(machine_setup):
+    controller, machine, clock = machine_setup
+    stopper = _stop_during_pump(controller, clock, STOP_PUMP, STOP_AFTER_S)
+
+    with pytest.raises(RuntimeError, match="^STOP: "):
+        controller.mix_cocktail(RUMCOLA_ID)
+    stopper[0].join(timeout=5.0)
+
+    # Stand nach dem Stop: erste Zutat fertig, zweite nur teilweise dosiert.
+    checkpoint = controller.engine.checkpoints.get_resumable()
+    assert checkpoint is not None
+    assert checkpoint["phase"] == "dispense"
+    assert checkpoint["glass_location"] == "mixer"
+    assert checkpoint["done_steps"] == [1]
+    assert checkpoint["partial_ms"][2] == pytest.approx(STOP_AFTER_S * 1000, abs=PUMP_TOL_S * 1000)
+    run_s = _pump_run_s(machine)
+    assert run_s[1] == pytest.approx(PLANNED_PUMP_S[1], abs=PUMP_TOL_S)
+    assert run_s[2] == pytest.approx(STOP_AFTER_S, abs=PUMP_TOL_S)
+    stopped = machine.snapshot()
+    assert stopped["mixer_glass"] is True
+    assert stopped["pumps"] == {}
+    assert controller.engine.is_running() is False
+
+    controller.resume_mix()
+
+    # Fortsetzung dosiert nur die Restzeit; in Summe lief jede Pumpe genau ihre Planzeit.
+    assert controller.get_mix_checkpoint() is None
+    run_s = _pump_run_s(machine)
+    assert run_s[1] == pytest.approx(PLANNED_PUMP_S[1], abs=PUMP_TOL_S)
+    assert run_s[2] == pytest.approx(PLANNED_PUMP_S[2], abs=PUMP_TOL_S)
+    final = machine.snapshot()
+    assert final["mixer_glass"] is False
+    assert final["lift_glass"] is False
+    assert final["counters"]["glasses_dropped"] == 0
+    # Glas steht in der Warteposition oder wurde dort schon entnommen.
+    assert final["wait_glasses"] + final["counters"]["glasses_served"] == 1
+    assert final["mixer_homed"] is True
+    assert controller.engine.is_running() is False
@@ -0,0 +1,101 @@
+import pytest
+
+from Model.order_queue_model import OrderQueueModel
+from Services.mix_checkpoint_service import MixCheckpointService
+from Services.order_queue_service import OrderQueueService
+
+
+def _no_run(mix_data, factor, order_id=None):
+    raise AssertionError("Queue darf im Test nicht mixen.")
+
+
+@pytest.fixture
+def queues():
+    # Alle im Test erzeugten Queues am Ende schliessen.
+    created = []
+    yield created
+    for queue in created:
+        queue.close()
+
+
+def _open_queue(queues, db_path, **kwargs):
+    queue = OrderQueueService(_no_run, db_path=db_path, **kwargs)
+    queues.append(queue)
+    return queue
+
+
+def _crash_with_running_order(db_path) -> dict:
+    # Auftrag lief, als das Programm beendet wurde.
+    model = OrderQueueModel(db_path=db_path)
+    try:
+        running = model.add_order(1)
+        model.mark_running(running["order_id"])
+        model.add_order(2)
+        return running
+    finally:
+        model.close()
+
+
+def test_empty_queue_starts_unpaused(queues, db_path):
+    queue = _open_queue(queues, db_path)
+
+    snapshot = queue.get_snapshot()
+
+    assert snapshot["paused"] is False
+    assert snapshot["orders"] == []
+
+
+def test_running_order_is_requeued_and_queue_paused(queues, db_path):
+    running = _crash_with_running_order(db_path)
+
+    queue = _open_queue(queues, db_path)
+    snapshot = queue.get_snapshot()
+
+    assert snapshot["paused"] is True
+    assert [order["status"] for order in snapshot["orders"]] == ["queued", "queued"]
+    assert running["order_id"] in [order["order_id"] for order in snapshot["orders"]]
+
+
+def test_resume_releases_paused_queue(queues, db_path):
+    _crash_with_running_order(db_path)
+    queue = _open_queue(queues, db_path)
+
+    queue.resume()
+
+    assert queue.get_snapshot()["paused"] is False
+
+
+def test_interrupted_checkpoint_pauses_queue(queues, db_path):
+    checkpoints = MixCheckpointService(db_path=db_path)
+    try:
+        checkpoints.start([{"order_index": 1, "cocktail_id": 1, "pump_number": 1}], 1.0)
+        checkpoints.fail("STOP: Mixvorgang wurde gestoppt.")
+
+        queue = _open_queue(queues, db_path, resume_fn=lambda: None, checkpoints=checkpoints)
+        snapshot = queue.get_snapshot()
+
+        assert snapshot["paused"] is True
+        assert snapshot["orders"] == []
+        assert snapshot["checkpoint"]["steps_total"] == 1
+    finally:
+        checkpoints.close()
+
+
+def test_finished_orders_are_trimmed(db_path, monkeypatch):
+    monkeypatch.setattr(OrderQueueModel, "FINISHED_HISTORY_LIMIT", 3)
+    model = OrderQueueModel(db_path=db_path)
+    try:
+        waiting = model.add_order(1)
+        for _ in range(5):
+            order = model.add_order(1)
+            model.mark_running(order["order_id"])
+            model.mark_finished(order["order_id"], "done")
+
+        rows = model.connection.execute("SELECT order_id, status FROM order_queue ORDER BY order_id").fetchall()
+
+        # Offene Auftraege bleiben, von den abgeschlossenen nur die neuesten.
+        assert [row["status"] for row in rows] == ["queued", "done", "done", "done"]
+        assert rows[0]["order_id"] == waiting["order_id"]
+        assert len(model.get_recent_durations(1)) == 3
+    finally:
+        model.close()
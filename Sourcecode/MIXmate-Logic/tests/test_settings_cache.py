@@ -0,0 +1,76 @@
+import pytest
+
+from Model.db_connection import open_connection
+from Model.settings_cache import SettingsCache
+
+
+@pytest.fixture
+def cache(db_path):
+    cache = SettingsCache(db_path)
+    yield cache
+    cache.close()
+
+
+def _write_external(db_path, key, value):
+    # Aenderung ueber eine zweite Verbindung, z.B. aus einem anderen Prozess.
+    con = open_connection(db_path)
+    try:
+        con.execute(
+            """
+            INSERT INTO machine_parameters (param_key, param_value)
+            VALUES (?, ?)
+            ON CONFLICT(param_key) DO UPDATE SET param_value=excluded.param_value
+            """,
+            (key, float(value)),
+        )
+        con.commit()
+    finally:
+        con.close()
+
+
+def test_set_value_is_visible_immediately(cache):
+    cache.set_value("test_speed", 12.5)
+
+    assert cache.get_value("test_speed") == 12.5
+    assert cache.get_all()["test_speed"] == 12.5
+
+
+def test_unknown_key_is_none(cache):
+    assert cache.get_value("gibt_es_nicht") is None
+
+
+def test_external_change_is_reloaded(db_path, cache):
+    cache.set_value("test_speed", 1.0)
+    assert cache.get_value("test_speed") == 1.0
+
+    _write_external(db_path, "test_speed", 2.0)
+
+    assert cache.get_value("test_speed") == 2.0
+
+
+def test_invalidate_forces_reload(db_path, cache):
+    cache.set_value("test_speed", 1.0)
+    # Cache-Inhalt an der DB vorbei veraendern.
+    cache._values["test_speed"] = 99.0
+    assert cache.get_value("test_speed") == 99.0
+
+    cache.invalidate()
+
+    assert cache.get_value("test_speed") == 1.0
+
+
+def test_commits_to_other_tables_keep_cache(db_path, cache):
+    cache.set_value("test_speed", 1.0)
+    # Marker im Cache: wird er neu geladen, ist er weg.
+    cache._values["test_speed"] = 99.0
+
+    con = open_connection(db_path)
+    try:
+        con.execute(
+            "INSERT INTO order_queue (cocktail_id, factor, priority, status, created_at) VALUES (1, 1.0, 0, 'done', 0)"
+        )
+        con.commit()
+    finally:
+        con.close()
+
+    assert cache.get_value("test_speed") == 99.0
@@ -0,0 +1,70 @@
+from Services.status_service import StatusService
+
+
+def test_empty_answer_is_no_response():
+    status = StatusService().parse_status(b"")
+
+    assert status["ok"] is False
+    assert status["error_code"] == "I2C_NO_RESPONSE"
+
+
+def test_wrong_length_is_rejected():
+    status = StatusService().parse_status(bytes(6))
+
+    assert status["ok"] is False
+    assert status["error_code"] == "I2C_BAD_LENGTH"
+    assert status["busy"] is None
+
+
+def test_five_byte_status():
+    # busy, Glas auf dem Band, Position 300 mm, gehomed.
+    status = StatusService().parse_status(bytes([1, 1, 0x2C, 0x01, 1]))
+
+    assert status["ok"] is True
+    assert status["severity"] == "OK"
+    assert status["status_version"] == 1
+    assert status["busy"] is True
+    assert status["band_belegt"] is True
+    assert status["ist_position"] == 300
+    assert status["glass_present"] is None
+    assert status["glass_moved"] is None
+
+
+def test_seven_byte_status_has_glass_flags():
+    status = StatusService().parse_status(bytes([0, 1, 0x2C, 0x01, 1, 1, 0]))
+
+    assert status["ok"] is True
+    assert status["status_version"] == 2
+    assert status["glass_present"] is True
+    assert status["glass_moved"] is False
+    assert status["severity"] == "OK"
+
+
+def test_moved_glass_is_a_warning():
+    status = StatusService().parse_status(bytes([0, 1, 0, 0, 1, 1, 1]))
+
+    assert status["ok"] is True
+    assert status["severity"] == "WARN"
+    assert status["error_code"] == "GLASS_MOVED"
+
+
+def test_missing_homing_wins_over_glass_flags():
+    status = StatusService().parse_status(bytes([0, 1, 0, 0, 0, 1, 1]))
+
+    assert status["ok"] is True
+    assert status["severity"] == "WARN"
+    assert status["error_code"] == "NOT_HOMED"
+
+
+def test_idle_without_glass_is_low():
+    status = StatusService().parse_status(bytes([0, 0, 0, 0, 1]))
+
+    assert status["ok"] is True
+    assert status["severity"] == "LOW"
+    assert status["error_code"] is None
+
+
+def test_negative_position_is_signed():
+    status = StatusService().parse_status(bytes([0, 1]) + (-5).to_bytes(2, "little", signed=True) + bytes([1]))
+
+    assert status["ist_position"] == -5
@@ -18,6 +18,11 @@ volatile bool is_homed = false;
 const unsigned long BAND_TIMEOUT_MS = 10000UL;
 const long CONTINUOUS_STEPS = 100000000L;
 
+// Laengster Pumpenlauf pro Befehl; laengere Laeufe teilt der Master auf.
+const uint32_t PUMP_MS_MAX = 600000UL;
+// Pumpen pro CMD_PUMPE_MULTI: 2 + 5 * 6 Byte passen in den 32-Byte-Wire-Puffer.
+const uint8_t PUMP_MULTI_MAX = 6;
+
 
 //   Empfehlung für 7/9 Schlauch
 // AccelStepper setSpeed() ist STEPS pro Sekunde (STEP-Pulse/s).
@@ -117,9 +122,19 @@ enum : uint8_t {
   CMD_PUMPE    = 3,
   CMD_BELADEN  = 4,
   CMD_ENTLADEN = 5,
-  CMD_STOP     = 6
+  CMD_STOP     = 6,
+  CMD_PUMPE_MS = 7,
+  CMD_CAPS     = 8,
+  CMD_PUMPE_MULTI = 9
 };
 
+// Antwort auf CMD_CAPS: [CAPS_MAGIC, CAPS_VERSION, Flags]
+// Alte Firmware antwortet nur mit ACK, daran erkennt der Master fehlende Features.
+static const uint8_t CAPS_MAGIC    = 0xCA;
+static const uint8_t CAPS_VERSION  = 1;
+static const uint8_t CAP_PUMPE_MS  = 0x01;
+static const uint8_t CAP_PUMPE_MULTI = 0x02;
+
 
 //         Hardware-Setup
 
@@ -235,11 +250,12 @@ TMC2209Stepper* DRV[] = {
 //   Task Status
 
 // Pumpe: laeuft schrittbasiert fuer die berechnete Laufzeit.
+// Ein Task pro Pumpe, damit mehrere Pumpen gleichzeitig laufen koennen.
 struct PumpTask {
   AccelStepper* motor;
   bool active;
 };
-PumpTask activePump = { nullptr, false };
+PumpTask pumpTasks[10] = {};
 
 struct BandTask {
   AccelStepper* motor;
@@ -254,7 +270,10 @@ BandTask activeBandTask = { nullptr, 0, false };
 volatile uint8_t  aufgabe_i2c  = 0;
 volatile int16_t  par_generic  = 0;     // bei FAHR: mm
 volatile uint8_t  pumpe_id_i2c = 0;
-volatile uint8_t  zeit_sek_i2c = 0;
+volatile uint32_t zeit_ms_i2c  = 0;     // Pumpenlaufzeit in ms (CMD_PUMPE und CMD_PUMPE_MS)
+volatile uint8_t  multi_count_i2c = 0;  // CMD_PUMPE_MULTI: Anzahl Pumpen
+volatile uint8_t  multi_ids_i2c[PUMP_MULTI_MAX];
+volatile uint32_t multi_ms_i2c[PUMP_MULTI_MAX];
 volatile bool     new_message  = false;
 volatile uint8_t  last_cmd     = 0;
 
@@ -307,12 +326,25 @@ void discardRemainingI2CBytes() {
   }
 }
 
-// Stoppt eine laufende Pumpe sauber.
-void stopActivePump() {
-  if (activePump.active && activePump.motor) {
-    activePump.motor->setSpeed(0);
-    activePump.active = false;
-    activePump.motor = nullptr;
+// Prueft, ob noch mindestens eine Pumpe laeuft.
+bool anyPumpActive() {
+  for (int i = 0; i < 10; ++i) {
+    if (pumpTasks[i].active) {
+      return true;
+    }
+  }
+  return false;
+}
+
+// Stoppt alle laufenden Pumpen.
+void stopAllPumps() {
+  for (int i = 0; i < 10; ++i) {
+    if (pumpTasks[i].active && pumpTasks[i].motor) {
+      pumpTasks[i].motor->setSpeed(0);
+      pumpTasks[i].motor->moveTo(pumpTasks[i].motor->currentPosition());
+    }
+    pumpTasks[i].active = false;
+    pumpTasks[i].motor = nullptr;
   }
 }
 
@@ -326,7 +358,7 @@ void stopBandTaskIfRunning() {
 
 // Stoppt alle laufenden Bewegungen und Aufgaben sofort.
 void stopAllMotion() {
-  stopActivePump();
+  stopAllPumps();
 
   if (activeBandTask.motor != nullptr) {
     activeBandTask.motor->setSpeed(0);
@@ -362,7 +394,7 @@ void startBandTask(bool forward, unsigned long stopTimeMs) {
 
 // Aktualisiert das busy-Flag anhand der aktuell laufenden Aufgaben.
 void updateBusyState() {
-  if (PLF.distanceToGo() == 0 && activeBandTask.motor == nullptr && !activePump.active) {
+  if (PLF.distanceToGo() == 0 && activeBandTask.motor == nullptr && !anyPumpActive()) {
     busy = false;
   }
 }
@@ -423,19 +455,27 @@ void updateBandTask() {
   }
 }
 
-// Arbeitet einen laufenden Pumpen-Task weiter ab.
+// Arbeitet alle laufenden Pumpen-Tasks weiter ab.
 void updatePumpTask() {
-  if (!activePump.active || activePump.motor == nullptr) {
-    return;
-  }
+  bool was_active = false;
+  for (int i = 0; i < 10; ++i) {
+    PumpTask& task = pumpTasks[i];
+    if (!task.active || task.motor == nullptr) {
+      continue;
+    }
+    was_active = true;
 
-  // Die Pumpe laeuft mit konstanter Geschwindigkeit bis zur Zielposition.
-  activePump.motor->runSpeedToPosition();
+    // Jede Pumpe laeuft mit konstanter Geschwindigkeit bis zu ihrer Zielposition.
+    task.motor->runSpeedToPosition();
+
+    if (task.motor->distanceToGo() == 0) {
+      task.motor->setSpeed(0);
+      task.active = false;
+      task.motor = nullptr;
+    }
+  }
 
-  if (activePump.motor->distanceToGo() == 0) {
-    activePump.motor->setSpeed(0);
-    activePump.active = false;
-    activePump.motor = nullptr;
+  if (was_active && !anyPumpActive()) {
     busy = false;
   }
 }
@@ -449,7 +489,7 @@ void writeStatusPacket() {
     current_busy =
       (PLF.distanceToGo() != 0) ||
       (activeBandTask.motor != nullptr) ||
-      (activePump.active);
+      anyPumpActive();
   }
 
   long pos_steps = PLF.currentPosition();
@@ -485,6 +525,8 @@ void handlePendingCommand() {
     case CMD_HOME:     (void)home();  break;
     case CMD_STATUS:   break;
     case CMD_PUMPE:    pumpe();       break;
+    case CMD_PUMPE_MS: pumpe();       break;
+    case CMD_PUMPE_MULTI: pumpe_multi(); break;
     case CMD_ENTLADEN: entladen();    break;
     case CMD_BELADEN:  beladen();     break;
     case CMD_STOP:     stopAllMotion(); break;
@@ -502,7 +544,7 @@ void fahren_mm(int16_t mm) {
 
 // Startet das Entladen in Richtung Ausgang.
 void entladen() {
-  stopActivePump();
+  stopAllPumps();
   stopBandTaskIfRunning();
   startBandTask(false, millis() + BAND_TIMEOUT_MS);
 
@@ -512,7 +554,7 @@ void entladen() {
 
 // Startet das Beladen bis ein Glas erkannt wird.
 void beladen() {
-  stopActivePump();
+  stopAllPumps();
   stopBandTaskIfRunning();
   startBandTask(true, 0);
 
@@ -560,40 +602,29 @@ bool home() {
   return true;
 }
 
-// Pumpen: Zeit kommt vom Master (Sekunden)
-// Wir rechnen Zeit -> Steps um (Steps = speed[steps/s] * duration[s])
+// Startet einen Pumpen-Task fuer die angegebene Laufzeit.
+// Wir rechnen Zeit -> Steps um (Steps = speed[steps/s] * duration[ms] / 1000)
 // Dann fahren wir schrittbasiert bis Zielposition (runSpeedToPosition()).
 // Ergebnis: Wenn Master 10s schickt, läuft sie ~10s (bei eingestellter speed).
-void pumpe() {
-  busy = true;
-
-  uint8_t pump_id = pumpe_id_i2c;
-  uint8_t duration_s = zeit_sek_i2c;
-
+void startPumpTask(uint8_t pump_id, uint32_t duration_ms) {
   if (!(pump_id >= 1 && pump_id <= 10)) {
-    busy = false;
     return;
   }
 
+  if (duration_ms > PUMP_MS_MAX) {
+    duration_ms = PUMP_MS_MAX;
+  }
+
   int motor_array_index = (int)pump_id + 1; // 1->2 (=P1) ... 10->11 (=P10)
   AccelStepper* motor = MOT[motor_array_index];
+  PumpTask& task = pumpTasks[pump_id - 1];
 
-  // Falls andere Pumpe aktiv: sofort stoppen
-  if (activePump.active && activePump.motor && activePump.motor != motor) {
-    activePump.motor->setSpeed(0);
-    activePump.active = false;
-    activePump.motor = nullptr;
-  }
-
-  if (duration_s == 0) {
+  if (duration_ms == 0) {
     // Stop-Befehl
     motor->setSpeed(0);
     motor->moveTo(motor->currentPosition());
-    if (activePump.motor == motor) {
-      activePump.active = false;
-      activePump.motor = nullptr;
-    }
-    busy = false;
+    task.active = false;
+    task.motor = nullptr;
     return;
   }
 
@@ -602,16 +633,52 @@ void pumpe() {
   float speed = motor->maxSpeed();
 
   // Dynamisch: Steps = Zeit * Speed
-  // (Runden damit 10 Sekunden möglichst exakt werden)
-  long steps_to_run = (long)lroundf((float)duration_s * fabsf(speed));
+  // (Runden damit auch kurze Laeufe im ms-Bereich moeglichst exakt werden)
+  long steps_to_run = (long)lroundf((float)duration_ms * fabsf(speed) / 1000.0f);
 
   long target = motor->currentPosition() + (speed >= 0 ? steps_to_run : -steps_to_run);
 
   motor->moveTo(target);
   motor->setSpeed(speed);
 
-  activePump.motor = motor;
-  activePump.active = true;
+  task.motor = motor;
+  task.active = true;
+}
+
+// Pumpen: Zeit kommt vom Master (CMD_PUMPE in Sekunden, CMD_PUMPE_MS in Millisekunden)
+void pumpe() {
+  busy = true;
+
+  noInterrupts();
+  uint8_t pump_id = pumpe_id_i2c;
+  uint32_t duration_ms = zeit_ms_i2c;
+  interrupts();
+
+  // Einzelbefehl: andere aktive Pumpen sofort stoppen
+  stopAllPumps();
+  startPumpTask(pump_id, duration_ms);
+  busy = anyPumpActive();
+}
+
+// Mehrere Pumpen gleichzeitig starten, jede mit eigener Laufzeit (CMD_PUMPE_MULTI).
+void pumpe_multi() {
+  busy = true;
+
+  uint8_t ids[PUMP_MULTI_MAX];
+  uint32_t durations_ms[PUMP_MULTI_MAX];
+  noInterrupts();
+  uint8_t n = multi_count_i2c;
+  for (uint8_t i = 0; i < n; ++i) {
+    ids[i] = multi_ids_i2c[i];
+    durations_ms[i] = multi_ms_i2c[i];
+  }
+  interrupts();
+
+  stopAllPumps();
+  for (uint8_t i = 0; i < n; ++i) {
+    startPumpTask(ids[i], durations_ms[i]);
+  }
+  busy = anyPumpActive();
 }
 
 //         I2C
@@ -639,7 +706,45 @@ void onI2CReceive(int count) {
   if (cmd == CMD_PUMPE) {
     if (count >= 3 && Wire.available() >= 2) {
       pumpe_id_i2c = Wire.read();
-      zeit_sek_i2c = Wire.read(); // Sekunden 0..255
+      zeit_ms_i2c = (uint32_t)Wire.read() * 1000UL; // Sekunden 0..255
+    }
+    discardRemainingI2CBytes();
+    new_message = true;
+    return;
+  }
+
+  if (cmd == CMD_PUMPE_MULTI) {
+    // [cmd, n, (pumpe, ms b0..b3) * n] (ms als uint32 little-endian)
+    uint8_t n = 0;
+    if (count >= 2 && Wire.available() >= 1) {
+      n = Wire.read();
+    }
+    if (n > PUMP_MULTI_MAX || count < 2 + 5 * (int)n) {
+      n = 0;
+    }
+    for (uint8_t k = 0; k < n; ++k) {
+      multi_ids_i2c[k] = Wire.read();
+      uint32_t ms = 0;
+      for (uint8_t i = 0; i < 4; ++i) {
+        ms |= (uint32_t)Wire.read() << (8 * i);
+      }
+      multi_ms_i2c[k] = ms;
+    }
+    multi_count_i2c = n;
+    discardRemainingI2CBytes();
+    new_message = true;
+    return;
+  }
+
+  if (cmd == CMD_PUMPE_MS) {
+    // [cmd, pumpe, ms b0, ms b1, ms b2, ms b3] (uint32 little-endian)
+    if (count >= 6 && Wire.available() >= 5) {
+      pumpe_id_i2c = Wire.read();
+      uint32_t ms = 0;
+      for (uint8_t i = 0; i < 4; ++i) {
+        ms |= (uint32_t)Wire.read() << (8 * i);
+      }
+      zeit_ms_i2c = ms;
     }
     discardRemainingI2CBytes();
     new_message = true;
@@ -657,6 +762,12 @@ void onI2CRequest() {
     return;
   }
 
+  if (last_cmd == CMD_CAPS) {
+    const uint8_t caps[3] = { CAPS_MAGIC, CAPS_VERSION, CAP_PUMPE_MS | CAP_PUMPE_MULTI };
+    Wire.write(caps, 3);
+    return;
+  }
+
   const uint8_t ack = 0x06;
   Wire.write(&ack, 1);
 }